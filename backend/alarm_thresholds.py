@@ -161,6 +161,7 @@ class AlarmThresholdManager:
         
         self._initialized = True
         self.thresholds: AlarmThresholds = None
+        self.version = 0  # 配置变化计数 (报警引擎据此重新编译阈值)
         
         # 确保配置目录存在
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -170,6 +171,7 @@ class AlarmThresholdManager:
     
     def load(self):
         """从文件加载配置"""
+        self.version += 1
         if ALARM_CONFIG_FILE.exists():
             try:
                 with open(ALARM_CONFIG_FILE, 'r', encoding='utf-8') as f:
@@ -217,6 +219,7 @@ class AlarmThresholdManager:
     def set_threshold(self, param_name: str, config: ThresholdConfig):
         """设置指定参数的阈值配置"""
         setattr(self.thresholds, param_name, config)
+        self.version += 1
     
     def check_value(self, param_name: str, value: float) -> str:
         """检查数值是否超限
@@ -10,7 +10,7 @@ def get_data_bridge():
     return _get_data_bridge()
 
 # 直接导入不依赖 PyQt6 的模块
-from .data_cache import DataCache, get_data_cache
+from .data_cache import CacheSnapshot, DataCache, get_data_cache
 from .data_models import (
     ElectrodeData,
     ArcData,
@@ -32,6 +32,7 @@ __all__ = [
     # 桥接器（延迟导入）
     "get_data_bridge",
     # 缓存管理器
+    "CacheSnapshot",
     "DataCache",
     "get_data_cache",
     # 历史查询服务
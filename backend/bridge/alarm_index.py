@@ -0,0 +1,191 @@
+"""
+报警记录索引 - 报警记录页面的内存缓存
+
+    1. 按批次缓存报警记录，按 (alarm_type, param_name) 分组，每组按时间倒序
+    2. 首次查询 / 查询起点变化: 一次查询取回所有类型 (query_alarm_records_grouped)
+    3. 再次刷新同一批次: 只查询上次截止时间之后的记录 (增量)，与缓存合并去重
+    4. 返回时按表格定义 (alarm_type + 参数名前缀) 分桶，切换批次/刷新页面只有一次数据库往返
+
+增量查询起点回退 _INCREMENTAL_OVERLAP，覆盖报警写入队列的延迟 (报警时间早于实际入库时间)
+截止时间提前 (缩小范围) 时，缓存只有每组最新 _RECORDS_PER_PARAM 条，不足以覆盖新范围则重新全量查询
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from backend.bridge.history_query import get_history_query_service, BEIJING_TZ
+
+# 增量查询起点回退时长
+_INCREMENTAL_OVERLAP = timedelta(seconds=60)
+
+# 最多缓存的批次数
+_MAX_BATCHES = 20
+
+# 每个 (alarm_type, param_name) 保留的记录数
+_RECORDS_PER_PARAM = 50
+
+# 表格定义: 表格键 -> (alarm_type, 参数名前缀)
+TableSpec = Dict[str, Tuple[str, str]]
+
+
+def _to_utc(value: datetime) -> datetime:
+    """北京时间 (naive 视为北京时间) -> UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=BEIJING_TZ)
+    return value.astimezone(timezone.utc)
+
+
+class _BatchAlarms:
+    """单个批次的缓存"""
+
+    __slots__ = ('start_utc', 'end_utc', 'groups', 'seen')
+
+    def __init__(self, start_utc: datetime, end_utc: datetime):
+        self.start_utc = start_utc
+        self.end_utc = end_utc                                     # 已查询的截止时间
+        self.groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.seen: Set[Tuple[datetime, str, str]] = set()         # (时间, 参数名, 级别) 去重
+
+    def merge(self, records: List[Dict[str, Any]]) -> int:
+        added = 0
+        touched = set()
+        for record in records:
+            key = (record['time_utc'], record['param_name'], record['level'])
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            group_key = (record['alarm_type'], record['param_name'])
+            self.groups.setdefault(group_key, []).append(record)
+            touched.add(group_key)
+            added += 1
+
+        for group_key in touched:
+            group = self.groups[group_key]
+            group.sort(key=lambda r: r['time_utc'], reverse=True)
+            for dropped in group[_RECORDS_PER_PARAM:]:
+                self.seen.discard((dropped['time_utc'], dropped['param_name'], dropped['level']))
+            del group[_RECORDS_PER_PARAM:]
+        return added
+
+    def covers(self, end_utc: datetime, limit: int) -> bool:
+        """缓存能否给出截止到 end_utc 的最新 limit 条 (每组未截断，或截止时间前仍有 limit 条)"""
+        for group in self.groups.values():
+            if len(group) < _RECORDS_PER_PARAM:
+                continue
+            if sum(1 for r in group if r['time_utc'] <= end_utc) < limit:
+                return False
+        return True
+
+
+class AlarmRecordIndex:
+    """报警记录索引 (GUI 线程使用，单例通过 get_alarm_record_index() 获取)"""
+
+    # 1. 初始化
+    def __init__(self):
+        self.history_service = get_history_query_service()
+        self._batches: "OrderedDict[str, _BatchAlarms]" = OrderedDict()
+        self._queries = 0
+
+    # 2. 获取分桶后的报警记录 (最多一次数据库查询)
+    def get_tables(
+        self,
+        batch_code: Optional[str],
+        start_time: datetime,
+        end_time: datetime,
+        tables: TableSpec,
+        limit: int = 10,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Args:
+            batch_code: 批次号 (None/空表示不按批次过滤)
+            start_time: 开始时间 (北京时间)
+            end_time: 结束时间 (北京时间)
+            tables: {表格键: (alarm_type, 参数名前缀)}
+            limit: 每个表格返回的最大条数
+
+        Returns:
+            {表格键: [报警记录, ...] (时间倒序)}
+        """
+        start_utc = _to_utc(start_time)
+        end_utc = _to_utc(end_time)
+        entry = self._refresh(batch_code or "", start_utc, end_utc, limit)
+
+        result: Dict[str, List[Dict[str, Any]]] = {key: [] for key in tables}
+        for (alarm_type, param_name), records in entry.groups.items():
+            for key, (table_type, prefix) in tables.items():
+                if alarm_type == table_type and param_name.startswith(prefix):
+                    result[key].extend(r for r in records if r['time_utc'] <= end_utc)
+                    break
+
+        for key, records in result.items():
+            records.sort(key=lambda r: r['time_utc'], reverse=True)
+            del records[limit:]
+        return result
+
+    # 3. 清除缓存 (batch_code 为 None 时全部清除)
+    def invalidate(self, batch_code: Optional[str] = None):
+        if batch_code is None:
+            self._batches.clear()
+        else:
+            self._batches.pop(batch_code, None)
+
+    # 4. 统计
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'queries': self._queries,
+            'batches': len(self._batches),
+            'records': sum(len(g) for entry in self._batches.values() for g in entry.groups.values()),
+        }
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _refresh(self, key: str, start_utc: datetime, end_utc: datetime, limit: int) -> _BatchAlarms:
+        entry = self._batches.get(key)
+        narrowed = entry is not None and end_utc < entry.end_utc and not entry.covers(end_utc, limit)
+        if entry is not None and entry.start_utc == start_utc and not narrowed:
+            self._batches.move_to_end(key)
+            if end_utc <= entry.end_utc - _INCREMENTAL_OVERLAP:
+                return entry
+            # 增量: 从上次截止时间 (回退重叠时长) 查询到本次截止时间
+            since = max(start_utc, entry.end_utc - _INCREMENTAL_OVERLAP)
+            records = self._query(key, since, end_utc)
+            if records is not None:
+                added = entry.merge(records)
+                entry.end_utc = max(entry.end_utc, end_utc)
+                logger.info(f"报警记录增量刷新: 批次={key or '全部'}, 新增 {added} 条")
+            return entry
+
+        # 全量: 首次查询、查询起点变化或截止时间提前超出缓存覆盖范围 (查询失败时不缓存，下次重新全量查询)
+        entry = _BatchAlarms(start_utc, end_utc)
+        records = self._query(key, start_utc, end_utc)
+        if records is None:
+            return entry
+        entry.merge(records)
+        self._batches[key] = entry
+        self._batches.move_to_end(key)
+        while len(self._batches) > _MAX_BATCHES:
+            self._batches.popitem(last=False)
+        return entry
+
+    def _query(self, key: str, start_utc: datetime, end_utc: datetime) -> Optional[List[Dict[str, Any]]]:
+        self._queries += 1
+        return self.history_service.query_alarm_records_grouped(
+            batch_code=key or None,
+            start_time=start_utc,
+            end_time=end_utc,
+            limit_per_param=_RECORDS_PER_PARAM,
+        )
+
+
+# 5. 获取报警记录索引单例
+_alarm_record_index: Optional[AlarmRecordIndex] = None
+
+
+def get_alarm_record_index() -> AlarmRecordIndex:
+    global _alarm_record_index
+    if _alarm_record_index is None:
+        _alarm_record_index = AlarmRecordIndex()
+    return _alarm_record_index
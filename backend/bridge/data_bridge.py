@@ -1,26 +1,84 @@
 """
 数据桥接器
+
+后端线程 -> 前端 (GUI 线程) 的数据分发:
+    1. 每个主题一个"最新值"槽位 (latest-wins)，GUI 线程繁忙时旧数据被覆盖，不会排队后再过期送达
+    2. 任意时刻最多只有一个排队中的唤醒事件，事件队列不会无限增长
+    3. GUI 线程被唤醒后一次取走所有主题的最新值，再发出对应信号 / 回调订阅者
+    4. 订阅者可设置最高刷新频率 (max_hz)，超频时延迟到下一个允许时刻送达最新值
+    错误信息 (error_occurred) 和报警事件 (alarm_raised) 不合并，逐条发送
 """
-from PyQt6.QtCore import QObject, pyqtSignal
-from typing import Dict, Any, Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
 from loguru import logger
 
+# 主题
+TOPIC_ARC = 'arc'
+TOPIC_SENSOR = 'sensor'
+TOPIC_BATCH_STATUS = 'batch_status'
+TOPIC_CONNECTION = 'connection'
+TOPIC_HEALTH = 'health'
+
+
+@dataclass(eq=False)
+class Subscription:
+    """订阅者 (subscribe() 返回，unsubscribe() 时传回)"""
+    topic: str
+    callback: Callable[[Any], None]
+    min_interval: float = 0.0          # 最短送达间隔 (秒)，0 表示不限
+    last_delivery: float = 0.0
+    deferred: bool = False             # 已安排延迟送达
+    delivered: int = 0
+    skipped: int = 0                   # 限频期间被覆盖的数据
+
+
+@dataclass
+class _TopicStats:
+    published: int = 0                 # 后端发布次数
+    delivered: int = 0                 # 实际送达 GUI 的次数
+    subscribers: List[Subscription] = field(default_factory=list)
+
 
 class DataBridge(QObject):
-    
+
     arc_data_updated = pyqtSignal(dict)
     sensor_data_updated = pyqtSignal(dict)
     batch_status_changed = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     connection_status_changed = pyqtSignal(bool)
-    
+    health_status_changed = pyqtSignal(dict)
+    alarm_raised = pyqtSignal(dict)
+
+    # 内部唤醒信号 (排队到 GUI 线程，同一时刻最多一个)
+    _wakeup = pyqtSignal()
+
     _instance: Optional['DataBridge'] = None
-    
+
     # 1. 初始化数据桥接器（私有，通过 get_instance() 获取）
     def __init__(self):
         super().__init__()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}       # 待送达的最新值
+        self._latest: Dict[str, Any] = {}        # 已送达的最新值 (限频订阅者延迟送达时使用)
+        self._wakeup_pending = False
+        self._wakeups = 0
+        self._topics: Dict[str, _TopicStats] = {
+            topic: _TopicStats() for topic in (TOPIC_ARC, TOPIC_SENSOR, TOPIC_BATCH_STATUS, TOPIC_CONNECTION, TOPIC_HEALTH)
+        }
+        self._signals = {
+            TOPIC_ARC: self.arc_data_updated,
+            TOPIC_SENSOR: self.sensor_data_updated,
+            TOPIC_BATCH_STATUS: self.batch_status_changed,
+            TOPIC_CONNECTION: self.connection_status_changed,
+            TOPIC_HEALTH: self.health_status_changed,
+        }
+        self._wakeup.connect(self._drain, Qt.ConnectionType.QueuedConnection)
         logger.info("数据桥接器已初始化")
-    
+
     # 2. 获取单例实例
     @classmethod
     def get_instance(cls) -> 'DataBridge':
@@ -28,44 +86,134 @@ class DataBridge(QObject):
             logger.info("创建 DataBridge 单例实例")
             cls._instance = cls()
         return cls._instance
-    
+
     # 3. 发送弧流数据到前端
     def emit_arc_data(self, data: Dict[str, Any]):
-        try:
-            self.arc_data_updated.emit(data)
-        except Exception as e:
-            logger.error(f"发送弧流数据失败: {e}")
-            self.error_occurred.emit(f"发送弧流数据失败: {e}")
-    
+        self._publish(TOPIC_ARC, data)
+
     # 4. 发送传感器数据到前端
     def emit_sensor_data(self, data: Dict[str, Any]):
-        try:
-            self.sensor_data_updated.emit(data)
-        except Exception as e:
-            logger.error(f"发送传感器数据失败: {e}")
-            self.error_occurred.emit(f"发送传感器数据失败: {e}")
-    
+        self._publish(TOPIC_SENSOR, data)
+
     # 5. 发送批次状态到前端
     def emit_batch_status(self, status: Dict[str, Any]):
-        try:
-            self.batch_status_changed.emit(status)
-        except Exception as e:
-            logger.error(f"发送批次状态失败: {e}")
-            self.error_occurred.emit(f"发送批次状态失败: {e}")
-    
+        self._publish(TOPIC_BATCH_STATUS, status)
+
     # 6. 发送错误信息到前端
     def emit_error(self, error_msg: str):
         logger.error(f"错误: {error_msg}")
         self.error_occurred.emit(error_msg)
-    
+
     # 7. 发送连接状态到前端
     def emit_connection_status(self, connected: bool):
         status = "已连接" if connected else "已断开"
         logger.info(f"PLC 连接状态: {status}")
-        self.connection_status_changed.emit(connected)
+        self._publish(TOPIC_CONNECTION, connected)
+
+    # 7.1 发送健康检查结果到前端 (HealthMonitor 状态变化时调用)
+    def emit_health_status(self, status: Dict[str, Any]):
+        self._publish(TOPIC_HEALTH, status)
+
+    # 7.2 发送报警事件到前端 (alarm_store 去重后立即调用，不经过槽位合并)
+    def emit_alarm(self, event: Dict[str, Any]):
+        self.alarm_raised.emit(event)
+
+    # 8. 订阅主题 (GUI 线程调用，回调在 GUI 线程执行)
+    def subscribe(self, topic: str, callback: Callable[[Any], None], max_hz: Optional[float] = None) -> Subscription:
+        """订阅主题的最新值
+
+        Args:
+            topic: TOPIC_ARC / TOPIC_SENSOR / TOPIC_BATCH_STATUS / TOPIC_CONNECTION / TOPIC_HEALTH
+            callback: 回调函数，参数为最新值
+            max_hz: 最高送达频率，None 表示每次唤醒都送达
+        """
+        subscription = Subscription(
+            topic=topic,
+            callback=callback,
+            min_interval=1.0 / max_hz if max_hz else 0.0,
+        )
+        self._topics[topic].subscribers.append(subscription)
+        return subscription
+
+    # 9. 取消订阅
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._topics[subscription.topic].subscribers
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+
+    # 10. 分发统计 {wakeups, topics: {主题: {published, delivered, coalesced, subscribers}}}
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        topics = {}
+        for topic, stats in self._topics.items():
+            topics[topic] = {
+                'published': stats.published,
+                'delivered': stats.delivered,
+                'coalesced': stats.published - stats.delivered,
+                'subscribers': [
+                    {'max_hz': round(1.0 / s.min_interval, 2) if s.min_interval else None,
+                     'delivered': s.delivered, 'skipped': s.skipped}
+                    for s in stats.subscribers
+                ],
+            }
+        return {'wakeups': self._wakeups, 'topics': topics}
 
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _publish(self, topic: str, value: Any):
+        """任意线程调用: 覆盖槽位，没有排队中的唤醒时发出一个"""
+        with self._lock:
+            self._pending[topic] = value
+            self._topics[topic].published += 1
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        self._wakeup.emit()
 
-# 8. 获取数据桥接器单例
+    def _drain(self):
+        """GUI 线程: 取走所有主题的最新值并送达"""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._wakeup_pending = False
+        self._wakeups += 1
+
+        for topic, value in pending.items():
+            stats = self._topics[topic]
+            stats.delivered += 1
+            self._latest[topic] = value
+            try:
+                self._signals[topic].emit(value)
+            except Exception as e:
+                logger.error(f"发送 {topic} 数据失败: {e}")
+            for subscription in list(stats.subscribers):
+                self._deliver(subscription, value)
+
+    def _deliver(self, subscription: Subscription, value: Any):
+        now = time.monotonic()
+        wait = subscription.last_delivery + subscription.min_interval - now
+        if wait <= 0:
+            subscription.last_delivery = now
+            subscription.delivered += 1
+            try:
+                subscription.callback(value)
+            except Exception as e:
+                logger.error(f"订阅回调失败 ({subscription.topic}): {e}")
+            return
+
+        # 限频: 到允许时刻再送达当时的最新值 (期间的数据被覆盖)
+        subscription.skipped += 1
+        if not subscription.deferred:
+            subscription.deferred = True
+            QTimer.singleShot(int(wait * 1000) + 1, lambda: self._deliver_deferred(subscription))
+
+    def _deliver_deferred(self, subscription: Subscription):
+        subscription.deferred = False
+        if subscription in self._topics[subscription.topic].subscribers:
+            subscription.skipped -= 1
+            self._deliver(subscription, self._latest[subscription.topic])
+
+
+# 11. 获取数据桥接器单例
 def get_data_bridge() -> DataBridge:
     return DataBridge.get_instance()
-
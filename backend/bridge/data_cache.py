@@ -1,14 +1,39 @@
 """
 内存缓存管理器
+
+读写模型（不可变快照 + 原子引用替换）:
+- 写入方（asyncio 轮询线程）构建新的只读快照 CacheSnapshot，整体替换 self._snapshot
+- 读取方（Qt GUI 线程）直接读取当前快照引用，不加锁、不复制
+- 快照带递增版本号，界面可在版本号未变化时跳过重绘
 """
-from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 from collections import deque
-from threading import RLock
+from threading import Lock, RLock
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class CacheSnapshot:
+    """缓存快照（只读，发布后不再修改）
+
+    version 每次写入递增；arc_version / sensor_version / batch_version
+    分别记录对应数据最后一次更新时的 version，界面可按需比较。
+    """
+    arc: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    sensor: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    batch_status: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    version: int = 0
+    arc_version: int = 0
+    sensor_version: int = 0
+    batch_version: int = 0
+
 
 class DataCache:
     
@@ -30,19 +55,15 @@ class DataCache:
         
         self._initialized = True
         
-        # 最新数据（单条）
-        self._latest_arc_data: Dict[str, Any] = {}
-        self._latest_sensor_data: Dict[str, Any] = {}
-        self._latest_batch_status: Dict[str, Any] = {}
+        # 当前快照（读取方直接读取该引用，写入方整体替换）
+        self._snapshot = CacheSnapshot()
         
-        # 历史数据（用于图表，保留最近 1000 条）
+        # 历史数据（用于图表，保留最近 1000 条，条目与快照共享只读数据）
         self._arc_history: deque = deque(maxlen=1000)
         self._sensor_history: deque = deque(maxlen=1000)
         
-        # 读写锁（使用 RLock 可重入锁，提高并发性能和安全性）
-        self._arc_lock = RLock()
-        self._sensor_lock = RLock()
-        self._batch_lock = RLock()
+        # 写锁（仅用于多个写入方之间串行化发布，读取方不加锁）
+        self._write_lock = Lock()
         
         # 上一次有效的弧压值（用于过滤0值跳动）
         self._last_valid_arc_voltage = {'U': 0.0, 'V': 0.0, 'W': 0.0}
@@ -51,9 +72,21 @@ class DataCache:
         logger.info(f"   - 弧流历史缓存: {self._arc_history.maxlen} 条")
         logger.info(f"   - 传感器历史缓存: {self._sensor_history.maxlen} 条")
     
-    # 3. 存储弧流数据（线程安全，过滤弧压0值）
+    # 2.1 获取当前快照（无锁，高频读取入口）
+    def get_snapshot(self) -> CacheSnapshot:
+        return self._snapshot
+    
+    # 2.2 获取当前版本号（无锁）
+    def get_version(self) -> int:
+        return self._snapshot.version
+    
+    # 3. 存储弧流数据（过滤弧压0值）
     def set_arc_data(self, data: Dict[str, Any]):
-        with self._arc_lock:
+        """发布弧流数据
+
+        调用方写入后不得再修改 data（快照直接引用该字典，不复制）
+        """
+        with self._write_lock:
             # 处理弧压数据：如果为0，使用上一次有效值
             arc_voltage = data.get('arc_voltage', {})
             if arc_voltage:
@@ -68,58 +101,88 @@ class DataCache:
                         # 0值，使用上一次有效值
                         processed_voltage[phase] = self._last_valid_arc_voltage[phase]
                 
-                # 更新数据中的弧压为处理后的值
-                data = data.copy()
-                data['arc_voltage'] = processed_voltage
+                # 弧压替换为处理后的值（不修改调用方的字典）
+                data = {**data, 'arc_voltage': processed_voltage}
             
-            self._latest_arc_data = data.copy()
+            arc = MappingProxyType(data)
+            current = self._snapshot
+            version = current.version + 1
+            self._snapshot = CacheSnapshot(
+                arc=arc,
+                sensor=current.sensor,
+                batch_status=current.batch_status,
+                version=version,
+                arc_version=version,
+                sensor_version=current.sensor_version,
+                batch_version=current.batch_version,
+            )
             self._arc_history.append({
-                'data': data.copy(),
+                'data': arc,
                 'timestamp': time.time()
             })
     
-    # 4. 获取最新弧流数据（线程安全）
-    def get_arc_data(self) -> Dict[str, Any]:
-        with self._arc_lock:
-            return self._latest_arc_data.copy()
+    # 4. 获取最新弧流数据（无锁，返回只读映射）
+    def get_arc_data(self) -> Mapping[str, Any]:
+        return self._snapshot.arc
     
-    # 5. 获取弧流历史数据（线程安全）
+    # 5. 获取弧流历史数据
     def get_arc_history(self, count: int = 100) -> List[Dict[str, Any]]:
-        with self._arc_lock:
-            return list(self._arc_history)[-count:]
+        return list(self._arc_history)[-count:]
     
-    # 6. 存储传感器数据（线程安全）
+    # 6. 存储传感器数据
     def set_sensor_data(self, data: Dict[str, Any]):
-        with self._sensor_lock:
-            self._latest_sensor_data = data.copy()
+        """发布传感器数据
+
+        调用方写入后不得再修改 data（快照直接引用该字典，不复制）
+        """
+        with self._write_lock:
+            sensor = MappingProxyType(data)
+            current = self._snapshot
+            version = current.version + 1
+            self._snapshot = CacheSnapshot(
+                arc=current.arc,
+                sensor=sensor,
+                batch_status=current.batch_status,
+                version=version,
+                arc_version=current.arc_version,
+                sensor_version=version,
+                batch_version=current.batch_version,
+            )
             self._sensor_history.append({
-                'data': data.copy(),
+                'data': sensor,
                 'timestamp': time.time()
             })
     
-    # 7. 获取最新传感器数据（线程安全）
-    def get_sensor_data(self) -> Dict[str, Any]:
-        with self._sensor_lock:
-            return self._latest_sensor_data.copy()
+    # 7. 获取最新传感器数据（无锁，返回只读映射）
+    def get_sensor_data(self) -> Mapping[str, Any]:
+        return self._snapshot.sensor
     
-    # 8. 获取传感器历史数据（线程安全）
+    # 8. 获取传感器历史数据
     def get_sensor_history(self, count: int = 100) -> List[Dict[str, Any]]:
-        with self._sensor_lock:
-            return list(self._sensor_history)[-count:]
+        return list(self._sensor_history)[-count:]
     
-    # 9. 存储批次状态（线程安全）
+    # 9. 存储批次状态
     def set_batch_status(self, status: Dict[str, Any]):
-        with self._batch_lock:
-            self._latest_batch_status = status.copy()
+        with self._write_lock:
+            current = self._snapshot
+            version = current.version + 1
+            self._snapshot = CacheSnapshot(
+                arc=current.arc,
+                sensor=current.sensor,
+                batch_status=MappingProxyType(dict(status)),
+                version=version,
+                arc_version=current.arc_version,
+                sensor_version=current.sensor_version,
+                batch_version=version,
+            )
     
-    # 10. 获取批次状态（线程安全）
-    def get_batch_status(self) -> Dict[str, Any]:
-        with self._batch_lock:
-            return self._latest_batch_status.copy()
+    # 10. 获取批次状态（无锁，返回只读映射）
+    def get_batch_status(self) -> Mapping[str, Any]:
+        return self._snapshot.batch_status
     
-    # 11. 获取前端实时显示数据（高频调用 0.5s）- 线程安全且数据一致
+    # 11. 获取前端实时显示数据（高频调用 0.5s）- 无锁且数据一致
     def get_realtime_display_data(self) -> Dict[str, Any]:
-        """获取前端实时显示所需的所有数据（线程安全）
+        """获取前端实时显示所需的所有数据
         
         此方法专为前端高频调用（0.5s）设计，返回：
         - 三相弧流弧压（U/V/W）
@@ -129,53 +192,50 @@ class DataCache:
         - 总能耗
         - 电极深度
         
-        线程安全保证：
-        1. 使用 RLock 可重入锁，避免死锁
-        2. 同时锁住 arc_lock 和 sensor_lock，确保数据一致性
-        3. 使用 .copy() 创建数据副本，避免引用问题
-        4. 即使后台正在更新，也能读取到完整的数据快照
+        数据一致性：弧流与传感器数据取自同一个快照，
+        读取过程中后台发布新快照也不会影响本次结果。
         
         Returns:
-            Dict: 包含所有实时显示数据的字典
+            Dict: 包含所有实时显示数据的字典（附带快照版本号 version）
         """
-        # 同时获取两个锁，确保读取的数据是一致的快照
-        with self._arc_lock, self._sensor_lock:
-            # 深拷贝数据，避免引用问题
-            arc_data = self._latest_arc_data.copy() if self._latest_arc_data else {}
-            sensor_data = self._latest_sensor_data.copy() if self._latest_sensor_data else {}
-            
-            # 提取电极深度
-            electrode_depths = sensor_data.get('electrode_depths', {})
-            
-            # 构建返回数据（所有数据来自同一时刻的快照）
-            return {
-                # 弧流数据（A）
-                'arc_current': arc_data.get('arc_current', {
-                    'U': 0.0, 'V': 0.0, 'W': 0.0
-                }),
-                # 弧压数据（V）
-                'arc_voltage': arc_data.get('arc_voltage', {
-                    'U': 0.0, 'V': 0.0, 'W': 0.0
-                }),
-                # 设定值（A）
-                'setpoints': arc_data.get('setpoints', {
-                    'U': 0.0, 'V': 0.0, 'W': 0.0
-                }),
-                # 死区百分比（%）
-                'manual_deadzone_percent': arc_data.get('manual_deadzone_percent', 0.0),
-                # 总功率（kW）
-                'power_total': arc_data.get('power_total', 0.0),
-                # 总能耗（kWh）- 从传感器数据中获取
-                'energy_total': sensor_data.get('energy_total', 0.0),
-                # 电极深度（mm）
-                'electrode_depths': {
-                    'U': electrode_depths.get('LENTH1', {}).get('distance_mm', 0.0),
-                    'V': electrode_depths.get('LENTH2', {}).get('distance_mm', 0.0),
-                    'W': electrode_depths.get('LENTH3', {}).get('distance_mm', 0.0),
-                },
-                # 时间戳（使用弧流数据的时间戳）
-                'timestamp': arc_data.get('timestamp', 0.0)
-            }
+        snapshot = self._snapshot
+        arc_data = snapshot.arc
+        sensor_data = snapshot.sensor
+        
+        # 提取电极深度
+        electrode_depths = sensor_data.get('electrode_depths', {})
+        
+        # 构建返回数据（所有数据来自同一时刻的快照）
+        return {
+            # 弧流数据（A）
+            'arc_current': arc_data.get('arc_current', {
+                'U': 0.0, 'V': 0.0, 'W': 0.0
+            }),
+            # 弧压数据（V）
+            'arc_voltage': arc_data.get('arc_voltage', {
+                'U': 0.0, 'V': 0.0, 'W': 0.0
+            }),
+            # 设定值（A）
+            'setpoints': arc_data.get('setpoints', {
+                'U': 0.0, 'V': 0.0, 'W': 0.0
+            }),
+            # 死区百分比（%）
+            'manual_deadzone_percent': arc_data.get('manual_deadzone_percent', 0.0),
+            # 总功率（kW）
+            'power_total': arc_data.get('power_total', 0.0),
+            # 总能耗（kWh）- 从传感器数据中获取
+            'energy_total': sensor_data.get('energy_total', 0.0),
+            # 电极深度（mm）
+            'electrode_depths': {
+                'U': electrode_depths.get('LENTH1', {}).get('distance_mm', 0.0),
+                'V': electrode_depths.get('LENTH2', {}).get('distance_mm', 0.0),
+                'W': electrode_depths.get('LENTH3', {}).get('distance_mm', 0.0),
+            },
+            # 时间戳（使用弧流数据的时间戳）
+            'timestamp': arc_data.get('timestamp', 0.0),
+            # 快照版本号（未变化时界面可跳过重绘）
+            'version': snapshot.version,
+        }
     
     # 11.1 获取料仓上限值（从 DB18 读取）
     def get_hopper_upper_limit(self) -> float:
@@ -189,22 +249,22 @@ class DataCache:
     
     # 12. 获取缓存统计信息
     def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
         return {
             'arc_history_count': len(self._arc_history),
             'sensor_history_count': len(self._sensor_history),
-            'has_arc_data': bool(self._latest_arc_data),
-            'has_sensor_data': bool(self._latest_sensor_data),
-            'has_batch_status': bool(self._latest_batch_status),
+            'has_arc_data': bool(snapshot.arc),
+            'has_sensor_data': bool(snapshot.sensor),
+            'has_batch_status': bool(snapshot.batch_status),
             'arc_history_maxlen': self._arc_history.maxlen,
-            'sensor_history_maxlen': self._sensor_history.maxlen
+            'sensor_history_maxlen': self._sensor_history.maxlen,
+            'version': snapshot.version,
         }
     
-    # 12. 清空所有缓存（线程安全）
+    # 12. 清空所有缓存
     def clear(self):
-        with self._arc_lock, self._sensor_lock, self._batch_lock:
-            self._latest_arc_data.clear()
-            self._latest_sensor_data.clear()
-            self._latest_batch_status.clear()
+        with self._write_lock:
+            self._snapshot = CacheSnapshot(version=self._snapshot.version + 1)
             self._arc_history.clear()
             self._sensor_history.clear()
         logger.info("缓存已清空")
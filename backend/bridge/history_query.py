@@ -3,15 +3,44 @@
 """
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timezone, timedelta
+import numpy as np
 from loguru import logger
+from influxdb_client import Dialect
 from backend.core.influxdb import get_influx_client
 from backend.config import get_settings
+from backend.services.rollup_aggregator import ROLLUP_MEASUREMENT, ROLLUP_TIERS
 
 settings = get_settings()
 
 # 北京时区 (UTC+8)
 BEIJING_TZ = timezone(timedelta(hours=8))
 
+# 历史曲线页 (九宫格) 的全部曲线键名
+# 时间为 UTC 秒级时间戳 (float64)，值为 float64
+HISTORY_SERIES_KEYS = (
+    "arc_current_U", "arc_current_V", "arc_current_W",
+    "arc_voltage_U", "arc_voltage_V", "arc_voltage_W",
+    "electrode_depth_1", "electrode_depth_2", "electrode_depth_3",
+    "power_total", "energy_total",
+    "feeding_total",
+    "furnace_shell_water_total", "furnace_cover_water_total",
+)
+
+# 历史曲线页需要窗口聚合的字段 (投料累计为阶梯数据，单独查询原始值)
+_HISTORY_AGG_FIELDS = (
+    "arc_current_U", "arc_current_V", "arc_current_W",
+    "arc_voltage_U", "arc_voltage_V", "arc_voltage_W",
+    "distance_mm",
+    "power_total", "energy_total",
+    "furnace_shell_water_total", "furnace_cover_water_total",
+)
+
+# Flux 时长单位 -> 秒
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# CSV 流式读取 (不输出注解行，只保留表头)
+_CSV_DIALECT = Dialect(header=True, annotations=[], date_time_format="RFC3339Nano")
+
 
 class HistoryQueryService:
     
@@ -77,7 +106,10 @@ class HistoryQueryService:
     # 4. 查询所有批次号列表（按时间倒序）
     def get_batch_list(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        查询所有批次号列表
+        查询所有批次号列表（读取本地批次目录，不扫描数据库）
+        
+        批次目录由 BatchService 增量更新，并定期与 InfluxDB 对账；
+        首次使用（目录为空）时从 InfluxDB 全量导入一次
         
         Args:
             limit: 返回的最大批次数量
@@ -85,49 +117,29 @@ class HistoryQueryService:
         Returns:
             批次列表，每个批次包含：
             - batch_code: 批次号
-            - start_time: 开始时间
+            - start_time: 开始时间（北京时间 ISO）
+            - end_time: 结束时间（运行中为 None）
+            - furnace_number: 炉号
+            - status: 批次状态
         """
         try:
-            # 只查询弧流数据的批次号，避免类型冲突
-            query = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["_field"] == "arc_current_U")
-              |> filter(fn: (r) => r["batch_code"] != "")
-              |> group(columns: ["batch_code"])
-              |> first()
-            '''
-            
-            result = self.query_api.query(query)
+            from backend.services.batch_catalog import get_batch_catalog
+            catalog = get_batch_catalog()
             
-            batches_dict = {}
+            if catalog.is_empty():
+                self.reconcile_batch_catalog()
             
-            for table in result:
-                for record in table.records:
-                    batch_code = record.values.get("batch_code")
-                    time_val = record.get_time()
-                    
-                    if batch_code:
-                        if batch_code not in batches_dict:
-                            batches_dict[batch_code] = time_val
-                        else:
-                            # 保留最早的时间
-                            if time_val < batches_dict[batch_code]:
-                                batches_dict[batch_code] = time_val
-            
-            # 按时间倒序排序，并转换为北京时间
             batches = [
                 {
-                    "batch_code": code,
-                    "start_time": self._utc_to_beijing(time_val) if time_val else None,
+                    "batch_code": entry["batch_code"],
+                    "start_time": self._naive_to_beijing_iso(entry.get("start_time")),
+                    "end_time": self._naive_to_beijing_iso(entry.get("end_time")),
+                    "furnace_number": entry.get("furnace_number"),
+                    "status": entry.get("status"),
                 }
-                for code, time_val in sorted(batches_dict.items(), key=lambda x: x[1], reverse=True)
+                for entry in catalog.list_batches(limit)
             ]
             
-            # 限制数量
-            batches = batches[:limit]
-            
             logger.info(f"查询到 {len(batches)} 个批次")
             return batches
             
@@ -135,6 +147,93 @@ class HistoryQueryService:
             logger.error(f"查询批次列表失败: {e}")
             return []
     
+    # 4.1 与 InfluxDB 对账批次目录（补录遗漏批次、修正起止时间）
+    def reconcile_batch_catalog(self) -> int:
+        """
+        扫描 InfluxDB 中的批次首尾时间并合并到本地批次目录
+        
+        - 首次对账：扫描最近 90 天
+        - 之后：从上次对账时间前 1 小时开始增量扫描
+        
+        Returns:
+            新增批次数量，失败返回 -1
+        """
+        from backend.services.batch_catalog import get_batch_catalog
+        catalog = get_batch_catalog()
+        
+        try:
+            now_utc = datetime.now(timezone.utc)
+            last = catalog.get_reconciled_at()
+            if last:
+                range_start = (last - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            else:
+                range_start = "-90d"
+            
+            ranges = self._scan_batch_time_ranges(range_start)
+            added = catalog.merge_time_ranges(ranges, now_utc)
+            
+            logger.info(f"批次目录对账完成: 扫描 {len(ranges)} 个批次, 新增 {added} 个 (起点: {range_start})")
+            return added
+            
+        except Exception as e:
+            logger.error(f"批次目录对账失败: {e}")
+            return -1
+    
+    # 4.2 扫描批次首尾数据时间（单个 Flux 脚本）
+    def _scan_batch_time_ranges(
+        self,
+        range_start: str,
+        batch_code: Optional[str] = None
+    ) -> Dict[str, Tuple[datetime, datetime]]:
+        """
+        Returns:
+            {批次号: (首条数据时间, 末条数据时间)}，北京时间（无时区）
+        """
+        # 只查询弧流数据的批次号，避免类型冲突
+        batch_filter = f'r["batch_code"] == "{batch_code}"' if batch_code else 'r["batch_code"] != ""'
+        query = f'''
+        data = from(bucket: "{settings.influx_bucket}")
+          |> range(start: {range_start})
+          |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+          |> filter(fn: (r) => r["_field"] == "arc_current_U")
+          |> filter(fn: (r) => {batch_filter})
+          |> group(columns: ["batch_code"])
+        
+        data |> first() |> keep(columns: ["_time", "batch_code"]) |> yield(name: "first")
+        data |> last() |> keep(columns: ["_time", "batch_code"]) |> yield(name: "last")
+        '''
+        
+        first_times: Dict[str, datetime] = {}
+        last_times: Dict[str, datetime] = {}
+        
+        for table in self.query_api.query(query):
+            for record in table.records:
+                code = record.values.get("batch_code")
+                time_val = record.get_time()
+                if not code or time_val is None:
+                    continue
+                if record.values.get("result") == "first":
+                    if code not in first_times or time_val < first_times[code]:
+                        first_times[code] = time_val
+                else:
+                    if code not in last_times or time_val > last_times[code]:
+                        last_times[code] = time_val
+        
+        return {
+            code: (
+                start.astimezone(BEIJING_TZ).replace(tzinfo=None),
+                last_times.get(code, start).astimezone(BEIJING_TZ).replace(tzinfo=None),
+            )
+            for code, start in first_times.items()
+        }
+    
+    # 4.3 目录中的北京时间（无时区）转为带时区 ISO 字符串
+    @staticmethod
+    def _naive_to_beijing_iso(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        return datetime.fromisoformat(value).replace(tzinfo=BEIJING_TZ).isoformat()
+    
     # 5. 查询弧流弧压历史数据
     def query_arc_data(
         self, 
@@ -579,72 +678,38 @@ class HistoryQueryService:
         else:
             return '|> range(start: -90d)'
     
-    # 14. 查询批次的时间范围（优化版：使用 first + last）
+    # 14. 查询批次的时间范围（读取本地批次目录）
     def query_batch_time_range(self, batch_code: str) -> Tuple[Optional[datetime], Optional[datetime]]:
         """
-        查询批次的起始时间和结束时间（第一条和最后一条数据的时间）
+        查询批次的起始时间和结束时间
         
         优化说明：
-        - 优化前：扫描所有数据点，然后排序，非常慢
-        - 优化后：使用 first() + last() 只查询首尾两条数据，速度提升 100 倍以上
+        - 优化前：每次选择批次都执行 first() + last() 两次 90 天扫描
+        - 优化后：直接读取本地批次目录；运行中的批次结束时间取当前时间；
+                 目录中没有的批次查询一次 InfluxDB 并补录到目录
         
         Args:
             batch_code: 批次号
             
         Returns:
-            (start_time, end_time) 元组（北京时间），如果查询失败返回 (None, None)
+            (start_time, end_time) 元组（北京时间，无时区），如果查询失败返回 (None, None)
         """
         try:
-            # 查询第一条数据的时间
-            query_first = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "arc_current_U")
-              |> first()
-            '''
-            
-            # 查询最后一条数据的时间
-            query_last = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "arc_current_U")
-              |> last()
-            '''
-            
-            first_result = self.query_api.query(query_first)
-            last_result = self.query_api.query(query_last)
-            
-            start_time_utc = None
-            end_time_utc = None
-            
-            # 获取第一条数据的时间
-            for table in first_result:
-                for record in table.records:
-                    start_time_utc = record.get_time()
-                    break
-            
-            # 获取最后一条数据的时间
-            for table in last_result:
-                for record in table.records:
-                    end_time_utc = record.get_time()
-                    break
-            
-            if not start_time_utc or not end_time_utc:
-                logger.warning(f"批次 {batch_code} 没有找到数据")
-                return (None, None)
-            
-            # 转换为北京时间
-            start_time_beijing = self._utc_to_beijing(start_time_utc)
-            end_time_beijing = self._utc_to_beijing(end_time_utc)
-            
-            # 转换为 datetime 对象（去掉时区信息，保持北京时间）
-            from dateutil import parser
-            start_time = parser.isoparse(start_time_beijing).replace(tzinfo=None)
-            end_time = parser.isoparse(end_time_beijing).replace(tzinfo=None)
+            from backend.services.batch_catalog import get_batch_catalog
+            catalog = get_batch_catalog()
+            
+            entry = catalog.get(batch_code)
+            if not entry or not entry.get("start_time"):
+                # 目录中没有: 查询 InfluxDB 并补录
+                ranges = self._scan_batch_time_ranges("-90d", batch_code)
+                if batch_code not in ranges:
+                    logger.warning(f"批次 {batch_code} 没有找到数据")
+                    return (None, None)
+                catalog.merge_time_ranges(ranges)
+                entry = catalog.get(batch_code)
+            
+            start_time = datetime.fromisoformat(entry["start_time"])
+            end_time = datetime.fromisoformat(entry["end_time"]) if entry.get("end_time") else datetime.now()
             
             logger.info(f"批次 {batch_code} 时间范围: {start_time} - {end_time}")
             return (start_time, end_time)
@@ -685,21 +750,25 @@ class HistoryQueryService:
                 'end_time': None
             }
             
-            # 1. 查询累计能耗最大值
-            query_energy = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "energy_total")
-              |> max()
-            '''
-            
-            energy_result = self.query_api.query(query_energy)
-            for table in energy_result:
-                for record in table.records:
-                    result['energy_total'] = record.get_value() or 0.0
-                    break
+            # 0. 优先从汇总数据读取能耗/冷却水最大值和开炉时长 (不扫描原始数据)
+            from_rollup = self._fill_statistics_from_rollup(batch_code, result)
+            
+            if not from_rollup:
+                # 1. 查询累计能耗最大值
+                query_energy = f'''
+                from(bucket: "{settings.influx_bucket}")
+                  |> range(start: -90d)
+                  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+                  |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+                  |> filter(fn: (r) => r["_field"] == "energy_total")
+                  |> max()
+                '''
+            
+                energy_result = self.query_api.query(query_energy)
+                for table in energy_result:
+                    for record in table.records:
+                        result['energy_total'] = record.get_value() or 0.0
+                        break
             
             # 2. 查询累计投料最大值 (使用新标签格式)
             query_feeding = f'''
@@ -719,84 +788,85 @@ class HistoryQueryService:
                     result['feeding_total'] = record.get_value() or 0.0
                     break
             
-            # 3. 查询炉皮累计水流量最大值
-            query_shell = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "furnace_shell_water_total")
-              |> max()
-            '''
-            
-            shell_result = self.query_api.query(query_shell)
-            for table in shell_result:
-                for record in table.records:
-                    result['shell_water_total'] = record.get_value() or 0.0
-                    break
-            
-            # 4. 查询炉盖累计水流量最大值
-            query_cover = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "furnace_cover_water_total")
-              |> max()
-            '''
-            
-            cover_result = self.query_api.query(query_cover)
-            for table in cover_result:
-                for record in table.records:
-                    result['cover_water_total'] = record.get_value() or 0.0
-                    break
-            
-            # 5. 查询开炉时长（使用混合方案：first + last，快速且准确）
-            # 优化前：扫描所有数据点，非常慢
-            # 优化后：只查询第一条和最后一条数据，速度提升 100 倍以上
-            query_first = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "arc_current_U")
-              |> first()
-            '''
-            
-            query_last = f'''
-            from(bucket: "{settings.influx_bucket}")
-              |> range(start: -90d)
-              |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
-              |> filter(fn: (r) => r["_field"] == "arc_current_U")
-              |> last()
-            '''
-            
-            first_result = self.query_api.query(query_first)
-            last_result = self.query_api.query(query_last)
-            
-            start_time = None
-            end_time = None
-            
-            # 获取第一条数据的时间
-            for table in first_result:
-                for record in table.records:
-                    start_time = record.get_time()
-                    break
-            
-            # 获取最后一条数据的时间
-            for table in last_result:
-                for record in table.records:
-                    end_time = record.get_time()
-                    break
-            
-            if start_time and end_time:
-                result['start_time'] = self._utc_to_beijing(start_time)
-                result['end_time'] = self._utc_to_beijing(end_time)
+            if not from_rollup:
+                # 3. 查询炉皮累计水流量最大值
+                query_shell = f'''
+                from(bucket: "{settings.influx_bucket}")
+                  |> range(start: -90d)
+                  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+                  |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+                  |> filter(fn: (r) => r["_field"] == "furnace_shell_water_total")
+                  |> max()
+                '''
+            
+                shell_result = self.query_api.query(query_shell)
+                for table in shell_result:
+                    for record in table.records:
+                        result['shell_water_total'] = record.get_value() or 0.0
+                        break
+            
+                # 4. 查询炉盖累计水流量最大值
+                query_cover = f'''
+                from(bucket: "{settings.influx_bucket}")
+                  |> range(start: -90d)
+                  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+                  |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+                  |> filter(fn: (r) => r["_field"] == "furnace_cover_water_total")
+                  |> max()
+                '''
+            
+                cover_result = self.query_api.query(query_cover)
+                for table in cover_result:
+                    for record in table.records:
+                        result['cover_water_total'] = record.get_value() or 0.0
+                        break
+            
+                # 5. 查询开炉时长（使用混合方案：first + last，快速且准确）
+                # 优化前：扫描所有数据点，非常慢
+                # 优化后：只查询第一条和最后一条数据，速度提升 100 倍以上
+                query_first = f'''
+                from(bucket: "{settings.influx_bucket}")
+                  |> range(start: -90d)
+                  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+                  |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+                  |> filter(fn: (r) => r["_field"] == "arc_current_U")
+                  |> first()
+                '''
+            
+                query_last = f'''
+                from(bucket: "{settings.influx_bucket}")
+                  |> range(start: -90d)
+                  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+                  |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+                  |> filter(fn: (r) => r["_field"] == "arc_current_U")
+                  |> last()
+                '''
+            
+                first_result = self.query_api.query(query_first)
+                last_result = self.query_api.query(query_last)
+            
+                start_time = None
+                end_time = None
+            
+                # 获取第一条数据的时间
+                for table in first_result:
+                    for record in table.records:
+                        start_time = record.get_time()
+                        break
+            
+                # 获取最后一条数据的时间
+                for table in last_result:
+                    for record in table.records:
+                        end_time = record.get_time()
+                        break
+            
+                if start_time and end_time:
+                    result['start_time'] = self._utc_to_beijing(start_time)
+                    result['end_time'] = self._utc_to_beijing(end_time)
                 
-                # 计算时长（小时）
-                duration_seconds = (end_time - start_time).total_seconds()
-                result['duration_hours'] = duration_seconds / 3600.0
+                    # 计算时长（小时）
+                    duration_seconds = (end_time - start_time).total_seconds()
+                    result['duration_hours'] = duration_seconds / 3600.0
             
             logger.info(f"批次 {batch_code} 统计数据: 能耗={result['energy_total']:.1f}kWh, "
                        f"投料={result['feeding_total']:.1f}kg, "
@@ -819,6 +889,121 @@ class HistoryQueryService:
                 'end_time': None
             }
     
+    # 15.1 从汇总数据读取批次统计 (成功返回 True)
+    def _fill_statistics_from_rollup(self, batch_code: str, result: Dict[str, Any]) -> bool:
+        """
+        从 sensor_rollup 读取能耗/冷却水最大值 (10m 层级 max) 和开炉时长 (10s 层级首尾时间)
+        
+        单个 Flux 脚本完成，数据量约为原始数据的 1/50；批次无汇总数据时返回 False
+        """
+        if not settings.history_rollup_enabled:
+            return False
+        
+        try:
+            query = f'''
+            from(bucket: "{settings.influx_bucket}")
+              |> range(start: -90d)
+              |> filter(fn: (r) => r["_measurement"] == "{ROLLUP_MEASUREMENT}" and r["tier"] == "10m")
+              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+              |> filter(fn: (r) => r["_field"] == "energy_total_max"
+                  or r["_field"] == "furnace_shell_water_total_max"
+                  or r["_field"] == "furnace_cover_water_total_max")
+              |> group(columns: ["_field"])
+              |> max()
+              |> yield(name: "max")
+            
+            span = from(bucket: "{settings.influx_bucket}")
+              |> range(start: -90d)
+              |> filter(fn: (r) => r["_measurement"] == "{ROLLUP_MEASUREMENT}" and r["tier"] == "10s")
+              |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+              |> filter(fn: (r) => r["_field"] == "arc_current_U_mean")
+              |> group(columns: ["_field"])
+              |> sort(columns: ["_time"])
+            
+            span |> first() |> yield(name: "first")
+            span |> last() |> yield(name: "last")
+            '''
+            
+            start_time = None
+            end_time = None
+            for table in self.query_api.query(query):
+                for record in table.records:
+                    name = record.values.get("result")
+                    if name == "first":
+                        start_time = record.get_time()
+                    elif name == "last":
+                        end_time = record.get_time()
+                    elif record.get_field() == "energy_total_max":
+                        result['energy_total'] = record.get_value() or 0.0
+                    elif record.get_field() == "furnace_shell_water_total_max":
+                        result['shell_water_total'] = record.get_value() or 0.0
+                    elif record.get_field() == "furnace_cover_water_total_max":
+                        result['cover_water_total'] = record.get_value() or 0.0
+            
+            if not start_time or not end_time:
+                return False
+            
+            result['start_time'] = self._utc_to_beijing(start_time)
+            result['end_time'] = self._utc_to_beijing(end_time)
+            result['duration_hours'] = (end_time - start_time).total_seconds() / 3600.0
+            return True
+            
+        except Exception as e:
+            logger.warning(f"从汇总数据读取批次统计失败，回退原始数据: {e}")
+            return False
+    
+    # 15.2 批量获取批次统计汇总（本地索引优先，用于批次对比）
+    def get_batch_summaries(self, batch_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取批次统计汇总
+        
+        - 运行中的批次：由内存累计器实时计算
+        - 已结束的批次：读取本地汇总索引（批次停止/终止时写入）
+        - 索引中没有、但有批次归档的批次：由归档计算并回填索引
+        - 索引中没有的旧批次：查询 InfluxDB 一次并回填索引
+        
+        Args:
+            batch_codes: 批次号列表
+            
+        Returns:
+            {批次号: 统计汇总}，格式同 query_batch_statistics
+        """
+        from backend.services.batch_archive import get_batch_archive
+        from backend.services.batch_service import get_batch_service
+        from backend.services.batch_summary_store import get_batch_summary_store
+        
+        store = get_batch_summary_store()
+        summaries = store.get_many(batch_codes)
+        batch_service = get_batch_service()
+        
+        for batch_code in batch_codes:
+            if batch_service.is_running and batch_code == batch_service.batch_code:
+                live = batch_service.build_live_summary()
+                if live:
+                    summaries[batch_code] = live
+                    continue
+            
+            if batch_code in summaries:
+                continue
+            
+            # 有批次归档时直接由归档计算 (不访问数据库；当前批次的数据仍会增加，不使用归档)
+            archived = None
+            if batch_code != batch_service.batch_code:
+                archived = get_batch_archive().summarize(batch_code)
+            if archived:
+                store.put(archived, source="archive")
+                summaries[batch_code] = archived
+                continue
+            
+            # 回填: 只有查询到数据时才写入索引（查询失败时下次重试）
+            stats = self.query_batch_statistics(batch_code)
+            if stats.get('start_time'):
+                store.put(stats, source="influx")
+                logger.info(f"批次 {batch_code} 统计汇总已回填到本地索引")
+            summaries[batch_code] = stats
+        
+        return summaries
+    
     # 16. 删除指定批次的所有数据
     def delete_batch_data(self, batch_code: str) -> dict:
         """
@@ -851,6 +1036,14 @@ class HistoryQueryService:
             
             logger.info(f"已删除批次 {batch_code} 的所有数据")
             
+            # 同步删除本地统计汇总、批次目录和批次归档
+            from backend.services.batch_summary_store import get_batch_summary_store
+            from backend.services.batch_catalog import get_batch_catalog
+            from backend.services.batch_archive import get_batch_archive
+            get_batch_summary_store().remove(batch_code)
+            get_batch_catalog().remove(batch_code)
+            get_batch_archive().discard(batch_code)
+            
             return {
                 "success": True,
                 "message": f"批次 {batch_code} 的所有数据已删除",
@@ -971,6 +1164,109 @@ class HistoryQueryService:
             logger.error(f"查询报警记录失败: {e}", exc_info=True)
             return []
     
+    # 17.1 一次查询所有报警类型 (每个参数各取最新 limit_per_param 条，替代逐个表格调用 query_alarm_records)
+    def query_alarm_records_grouped(
+        self,
+        batch_code: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit_per_param: int = 50
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        查询时间范围内所有类型的报警记录 (单个 Flux 脚本，服务端按 alarm_type + param_name 分组取最新 N 条)
+        
+        优化说明：
+        - 优化前：报警页每个表格一次查询，每次 pivot 整个 alarm_logs 范围后在客户端按参数名子串过滤
+        - 优化后：1 次查询，CSV 流式读取，调用方按 alarm_type/param_name 分桶
+        
+        Args:
+            batch_code: 批次号过滤 (None 表示不过滤)
+            start_time: 开始时间 (北京时间 naive 或带时区，默认24小时前)
+            end_time: 结束时间 (同上，默认当前)
+            limit_per_param: 每个 (alarm_type, param_name) 最多返回的条数
+            
+        Returns:
+            报警记录列表 (字段同 query_alarm_records，另含 'time_utc': 带时区的 UTC datetime)，查询失败返回 None
+        """
+        try:
+            if start_time is None:
+                start_time = datetime.now() - timedelta(hours=24)
+            if end_time is None:
+                end_time = datetime.now()
+            
+            start_iso = self._beijing_to_utc(start_time).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            end_iso = self._beijing_to_utc(end_time).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            
+            filters = ['r["_measurement"] == "alarm_logs"']
+            if batch_code:
+                filters.append(f'r["batch_code"] == "{batch_code}"')
+            
+            query = f'''
+            from(bucket: "{settings.influx_bucket}")
+              |> range(start: {start_iso}, stop: {end_iso})
+              |> filter(fn: (r) => {" and ".join(filters)})
+              |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+              |> group(columns: ["alarm_type", "param_name"])
+              |> sort(columns: ["_time"], desc: true)
+              |> limit(n: {limit_per_param})
+              |> keep(columns: ["_time", "device_id", "alarm_type", "level", "param_name", "value", "threshold", "message"])
+            '''
+            
+            records = []
+            header: Dict[str, int] = {}
+            for row in self.query_api.query_csv(query, dialect=_CSV_DIALECT):
+                # 空行分隔不同结构的表，随后重新输出表头
+                if not row or len(row) < 3:
+                    header = {}
+                    continue
+                if "_time" in row and "param_name" in row:
+                    header = {name: i for i, name in enumerate(row)}
+                    continue
+                if not header:
+                    continue
+                
+                def col(name: str) -> str:
+                    index = header.get(name)
+                    return row[index] if index is not None and index < len(row) else ""
+                
+                time_utc = self._parse_rfc3339(col("_time"))
+                if time_utc is None:
+                    continue
+                param_name = col("param_name")
+                records.append({
+                    'timestamp': self._utc_to_beijing(time_utc),
+                    'time_utc': time_utc,
+                    'device_id': col("device_id"),
+                    'alarm_type': col("alarm_type"),
+                    'level': col("level"),
+                    'param_name': param_name,
+                    'value': float(col("value") or 0),
+                    'threshold': float(col("threshold") or 0),
+                    'message': col("message"),
+                    'phase': self._extract_phase_from_param(param_name)
+                })
+            
+            logger.info(f"查询到 {len(records)} 条报警记录 (批次={batch_code or '全部'}, 单次查询)")
+            return records
+            
+        except Exception as e:
+            logger.error(f"查询报警记录失败: {e}", exc_info=True)
+            return None
+    
+    # 17.2 解析 RFC3339 时间 (纳秒精度截断到微秒)
+    @staticmethod
+    def _parse_rfc3339(value: str) -> Optional[datetime]:
+        if not value:
+            return None
+        text = value[:-1] if value.endswith("Z") else value
+        if "." in text:
+            head, frac = text.split(".", 1)
+            text = f"{head}.{frac[:6].ljust(6, '0')}"
+        try:
+            return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    
     # 18. 查询报警统计（按类型分组统计数量）
     def query_alarm_statistics(
         self,
@@ -1037,8 +1333,241 @@ class HistoryQueryService:
         else:
             return "-"
 
+    # 20. 一次查询历史曲线页全部曲线 (单个 Flux 脚本 + CSV 流式解析)
+    def query_history_series(
+        self,
+        batch_code: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval: str = "1m"
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        一次查询历史曲线页的全部曲线 (替代逐个调用 query_arc_data/query_electrode_depth/...)
+        
+        优化说明：
+        - 优化前：5 次独立查询，每次重复扫描同一批次/时间范围，逐条构造 FluxRecord 和时间字符串
+        - 优化后：1 个 Flux 脚本 (两个 yield)，CSV 流式读取，结果直接转为 NumPy 列数组
+        - 长时间跨度：按聚合间隔自动读取 10s/1m/10m 汇总层级 (sensor_rollup)，不扫描原始数据
+        - 已结束批次：读取本地列存归档 (batch_archive)，按同样的窗口对齐求均值
+        
+        Args:
+            batch_code: 批次号
+            start_time: 开始时间（可选，北京时间）
+            end_time: 结束时间（可选，北京时间）
+            interval: 聚合间隔（投料累计为阶梯数据，不聚合）
+            
+        Returns:
+            {曲线键名: (时间戳数组, 数值数组)}，键名见 HISTORY_SERIES_KEYS，无数据的曲线为空数组
+        """
+        try:
+            # 已结束批次优先读取本地列存归档 (内存映射，不访问数据库)
+            archived = self._query_series_from_archive(batch_code, start_time, end_time, interval)
+            if archived is not None:
+                logger.info(f"历史曲线使用批次归档: {batch_code}")
+                return archived
+            
+            time_filter = self._build_time_filter(batch_code, start_time, end_time)
+            
+            # 优先读取汇总层级，该批次无汇总数据 (功能上线前的批次) 时回退原始数据
+            tier = self.select_rollup_tier(interval)
+            if tier:
+                result = self._query_series_columns(batch_code, time_filter, interval, tier)
+                if any(len(result[key][0]) for key in HISTORY_SERIES_KEYS if key != "feeding_total"):
+                    logger.info(f"历史曲线使用汇总层级: {tier}")
+                    return result
+            
+            return self._query_series_columns(batch_code, time_filter, interval, None)
+            
+        except Exception as e:
+            logger.error(f"查询历史曲线数据失败: {e}", exc_info=True)
+            return {key: self._to_columns([], []) for key in HISTORY_SERIES_KEYS}
+    
+    # 20.1 执行单脚本查询并解析为列数组 (tier 为 None 时读取原始数据，interval 为 None 时不聚合)
+    def _query_series_columns(
+        self,
+        batch_code: str,
+        time_filter: str,
+        interval: Optional[str],
+        tier: Optional[str]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        columns: Dict[str, Tuple[List[str], List[str]]] = {key: ([], []) for key in HISTORY_SERIES_KEYS}
+        
+        if tier:
+            # 汇总层级: 读取 {字段}_mean，再按目标间隔聚合
+            source = f'''r["_measurement"] == "{ROLLUP_MEASUREMENT}" and r["tier"] == "{tier}"'''
+            field_suffix = "_mean"
+        else:
+            source = '''r["_measurement"] == "sensor_data"'''
+            field_suffix = ""
+        field_filter = " or ".join(f'r["_field"] == "{field}{field_suffix}"' for field in _HISTORY_AGG_FIELDS)
+        # interval 为 None 时不聚合 (原始分辨率导出)
+        if interval:
+            aggregate = f'|> aggregateWindow(every: {interval}, fn: mean, createEmpty: false)'
+        else:
+            aggregate = '|> sort(columns: ["_time"])'
+        
+        query = f'''
+        from(bucket: "{settings.influx_bucket}")
+          {time_filter}
+          |> filter(fn: (r) => {source})
+          |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+          |> filter(fn: (r) => {field_filter})
+          |> group(columns: ["_field", "sensor"])
+          {aggregate}
+          |> keep(columns: ["_time", "_value", "_field", "sensor"])
+          |> yield(name: "aggregated")
+        
+        from(bucket: "{settings.influx_bucket}")
+          {time_filter}
+          |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+          |> filter(fn: (r) => r["batch_code"] == "{batch_code}")
+          |> filter(fn: (r) => r["module_type"] == "feeding")
+          |> filter(fn: (r) => r["device_type"] == "hopper")
+          |> filter(fn: (r) => r["_field"] == "feeding_total")
+          |> group(columns: ["_field"])
+          |> sort(columns: ["_time"])
+          |> keep(columns: ["_time", "_value", "_field"])
+          |> yield(name: "feeding")
+        '''
+        
+        i_time = i_value = i_field = i_sensor = None
+        for row in self.query_api.query_csv(query, dialect=_CSV_DIALECT):
+            # 空行分隔不同结构的表，随后重新输出表头
+            if not row or len(row) < 3:
+                i_time = None
+                continue
+            if "_value" in row and "_time" in row:
+                i_time = row.index("_time")
+                i_value = row.index("_value")
+                i_field = row.index("_field")
+                i_sensor = row.index("sensor") if "sensor" in row else None
+                continue
+            if i_time is None or not row[i_value]:
+                continue
+            
+            key = row[i_field]
+            if field_suffix and key.endswith(field_suffix):
+                key = key[:-len(field_suffix)]
+            if key == "distance_mm":
+                sensor = row[i_sensor] if i_sensor is not None else ""
+                if "electrode_" not in sensor:
+                    continue
+                key = "electrode_depth_" + sensor.split("_")[-1]
+            
+            series = columns.get(key)
+            if series is not None:
+                series[0].append(row[i_time])
+                series[1].append(row[i_value])
+        
+        result = {key: self._to_columns(times, values) for key, (times, values) in columns.items()}
+        if not interval:
+            return result
+        
+        logger.info(f"查询到历史曲线数据: 弧流{len(result['arc_current_U'][0])}点, "
+                   f"电极{len(result['electrode_depth_1'][0])}点, "
+                   f"功率{len(result['power_total'][0])}点, "
+                   f"投料累计{len(result['feeding_total'][0])}点")
+        return result
+    
+    # 20.2 查询一个时间段的原始数据 (不聚合，供分段流式导出使用，失败时抛出异常)
+    def query_raw_series(
+        self,
+        batch_code: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        查询 [start_time, end_time) 内全部曲线的原始数据点
+        
+        Args:
+            batch_code: 批次号
+            start_time: 开始时间（北京时间，包含）
+            end_time: 结束时间（北京时间，不包含）
+            
+        Returns:
+            {曲线键名: (时间戳数组, 数值数组)}，键名见 HISTORY_SERIES_KEYS
+        """
+        start_iso = self._beijing_to_utc(start_time).strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_iso = self._beijing_to_utc(end_time).strftime("%Y-%m-%dT%H:%M:%SZ")
+        time_filter = f'|> range(start: {start_iso}, stop: {end_iso})'
+        return self._query_series_columns(batch_code, time_filter, None, None)
+    
+    # 20.3 从批次归档读取曲线 (没有归档时返回 None)
+    def _query_series_from_archive(
+        self,
+        batch_code: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        interval: str
+    ) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        from backend.services.batch_archive import get_batch_archive
+        from backend.services.batch_service import get_batch_service
+        
+        # 当前批次 (运行中/暂停中) 的数据仍会增加，不使用归档
+        if batch_code == get_batch_service().batch_code:
+            return None
+        
+        try:
+            return get_batch_archive().query_series(
+                batch_code,
+                self._beijing_to_utc(start_time) if start_time and end_time else None,
+                self._beijing_to_utc(end_time) if start_time and end_time else None,
+                self._interval_seconds(interval),
+                HISTORY_SERIES_KEYS,
+            )
+        except Exception as e:
+            logger.warning(f"读取批次归档失败，回退 InfluxDB: {e}")
+            return None
+    
+    # 21. RFC3339 时间/数值字符串列转为 NumPy 数组 (按时间排序)
+    @staticmethod
+    def _to_columns(times: List[str], values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        if not times:
+            return (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64))
+        
+        # 去掉结尾 'Z' 后按 UTC 解析 (numpy 不再支持带时区的字符串)
+        ts = np.array([t[:-1] if t.endswith("Z") else t for t in times], dtype="datetime64[ns]")
+        x = ts.astype(np.int64) / 1e9
+        y = np.array(values, dtype=np.float64)
+        
+        # 分组聚合后各窗口按时间输出，此处兜底保证单调
+        if x.size > 1 and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        return (x, y)
+
+    
+    # 22. 选择汇总层级 (能整除聚合间隔的最粗层级)
+    @staticmethod
+    def select_rollup_tier(interval: str) -> Optional[str]:
+        """
+        根据聚合间隔选择汇总层级
+        
+        例: 30s -> 10s, 5m -> 1m, 15m -> 1m, 1h -> 10m, 10s 以下/未启用 -> None (读取原始数据)
+        """
+        if not settings.history_rollup_enabled:
+            return None
+        
+        interval_seconds = HistoryQueryService._interval_seconds(interval)
+        if interval_seconds is None:
+            return None
+        
+        best = None
+        for name, seconds in ROLLUP_TIERS:
+            if seconds <= interval_seconds and interval_seconds % seconds == 0:
+                best = name
+        return best
+    
+    # 22.1 Flux 时长字符串转为秒 (如 "30s" -> 30, "5m" -> 300)，无法解析时返回 None
+    @staticmethod
+    def _interval_seconds(interval: str) -> Optional[int]:
+        unit = _DURATION_UNITS.get(interval[-1:])
+        if unit is None or not interval[:-1].isdigit():
+            return None
+        return int(interval[:-1]) * unit
+
 
-# 20. 获取历史查询服务单例
+# 23. 获取历史查询服务单例
 def get_history_query_service() -> HistoryQueryService:
     return HistoryQueryService.get_instance()
 
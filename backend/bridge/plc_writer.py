@@ -1,15 +1,31 @@
 """
-PLC 写入操作桥接层
+PLC 写入操作桥接层 (写入经 PLCScheduler 排队，与轮询读取共用 PLC I/O 线程)
 """
 import struct
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from loguru import logger
 from backend.plc.plc_manager import get_plc_manager
+from backend.plc.plc_scheduler import PLCPriority, get_plc_scheduler
 from backend.config import get_settings
 
 settings = get_settings()
 
 
+def _write_db(db_number: int, offset: int, data: bytes) -> Tuple[bool, str]:
+    """通过 PLC 调度器写入 (操作员写入优先级，高于传感器/状态读取)
+    
+    Returns:
+        (成功, 错误信息)
+    """
+    result = get_plc_scheduler().call(
+        f"写DB{db_number}", get_plc_manager().write_db, (db_number, offset, data),
+        priority=PLCPriority.WRITE,
+    )
+    if result is None:
+        return (False, f"PLC 写入超时 DB{db_number}.{offset}")
+    return result
+
+
 def write_hopper_upper_limit_to_plc(upper_limit: float) -> Dict[str, Any]:
     """
     将料仓上限值写入 PLC DB18
@@ -29,19 +45,7 @@ def write_hopper_upper_limit_to_plc(upper_limit: float) -> Dict[str, Any]:
                 'message': f'[Mock模式] 料仓上限值已设置为 {int(upper_limit)} kg'
             }
         
-        # 2. 获取 PLC 管理器
-        plc = get_plc_manager()
-        
-        # 3. 检查连接
-        if not plc.is_connected():
-            logger.warning("PLC 未连接，尝试重新连接...")
-            plc.connect()
-            
-            if not plc.is_connected():
-                return {
-                    'success': False,
-                    'message': 'PLC 连接失败，无法写入数据'
-                }
+        # 2/3. 连接由 PLC I/O 线程负责 (未连接时写入前自动重连)
         
         # 4. 转换数据为 DInt (有符号32位整数，大端序)
         upper_limit_int = int(upper_limit)
@@ -55,7 +59,7 @@ def write_hopper_upper_limit_to_plc(upper_limit: float) -> Dict[str, Any]:
         logger.info(f"准备写入 PLC DB{db_number}.DBD{offset}: {upper_limit_int} kg")
         
         # 6. 执行写入
-        result = plc.write_db(db_number, offset, data_bytes)
+        result, err = _write_db(db_number, offset, data_bytes)
         
         if result:
             logger.info(f"成功写入料仓上限值: {upper_limit_int} kg")
@@ -64,7 +68,7 @@ def write_hopper_upper_limit_to_plc(upper_limit: float) -> Dict[str, Any]:
                 'message': f'料仓上限值已设置为 {upper_limit_int} kg'
             }
         else:
-            logger.error(f"写入 PLC 失败")
+            logger.error(f"写入 PLC 失败: {err}")
             return {
                 'success': False,
                 'message': '写入 PLC 失败，请检查 PLC 连接'
@@ -97,19 +101,7 @@ def write_arc_limit_to_plc(arc_limit: int) -> Dict[str, Any]:
                 'message': f'[Mock模式] 弧流上限值已设置为 {arc_limit} A'
             }
         
-        # 2. 获取 PLC 管理器
-        plc = get_plc_manager()
-        
-        # 3. 检查连接
-        if not plc.is_connected():
-            logger.warning("PLC 未连接，尝试重新连接...")
-            plc.connect()
-            
-            if not plc.is_connected():
-                return {
-                    'success': False,
-                    'message': 'PLC 连接失败，无法写入数据'
-                }
+        # 2/3. 连接由 PLC I/O 线程负责 (未连接时写入前自动重连)
         
         # 4. 转换数据为 Int (有符号16位整数，大端序)
         data_bytes = struct.pack('>h', arc_limit)  # 大端序
@@ -122,7 +114,7 @@ def write_arc_limit_to_plc(arc_limit: int) -> Dict[str, Any]:
         logger.info(f"准备写入 PLC DB{db_number}.DBW{offset}: {arc_limit} A")
         
         # 6. 执行写入
-        result = plc.write_db(db_number, offset, data_bytes)
+        result, err = _write_db(db_number, offset, data_bytes)
         
         if result:
             logger.info(f"成功写入弧流上限值: {arc_limit} A")
@@ -131,7 +123,7 @@ def write_arc_limit_to_plc(arc_limit: int) -> Dict[str, Any]:
                 'message': f'弧流上限值已设置为 {arc_limit} A'
             }
         else:
-            logger.error(f"写入 PLC 失败")
+            logger.error(f"写入 PLC 失败: {err}")
             return {
                 'success': False,
                 'message': '写入 PLC 失败，请检查 PLC 连接'
@@ -164,19 +156,7 @@ def write_emergency_delay_to_plc(delay_ms: int) -> Dict[str, Any]:
                 'message': f'[Mock模式] 消抖时间已设置为 {delay_ms} ms'
             }
         
-        # 2. 获取 PLC 管理器
-        plc = get_plc_manager()
-        
-        # 3. 检查连接
-        if not plc.is_connected():
-            logger.warning("PLC 未连接，尝试重新连接...")
-            plc.connect()
-            
-            if not plc.is_connected():
-                return {
-                    'success': False,
-                    'message': 'PLC 连接失败，无法写入数据'
-                }
+        # 2/3. 连接由 PLC I/O 线程负责 (未连接时写入前自动重连)
         
         # 4. 转换数据为 TIME (有符号32位整数，大端序)
         # TIME 类型存储单位为毫秒
@@ -190,7 +170,7 @@ def write_emergency_delay_to_plc(delay_ms: int) -> Dict[str, Any]:
         logger.info(f"准备写入 PLC DB{db_number}.DBD{offset}: {delay_ms} ms ({delay_ms/1000:.3f} s)")
         
         # 6. 执行写入
-        result = plc.write_db(db_number, offset, data_bytes)
+        result, err = _write_db(db_number, offset, data_bytes)
         
         if result:
             logger.info(f"成功写入消抖时间: {delay_ms} ms ({delay_ms/1000:.3f} s)")
@@ -199,7 +179,7 @@ def write_emergency_delay_to_plc(delay_ms: int) -> Dict[str, Any]:
                 'message': f'消抖时间已设置为 {delay_ms} ms ({delay_ms/1000:.3f} s)'
             }
         else:
-            logger.error(f"写入 PLC 失败")
+            logger.error(f"写入 PLC 失败: {err}")
             return {
                 'success': False,
                 'message': '写入 PLC 失败，请检查 PLC 连接'
@@ -233,19 +213,7 @@ def write_arc_limit_and_delay_to_plc(arc_limit: int, delay_ms: int) -> Dict[str,
                 'message': f'[Mock模式] 已设置: 弧流上限 {arc_limit} A, 消抖时间 {delay_ms} ms'
             }
         
-        # 2. 获取 PLC 管理器
-        plc = get_plc_manager()
-        
-        # 3. 检查连接
-        if not plc.is_connected():
-            logger.warning("PLC 未连接，尝试重新连接...")
-            plc.connect()
-            
-            if not plc.is_connected():
-                return {
-                    'success': False,
-                    'message': 'PLC 连接失败，无法写入数据'
-                }
+        # 2/3. 连接由 PLC I/O 线程负责 (未连接时写入前自动重连)
         
         # 4. 构建数据包（8字节）
         # offset 182-183: arc_limit (INT, 2字节)
@@ -265,8 +233,8 @@ def write_arc_limit_and_delay_to_plc(arc_limit: int, delay_ms: int) -> Dict[str,
         logger.info(f"准备批量写入 PLC DB{db_number}: 弧流上限 {arc_limit} A, 消抖时间 {delay_ms} ms")
         
         # 5. 执行写入（分两次）
-        result1 = plc.write_db(db_number, 182, arc_limit_bytes)
-        result2 = plc.write_db(db_number, 186, delay_bytes)
+        result1, _ = _write_db(db_number, 182, arc_limit_bytes)
+        result2, _ = _write_db(db_number, 186, delay_bytes)
         
         if result1 and result2:
             logger.info(f"成功批量写入: 弧流上限 {arc_limit} A, 消抖时间 {delay_ms} ms")
@@ -38,6 +38,10 @@ class ServiceManager:
         self.bridge = get_data_bridge()
         logger.info("数据桥接器初始化完成")
         
+        # 报警事件直接推送到前端（弹窗/声音不等待数据库写入）
+        from backend.core.alarm_store import add_alarm_listener
+        add_alarm_listener(self.bridge.emit_alarm)
+        
         logger.info(f"服务管理器初始化完成 (Mock模式: {use_mock})")
     
     # 2. 启动所有后端服务
@@ -52,6 +56,22 @@ class ServiceManager:
             asyncio_thread.start()
             self.threads.append(asyncio_thread)
             
+            # 批次目录对账线程（低频，不占用 asyncio 事件循环）
+            if not self.use_mock:
+                catalog_thread = Thread(
+                    target=self._run_batch_catalog_reconcile,
+                    daemon=True,
+                    name="BatchCatalogReconcile"
+                )
+                catalog_thread.start()
+                self.threads.append(catalog_thread)
+            
+            # 健康检查线程（PLC / InfluxDB / 轮询状态探测，结果经 DataBridge 推送到状态栏）
+            from backend.services.health_monitor import get_health_monitor
+            health_monitor = get_health_monitor()
+            health_monitor.add_listener(self.bridge.emit_health_status)
+            health_monitor.start()
+            
             logger.info("所有后端服务已启动")
         except Exception as e:
             logger.error(f"启动后端服务失败: {e}", exc_info=True)
@@ -81,6 +101,19 @@ class ServiceManager:
             if self.loop:
                 self.loop.close()
     
+    # 3.1 定期与 InfluxDB 对账批次目录
+    def _run_batch_catalog_reconcile(self):
+        from backend.config import get_settings
+        from backend.bridge.history_query import get_history_query_service
+        
+        interval = get_settings().batch_catalog_reconcile_interval
+        while not self.stop_event.is_set():
+            try:
+                get_history_query_service().reconcile_batch_catalog()
+            except Exception as e:
+                logger.warning(f"批次目录对账失败: {e}")
+            self.stop_event.wait(interval)
+    
     # 4. 启动真实服务（asyncio）
     async def _start_real_services(self):
         from backend.services.polling_loops_v2 import start_all_polling_loops
@@ -107,6 +140,13 @@ class ServiceManager:
     def stop_all(self):
         logger.info("正在停止所有后端服务...")
         
+        # 0. 停止健康检查（避免关闭过程中探测已断开的连接）
+        try:
+            from backend.services.health_monitor import get_health_monitor
+            get_health_monitor().stop()
+        except Exception as e:
+            logger.warning(f"停止健康检查失败: {e}")
+        
         # 1. 停止 asyncio 事件循环中的所有任务
         if self.loop and self.loop.is_running():
             logger.info("正在停止 asyncio 事件循环...")
@@ -140,7 +180,16 @@ class ServiceManager:
         except Exception as e:
             logger.warning(f"关闭 PLC 连接失败: {e}")
         
-        # 3. 关闭 InfluxDB 客户端
+        # 3. 停止 InfluxDB 异步写入线程（先输出未结束的汇总窗口，写完队列剩余数据），再关闭客户端
+        try:
+            from backend.services.rollup_aggregator import get_rollup_aggregator
+            from backend.core.influx_writer import close_influx_writer
+            get_rollup_aggregator().flush_all()
+            close_influx_writer(timeout=3.0)
+            logger.info("InfluxDB 写入线程已停止")
+        except Exception as e:
+            logger.warning(f"停止 InfluxDB 写入线程失败: {e}")
+        
         try:
             from backend.core.influxdb import close_influx_client
             close_influx_client()
@@ -178,8 +227,9 @@ class ServiceManager:
     
     # 7. 获取服务状态
     def get_status(self) -> dict:
-        from backend.services.polling_loops_v2 import get_polling_loops_status
+        from backend.services.polling_loops_v2 import get_polling_loops_status, get_pipeline_stage_metrics
         from backend.services.batch_service import get_batch_service
+        from backend.services.health_monitor import get_health_monitor
         
         polling_status = get_polling_loops_status()
         batch_service = get_batch_service()
@@ -214,6 +264,8 @@ class ServiceManager:
                 for thread in self.threads
             ],
             "polling_loops": polling_status,
+            "pipeline_metrics": get_pipeline_stage_metrics(),
+            "health": get_health_monitor().get_status(),
             "batch_status": batch_status
         }
 
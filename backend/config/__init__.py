@@ -36,6 +36,12 @@ class Settings(BaseSettings):
     plc_rack: int = 0
     plc_slot: int = 1
     
+    # PLC 异步读写 (轮询循环的 S7 请求在独立 I/O 线程执行，超过截止时间直接放弃)
+    plc_request_timeout: float = 3.0       # 普通请求截止时间 (秒)
+    plc_arc_request_timeout: float = 1.0   # DB1 弧流读取截止时间 (秒)
+    plc_reconnect_wait: float = 2.0        # 强制重连前等待 PLC 释放旧连接槽 (秒)
+    plc_arc_guard_enabled: bool = True     # 高速弧流轮询时低优先级请求避开下一次弧流读取
+    
     # ============================================================
     # InfluxDB 配置
     # ============================================================
@@ -44,6 +50,44 @@ class Settings(BaseSettings):
     influx_org: str = "furnace"
     influx_bucket: str = "sensor_data"
     
+    # ============================================================
+    # InfluxDB 异步写入管线配置
+    # ============================================================
+    influx_write_queue_size: int = 50000          # 写入队列上限 (点)
+    influx_write_batch_size: int = 500            # 单次写入最大点数
+    influx_write_flush_interval: float = 2.0      # 最旧数据最长等待时间 (秒)
+    influx_write_max_retries: int = 3             # 写入失败重试次数
+    influx_write_drop_policy: str = "drop_oldest" # 队列满时策略: drop_oldest / drop_newest
+    
+    # InfluxDB 离线缓冲 (数据库不可用时落盘，恢复后回放)
+    influx_spool_enabled: bool = True
+    influx_spool_dir: str = ""                    # 为空时使用 data/influx_spool
+    influx_spool_max_mb: int = 1024               # 磁盘占用上限 (MB)
+    influx_spool_segment_mb: int = 16             # 单个分段文件大小 (MB)
+    influx_spool_replay_rate: int = 5000          # 回放速率 (点/秒)
+    
+    # 历史查询优先读取 10s/1m/10m 预聚合数据 (sensor_rollup)，无汇总数据时回退原始数据
+    history_rollup_enabled: bool = True
+    
+    # 批次目录 (data/batch_catalog.json) 与 InfluxDB 对账间隔 (秒)
+    batch_catalog_reconcile_interval: float = 3600.0
+    
+    # 后台健康检查 (PLC / InfluxDB / 轮询循环，结果推送到顶部状态栏)
+    health_check_interval: float = 5.0      # 探测间隔 (秒)
+    health_probe_timeout: float = 10.0      # 单项探测超过该时间未返回视为异常 (秒)
+    
+    # 报警判定 (超限持续 on_delay 秒才报警，回到回差范围内持续 off_delay 秒才解除)
+    alarm_on_delay: float = 1.0
+    alarm_off_delay: float = 3.0
+    
+    # 原始数据导出 (按时间分段流式查询 InfluxDB，逐段写入文件)
+    export_chunk_minutes: int = 30          # 单次查询的时间跨度 (分钟)
+    
+    # 批次列存归档 (批次停止/终止后在后台生成，历史曲线/批次对比优先读取)
+    batch_archive_enabled: bool = True
+    batch_archive_dir: str = ""             # 为空时使用 data/batch_archive
+    batch_archive_delay: float = 30.0       # 批次结束后等待写入队列落库的时间 (秒)
+    
     # ============================================================
     # 轮询间隔配置 (秒)
     # ============================================================
@@ -61,6 +105,12 @@ class Settings(BaseSettings):
     # 调试配置
     # ============================================================
     app_debug: bool = False
+    pipeline_metrics_enabled: bool = True  # 采集链路分阶段耗时统计 (状态页显示，关闭后几乎无开销)
+
+    # PLC 原始帧录制 (data/frame_records/<会话>/，用于离线回放复现问题)
+    frame_record_enabled: bool = False
+    frame_record_dir: str = ""              # 为空时使用 data/frame_records
+    frame_record_segment_mb: int = 64       # 单个分段文件大小 (MB)
     
     class Config:
         env_file = _get_env_file_path()
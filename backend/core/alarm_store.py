@@ -1,16 +1,88 @@
 """
 电炉后端 - 报警日志存储
+
+报警事件管线 (轮询路径上的 log_alarm 只做内存操作，不访问数据库):
+    1. 去重: 同一设备/参数/级别 60 秒内只记录一次，过期记录按时间顺序清理 (不会无限增长)
+    2. 快速通知: 去重通过后立即回调监听者 (DataBridge -> 界面弹窗/报警声音)
+    3. 持久化: 数据点提交到 InfluxWriter (有界队列 + 后台线程批量写入 + 失败重试/离线缓冲)
+    4. 最近报警: 内存中保留最近 N 条报警事件，界面无需查询数据库即可显示
 """
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Deque, Dict, Any, List, Optional
 
-from backend.core.influxdb import write_point, get_influx_client
+from backend.core.influxdb import build_point, get_influx_client
+from backend.core.influx_writer import get_influx_writer
+from backend.core.log_throttler import get_error_log_throttler
 from backend.config import get_settings
+from backend.core.frame_recorder import frame_utcnow
 
 settings = get_settings()
+log_throttler = get_error_log_throttler()
 
-_last_alarms: Dict[str, datetime] = {}
 _ALARM_DEDUP_SECONDS = 60
+_ALARM_DEDUP_MAX_KEYS = 4096     # 去重表上限 (正常只有几十个键，仅作保护)
+_RECENT_ALARMS_LIMIT = 200
+
+
+class _ExpiringKeys:
+    """按时间过期的去重表 (插入顺序即时间顺序，清理时只检查表头)"""
+
+    def __init__(self, ttl_seconds: float, max_keys: int):
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._max_keys = max_keys
+        self._entries: "OrderedDict[str, datetime]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # 1. 键不在有效期内时记录并返回 True，否则返回 False
+    def add_if_absent(self, key: str, now: datetime) -> bool:
+        with self._lock:
+            self._expire(now)
+            last = self._entries.get(key)
+            # 时间倒退 (重复回放录制数据) 时视为已过期
+            if last is not None and last <= now < last + self._ttl:
+                return False
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+            return True
+
+    # 2. 清除去重记录 (key 为 None 时全部清除)
+    def discard(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: datetime):
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest <= now < oldest + self._ttl:
+                break
+            self._entries.popitem(last=False)
+
+
+_dedup = _ExpiringKeys(_ALARM_DEDUP_SECONDS, _ALARM_DEDUP_MAX_KEYS)
+_recent_alarms: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_ALARMS_LIMIT)
+_alarm_listeners: List[Callable[[Dict[str, Any]], None]] = []
+_alarm_stats = {'raised': 0, 'deduplicated': 0, 'submitted': 0, 'rejected': 0}
+
+
+def add_alarm_listener(callback: Callable[[Dict[str, Any]], None]):
+    """注册报警事件监听者 (在轮询线程同步回调，回调内不得阻塞)"""
+    if callback not in _alarm_listeners:
+        _alarm_listeners.append(callback)
+
+
+def remove_alarm_listener(callback: Callable[[Dict[str, Any]], None]):
+    if callback in _alarm_listeners:
+        _alarm_listeners.remove(callback)
 
 
 def log_alarm(
@@ -23,14 +95,17 @@ def log_alarm(
     message: str = "",
     batch_code: str = ""
 ) -> bool:
-    """记录报警日志到InfluxDB"""
+    """记录报警 (非阻塞: 通知监听者并提交到异步写入队列)
+
+    Returns:
+        bool: 是否记录 (去重期内的重复报警返回 False)
+    """
     dedup_key = f"{device_id}_{param_name}_{level}"
-    now = datetime.now(timezone.utc)
+    now = frame_utcnow()
     
-    if dedup_key in _last_alarms:
-        elapsed = (now - _last_alarms[dedup_key]).total_seconds()
-        if elapsed < _ALARM_DEDUP_SECONDS:
-            return False
+    if not _dedup.add_if_absent(dedup_key, now):
+        _alarm_stats['deduplicated'] += 1
+        return False
     
     tags = {
         "device_id": device_id,
@@ -50,13 +125,40 @@ def log_alarm(
         "acknowledged": False,
     }
     
-    success = write_point("alarm_logs", tags, fields, now)
+    # 1. 快速通知 (界面弹窗/报警声音不等待数据库)
+    event = {
+        "timestamp": now.isoformat(),
+        **tags,
+        **fields,
+    }
+    _recent_alarms.append(event)
+    _alarm_stats['raised'] += 1
+    for callback in list(_alarm_listeners):
+        try:
+            callback(event)
+        except Exception as e:
+            log_throttler.log_error("alarm_listener_failed", f"报警通知失败: {e}")
     
-    if success:
-        _last_alarms[dedup_key] = now
-        print(f"[ALARM] 报警记录: {device_id} {alarm_type} {level} - {param_name}={value:.2f}")
+    # 2. 持久化 (入队即返回，由 InfluxWriter 后台线程批量写入)
+    point = build_point("alarm_logs", tags, fields, now)
+    if point is not None and get_influx_writer().submit([point]).accepted:
+        _alarm_stats['submitted'] += 1
+    else:
+        _alarm_stats['rejected'] += 1
+        log_throttler.log_error("alarm_submit_failed", f"报警记录未能进入写入队列: {dedup_key}")
     
-    return success
+    print(f"[ALARM] 报警记录: {device_id} {alarm_type} {level} - {param_name}={value:.2f}")
+    return True
+
+
+def get_recent_alarms(limit: int = _RECENT_ALARMS_LIMIT) -> List[Dict[str, Any]]:
+    """最近的报警事件 (新的在前，本次运行期间，不查询数据库)"""
+    return list(reversed(_recent_alarms))[:limit]
+
+
+def get_alarm_pipeline_stats() -> Dict[str, Any]:
+    """报警管线统计 {raised, deduplicated, submitted, rejected, dedup_keys}"""
+    return {**_alarm_stats, 'dedup_keys': len(_dedup)}
 
 
 def query_alarms(
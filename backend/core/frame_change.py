@@ -0,0 +1,108 @@
+# ============================================================
+# 文件说明: frame_change.py - 数据块变化检测
+# ============================================================
+# 功能:
+#   1. 与上一次读取的原始字节比较 (bytes 相等比较，200 字节以内比哈希更快)
+#   2. 未变化的数据块跳过解析、缓存重建和界面发布
+#   3. 记录每个块的最后变化时间 (状态页显示数据是否陈旧) 和最后读取时间
+#   4. 统计每个块的读取次数/变化次数 (跳过比例)
+# ============================================================
+# 用法:
+#   detector = get_frame_change_detector()
+#   if not detector.changed('db30', raw_data):
+#       return                      # 与上次相同，沿用已有解析结果
+#   ... 解析 ...
+#   解析失败时调用 detector.invalidate('db30')，下次相同数据仍会重新解析
+# ============================================================
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class _BlockState:
+    __slots__ = ('data', 'changed_at', 'seen_at', 'reads', 'changes')
+
+    def __init__(self):
+        self.data: Optional[bytes] = None
+        self.changed_at: Optional[datetime] = None
+        self.seen_at: Optional[datetime] = None
+        self.reads = 0
+        self.changes = 0
+
+
+class FrameChangeDetector:
+    """数据块变化检测 (单例通过 get_frame_change_detector() 获取)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, _BlockState] = {}
+
+    # 1. 记录本次读取，返回是否与上次不同 (首次读取视为变化)
+    def changed(self, key: str, data: Optional[bytes]) -> bool:
+        now = datetime.now()
+        with self._lock:
+            state = self._blocks.get(key)
+            if state is None:
+                state = self._blocks[key] = _BlockState()
+            state.reads += 1
+            state.seen_at = now
+            if data is not None and state.data == data:
+                return False
+            state.data = bytes(data) if data is not None else None
+            state.changed_at = now
+            state.changes += 1
+            return True
+
+    # 2. 多个块一起判断 (任意一个变化即为变化，所有块的记录都会更新)
+    def changed_any(self, blocks: Dict[str, Optional[bytes]]) -> bool:
+        result = False
+        for key, data in blocks.items():
+            if self.changed(key, data):
+                result = True
+        return result
+
+    # 3. 清除记录 (解析失败/重新加载配置后调用，下次读取强制处理)
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                for state in self._blocks.values():
+                    state.data = None
+            elif key in self._blocks:
+                self._blocks[key].data = None
+
+    # 4. 最后变化时间 / 最后读取时间
+    def changed_at(self, key: str) -> Optional[datetime]:
+        state = self._blocks.get(key)
+        return state.changed_at if state else None
+
+    def seen_at(self, key: str) -> Optional[datetime]:
+        state = self._blocks.get(key)
+        return state.seen_at if state else None
+
+    # 5. 统计 {块名: {reads, changes, skip_ratio, changed_at, seen_at}}
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                key: {
+                    'reads': state.reads,
+                    'changes': state.changes,
+                    'skip_ratio': round(1 - state.changes / state.reads, 3) if state.reads else 0.0,
+                    'changed_at': state.changed_at.isoformat() if state.changed_at else None,
+                    'seen_at': state.seen_at.isoformat() if state.seen_at else None,
+                }
+                for key, state in self._blocks.items()
+            }
+
+
+# ============================================================
+# 单例
+# ============================================================
+_frame_change_detector: Optional[FrameChangeDetector] = None
+
+
+def get_frame_change_detector() -> FrameChangeDetector:
+    global _frame_change_detector
+    if _frame_change_detector is None:
+        _frame_change_detector = FrameChangeDetector()
+    return _frame_change_detector
@@ -0,0 +1,254 @@
+# ============================================================
+# 文件说明: frame_recorder.py - PLC 原始帧录制与读取
+# ============================================================
+# 功能:
+#   1. 录制每次读取到的原始字节 (DB1/DB32/DB18/DB19/DB30/DB41 + Q/I 区)，带单调时钟和墙钟时间戳
+#   2. 每个数据块独立的追加写分段文件，定长记录 (同一分段内记录大小固定，可直接按偏移定位)
+#   3. 读取: 按块读取，或按单调时间合并为"帧" (同一次读取的多个块时间戳相同，合并为一帧)
+#   4. 回放时钟: 回放期间 frame_utcnow() 返回录制时的墙钟时间，能耗积分/投料记录/报警时间与现场一致
+# ============================================================
+# 文件结构 (data/frame_records/<会话>/):
+#   - db1.000001.frm     分段文件: 32 字节文件头 + N × (16 字节时间戳 + 数据块字节)
+#   - db32.000001.frm
+#   - q_area.000001.frm
+#   文件头: 魔数 PLCFRM01 (8) + 块名 (16, 不足补 0) + 数据长度 uint32 + 保留 (4)
+#   记录:   单调时钟 float64 + 墙钟 Unix 时间 float64 + 数据 (小端时间戳)
+# ============================================================
+# 容量估算:
+#   - DB1 (182 字节) 0.2s 一次约 1 KB/s，20 小时约 70 MB
+#   - DB32+DB18+DB19+Q+I 0.5s 一次约 320 B/s，20 小时约 23 MB
+# ============================================================
+# 注意:
+#   - 录制只在 asyncio 线程调用，写入走 64 KB 缓冲，不在每条记录后 flush
+#   - 进程异常退出时最多丢失缓冲区中的数据，读取时忽略末尾不完整的记录
+# ============================================================
+
+import heapq
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import get_settings
+from backend.core.log_throttler import get_error_log_throttler
+
+settings = get_settings()
+log_throttler = get_error_log_throttler()
+
+# 计算项目根目录的绝对路径 (避免工作目录变化导致路径问题)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_RECORD_DIR = os.path.join(_PROJECT_ROOT, "data", "frame_records")
+
+_SEGMENT_SUFFIX = ".frm"
+_MAGIC = b"PLCFRM01"
+_FILE_HEADER = struct.Struct("<8s16sI4x")    # 32 字节
+_RECORD_HEADER = struct.Struct("<dd")        # 单调时钟, 墙钟
+_WRITE_BUFFER = 64 * 1024
+
+# 帧: (单调时钟, 墙钟, {块名: 字节})
+Frame = Tuple[float, float, Dict[str, bytes]]
+
+
+class FrameRecorder:
+    """原始帧录制器 (只在 asyncio 线程使用)"""
+
+    # 1. 初始化会话目录
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        self._dir = directory
+        self._segment_max_bytes = segment_max_bytes
+        os.makedirs(self._dir, exist_ok=True)
+
+        # 块名 -> (文件, 分段序号, 数据长度)
+        self._files: Dict[str, Tuple[object, int, int]] = {}
+        self._frames: Dict[str, int] = {}
+        self._bytes = 0
+        self._closed = False
+
+        logger.info(f"PLC 原始帧录制已启动: {self._dir}")
+
+    # 2. 录制一个数据块
+    def record(self, key: str, data: Optional[bytes], mono: Optional[float] = None, wall: Optional[float] = None):
+        if not data or self._closed:
+            return
+        if mono is None:
+            mono = time.monotonic()
+        if wall is None:
+            wall = time.time()
+        try:
+            f = self._ensure_segment(key, len(data))
+            f.write(_RECORD_HEADER.pack(mono, wall))
+            f.write(data)
+            self._frames[key] = self._frames.get(key, 0) + 1
+            self._bytes += _RECORD_HEADER.size + len(data)
+        except Exception as e:
+            log_throttler.log_error("frame_record_failed", f"PLC 原始帧录制失败 ({key}): {e}")
+
+    # 3. 录制同一次读取的多个数据块 (时间戳相同，回放时合并为一帧)
+    def record_group(self, blocks: Dict[str, Optional[bytes]]):
+        mono = time.monotonic()
+        wall = time.time()
+        for key, data in blocks.items():
+            self.record(key, data, mono, wall)
+
+    # 4. 状态
+    def get_status(self) -> dict:
+        return {
+            'directory': self._dir,
+            'frames': dict(self._frames),
+            'bytes': self._bytes,
+        }
+
+    # 5. 关闭所有分段
+    def close(self):
+        self._closed = True
+        for f, _, _ in self._files.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._files.clear()
+        logger.info(f"PLC 原始帧录制已停止: {sum(self._frames.values())} 条记录, {self._bytes / 1024:.1f} KB")
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _ensure_segment(self, key: str, size: int):
+        entry = self._files.get(key)
+        if entry is not None:
+            f, seq, record_size = entry
+            # 数据长度不变且分段未满: 继续追加
+            if record_size == size and f.tell() + _RECORD_HEADER.size + size <= self._segment_max_bytes:
+                return f
+            f.close()
+            seq += 1
+        else:
+            seq = 1 + max(
+                (int(name.split(".")[1]) for name in os.listdir(self._dir)
+                 if name.startswith(key + ".") and name.endswith(_SEGMENT_SUFFIX)),
+                default=0,
+            )
+
+        path = os.path.join(self._dir, f"{key}.{seq:06d}{_SEGMENT_SUFFIX}")
+        f = open(path, "wb", buffering=_WRITE_BUFFER)
+        f.write(_FILE_HEADER.pack(_MAGIC, key.encode("ascii")[:16], size))
+        self._files[key] = (f, seq, size)
+        return f
+
+
+class FrameReader:
+    """录制会话读取器"""
+
+    def __init__(self, directory: str):
+        self._dir = directory
+        # 块名 -> 按序号排列的分段路径
+        self._segments: Dict[str, List[str]] = {}
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(_SEGMENT_SUFFIX):
+                continue
+            key = name.split(".")[0]
+            self._segments.setdefault(key, []).append(os.path.join(directory, name))
+
+    # 1. 录制的块名
+    def keys(self) -> List[str]:
+        return list(self._segments)
+
+    # 2. 按时间顺序读取单个块 -> (单调时钟, 墙钟, 字节)
+    def iter_block(self, key: str) -> Iterator[Tuple[float, float, bytes]]:
+        for path in self._segments.get(key, []):
+            with open(path, "rb") as f:
+                header = f.read(_FILE_HEADER.size)
+                if len(header) < _FILE_HEADER.size:
+                    continue
+                magic, _, size = _FILE_HEADER.unpack(header)
+                if magic != _MAGIC:
+                    logger.warning(f"跳过无法识别的录制文件: {path}")
+                    continue
+                data = f.read()
+
+            record_size = _RECORD_HEADER.size + size
+            view = memoryview(data)
+            # 末尾不完整的记录 (写入中断) 直接忽略
+            for offset in range(0, len(data) - record_size + 1, record_size):
+                mono, wall = _RECORD_HEADER.unpack_from(view, offset)
+                yield (mono, wall, bytes(view[offset + _RECORD_HEADER.size:offset + record_size]))
+
+    # 3. 所有块按单调时钟合并，时间戳相同的块合并为一帧
+    def iter_frames(self) -> Iterator[Frame]:
+        def tagged(key: str):
+            for mono, wall, data in self.iter_block(key):
+                yield (mono, wall, key, data)
+
+        streams = [tagged(key) for key in self._segments]
+        current: Optional[Frame] = None
+        for mono, wall, key, data in heapq.merge(*streams, key=lambda r: r[0]):
+            if current is not None and current[0] == mono:
+                current[2][key] = data
+                continue
+            if current is not None:
+                yield current
+            current = (mono, wall, {key: data})
+        if current is not None:
+            yield current
+
+    # 4. 每个块的记录数 (按文件大小计算，不读取数据)
+    def count(self) -> Dict[str, int]:
+        counts = {}
+        for key, paths in self._segments.items():
+            total = 0
+            for path in paths:
+                with open(path, "rb") as f:
+                    header = f.read(_FILE_HEADER.size)
+                if len(header) < _FILE_HEADER.size:
+                    continue
+                _, _, size = _FILE_HEADER.unpack(header)
+                total += (os.path.getsize(path) - _FILE_HEADER.size) // (_RECORD_HEADER.size + size)
+            counts[key] = total
+        return counts
+
+
+# ============================================================
+# 回放时钟
+# ============================================================
+_replay_wall_time: Optional[float] = None
+
+
+def set_replay_wall_time(wall: Optional[float]):
+    """回放时设置当前帧的录制墙钟时间 (None 表示恢复实时时钟)"""
+    global _replay_wall_time
+    _replay_wall_time = wall
+
+
+def frame_utcnow() -> datetime:
+    """当前帧时间: 回放时为录制时的墙钟时间，否则为当前 UTC 时间"""
+    if _replay_wall_time is None:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(_replay_wall_time, timezone.utc)
+
+
+# ============================================================
+# 单例
+# ============================================================
+_frame_recorder: Optional[FrameRecorder] = None
+
+
+def get_frame_recorder() -> Optional[FrameRecorder]:
+    """未启用录制时返回 None"""
+    global _frame_recorder
+    if _frame_recorder is None and settings.frame_record_enabled:
+        base_dir = settings.frame_record_dir or DEFAULT_RECORD_DIR
+        session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        _frame_recorder = FrameRecorder(
+            os.path.join(base_dir, session),
+            segment_max_bytes=settings.frame_record_segment_mb * 1024 * 1024,
+        )
+    return _frame_recorder
+
+
+def close_frame_recorder() -> None:
+    global _frame_recorder
+    if _frame_recorder is not None:
+        _frame_recorder.close()
+        _frame_recorder = None
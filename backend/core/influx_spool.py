@@ -0,0 +1,254 @@
+# ============================================================
+# 文件说明: influx_spool.py - InfluxDB 离线写入缓冲 (磁盘分段文件)
+# ============================================================
+# 功能:
+#   1. InfluxDB 不可用时，将数据点以 line protocol 追加写入磁盘
+#   2. 分段文件存储 (每段固定上限，按序号递增)
+#   3. 按时间顺序读取回放，读取位置持久化 (重启后继续回放)
+#   4. 磁盘总量上限 (超出时删除最旧分段)
+# ============================================================
+# 文件结构 (data/influx_spool/):
+#   - 0000000001.lp      分段文件 (每行一条 line protocol)
+#   - 0000000002.lp
+#   - replay.offset      当前回放分段的已读字节偏移
+#   - rejected.lp        被 InfluxDB 拒绝 (400/413/422) 的数据，不回放 (上限 64 MB，超出后丢弃)
+# ============================================================
+# 容量估算:
+#   - 0.2s 弧流数据约 1.5 KB/s，20 小时约 110 MB
+#   - 内存占用与缓冲数据量无关 (只保留当前分段的文件句柄)
+# ============================================================
+
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from backend.core.log_throttler import get_error_log_throttler
+
+log_throttler = get_error_log_throttler()
+
+# 计算项目根目录的绝对路径 (避免工作目录变化导致路径问题)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SPOOL_DIR = os.path.join(_PROJECT_ROOT, "data", "influx_spool")
+
+_SEGMENT_SUFFIX = ".lp"
+_OFFSET_FILE = "replay.offset"
+
+# 被 InfluxDB 拒绝 (400/413/422) 的数据 (不参与回放，保留供人工排查/修正后导入)
+_REJECTED_FILE = "rejected.lp"
+_REJECTED_MAX_BYTES = 64 * 1024 * 1024
+
+
+class InfluxSpool:
+    """InfluxDB 离线写入缓冲 (线程安全)"""
+
+    # 1. 初始化缓冲目录
+    def __init__(
+        self,
+        directory: str = DEFAULT_SPOOL_DIR,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        max_total_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self._dir = directory
+        self._segment_max_bytes = segment_max_bytes
+        self._max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(self._dir, exist_ok=True)
+
+        # 已有分段 (断电/重启前未回放完的数据)
+        self._segments: List[int] = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self._dir)
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        self._write_file = None
+        self._write_seq: Optional[int] = None
+        self._total_bytes = sum(os.path.getsize(self._segment_path(seq)) for seq in self._segments)
+        self._read_offset = self._load_offset()
+
+        # 统计
+        self._spooled_lines = 0
+        self._replayed_lines = 0
+        self._discarded_bytes = 0
+        self._rejected_lines = 0
+
+        if self._segments:
+            logger.warning(f"InfluxDB 离线缓冲存在未回放数据: {len(self._segments)} 个分段, {self._total_bytes / 1024:.1f} KB")
+
+    # 2. 追加写入 line protocol (返回写入行数)
+    def append(self, lines: List[str]) -> int:
+        if not lines:
+            return 0
+
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                self._ensure_write_segment(len(data))
+                self._write_file.write(data)
+                self._write_file.flush()
+                self._total_bytes += len(data)
+                self._spooled_lines += len(lines)
+                self._enforce_capacity()
+                log_throttler.reset("influx_spool_write_failed")
+                return len(lines)
+            except Exception as e:
+                log_throttler.log_error("influx_spool_write_failed", f"InfluxDB 离线缓冲写入失败: {e}")
+                return 0
+
+    # 2.1 隔离被拒绝的数据 (写入 rejected.lp，返回是否成功)
+    def quarantine(self, lines: List[str]) -> bool:
+        if not lines:
+            return True
+
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        path = os.path.join(self._dir, _REJECTED_FILE)
+        with self._lock:
+            try:
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                if size + len(data) > _REJECTED_MAX_BYTES:
+                    return False
+                with open(path, "ab") as f:
+                    f.write(data)
+                self._rejected_lines += len(lines)
+                return True
+            except Exception as e:
+                log_throttler.log_error("influx_spool_quarantine_failed", f"隔离被拒绝数据失败: {e}")
+                return False
+
+    # 3. 读取最旧的一批数据 (不移动读取位置，需调用 commit 确认)
+    def read_chunk(self, max_lines: int) -> Tuple[Optional[int], List[str], int]:
+        """读取最旧分段中从当前偏移开始的最多 max_lines 行
+
+        Returns:
+            (分段序号, 行列表, 读取后的新偏移)，无数据时分段序号为 None
+        """
+        with self._lock:
+            while self._segments:
+                seq = self._segments[0]
+                path = self._segment_path(seq)
+                # 正在写入的分段先封口，避免读到半行
+                if seq == self._write_seq:
+                    self._close_write_segment()
+
+                lines: List[str] = []
+                offset = self._read_offset
+                try:
+                    with open(path, "rb") as f:
+                        f.seek(offset)
+                        while len(lines) < max_lines:
+                            raw = f.readline()
+                            if not raw or not raw.endswith(b"\n"):
+                                break
+                            offset += len(raw)
+                            line = raw.decode("utf-8").strip()
+                            if line:
+                                lines.append(line)
+                except FileNotFoundError:
+                    self._drop_segment(seq)
+                    continue
+
+                if lines:
+                    return (seq, lines, offset)
+
+                # 分段已读完: 删除并继续下一个分段
+                self._drop_segment(seq)
+
+            return (None, [], 0)
+
+    # 4. 确认已回放 (持久化读取位置)
+    def commit(self, seq: int, offset: int, line_count: int):
+        with self._lock:
+            if not self._segments or self._segments[0] != seq:
+                return
+            self._read_offset = offset
+            self._replayed_lines += line_count
+            self._save_offset()
+
+    # 5. 是否有待回放数据
+    def has_pending(self) -> bool:
+        return bool(self._segments)
+
+    # 6. 获取缓冲状态
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                'directory': self._dir,
+                'segments': len(self._segments),
+                'pending_bytes': self._total_bytes,
+                'spooled_lines': self._spooled_lines,
+                'replayed_lines': self._replayed_lines,
+                'discarded_bytes': self._discarded_bytes,
+                'rejected_lines': self._rejected_lines,
+            }
+
+    # 7. 关闭写入文件
+    def close(self):
+        with self._lock:
+            self._close_write_segment()
+
+    # ------------------------------------------------------------
+    # 内部方法 (调用方已持有锁)
+    # ------------------------------------------------------------
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self._dir, f"{seq:010d}{_SEGMENT_SUFFIX}")
+
+    def _ensure_write_segment(self, incoming: int):
+        if self._write_file is not None and self._write_file.tell() + incoming <= self._segment_max_bytes:
+            return
+        self._close_write_segment()
+        seq = (self._segments[-1] + 1) if self._segments else 1
+        self._write_file = open(self._segment_path(seq), "ab")
+        self._write_seq = seq
+        self._segments.append(seq)
+
+    def _close_write_segment(self):
+        if self._write_file is not None:
+            try:
+                self._write_file.close()
+            except Exception:
+                pass
+        self._write_file = None
+        self._write_seq = None
+
+    def _drop_segment(self, seq: int):
+        path = self._segment_path(seq)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._total_bytes -= size
+        except FileNotFoundError:
+            pass
+        self._segments.remove(seq)
+        self._read_offset = 0
+        self._save_offset()
+
+    def _enforce_capacity(self):
+        # 超出磁盘上限时删除最旧分段 (保留正在写入的分段)
+        while self._total_bytes > self._max_total_bytes and len(self._segments) > 1:
+            seq = self._segments[0]
+            size = os.path.getsize(self._segment_path(seq))
+            self._discarded_bytes += size
+            self._drop_segment(seq)
+            log_throttler.log_error(
+                "influx_spool_overflow",
+                f"InfluxDB 离线缓冲超出上限 ({self._max_total_bytes // (1024 * 1024)} MB)，已丢弃最旧分段"
+            )
+
+    def _load_offset(self) -> int:
+        try:
+            with open(os.path.join(self._dir, _OFFSET_FILE), "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _save_offset(self):
+        path = os.path.join(self._dir, _OFFSET_FILE)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(self._read_offset))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log_throttler.log_error("influx_spool_offset_failed", f"保存离线缓冲回放位置失败: {e}")
@@ -0,0 +1,463 @@
+# ============================================================
+# 文件说明: influx_writer.py - InfluxDB 异步写入管线
+# ============================================================
+# 功能:
+#   1. 有界写入队列 (轮询线程只入队，不等待数据库)
+#   2. 后台写入线程 (复用 influxdb.get_write_api() 单例)
+#   3. 按数量/时长触发批量写入
+#   4. 写入失败带抖动的指数退避重试
+#   5. 背压与丢弃策略 (drop_oldest / drop_newest)；submit() 返回 SubmitResult (保留/丢弃点数)，
+#      is_backpressured() 供轮询写入方在队列接近上限时降采样原始数据
+#   6. 运行指标 (队列深度、写入延迟、点/秒；指标与队列共用同一把锁)
+#   7. InfluxDB 不可用时写入磁盘离线缓冲，恢复后限速回放
+#   8. 数据错误 (400/413/422，如 line protocol 格式错误/字段类型冲突) 不重试、不落盘，
+#      隔离到离线缓冲目录的 rejected.lp (无离线缓冲时丢弃)
+#      认证/配置错误 (401/403/404) 不重试，按不可用写入离线缓冲，修复后回放
+# ============================================================
+# 设计原则:
+#   - submit() 永不阻塞 asyncio 事件循环
+#   - 轮询延迟与数据库延迟完全解耦
+#   - 进程退出时尽量把队列中的数据写完
+#   - 启用离线缓冲时，队列溢出/写入失败的数据落盘而不是丢弃
+# ============================================================
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import get_settings
+from backend.core.influxdb import get_write_api, check_influx_health, writes_suppressed
+from backend.core.influx_spool import InfluxSpool, DEFAULT_SPOOL_DIR
+from backend.core.log_throttler import get_error_log_throttler
+
+settings = get_settings()
+log_throttler = get_error_log_throttler()
+
+# 丢弃策略
+DROP_OLDEST = "drop_oldest"   # 队列满时丢弃最旧的点 (保留最新数据)
+DROP_NEWEST = "drop_newest"   # 队列满时拒绝新提交的点
+
+
+@dataclass(frozen=True)
+class SubmitResult:
+    """submit() 结果 (单位均为数据点数，多行 line protocol 按行计)"""
+    accepted: int   # 本次提交中入队或落盘的点数 (只读模式下为计数的点数)
+    dropped: int    # 因本次提交而丢弃的点数 (drop_newest: 本次提交的点; drop_oldest: 被挤出的旧点)
+
+
+class InfluxWriter:
+    """InfluxDB 异步写入器 (单例通过 get_influx_writer() 获取)"""
+
+    # 1. 初始化写入器
+    def __init__(
+        self,
+        max_queue_size: int = settings.influx_write_queue_size,
+        batch_size: int = settings.influx_write_batch_size,
+        flush_interval: float = settings.influx_write_flush_interval,
+        max_retries: int = settings.influx_write_max_retries,
+        drop_policy: str = settings.influx_write_drop_policy,
+        spool: Optional[InfluxSpool] = None,
+    ):
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._drop_policy = drop_policy if drop_policy in (DROP_OLDEST, DROP_NEWEST) else DROP_OLDEST
+
+        # 队列元素: (入队时间, Point)
+        self._queue: Deque[Tuple[float, Any]] = deque()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 背压阈值 (队列占用超过 80% 视为背压)
+        self._high_watermark = int(max_queue_size * 0.8)
+
+        # 离线缓冲 (None 表示不启用，重试耗尽后直接丢弃)
+        self._spool = spool
+        self._replay_rate = settings.influx_spool_replay_rate  # 回放速率 (点/秒)
+        self._replay_chunk = max(1, min(self._batch_size, self._replay_rate))
+        self._health_interval = 10.0  # InfluxDB 不可用时健康检查间隔 (秒)
+        self._last_health_check = 0.0
+        # 启动时存在未回放数据，先做健康检查再决定写库还是落盘
+        self._influx_down = bool(spool and spool.has_pending())
+
+        # 运行指标
+        self._metrics = {
+            'submitted_points': 0,
+            'written_points': 0,
+            'failed_points': 0,
+            'dropped_points': 0,
+            'evicted_points': 0,
+            'rejected_points': 0,
+            'spooled_points': 0,
+            'replayed_points': 0,
+            'suppressed_points': 0,
+            'write_batches': 0,
+            'retries': 0,
+            'last_write_latency_ms': 0.0,
+            'avg_write_latency_ms': 0.0,
+            'max_write_latency_ms': 0.0,
+            'last_error': "",
+        }
+        # 最近写入记录 (时间, 点数)，用于计算点/秒
+        self._recent_writes: Deque[Tuple[float, int]] = deque(maxlen=120)
+
+    # 2. 启动后台写入线程
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="InfluxWriter")
+        self._thread.start()
+        logger.info(
+            f"InfluxDB 写入线程已启动 (队列上限: {self._max_queue_size}, "
+            f"批量: {self._batch_size}, 间隔: {self._flush_interval}s, 策略: {self._drop_policy})"
+        )
+
+    # 3. 停止写入线程 (尽量写完队列中的数据)
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(f"InfluxDB 写入线程未能在 {timeout}s 内停止 (剩余 {len(self._queue)} 个点)")
+        self._thread = None
+
+    # 4. 提交数据点 (Point / line protocol 字符串或 bytes，非阻塞)
+    def submit(self, points: List[Any]) -> SubmitResult:
+        """提交数据点，返回 SubmitResult (点数)
+
+        队列已满时按丢弃策略溢出的记录 (drop_newest 为本次提交的记录，drop_oldest 为被挤出的旧记录)
+        优先落盘；落盘失败的溢出点计入 dropped，drop_newest 时同时从 accepted 中扣除
+        """
+        if not points:
+            return SubmitResult(0, 0)
+
+        total = _count_points(points)
+
+        # 只读模式 (离线回放): 只计数，不入队
+        if writes_suppressed():
+            with self._cond:
+                self._metrics['suppressed_points'] += total
+            return SubmitResult(total, 0)
+
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+
+        now = time.monotonic()
+        overflow = []
+        with self._cond:
+            for point in points:
+                if len(self._queue) >= self._max_queue_size:
+                    if self._drop_policy == DROP_NEWEST:
+                        overflow.append(point)
+                        continue
+                    overflow.append(self._queue.popleft()[1])
+                self._queue.append((now, point))
+
+            self._metrics['submitted_points'] += total
+            if overflow and self._drop_policy == DROP_OLDEST:
+                self._metrics['evicted_points'] += _count_points(overflow)
+
+            if len(self._queue) >= self._batch_size:
+                self._cond.notify()
+
+        if not overflow:
+            return SubmitResult(total, 0)
+
+        # 溢出的数据优先落盘，落盘失败才算丢弃
+        dropped = _count_points(overflow) - self._spool_points(overflow)
+        if not dropped:
+            return SubmitResult(total, 0)
+
+        with self._cond:
+            self._metrics['dropped_points'] += dropped
+        log_throttler.log_error(
+            "influxdb_writer_dropped",
+            f"InfluxDB 写入队列已满 ({self._max_queue_size})，按 {self._drop_policy} 丢弃 {dropped} 个点"
+        )
+        accepted = total - dropped if self._drop_policy == DROP_NEWEST else total
+        return SubmitResult(accepted, dropped)
+
+    # 5. 是否处于背压状态 (队列达到 80%，轮询写入方据此对原始数据降采样)
+    def is_backpressured(self) -> bool:
+        return len(self._queue) >= self._high_watermark
+
+    # 6. 获取运行指标
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            metrics = dict(self._metrics)
+            queue_depth = len(self._queue)
+            oldest_age = time.monotonic() - self._queue[0][0] if self._queue else 0.0
+
+        # 最近 60 秒的写入速率
+        now = time.monotonic()
+        recent = [(t, n) for t, n in list(self._recent_writes) if now - t <= 60.0]
+        points_per_second = sum(n for _, n in recent) / 60.0 if recent else 0.0
+
+        metrics.update({
+            'queue_depth': queue_depth,
+            'queue_capacity': self._max_queue_size,
+            'oldest_point_age_s': round(oldest_age, 3),
+            'backpressured': queue_depth >= self._high_watermark,
+            'points_per_second': round(points_per_second, 2),
+            'drop_policy': self._drop_policy,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'influx_down': self._influx_down,
+            'spool': self._spool.get_status() if self._spool else None,
+        })
+        return metrics
+
+    # 7. 后台线程主循环
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._write_with_retry(batch)
+            elif self._stop_event.is_set():
+                break
+            else:
+                self._replay_spool()
+        if self._spool:
+            self._spool.close()
+
+    # 8. 取出一批数据 (达到批量大小或最旧数据超过刷新间隔)
+    def _take_batch(self) -> List[Any]:
+        with self._cond:
+            while not self._stop_event.is_set():
+                if len(self._queue) >= self._batch_size:
+                    break
+                wait = self._flush_interval
+                if self._queue:
+                    wait = self._flush_interval - (time.monotonic() - self._queue[0][0])
+                    if wait <= 0:
+                        break
+
+                # 有待回放数据时缩短等待，空闲时间按回放速率用于回放
+                replaying = bool(self._spool and self._spool.has_pending())
+                if replaying:
+                    wait = min(wait, self._replay_chunk / self._replay_rate)
+
+                notified = self._cond.wait(timeout=wait)
+                if not notified and replaying:
+                    ready = len(self._queue) >= self._batch_size or (
+                        self._queue and time.monotonic() - self._queue[0][0] >= self._flush_interval
+                    )
+                    if not ready:
+                        return []
+
+            count = min(len(self._queue), self._batch_size)
+            return [self._queue.popleft()[1] for _ in range(count)]
+
+    # 9. 写入一批数据 (带抖动的指数退避重试)
+    def _write_with_retry(self, batch: List[Any]):
+        # InfluxDB 不可用期间直接落盘，不逐批重试 (恢复由健康检查判断)
+        if self._influx_down and self._spool:
+            self._on_batch_failed(batch)
+            return
+
+        for attempt in range(self._max_retries + 1):
+            start = time.perf_counter()
+            try:
+                get_write_api().write(
+                    bucket=settings.influx_bucket,
+                    org=settings.influx_org,
+                    record=batch
+                )
+                self._record_success(_count_points(batch), (time.perf_counter() - start) * 1000)
+                return
+            except Exception as e:
+                with self._cond:
+                    self._metrics['last_error'] = str(e)
+                # 数据本身被拒绝: 重试和回放都不会成功，不能按数据库不可用处理
+                if _is_rejected(e):
+                    self._on_batch_rejected(batch, e)
+                    return
+                log_throttler.log_error("influxdb_writer_failed", f"InfluxDB 异步写入失败 (第{attempt + 1}次): {e}")
+                # 认证/配置错误 (token 失效、bucket/org 不存在): 重试无效，直接落盘，修复后回放
+                if _is_unauthorized(e):
+                    break
+
+                # 退出时不再等待重试
+                if attempt >= self._max_retries or self._stop_event.is_set():
+                    break
+
+                with self._cond:
+                    self._metrics['retries'] += 1
+                delay = min(30.0, 0.5 * (2 ** attempt)) * random.uniform(0.5, 1.5)
+                self._stop_event.wait(delay)
+
+        self._on_batch_failed(batch)
+
+    # 10. 写入成功后更新指标
+    def _record_success(self, count: int, latency_ms: float):
+        with self._cond:
+            metrics = self._metrics
+            metrics['written_points'] += count
+            metrics['write_batches'] += 1
+            metrics['last_write_latency_ms'] = round(latency_ms, 2)
+            metrics['max_write_latency_ms'] = round(max(metrics['max_write_latency_ms'], latency_ms), 2)
+            # 指数滑动平均
+            prev = metrics['avg_write_latency_ms']
+            metrics['avg_write_latency_ms'] = round(latency_ms if prev == 0.0 else prev * 0.9 + latency_ms * 0.1, 2)
+        self._recent_writes.append((time.monotonic(), count))
+        log_throttler.reset("influxdb_writer_failed")
+
+    # 11. 重试耗尽后的处理 (落盘，无离线缓冲时计为失败)
+    def _on_batch_failed(self, batch: List[Any]):
+        if self._spool:
+            if not self._influx_down:
+                logger.warning("InfluxDB 不可用，后续数据写入离线缓冲")
+            self._influx_down = True
+            self._last_health_check = time.monotonic()
+        spooled = self._spool_points(batch)
+        with self._cond:
+            self._metrics['failed_points'] += _count_points(batch) - spooled
+
+    # 11.1 数据被拒绝 (400/413/422) 的处理: 隔离，不标记 InfluxDB 不可用
+    def _on_batch_rejected(self, batch: List[Any], error: Exception):
+        count = _count_points(batch)
+        quarantined = bool(self._spool) and self._spool.quarantine(_to_lines(batch))
+        with self._cond:
+            self._metrics['rejected_points'] += count
+            if not quarantined:
+                self._metrics['failed_points'] += count
+        log_throttler.log_error(
+            "influxdb_writer_rejected",
+            f"InfluxDB 拒绝写入 {count} 个点 ({getattr(error, 'status', '')})，"
+            f"{'已隔离到 rejected.lp' if quarantined else '已丢弃'}: {error}"
+        )
+
+    # 12. 写入离线缓冲 (返回落盘点数)
+    def _spool_points(self, points: List[Any]) -> int:
+        if not points or not self._spool:
+            return 0
+        lines = _to_lines(points)
+        spooled = _count_points(points) if self._spool.append(lines) else 0
+        with self._cond:
+            self._metrics['spooled_points'] += spooled
+        return spooled
+
+    # 13. 回放离线缓冲 (InfluxDB 恢复后按时间顺序限速写入)
+    def _replay_spool(self):
+        if not self._spool or not self._spool.has_pending() or self._stop_event.is_set():
+            return
+
+        if self._influx_down:
+            now = time.monotonic()
+            if now - self._last_health_check < self._health_interval:
+                return
+            self._last_health_check = now
+            healthy, _ = check_influx_health()
+            if not healthy:
+                return
+            self._influx_down = False
+            logger.info(f"InfluxDB 已恢复，开始回放离线缓冲 ({self._spool.get_status()['pending_bytes'] / 1024:.1f} KB)")
+
+        seq, lines, offset = self._spool.read_chunk(self._replay_chunk)
+        if seq is None:
+            return
+        try:
+            get_write_api().write(bucket=settings.influx_bucket, org=settings.influx_org, record=lines)
+        except Exception as e:
+            if _is_rejected(e):
+                # 被拒绝的数据隔离后跳过，不阻塞后续回放
+                quarantined = self._spool.quarantine(lines)
+                self._spool.commit(seq, offset, len(lines))
+                with self._cond:
+                    self._metrics['rejected_points'] += len(lines)
+                log_throttler.log_error(
+                    "influxdb_spool_replay_rejected",
+                    f"离线缓冲回放被拒绝 {len(lines)} 行 ({getattr(e, 'status', '')})，"
+                    f"{'已隔离到 rejected.lp' if quarantined else '已丢弃'}: {e}"
+                )
+                return
+            self._influx_down = True
+            self._last_health_check = time.monotonic()
+            log_throttler.log_error("influxdb_spool_replay_failed", f"离线缓冲回放失败: {e}")
+            return
+        self._spool.commit(seq, offset, len(lines))
+        with self._cond:
+            self._metrics['replayed_points'] += len(lines)
+        if not self._spool.has_pending():
+            logger.info("离线缓冲回放完成")
+
+
+# 数据本身有问题的状态码 (格式错误/请求过大/字段类型冲突): 重试和回放都不会成功，隔离
+_REJECTED_STATUSES = frozenset((400, 413, 422))
+# 认证/配置错误 (token 失效或被轮换、bucket/org 不存在): 按不可用处理，落盘等待修复后回放
+_UNAUTHORIZED_STATUSES = frozenset((401, 403, 404))
+
+
+def _is_rejected(error: Exception) -> bool:
+    """InfluxDB 拒绝数据本身 (400/413/422)"""
+    return getattr(error, 'status', None) in _REJECTED_STATUSES
+
+
+def _is_unauthorized(error: Exception) -> bool:
+    """InfluxDB 认证/配置错误 (401/403/404)"""
+    return getattr(error, 'status', None) in _UNAUTHORIZED_STATUSES
+
+
+def _to_lines(points: List[Any]) -> List[str]:
+    """数据点转为 line protocol 行 (bytes 为多行 line protocol)"""
+    lines = []
+    for point in points:
+        if isinstance(point, str):
+            lines.append(point)
+            continue
+        if isinstance(point, bytes):
+            lines.append(point.decode('utf-8').rstrip('\n'))
+            continue
+        # 未指定时间的点补上当前时间，避免回放时变成回放时刻
+        if getattr(point, '_time', None) is None:
+            point.time(datetime.now(timezone.utc))
+        lines.append(point.to_line_protocol())
+    return lines
+
+
+def _count_points(records: List[Any]) -> int:
+    """统计数据点数 (bytes 为多行 line protocol，按行数计)"""
+    return sum(r.count(b'\n') if isinstance(r, bytes) else 1 for r in records)
+
+
+# ============================================================
+# 全局单例获取函数
+# ============================================================
+_influx_writer: Optional[InfluxWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_influx_writer() -> InfluxWriter:
+    """获取 InfluxDB 异步写入器单例"""
+    global _influx_writer
+    if _influx_writer is None:
+        with _writer_lock:
+            if _influx_writer is None:
+                spool = None
+                if settings.influx_spool_enabled:
+                    spool = InfluxSpool(
+                        directory=settings.influx_spool_dir or DEFAULT_SPOOL_DIR,
+                        segment_max_bytes=settings.influx_spool_segment_mb * 1024 * 1024,
+                        max_total_bytes=settings.influx_spool_max_mb * 1024 * 1024,
+                    )
+                _influx_writer = InfluxWriter(spool=spool)
+    return _influx_writer
+
+
+def close_influx_writer(timeout: float = 5.0) -> None:
+    """停止写入线程 (进程退出前调用，在关闭 InfluxDB 客户端之前)"""
+    global _influx_writer
+    if _influx_writer is not None:
+        _influx_writer.stop(timeout=timeout)
+        _influx_writer = None
@@ -92,6 +92,7 @@ _write_lock = threading.Lock()
 # 1: 客户端管理模块
 # ============================================================
 _influx_client_instance: Optional[InfluxDBClient] = None
+_write_api_instance = None
 _client_lock = threading.Lock()
 
 
@@ -111,14 +112,28 @@ def get_influx_client() -> InfluxDBClient:
     return _influx_client_instance
 
 
+def get_write_api():
+    """获取同步 write_api 单例 (复用，避免每次写入重新创建)"""
+    global _write_api_instance
+    
+    if _write_api_instance is None:
+        client = get_influx_client()
+        with _client_lock:
+            if _write_api_instance is None:
+                _write_api_instance = client.write_api(write_options=SYNCHRONOUS)
+    
+    return _write_api_instance
+
+
 def close_influx_client():
     """关闭 InfluxDB 客户端连接"""
-    global _influx_client_instance
+    global _influx_client_instance, _write_api_instance
     
     if _influx_client_instance is not None:
         with _client_lock:
             if _influx_client_instance is not None:
                 try:
+                    _write_api_instance = None
                     _influx_client_instance.close()
                     _influx_client_instance = None
                     log_throttler.reset("influxdb_close_failed")
@@ -149,11 +164,27 @@ def check_influx_health() -> Tuple[bool, str]:
 # ============================================================
 # 2: 数据写入模块
 # ============================================================
+# 只读模式 (离线回放时使用): 写入函数直接返回成功，不访问数据库
+_writes_suppressed = False
+
+
+def set_writes_suppressed(suppressed: bool):
+    """开启/关闭只读模式"""
+    global _writes_suppressed
+    _writes_suppressed = suppressed
+
+
+def writes_suppressed() -> bool:
+    return _writes_suppressed
+
+
 def write_point(measurement: str, tags: Dict[str, str], fields: Dict[str, Any], timestamp: Optional[datetime] = None) -> bool:
     """写入单个数据点到 InfluxDB"""
+    if _writes_suppressed:
+        return True
+    
     try:
-        client = get_influx_client()
-        write_api = client.write_api(write_options=SYNCHRONOUS)
+        write_api = get_write_api()
         point = _build_point(measurement, tags, fields, timestamp)
         if point is None:
             return False
@@ -172,12 +203,11 @@ def write_point(measurement: str, tags: Dict[str, str], fields: Dict[str, Any],
 
 def write_points_batch(points: List[Point]) -> Tuple[bool, str]:
     """批量写入数据点到 InfluxDB"""
-    if not points:
+    if not points or _writes_suppressed:
         return (True, "")
     
     try:
-        client = get_influx_client()
-        write_api = client.write_api(write_options=SYNCHRONOUS)
+        write_api = get_write_api()
         
         with _write_lock:
             write_api.write(bucket=settings.influx_bucket, org=settings.influx_org, record=points)
@@ -0,0 +1,169 @@
+# ============================================================
+# 文件说明: line_protocol.py - InfluxDB line protocol 快速序列化
+# ============================================================
+# 功能:
+#   1. 预编译固定 tag 组合的行前缀 (measurement + tags 只转义一次)
+#   2. 字段键转义结果缓存
+#   3. 数值快速格式化 (float: repr 最短往返; int: 'i' 后缀)
+#   4. 直接写入可复用的 bytearray 缓冲区
+# ============================================================
+# 与 influxdb.build_point 的规则保持一致:
+#   - tag 按键名排序，空值 tag 忽略
+#   - None / NaN / Inf 字段忽略
+#   - 字符串字段仅 alarm_logs 或 comm_state 允许
+#   - 无有效字段的数据点不输出
+# ============================================================
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# 转义表
+_MEASUREMENT_ESCAPE = str.maketrans({',': r'\,', ' ': r'\ ', '\n': r'\n', '\r': r'\r', '\t': r'\t'})
+_KEY_ESCAPE = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n', '\r': r'\r', '\t': r'\t'})
+_STRING_ESCAPE = str.maketrans({'"': r'\"', '\\': r'\\'})
+
+# 行前缀与字段键缓存上限 (超过后清空重建，batch_code 变化时不会无限增长)
+_CACHE_LIMIT = 1024
+
+
+def escape_measurement(name: str) -> str:
+    """转义 measurement 名称"""
+    return name.translate(_MEASUREMENT_ESCAPE)
+
+
+def escape_key(key: str) -> str:
+    """转义 tag 键/值或字段键"""
+    value = key.translate(_KEY_ESCAPE)
+    # 结尾单个反斜杠会转义掉后面的分隔符，补成双反斜杠
+    if value.endswith('\\') and not value.endswith('\\\\'):
+        value += '\\'
+    return value
+
+
+def datetime_to_ns(timestamp: datetime) -> int:
+    """datetime 转纳秒时间戳 (整数运算，无浮点精度损失)"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+class LineProtocolEncoder:
+    """line protocol 编码器 (预编译行前缀 + 可复用缓冲区)
+
+    非线程安全，每个写入路径持有自己的实例。
+    """
+
+    # 1. 初始化缓冲区和缓存
+    def __init__(self):
+        self._buffer = bytearray()
+        self._line_count = 0
+        # (measurement, tags) -> 行前缀 bytes (含结尾空格)
+        self._prefix_cache: Dict[Tuple, bytes] = {}
+        # 字段键 -> 转义后的 'key=' bytes
+        self._field_key_cache: Dict[str, bytes] = {}
+
+    # 2. 追加一个数据点 (返回是否写入)
+    def append(
+        self,
+        measurement: str,
+        tags: Dict[str, str],
+        fields: Dict[str, Any],
+        timestamp: Optional[datetime] = None,
+    ) -> bool:
+        allow_string = measurement == "alarm_logs"
+        field_cache = self._field_key_cache
+        parts = []
+        for k, v in fields.items():
+            if v is None:
+                continue
+            key = field_cache.get(k)
+            if key is None:
+                if len(field_cache) >= _CACHE_LIMIT:
+                    field_cache.clear()
+                key = field_cache[k] = (escape_key(k) + '=').encode('utf-8')
+            # bool 必须先于 int 判断 (bool 是 int 的子类)
+            if v is True:
+                parts.append(key + b'true')
+            elif v is False:
+                parts.append(key + b'false')
+            elif isinstance(v, float):
+                if not math.isfinite(v):
+                    continue
+                parts.append(key + repr(v).encode('ascii'))
+            elif isinstance(v, int):
+                parts.append(key + str(v).encode('ascii') + b'i')
+            elif isinstance(v, str):
+                if not (allow_string or k == "comm_state"):
+                    continue
+                parts.append(key + b'"' + v.translate(_STRING_ESCAPE).encode('utf-8') + b'"')
+            else:
+                # numpy 等数值类型按 float 处理
+                try:
+                    value = float(v)
+                except (TypeError, ValueError):
+                    continue
+                if not math.isfinite(value):
+                    continue
+                parts.append(key + repr(value).encode('ascii'))
+
+        if not parts:
+            return False
+
+        buffer = self._buffer
+        buffer += self._get_prefix(measurement, tags)
+        buffer += b','.join(parts)
+        if timestamp is not None:
+            buffer += b' '
+            buffer += str(datetime_to_ns(timestamp)).encode('ascii')
+        buffer += b'\n'
+        self._line_count += 1
+        return True
+
+    # 3. 追加字典格式数据点 (measurement/tags/fields/time)
+    def append_dict(self, point: Dict[str, Any]) -> bool:
+        return self.append(point['measurement'], point['tags'], point['fields'], point.get('time'))
+
+    # 4. 取出缓冲区内容并清空 (缓冲区内存保留复用)
+    def take(self) -> bytes:
+        payload = bytes(self._buffer)
+        del self._buffer[:]
+        self._line_count = 0
+        return payload
+
+    # 5. 当前缓冲行数
+    @property
+    def line_count(self) -> int:
+        return self._line_count
+
+    # 6. 获取/编译行前缀
+    def _get_prefix(self, measurement: str, tags: Dict[str, str]) -> bytes:
+        cache_key = (measurement, tuple(tags.items()))
+        prefix = self._prefix_cache.get(cache_key)
+        if prefix is None:
+            if len(self._prefix_cache) >= _CACHE_LIMIT:
+                self._prefix_cache.clear()
+            text = escape_measurement(measurement)
+            for k, v in sorted(tags.items()):
+                if v is None:
+                    continue
+                key, value = escape_key(str(k)), escape_key(str(v))
+                if key and value:
+                    text += f',{key}={value}'
+            prefix = self._prefix_cache[cache_key] = (text + ' ').encode('utf-8')
+        return prefix
+
+
+def encode_points(encoder: LineProtocolEncoder, points) -> Tuple[bytes, int]:
+    """将字典格式数据点列表编码为 line protocol
+
+    Returns:
+        (payload, 行数)
+    """
+    for point in points:
+        encoder.append_dict(point)
+    count = encoder.line_count
+    return (encoder.take(), count)
@@ -0,0 +1,201 @@
+# ============================================================
+# 文件说明: pipeline_metrics.py - 采集链路分阶段耗时统计
+# ============================================================
+# 功能:
+#   1. 记录每个轮询循环 (db1/db32/status) 各阶段耗时
+#      PLC 读取 / 解析 / 转换 / 功率能耗计算 / 报警检查 / 缓存发布 / 信号发送 / 缓存批量写入
+#   2. 每个 (循环, 阶段) 保留最近 N 个样本，按需计算 p50/p95/p99/max
+#   3. 关闭时 start() 返回 0.0、begin() 返回空操作对象，开销只有一次方法调用
+# ============================================================
+# 用法:
+#   1. 单个阶段: t = metrics.start(); ...; metrics.lap('db1', STAGE_PLC_READ, t)
+#   2. 处理函数内多个阶段 (同一阶段多段耗时累加为一个样本):
+#        cycle = metrics.begin('db1')
+#        parsed = parser.parse_all(raw); cycle.mark(STAGE_PARSE)
+#        obj = convert(parsed);          cycle.mark(STAGE_CONVERT)
+#        cycle.commit()
+# ============================================================
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+_perf = time.perf_counter
+
+# 阶段名称
+STAGE_PLC_READ = 'plc_read'           # PLC 读取 (含排队等待)
+STAGE_PARSE = 'parse'                 # 原始字节解析
+STAGE_CONVERT = 'convert'             # 数据转换 (物理量/InfluxDB 字段)
+STAGE_POWER_CALC = 'power_calc'       # 功率/能耗/冷却水计算
+STAGE_ALARM_CHECK = 'alarm_check'     # 报警检查
+STAGE_CACHE_PUBLISH = 'cache_publish'  # 写入 DataCache
+STAGE_SIGNAL_EMIT = 'signal_emit'     # DataBridge 信号发送
+STAGE_BUFFER_FLUSH = 'buffer_flush'   # 批量写入 (编码 + 提交写入队列)
+STAGE_CYCLE = 'cycle'                 # 整个轮询周期 (读取 + 处理 + 写入)
+
+# 显示顺序
+STAGE_ORDER: Tuple[str, ...] = (
+    STAGE_PLC_READ, STAGE_PARSE, STAGE_CONVERT, STAGE_POWER_CALC, STAGE_ALARM_CHECK,
+    STAGE_CACHE_PUBLISH, STAGE_SIGNAL_EMIT, STAGE_BUFFER_FLUSH, STAGE_CYCLE,
+)
+
+
+class _StageStats:
+    """单个阶段的滚动样本"""
+
+    __slots__ = ('samples', 'count', 'total')
+
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.samples)
+        n = len(recent)
+        if not n:
+            return {'count': self.count, 'avg_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'count': self.count,
+            'avg_ms': round(sum(recent) / n * 1000, 3),
+            'p50_ms': round(recent[min(n - 1, int(n * 0.50))] * 1000, 3),
+            'p95_ms': round(recent[min(n - 1, int(n * 0.95))] * 1000, 3),
+            'p99_ms': round(recent[min(n - 1, int(n * 0.99))] * 1000, 3),
+            'max_ms': round(recent[-1] * 1000, 3),
+        }
+
+
+class _Cycle:
+    """一次处理过程的分阶段计时 (commit 时每个阶段记录一个样本)"""
+
+    __slots__ = ('_metrics', '_loop', '_last', '_stages')
+
+    def __init__(self, metrics: 'PipelineMetrics', loop: str):
+        self._metrics = metrics
+        self._loop = loop
+        self._last = _perf()
+        self._stages: Dict[str, float] = {}
+
+    def mark(self, stage: str):
+        """上一个标记到现在的耗时计入 stage"""
+        now = _perf()
+        self._stages[stage] = self._stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def skip(self):
+        """上一个标记到现在的耗时不计入任何阶段"""
+        self._last = _perf()
+
+    def commit(self):
+        for stage, seconds in self._stages.items():
+            self._metrics.record(self._loop, stage, seconds)
+
+
+class _NullCycle:
+    """统计关闭时的空操作对象"""
+
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+    def skip(self):
+        pass
+
+    def commit(self):
+        pass
+
+
+_NULL_CYCLE = _NullCycle()
+
+
+class PipelineMetrics:
+    """分阶段耗时统计 (单例通过 get_pipeline_metrics() 获取)"""
+
+    # 1. 初始化
+    def __init__(self, enabled: bool = settings.pipeline_metrics_enabled, window: int = 1024):
+        self._enabled = enabled
+        self._window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, _StageStats]] = {}
+
+    # 2. 开始计时 (关闭时返回 0.0)
+    def start(self) -> float:
+        return _perf() if self._enabled else 0.0
+
+    # 3. 结束一个阶段并返回下一阶段的起点
+    def lap(self, loop: str, stage: str, t0: float) -> float:
+        if not t0:
+            return 0.0
+        now = _perf()
+        self.record(loop, stage, now - t0)
+        return now
+
+    # 3.1 开始一次分阶段计时
+    def begin(self, loop: str):
+        return _Cycle(self, loop) if self._enabled else _NULL_CYCLE
+
+    # 4. 记录一个样本 (秒)
+    def record(self, loop: str, stage: str, seconds: float):
+        if not self._enabled:
+            return
+        with self._lock:
+            stages = self._stages.get(loop)
+            if stages is None:
+                stages = self._stages[loop] = {}
+            stats = stages.get(stage)
+            if stats is None:
+                stats = stages[stage] = _StageStats(self._window)
+            stats.samples.append(seconds)
+            stats.count += 1
+            stats.total += seconds
+
+    # 5. 统计快照 {循环: {阶段: {count, avg_ms, p50_ms, p95_ms, p99_ms, max_ms}}}
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            copied = {
+                loop: {stage: (list(s.samples), s.count) for stage, s in stages.items()}
+                for loop, stages in self._stages.items()
+            }
+        result: Dict[str, Any] = {}
+        for loop, stages in copied.items():
+            ordered = sorted(stages, key=lambda name: STAGE_ORDER.index(name) if name in STAGE_ORDER else len(STAGE_ORDER))
+            loop_result = {}
+            for stage in ordered:
+                samples, count = stages[stage]
+                stats = _StageStats(len(samples) or 1)
+                stats.samples.extend(samples)
+                stats.count = count
+                loop_result[stage] = stats.to_dict()
+            result[loop] = loop_result
+        return result
+
+    # 6. 开关 / 清空
+    def set_enabled(self, enabled: bool):
+        self._enabled = enabled
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+# ============================================================
+# 单例
+# ============================================================
+_pipeline_metrics: Optional[PipelineMetrics] = None
+
+
+def get_pipeline_metrics() -> PipelineMetrics:
+    global _pipeline_metrics
+    if _pipeline_metrics is None:
+        _pipeline_metrics = PipelineMetrics()
+    return _pipeline_metrics
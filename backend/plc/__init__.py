@@ -1,6 +1,8 @@
 # PLC通信模块
 
-from .plc_manager import PLCManager, get_plc_manager, reset_plc_manager, SNAP7_AVAILABLE
+from .plc_manager import PLCManager, ReadItem, plan_multi_read, get_plc_manager, reset_plc_manager, SNAP7_AVAILABLE
+from .plc_scheduler import PLCPriority, PLCScheduler, get_plc_scheduler
+from .plc_async_client import AsyncPLCClient, get_async_plc_client, close_async_plc_client
 from .parser_modbus import ModbusDataParser
 from .parser_status import ModbusStatusParser
 from .parser_config_db32 import ConfigDrivenDB32Parser, get_db32_parser
@@ -9,9 +11,18 @@ from .parser_status_db30 import ConfigDrivenDB30Parser, get_db30_parser
 __all__ = [
     # PLC 连接管理
     'PLCManager',
+    'ReadItem',
+    'plan_multi_read',
     'get_plc_manager',
     'reset_plc_manager',
     'SNAP7_AVAILABLE',
+    # PLC 请求调度 + 异步读写 (独立 I/O 线程)
+    'PLCPriority',
+    'PLCScheduler',
+    'get_plc_scheduler',
+    'AsyncPLCClient',
+    'get_async_plc_client',
+    'close_async_plc_client',
     # 旧解析器 (兼容)
     'ModbusDataParser',
     'ModbusStatusParser',
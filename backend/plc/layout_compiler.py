@@ -0,0 +1,219 @@
+# ============================================================
+# 文件说明: layout_compiler.py - DB 块结构预编译器
+# ============================================================
+# 功能:
+#   1. 加载配置时把 YAML 字段定义编译为一个大端 struct.Struct
+#   2. BOOL 位字段编译为 (字节偏移, 掩码) 位提取表
+#   3. 每帧数据一次 unpack_from 解码为 __slots__ 记录 (namedtuple)
+#   4. 字段元数据 (类型/偏移/单位/描述) 编译时保存一份，解码时不再复制
+#   5. 提供等价的 NumPy 大端 dtype，用于批量解码多帧数据
+# ============================================================
+# 越界规则 (与原逐字段解析一致):
+#   - 超出帧长度的字段解码为默认值 (数值 0 / REAL 0.0 / BOOL False)
+#   - 未知类型字段解码为 0
+# ============================================================
+
+import struct
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# PLC 类型 -> struct 格式码 (大端序)
+TYPE_CODES: Dict[str, str] = {
+    'INT': 'h',     # 有符号 16 位
+    'WORD': 'H',    # 无符号 16 位
+    'DWORD': 'I',   # 无符号 32 位
+    'UDINT': 'I',   # 无符号 32 位
+    'DINT': 'i',    # 有符号 32 位
+    'TIME': 'i',    # 有符号 32 位 (ms)
+    'REAL': 'f',    # 32 位浮点
+    'BYTE': 'B',    # 无符号 8 位
+}
+
+# struct 格式码 -> NumPy 大端 dtype
+_NUMPY_CODES: Dict[str, str] = {
+    'h': '>i2',
+    'H': '>u2',
+    'I': '>u4',
+    'i': '>i4',
+    'f': '>f4',
+    'B': 'u1',
+}
+
+
+@dataclass(frozen=True)
+class FieldMeta:
+    """字段静态元数据 (编译时生成一次)"""
+    name: str
+    type: str
+    offset: int
+    bit: Optional[int] = None
+    unit: str = ''
+    description: str = ''
+
+
+def parse_offset(offset: Union[int, float]) -> Tuple[int, int]:
+    """解析偏移量 (支持位域写法 0.3 = byte 0 bit 3)"""
+    if isinstance(offset, float):
+        byte_offset = int(offset)
+        bit_offset = int(round((offset - byte_offset) * 10))
+        return byte_offset, bit_offset
+    return int(offset), 0
+
+
+def field_meta_from_config(field: Dict[str, Any], base_offset: int = 0,
+                           default_type: str = 'INT', default_unit: str = '') -> FieldMeta:
+    """YAML 字段定义 -> FieldMeta
+
+    Args:
+        field: 字段定义 (name/offset/type/bit/unit/description)
+        base_offset: 模块基础偏移量 (DB32 模块字段的 offset 为模块内相对偏移)
+        default_type: 未配置 type 时的默认类型
+        default_unit: 未配置 unit 时的默认单位
+    """
+    field_type = str(field.get('type', default_type)).upper()
+    byte_offset, bit_offset = parse_offset(field.get('offset', 0))
+    bit = None
+    if field_type == 'BOOL':
+        bit = field['bit'] if field.get('bit') is not None else bit_offset
+    return FieldMeta(
+        name=field.get('name', ''),
+        type=field_type,
+        offset=base_offset + byte_offset,
+        bit=bit,
+        unit=field.get('unit', default_unit),
+        description=field.get('description', ''),
+    )
+
+
+class CompiledLayout:
+    """预编译的 DB 块结构
+
+    用法:
+        layout = CompiledLayout(metas, frame_size=190, real_digits=4)
+        record = layout.decode(raw)       # namedtuple，按字段名访问
+        values = layout.decode_values(raw)  # 与 layout.names 对应的元组
+    """
+
+    # 1. 编译字段列表
+    def __init__(self, fields: Iterable[FieldMeta], frame_size: int,
+                 record_name: str = 'Record', real_digits: Optional[int] = None):
+        fields = list(fields)
+        self.frame_size = frame_size
+        self.meta: Dict[str, FieldMeta] = {f.name: f for f in fields}
+
+        numeric: List[FieldMeta] = []
+        bits: List[FieldMeta] = []
+        constants: List[Tuple[FieldMeta, Any]] = []
+        for f in fields:
+            if f.type == 'BOOL':
+                if f.offset < frame_size:
+                    bits.append(f)
+                else:
+                    constants.append((f, False))
+            elif f.type in TYPE_CODES:
+                if f.offset + struct.calcsize('>' + TYPE_CODES[f.type]) <= frame_size:
+                    numeric.append(f)
+                else:
+                    constants.append((f, 0.0 if f.type == 'REAL' else 0))
+            else:
+                constants.append((f, 0))
+
+        # 1.1 数值字段按偏移排序，中间空隙用 pad 字节填充，合并为一个 Struct
+        #     与前一字段重叠的字段 (如 WORD 与其中的 BYTE) 单独编译
+        fmt = ['>']
+        cursor = 0
+        packed: List[FieldMeta] = []
+        overlapped: List[FieldMeta] = []
+        for f in sorted(numeric, key=lambda m: m.offset):
+            if f.offset < cursor:
+                overlapped.append(f)
+                continue
+            if f.offset > cursor:
+                fmt.append(f"{f.offset - cursor}x")
+            code = TYPE_CODES[f.type]
+            fmt.append(code)
+            cursor = f.offset + struct.calcsize('>' + code)
+            packed.append(f)
+        self._struct = struct.Struct(''.join(fmt))
+        self._overlapped = tuple(
+            (struct.Struct('>' + TYPE_CODES[f.type]), f.offset) for f in overlapped
+        )
+        self._bits = tuple((f.offset, 1 << f.bit) for f in bits)
+        self._constants = tuple(value for _, value in constants)
+        self.out_of_frame: Tuple[str, ...] = tuple(f.name for f, _ in constants)
+
+        # 1.2 记录字段顺序: 合并 Struct -> 重叠字段 -> 位字段 -> 越界常量
+        ordered = packed + overlapped + bits + [f for f, _ in constants]
+        self.names: Tuple[str, ...] = tuple(f.name for f in ordered)
+        self.record = namedtuple(record_name, self.names, rename=True)
+        self.size = self._struct.size
+
+        # 1.3 REAL 字段保留小数位 (DB1 解析结果保留 4 位小数)
+        self._round_digits = real_digits
+        self._round_indices = tuple(
+            i for i, f in enumerate(ordered) if f.type == 'REAL' and real_digits is not None
+        )
+
+        # 1.4 短帧回退路径: 每个字段单独的 Struct + 边界
+        self._numeric = packed + overlapped
+        self._fallback = tuple(
+            (struct.Struct('>' + TYPE_CODES[f.type]), f.offset) for f in self._numeric
+        )
+
+    # 2. 解码为元组 (顺序与 self.names 一致)
+    def decode_values(self, data: bytes) -> Tuple[Any, ...]:
+        if len(data) >= self.size:
+            values = self._struct.unpack_from(data)
+            if self._overlapped:
+                values += tuple(s.unpack_from(data, off)[0] for s, off in self._overlapped)
+        else:
+            values = self._decode_short(data)
+
+        if self._bits:
+            length = len(data)
+            values += tuple(off < length and (data[off] & mask) != 0 for off, mask in self._bits)
+        if self._constants:
+            values += self._constants
+        if self._round_indices:
+            values = list(values)
+            digits = self._round_digits
+            for i in self._round_indices:
+                values[i] = round(values[i], digits)
+            values = tuple(values)
+        return values
+
+    # 3. 解码为 __slots__ 记录
+    def decode(self, data: bytes):
+        return self.record._make(self.decode_values(data))
+
+    # 4. 解码为字典 (字段名 -> 值)
+    def decode_dict(self, data: bytes) -> Dict[str, Any]:
+        return dict(zip(self.names, self.decode_values(data)))
+
+    # 5. 等价的 NumPy 结构化 dtype (只含数值字段，itemsize = 帧长度)
+    def numpy_dtype(self) -> np.dtype:
+        """用于批量解码: np.frombuffer(frames, dtype=layout.numpy_dtype())"""
+        numeric = self._numeric
+        return np.dtype({
+            'names': [f.name for f in numeric],
+            'formats': [_NUMPY_CODES[TYPE_CODES[f.type]] for f in numeric],
+            'offsets': [f.offset for f in numeric],
+            'itemsize': self.frame_size,
+        })
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _decode_short(self, data: bytes) -> Tuple[Any, ...]:
+        """帧长度不足时逐字段解码，越界字段取默认值"""
+        length = len(data)
+        values = []
+        for s, off in self._fallback:
+            if off + s.size <= length:
+                values.append(s.unpack_from(data, off)[0])
+            else:
+                values.append(0.0 if s.format.endswith('f') else 0)
+        return tuple(values)
@@ -6,14 +6,17 @@
 #   2. 支持 Int 和 Real 类型字段解析
 #   3. 按数据分组返回结果 (电机输出、弧流、弧压、变频电流)
 #   4. 自动计算归一化值与比例放大值的组合
+#   5. 加载时预编译结构 (layout_compiler)，每帧一次 unpack_from 解码
 # ============================================================
 
 import struct
 import yaml
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from backend.plc.layout_compiler import CompiledLayout, field_meta_from_config
+
 
 class ConfigDrivenDB1Parser:
     """配置驱动的 DB1 Vw_Data 数据解析器
@@ -43,6 +46,10 @@ class ConfigDrivenDB1Parser:
         # 上一次的紧急停电数据（用于变化检测）
         self.last_emergency_data: Optional[Dict[str, Any]] = None
         
+        # 预编译结构 + 字段分组表 (加载配置时生成)
+        self.layout: Optional[CompiledLayout] = None
+        self._group_plan: List[Tuple[int, str, Optional[str], Optional[str]]] = []
+        
         self._load_config()
     
     def _load_config(self):
@@ -64,81 +71,52 @@ class ConfigDrivenDB1Parser:
         # 加载数据分组
         self.data_groups = self.config.get('data_groups', {})
         
+        # 预编译结构: 所有字段合并为一个大端 Struct，元数据只保存一份
+        self.layout = CompiledLayout(
+            [field_meta_from_config(f) for f in self.fields],
+            frame_size=self.db_config['total_size'],
+            record_name='DB1Record',
+            real_digits=4,
+        )
+        
+        # 预计算字段分组表: (值索引, 字段名, 分组键, 顶层键)，保持配置文件中的字段顺序
+        index_of = {name: i for i, name in enumerate(self.layout.names)}
+        self._group_plan = [
+            (index_of[name], name, *self._resolve_group(name))
+            for name in self.layout.meta
+        ]
+        
         print(f" DB1 解析器初始化: DB{self.db_config['db_number']} ({self.db_config['db_name']}), "
               f"{len(self.fields)} 个字段, 总大小 {self.db_config['total_size']} bytes")
     
-    def _parse_field(self, data: bytes, field_def: Dict) -> Any:
-        """解析单个字段
-        
-        Args:
-            data: 完整的 DB 块数据
-            field_def: 字段定义
-        
-        Returns:
-            解析后的值
-        """
-        offset = field_def.get('offset', 0)
-        field_type = field_def.get('type', 'INT').upper()
-        
-        try:
-            if field_type == 'INT':
-                # 有符号 16 位整数 (2 bytes, 大端序)
-                if offset + 2 > len(data):
-                    return 0
-                return struct.unpack('>h', data[offset:offset + 2])[0]
-            
-            elif field_type == 'REAL':
-                # 32 位浮点数 (4 bytes, 大端序)
-                if offset + 4 > len(data):
-                    return 0.0
-                return round(struct.unpack('>f', data[offset:offset + 4])[0], 4)
-            
-            elif field_type == 'WORD':
-                # 无符号 16 位整数 (2 bytes, 大端序)
-                if offset + 2 > len(data):
-                    return 0
-                return struct.unpack('>H', data[offset:offset + 2])[0]
-            
-            elif field_type == 'DWORD' or field_type == 'UDINT':
-                # 无符号 32 位整数 (4 bytes, 大端序)
-                if offset + 4 > len(data):
-                    return 0
-                return struct.unpack('>I', data[offset:offset + 4])[0]
-            
-            elif field_type == 'DINT':
-                # 有符号 32 位整数 (4 bytes, 大端序)
-                if offset + 4 > len(data):
-                    return 0
-                return struct.unpack('>i', data[offset:offset + 4])[0]
-            
-            elif field_type == 'BYTE':
-                # 无符号 8 位整数 (1 byte)
-                if offset + 1 > len(data):
-                    return 0
-                return data[offset]
-            
-            elif field_type == 'BOOL':
-                # 布尔值 (支持位偏移)
-                if offset + 1 > len(data):
-                    return False
-                bit = field_def.get('bit', 0)  # 获取位偏移，默认为0
-                return bool(data[offset] & (1 << bit))
-            
-            elif field_type == 'TIME':
-                # TIME 类型 (32 位有符号整数, 4 bytes, 大端序)
-                # 存储单位: 毫秒 (ms)
-                # 范围: -2,147,483,648 ms 到 +2,147,483,647 ms
-                if offset + 4 > len(data):
-                    return 0
-                return struct.unpack('>i', data[offset:offset + 4])[0]
-            
-            else:
-                # 未知类型，静默返回0，不打印警告
-                return 0
-                
-        except Exception as e:
-            print(f" 解析字段 {field_def.get('name')} (offset {offset}) 失败: {e}")
-            return 0
+    @staticmethod
+    def _resolve_group(name: str) -> Tuple[Optional[str], Optional[str]]:
+        """字段名 -> (结果分组键, 顶层独立字段键)，加载时计算一次"""
+        # 按类型分组（优先判断设定值和死区）
+        if name in ['arc_current_setpoint_U', 'arc_current_setpoint_V', 'arc_current_setpoint_W', 'manual_deadzone_percent']:
+            # 设定值和死区百分比放入 vw_variables
+            return 'vw_variables', None
+        if name.startswith('emergency_stop'):
+            # 高压紧急停电数据
+            return 'emergency_stop', None
+        if name.startswith('motor_output'):
+            return 'motor_outputs', None
+        if name.startswith('arc_current'):
+            # 特殊处理：死区上下限同时作为独立字段
+            if name in ('arc_current_deadzone_upper', 'arc_current_deadzone_lower'):
+                return 'arc_current', name
+            return 'arc_current', None
+        if name.startswith('arc_voltage'):
+            return 'arc_voltage', None
+        if name.startswith('vfd_current'):
+            return 'vfd_current', None
+        if name.startswith('Vw'):
+            return 'vw_variables', None
+        return None, None
+    
+    def decode(self, data: bytes):
+        """解码为 DB1Record (namedtuple，按字段名访问，不做分组)"""
+        return self.layout.decode(data)
     
     def parse(self, data: bytes) -> Dict[str, Any]:
         """解析 DB1 原始数据
@@ -147,7 +125,8 @@ class ConfigDrivenDB1Parser:
             data: PLC DB1 原始字节数据 (190 bytes)
             
         Returns:
-            解析后的数据字典
+            解析后的数据字典 (all_fields 为 字段名 -> 值，
+            类型/偏移/单位/描述等静态元数据见 self.layout.meta)
         """
         if len(data) < self.db_config['total_size']:
             return {
@@ -176,40 +155,18 @@ class ConfigDrivenDB1Parser:
         }
         
         try:
-            # 解析所有字段
-            for field_def in self.fields:
-                name = field_def.get('name', '')
-                value = self._parse_field(data, field_def)
-                result['all_fields'][name] = {
-                    'value': value,
-                    'type': field_def.get('type', 'INT'),
-                    'offset': field_def.get('offset', 0),
-                    'unit': field_def.get('unit', ''),
-                    'description': field_def.get('description', '')
-                }
-                
-                # 按类型分组（优先判断设定值和死区）
-                if name in ['arc_current_setpoint_U', 'arc_current_setpoint_V', 'arc_current_setpoint_W', 'manual_deadzone_percent']:
-                    # 设定值和死区百分比放入 vw_variables
-                    result['vw_variables'][name] = value
-                elif name.startswith('emergency_stop'):
-                    # 高压紧急停电数据
-                    result['emergency_stop'][name] = value
-                elif name.startswith('motor_output'):
-                    result['motor_outputs'][name] = value
-                elif name.startswith('arc_current'):
-                    result['arc_current'][name] = value
-                    # 特殊处理：死区上下限作为独立字段
-                    if name == 'arc_current_deadzone_upper':
-                        result['arc_current_deadzone_upper'] = value
-                    elif name == 'arc_current_deadzone_lower':
-                        result['arc_current_deadzone_lower'] = value
-                elif name.startswith('arc_voltage'):
-                    result['arc_voltage'][name] = value
-                elif name.startswith('vfd_current'):
-                    result['vfd_current'][name] = value
-                elif name.startswith('Vw'):
-                    result['vw_variables'][name] = value
+            # 一次解码所有字段
+            values = self.layout.decode_values(data)
+            all_fields = result['all_fields']
+            
+            # 按预计算的分组表分发
+            for index, name, group, top_key in self._group_plan:
+                value = values[index]
+                all_fields[name] = value
+                if group is not None:
+                    result[group][name] = value
+                if top_key is not None:
+                    result[top_key] = value
             
             # 计算弧流弧压的组合值 (归一化 × 比例放大)
             result['arc_combined'] = self._calculate_arc_combined(result)
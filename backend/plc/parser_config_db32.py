@@ -8,14 +8,17 @@
 #   4. 支持位域解析 (offset: 0.0 表示 byte 0 bit 0)
 #   5. 红外测距数据解析 (UDInt 类型)
 #   6. 蝶阀状态监测 (Byte 类型，每bit对应一个蝶阀开关状态)
+#   7. 加载时预编译结构 (layout_compiler)，每帧一次 unpack_from 解码
 # ============================================================
 
 import struct
 import yaml
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from backend.plc.layout_compiler import CompiledLayout, field_meta_from_config
+
 # 导入转换器
 from backend.tools.converter_length import get_length_converter
 
@@ -50,6 +53,10 @@ class ConfigDrivenDB32Parser:
         self.db_config: Dict[str, Any] = {}
         self.module_list: List[Dict] = []
         
+        # 预编译结构 + 模块解码表 (加载配置时生成)
+        self.layout: Optional[CompiledLayout] = None
+        self._module_plan: Dict[str, Tuple[Dict[str, Any], List[Tuple[str, int]]]] = {}
+        
         self._load_config()
     
     def _load_config(self):
@@ -75,9 +82,73 @@ class ConfigDrivenDB32Parser:
         }
         self.module_list = db32.get('modules', [])
         
+        # 4. 预编译结构
+        self._compile_layout()
+        
         print(f" DB32 配置解析器初始化: DB{self.db_config['db_number']}, "
               f"{len(self.module_list)}个模块, 总大小{self.db_config['total_size']}字节")
     
+    def _compile_layout(self):
+        """所有 READ 模块字段合并为一个大端 Struct
+        
+        字段名为 "模块名_字段名"；模块的静态信息 (名称/描述/单位) 只保存一份，
+        每帧解码后按 _module_plan 取值组装。
+        """
+        metas = []
+        module_fields: Dict[str, List[Tuple[str, str]]] = {}
+        static_info: Dict[str, Dict[str, Any]] = {}
+        
+        for module_config in self.module_list:
+            name = module_config.get('name', '')
+            module_ref = module_config.get('module_ref', '')
+            offset = module_config.get('offset', 0)
+            description = module_config.get('description', '')
+            
+            # 写入模块不解析
+            if module_config.get('direction', 'READ') == 'WRITE':
+                static_info[name] = {
+                    'name': name,
+                    'module_ref': module_ref,
+                    'direction': 'WRITE',
+                    'description': description,
+                    'skipped': True
+                }
+                continue
+            
+            base_def = self._get_module_definition(module_ref)
+            if not base_def:
+                static_info[name] = {
+                    'name': name,
+                    'module_ref': module_ref,
+                    'error': f"未找到模块定义: {module_ref}"
+                }
+                continue
+            
+            static_info[name] = {
+                'name': name,
+                'module_ref': module_ref,
+                'offset': offset,
+                'description': description,
+                'unit': base_def.get('unit', ''),
+            }
+            module_fields[name] = []
+            for field in base_def.get('fields', []):
+                meta = field_meta_from_config(
+                    {**field, 'name': f"{name}_{field.get('name', '')}"},
+                    base_offset=offset,
+                    default_type='WORD',
+                    default_unit=base_def.get('unit', ''),
+                )
+                metas.append(meta)
+                module_fields[name].append((field.get('name', ''), meta.name))
+        
+        self.layout = CompiledLayout(metas, frame_size=self.db_config['total_size'], record_name='DB32Record')
+        index_of = {name: i for i, name in enumerate(self.layout.names)}
+        self._module_plan = {
+            name: (info, [(field_name, index_of[full_name]) for field_name, full_name in module_fields.get(name, [])])
+            for name, info in static_info.items()
+        }
+    
     def _get_module_definition(self, module_ref: str) -> Optional[Dict]:
         """获取基础模块定义
         
@@ -89,97 +160,15 @@ class ConfigDrivenDB32Parser:
         """
         return self.base_modules.get(module_ref)
     
-    def _parse_offset(self, offset: Union[int, float]) -> tuple:
-        """解析偏移量 (支持位域)
-        
-        Args:
-            offset: 可以是整数 (如 0) 或浮点数 (如 0.3 表示 byte 0 bit 3)
-        
-        Returns:
-            (byte_offset, bit_offset)
-        """
-        if isinstance(offset, float):
-            byte_offset = int(offset)
-            bit_offset = int(round((offset - byte_offset) * 10))
-            return (byte_offset, bit_offset)
-        return (int(offset), 0)
-    
-    def _parse_field(self, data: bytes, base_offset: int, field: Dict) -> Any:
-        """解析单个字段
-        
-        Args:
-            data: 完整的 DB 块数据
-            base_offset: 模块的基础偏移量
-            field: 字段定义
-        
-        Returns:
-            解析后的值
-        """
-        field_offset = field.get('offset', 0)
-        field_type = field.get('type', 'WORD').upper()
-        # 不再使用 scale 参数，直接返回原始值
-        
-        # 解析偏移量 (支持位域)
-        byte_off, bit_off = self._parse_offset(field_offset)
-        abs_offset = base_offset + byte_off
-        
-        try:
-            if field_type == 'BOOL':
-                # 位域解析
-                if abs_offset >= len(data):
-                    return False
-                byte_val = data[abs_offset]
-                return bool(byte_val & (1 << bit_off))
-            
-            elif field_type == 'BYTE':
-                if abs_offset >= len(data):
-                    return 0
-                return data[abs_offset]
-            
-            elif field_type == 'WORD':
-                if abs_offset + 2 > len(data):
-                    return 0
-                raw = struct.unpack('>H', data[abs_offset:abs_offset + 2])[0]
-                return raw  # 直接返回原始值
-            
-            elif field_type == 'INT':
-                if abs_offset + 2 > len(data):
-                    return 0
-                raw = struct.unpack('>h', data[abs_offset:abs_offset + 2])[0]
-                return raw  # 直接返回原始值
-            
-            elif field_type == 'DWORD':
-                if abs_offset + 4 > len(data):
-                    return 0
-                raw = struct.unpack('>I', data[abs_offset:abs_offset + 4])[0]
-                return raw  # 直接返回原始值
-            
-            elif field_type == 'UDINT':
-                # 无符号双整数 (4字节, 大端序)
-                if abs_offset + 4 > len(data):
-                    return 0
-                raw = struct.unpack('>I', data[abs_offset:abs_offset + 4])[0]
-                return raw  # 直接返回原始值
-            
-            elif field_type == 'DINT':
-                if abs_offset + 4 > len(data):
-                    return 0
-                raw = struct.unpack('>i', data[abs_offset:abs_offset + 4])[0]
-                return raw  # 直接返回原始值
-            
-            elif field_type == 'REAL':
-                if abs_offset + 4 > len(data):
-                    return 0.0
-                raw = struct.unpack('>f', data[abs_offset:abs_offset + 4])[0]
-                return raw  # 直接返回原始值
-            
-            else:
-                print(f" 未知数据类型: {field_type}")
-                return 0
-                
-        except Exception as e:
-            print(f" 解析字段失败 @ offset {abs_offset}: {e}")
-            return 0
+    def _module_result(self, name: str, values: Tuple[Any, ...]) -> Dict[str, Any]:
+        """按模块解码表组装单个模块结果 (fields 为 字段名 -> 值)"""
+        info, field_indices = self._module_plan[name]
+        if not field_indices:
+            return info
+        return {
+            **info,
+            'fields': {field_name: values[index] for field_name, index in field_indices}
+        }
     
     def parse_module(self, data: bytes, module_config: Dict) -> Dict[str, Any]:
         """解析单个模块
@@ -189,53 +178,9 @@ class ConfigDrivenDB32Parser:
             module_config: 模块配置 (来自 config 的 modules 列表)
         
         Returns:
-            解析后的模块数据
+            解析后的模块数据 (字段元数据见 self.layout.meta)
         """
-        name = module_config.get('name', '')
-        module_ref = module_config.get('module_ref', '')
-        offset = module_config.get('offset', 0)
-        direction = module_config.get('direction', 'READ')
-        description = module_config.get('description', '')
-        
-        # 跳过写入模块
-        if direction == 'WRITE':
-            return {
-                'name': name,
-                'module_ref': module_ref,
-                'direction': 'WRITE',
-                'description': description,
-                'skipped': True
-            }
-        
-        # 获取基础模块定义
-        base_def = self._get_module_definition(module_ref)
-        if not base_def:
-            return {
-                'name': name,
-                'module_ref': module_ref,
-                'error': f"未找到模块定义: {module_ref}"
-            }
-        
-        # 解析所有字段
-        fields = {}
-        for field in base_def.get('fields', []):
-            field_name = field.get('name', '')
-            value = self._parse_field(data, offset, field)
-            fields[field_name] = {
-                'value': value,
-                'type': field.get('type', 'WORD'),
-                'unit': field.get('unit', base_def.get('unit', '')),
-                'description': field.get('description', '')
-            }
-        
-        return {
-            'name': name,
-            'module_ref': module_ref,
-            'offset': offset,
-            'description': description,
-            'unit': base_def.get('unit', ''),
-            'fields': fields
-        }
+        return self._module_result(module_config.get('name', ''), self.layout.decode_values(data))
     
     def parse_all(self, db32_data: bytes) -> Dict[str, Any]:
         """解析 DB32 所有模块数据
@@ -261,18 +206,21 @@ class ConfigDrivenDB32Parser:
             'valve_status': {}  # 蝶阀状态监测
         }
         
+        # 一次解码所有模块字段
+        values = self.layout.decode_values(db32_data)
+        
         for module_config in self.module_list:
             name = module_config.get('name', '')
             module_ref = module_config.get('module_ref', '')
             
-            parsed = self.parse_module(db32_data, module_config)
+            parsed = self._module_result(name, values)
             result['modules'][name] = parsed
             
             # 按类型分组
             if module_ref == 'InfraredDistance':
                 # UDInt 类型红外测距，直接读取 distance 字段
                 fields = parsed.get('fields', {})
-                distance_raw = int(fields.get('distance', {}).get('value', 0))
+                distance_raw = int(fields.get('distance', 0))
                 
                 # 有效性校验: 距离值应该在合理范围内 (0-10000mm)
                 valid = 0 <= distance_raw <= 10000
@@ -291,7 +239,7 @@ class ConfigDrivenDB32Parser:
             
             elif module_ref == 'PressureSensor':
                 fields = parsed.get('fields', {})
-                raw = fields.get('pressure', {}).get('value', 0)
+                raw = fields.get('pressure', 0)
                 # PLC 原始值直接使用，不乘以任何系数
                 pressure_kpa = int(raw)  # 直接使用原始值
                 result['cooling_pressures'][name] = {
@@ -303,7 +251,7 @@ class ConfigDrivenDB32Parser:
             
             elif module_ref == 'FlowSensor':
                 fields = parsed.get('fields', {})
-                raw = fields.get('flow', {}).get('value', 0)
+                raw = fields.get('flow', 0)
                 # 原始值 × 0.1 转为 m³/h
                 flow = raw * 0.1
                 result['cooling_flows'][name] = {
@@ -318,7 +266,7 @@ class ConfigDrivenDB32Parser:
                 fields = parsed.get('fields', {})
                 # 尝试获取 status_byte 字段，如果不存在则尝试直接读取
                 if 'status_byte' in fields:
-                    status_byte = int(fields.get('status_byte', {}).get('value', 0))
+                    status_byte = int(fields.get('status_byte', 0))
                 else:
                     # Fallback: 直接从 offset 读取
                     offset = module_config.get('offset', 20)
@@ -5,13 +5,15 @@
 #   1. 解析 DB18 WEIGHT_VAR 数据块
 #   2. 提取料仓上限值 (offset 40, DInt)
 #   3. 提取当前料仓重量、排料重量等数据
+#   4. 加载时预编译结构 (layout_compiler)，每帧一次 unpack_from 解码
 # ============================================================
 
-import struct
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+from backend.plc.layout_compiler import CompiledLayout, field_meta_from_config
+
 
 class HopperDB18Parser:
     """DB18 料仓电气数据解析器"""
@@ -35,6 +37,10 @@ class HopperDB18Parser:
         self.db_config: Dict[str, Any] = {}
         self.fields: list = []
         
+        # 预编译结构 + 换算表 (值索引, 字段名, 系数, 偏移)
+        self.layout: Optional[CompiledLayout] = None
+        self._conversions: List[Tuple[int, str, float, float]] = []
+        
         self._load_config()
     
     # 2. 加载配置文件
@@ -52,27 +58,30 @@ class HopperDB18Parser:
         }
         self.fields = db18.get('fields', [])
         
+        self._compile_layout()
+        
         print(f"DB18 配置解析器初始化: DB{self.db_config['db_number']}, "
               f"{len(self.fields)}个字段, 总大小{self.db_config['total_size']}字节")
     
-    # 3. 解析 DInt 类型数据
-    def _parse_dint(self, data: bytes, offset: int) -> int:
-        """
-        解析 DInt (有符号32位整数)
-        
-        Args:
-            data: 原始字节数据
-            offset: 偏移量
-            
-        Returns:
-            整数值
-        """
-        if offset + 4 > len(data):
-            return 0
-        
-        # 大端序 (Big-Endian)
-        value = struct.unpack('>i', data[offset:offset+4])[0]
-        return value
+    # 3. 预编译结构 (只解析 DInt 字段)
+    def _compile_layout(self):
+        """DInt 字段合并为一个大端 Struct，线性换算参数预先取出"""
+        dint_fields = [field for field in self.fields if field['type'] == 'DINT']
+        self.layout = CompiledLayout(
+            [field_meta_from_config(field) for field in dint_fields],
+            frame_size=self.db_config['total_size'],
+            record_name='DB18Record',
+        )
+        index_of = {name: i for i, name in enumerate(self.layout.names)}
+        self._conversions = []
+        for field in dint_fields:
+            conversion = field.get('conversion', {})
+            self._conversions.append((
+                index_of[field['name']],
+                field['name'],
+                conversion.get('factor', 1.0),
+                conversion.get('offset', 0.0),
+            ))
     
     # 4. 解析 DB18 数据
     def parse(self, data: bytes) -> Dict[str, Any]:
@@ -89,24 +98,12 @@ class HopperDB18Parser:
             print(f"DB18 数据长度不足: {len(data) if data else 0} < {self.db_config['total_size']}")
             return {}
         
-        result = {}
-        
-        for field in self.fields:
-            field_name = field['name']
-            offset = field['offset']
-            field_type = field['type']
-            conversion = field.get('conversion', {})
-            factor = conversion.get('factor', 1.0)
-            offset_val = conversion.get('offset', 0.0)
-            
-            # 解析 DInt 类型
-            if field_type == 'DINT':
-                raw_value = self._parse_dint(data, offset)
-                # 应用转换
-                converted_value = raw_value * factor + offset_val
-                result[field_name] = converted_value
-        
-        return result
+        # 一次解码所有字段，再应用线性换算
+        values = self.layout.decode_values(data)
+        return {
+            name: values[index] * factor + offset_val
+            for index, name, factor, offset_val in self._conversions
+        }
     
     # 5. 获取当前料仓重量
     def get_current_weight(self, data: bytes) -> float:
@@ -4,13 +4,15 @@
 # 功能:
 #   1. 解析 DB19 料仓控制数据块
 #   2. 提取本次排料重量待读取标志 (offset 2.3)
+#   3. 加载时预编译位提取表 (layout_compiler)
 # ============================================================
 
-import struct
 import yaml
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from backend.plc.layout_compiler import CompiledLayout, field_meta_from_config
+
 
 class HopperDB19Parser:
     """DB19 料仓控制标志解析器"""
@@ -34,6 +36,9 @@ class HopperDB19Parser:
         self.db_config: Dict[str, Any] = {}
         self.fields: list = []
         
+        # 预编译位提取表
+        self.layout: Optional[CompiledLayout] = None
+        
         self._load_config()
     
     # 2. 加载配置文件
@@ -51,27 +56,19 @@ class HopperDB19Parser:
         }
         self.fields = db19.get('fields', [])
         
+        self._compile_layout()
+        
         print(f"DB19 配置解析器初始化: DB{self.db_config['db_number']}, "
               f"{len(self.fields)}个字段, 总大小{self.db_config['total_size']}字节")
     
-    # 3. 解析 Bool 类型数据
-    def _parse_bool(self, data: bytes, offset: int, bit: int) -> bool:
-        """
-        解析 Bool (位)
-        
-        Args:
-            data: 原始字节数据
-            offset: 字节偏移量
-            bit: 位偏移量 (0-7)
-            
-        Returns:
-            布尔值
-        """
-        if offset >= len(data):
-            return False
-        
-        byte_value = data[offset]
-        return bool((byte_value >> bit) & 0x01)
+    # 3. 预编译位提取表 (只解析 Bool 字段)
+    def _compile_layout(self):
+        """Bool 字段编译为 (字节偏移, 掩码) 位提取表"""
+        self.layout = CompiledLayout(
+            [field_meta_from_config(field) for field in self.fields if field['type'] == 'BOOL'],
+            frame_size=self.db_config['total_size'],
+            record_name='DB19Record',
+        )
     
     # 4. 解析 DB19 数据
     def parse(self, data: bytes) -> Dict[str, Any]:
@@ -88,20 +85,7 @@ class HopperDB19Parser:
             print(f"DB19 数据长度不足: {len(data) if data else 0} < {self.db_config['total_size']}")
             return {}
         
-        result = {}
-        
-        for field in self.fields:
-            field_name = field['name']
-            offset = field['offset']
-            field_type = field['type']
-            
-            # 解析 Bool 类型
-            if field_type == 'BOOL':
-                bit = field.get('bit', 0)
-                value = self._parse_bool(data, offset, bit)
-                result[field_name] = value
-        
-        return result
+        return self.layout.decode_dict(data)
     
     # 5. 获取排料重量待读取标志
     def get_discharge_weight_ready(self, data: bytes) -> bool:
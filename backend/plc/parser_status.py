@@ -8,14 +8,17 @@
 #   - 2个流量计通信状态 (MB_MASTER_WATER_1-2)
 #   - 2个压力计通信状态 (MB_MASTER_PRESS_1-2)
 #   - 继电器读取状态 (DB_MASTER_RELAY)
+# 加载时预编译结构 (layout_compiler)，每帧一次 unpack_from 解码
 # ============================================================
 
 import struct
 import yaml
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from backend.plc.layout_compiler import CompiledLayout, FieldMeta
+
 
 class ModbusStatusParser:
     """DB30 Modbus 状态解析器
@@ -39,6 +42,10 @@ class ModbusStatusParser:
         self.devices: List[Dict] = []
         self.module_size: int = 4  # 每个状态模块 4 字节
         
+        # 预编译结构 + 设备解码表 (设备ID, 状态字节索引, Status 索引, 静态信息)
+        self.layout: Optional[CompiledLayout] = None
+        self._device_plan: List[Tuple[str, int, int, Dict[str, Any]]] = []
+        
         self._load_config()
     
     def _load_config(self):
@@ -61,9 +68,36 @@ class ModbusStatusParser:
             # 设备列表
             self.devices = config.get('devices', [])
         
+        self._compile_layout()
+        
         print(f" DB30 状态解析器初始化完成: DB{self.db_config['db_number']}, "
               f"{len(self.devices)}个设备, 总大小{self.db_config['total_size']}字节")
     
+    def _compile_layout(self):
+        """启用设备的状态字节 (Byte 0) 与 Status (Byte 2-3) 合并为一个大端 Struct"""
+        metas = []
+        devices = []
+        for device in self.devices:
+            if not device.get('enabled', True):
+                continue
+            device_id = device.get('device_id', '')
+            offset = device.get('start_offset', 0)
+            metas.append(FieldMeta(f"{device_id}_flags", 'BYTE', offset))
+            metas.append(FieldMeta(f"{device_id}_status", 'WORD', offset + 2))
+            devices.append((device_id, {
+                'device_name': device.get('device_name', ''),
+                'plc_name': device.get('plc_name', ''),
+                'data_device_id': device.get('data_device_id', ''),
+                'description': device.get('description', ''),
+            }))
+        
+        self.layout = CompiledLayout(metas, frame_size=self.db_config['total_size'], record_name='DB30Record')
+        index_of = {name: i for i, name in enumerate(self.layout.names)}
+        self._device_plan = [
+            (device_id, index_of[f"{device_id}_flags"], index_of[f"{device_id}_status"], static)
+            for device_id, static in devices
+        ]
+    
     def parse_status_module(self, data: bytes, offset: int) -> Dict[str, Any]:
         """解析单个状态模块 (4字节)
         
@@ -124,6 +158,30 @@ class ModbusStatusParser:
             }
         }
         
+        # 帧完整时一次解码所有设备状态
+        if not self.layout.out_of_frame and len(db30_data) >= self.layout.size:
+            values = self.layout.decode_values(db30_data)
+            summary = result['summary']
+            for device_id, flags_index, status_index, static in self._device_plan:
+                byte0 = values[flags_index]
+                status_word = values[status_index]
+                healthy = not (byte0 & 0x04) and status_word == 0
+                result['devices'][device_id] = {
+                    'done': bool(byte0 & 0x01),
+                    'busy': bool(byte0 & 0x02),
+                    'error': bool(byte0 & 0x04),
+                    'status': status_word,
+                    'status_hex': f"16#{status_word:04X}",
+                    'healthy': healthy,
+                    **static
+                }
+                if healthy:
+                    summary['healthy'] += 1
+                else:
+                    summary['error'] += 1
+            return result
+        
+        # 帧长度不足时逐设备解析 (越界设备标记为错误)
         for device in self.devices:
             device_id = device.get('device_id', '')
             offset = device.get('start_offset', 0)
@@ -0,0 +1,121 @@
+# ============================================================
+# 文件说明: plc_async_client.py - PLC 异步读写门面
+# ============================================================
+# 功能:
+#   1. 可 await 的 read_db / read_multi / write_db (asyncio 轮询循环使用)
+#   2. 请求提交到 PLCScheduler，由独立 I/O 线程按优先级执行，事件循环不被 snap7 阻塞
+#   3. 每个请求带截止时间: 超时后调用方立即返回错误，I/O 线程跳过已过期请求
+#   4. 支持取消: 调用方任务被取消时，尚未执行的请求不再发送到 PLC
+# ============================================================
+# 返回值与 PLCManager 一致:
+#   read_db    -> (bytes | None, err)
+#   read_multi -> ({name: bytes | None}, err)
+#   write_db   -> (bool, err)
+# ============================================================
+# 注意:
+#   - snap7 客户端非线程安全，所有请求在同一个 I/O 线程串行执行
+#   - 已经发出的 S7 请求无法中断，超时只保证调用方 (轮询循环) 不被拖住
+# ============================================================
+
+import asyncio
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from backend.config import get_settings
+from backend.core.log_throttler import get_error_log_throttler
+from backend.plc.plc_manager import ReadItem, get_plc_manager
+from backend.plc.plc_scheduler import PLCPriority, get_plc_scheduler, close_plc_scheduler
+
+settings = get_settings()
+log_throttler = get_error_log_throttler()
+
+
+class AsyncPLCClient:
+    """PLC 异步客户端 (单例通过 get_async_plc_client() 获取)"""
+
+    # 1. 初始化
+    def __init__(self, default_timeout: float = settings.plc_request_timeout):
+        self._default_timeout = default_timeout
+        self._timeout_count = 0
+
+    # 2. 读取 DB 块 (队列中相同的读取会合并)
+    async def read_db(self, db_number: int, start: int, size: int,
+                      priority: PLCPriority = PLCPriority.SENSOR,
+                      timeout: Optional[float] = None) -> Tuple[Optional[bytes], str]:
+        result = await self._submit(
+            f"DB{db_number}", get_plc_manager().read_db, (db_number, start, size), priority, timeout,
+            merge_key=get_plc_scheduler().read_db_key(db_number, start, size),
+        )
+        if result is None:
+            return (None, f"PLC 请求超时 DB{db_number}")
+        return result
+
+    # 3. 合并读取多个区域 (队列中相同的读取会合并)
+    async def read_multi(self, items: List[ReadItem],
+                         priority: PLCPriority = PLCPriority.SENSOR,
+                         timeout: Optional[float] = None) -> Tuple[Dict[str, Optional[bytes]], str]:
+        name = "+".join(item.key for item in items)
+        result = await self._submit(
+            name, get_plc_manager().read_multi, (items,), priority, timeout,
+            merge_key=get_plc_scheduler().read_multi_key(items),
+        )
+        if result is None:
+            return ({item.key: None for item in items}, f"PLC 请求超时 {name}")
+        return result
+
+    # 4. 写入 DB 块
+    async def write_db(self, db_number: int, start: int, data: bytes,
+                       priority: PLCPriority = PLCPriority.WRITE,
+                       timeout: Optional[float] = None) -> Tuple[bool, str]:
+        result = await self._submit(
+            f"写DB{db_number}", get_plc_manager().write_db, (db_number, start, data), priority, timeout,
+        )
+        if result is None:
+            return (False, f"PLC 请求超时 写DB{db_number}")
+        return result
+
+    # 5. 状态 (含调度器按优先级的等待时间统计)
+    def get_status(self) -> Dict[str, Any]:
+        status = get_plc_scheduler().get_stats()
+        status['timeout_count'] = self._timeout_count
+        return status
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    async def _submit(self, name: str, func, args: Tuple[Any, ...], priority: PLCPriority,
+                      timeout: Optional[float], merge_key: Optional[Hashable] = None) -> Optional[Any]:
+        """提交请求并等待结果，超时返回 None"""
+        timeout = self._default_timeout if timeout is None else timeout
+        future: Future = get_plc_scheduler().submit(name, func, args, priority, timeout, merge_key)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self._timeout_count += 1
+            log_throttler.log_error(f"plc_async_timeout_{name}", f"PLC 请求超时 {name} ({timeout}s)")
+            return None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+
+# ============================================================
+# 单例
+# ============================================================
+_async_plc_client: Optional[AsyncPLCClient] = None
+
+
+def get_async_plc_client() -> AsyncPLCClient:
+    global _async_plc_client
+    if _async_plc_client is None:
+        _async_plc_client = AsyncPLCClient()
+    return _async_plc_client
+
+
+def close_async_plc_client() -> None:
+    """停止 PLC I/O 线程 (轮询停止时调用)"""
+    global _async_plc_client
+    close_plc_scheduler()
+    _async_plc_client = None
@@ -7,12 +7,18 @@
 #   3. 连接健康检查
 #   4. 线程安全读写
 #   5. 进程退出时自动清理连接
+#   6. 多块合并读取（read_multi_vars，按协商 PDU 长度分组）
+#   7. 强制重连不在锁内等待（断开后记录最早重连时间，由下一次请求重连）
+# ============================================================
+# 轮询循环不直接调用本类 (阻塞 I/O)，而是通过 plc_async_client 的独立 I/O 线程
 # ============================================================
 
 import atexit
+import ctypes
 import threading
 import time
-from typing import Optional, Tuple, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, Any, List
 from datetime import datetime
 
 from backend.config import get_settings
@@ -31,6 +37,93 @@ except ImportError:
     print(" snap7 未安装，使用模拟模式")
 
 
+# ============================================================
+# 多块合并读取 (read_multi_vars) 相关常量
+# ============================================================
+# snap7 单次 Cli_ReadMultiVars 最多 20 个变量 (MaxVars)
+MAX_MULTI_VARS = 20
+# S7-1200 常见协商 PDU 长度，未能从 PLC 获取时使用
+DEFAULT_PDU_LENGTH = 240
+# 读请求: 10 字节头 + 2 字节参数头 + 每项 12 字节
+_REQ_HEADER_SIZE = 12
+_REQ_ITEM_SIZE = 12
+# 读响应: 12 字节头 + 2 字节参数头 + 每项 4 字节头 + 数据 (非末项奇数长度补 1 字节)
+_RESP_HEADER_SIZE = 14
+_RESP_ITEM_HEADER_SIZE = 4
+
+
+@dataclass
+class ReadItem:
+    """单个读取请求 (一个 DB 块或 Q/I 区域片段)"""
+    key: str            # 结果字典的键 (如 'db32', 'q_area')
+    area: str           # 'DB' / 'PA'(Q区) / 'PE'(I区)
+    db_number: int      # DB 块号 (Q/I 区为 0)
+    start: int          # 起始字节偏移
+    size: int           # 读取字节数
+
+
+def plan_multi_read(items: List[ReadItem], pdu_length: int = DEFAULT_PDU_LENGTH) -> List[List[ReadItem]]:
+    """将一个周期的读取请求按 PDU 长度分组
+    
+    每组的请求报文和响应报文都不超过协商的 PDU 长度，且不超过 MAX_MULTI_VARS 项。
+    单项数据超过 PDU 容量时单独成组，由调用方走普通读取 (snap7 内部自动分片)。
+    
+    Args:
+        items: 读取请求列表 (保持原有顺序)
+        pdu_length: 协商的 PDU 长度
+        
+    Returns:
+        分组后的请求列表
+    """
+    groups: List[List[ReadItem]] = []
+    current: List[ReadItem] = []
+    resp_size = _RESP_HEADER_SIZE
+    
+    for item in items:
+        # 本项在响应中的占用 (按奇数补齐计算，保守估计)
+        item_resp = _RESP_ITEM_HEADER_SIZE + item.size + (item.size & 1)
+        
+        # 单项超出 PDU 容量: 单独成组
+        if _RESP_HEADER_SIZE + item_resp > pdu_length:
+            if current:
+                groups.append(current)
+                current = []
+                resp_size = _RESP_HEADER_SIZE
+            groups.append([item])
+            continue
+        
+        req_size = _REQ_HEADER_SIZE + _REQ_ITEM_SIZE * (len(current) + 1)
+        if current and (
+            len(current) >= MAX_MULTI_VARS
+            or resp_size + item_resp > pdu_length
+            or req_size > pdu_length
+        ):
+            groups.append(current)
+            current = []
+            resp_size = _RESP_HEADER_SIZE
+        
+        current.append(item)
+        resp_size += item_resp
+    
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _get_snap7_multi_types() -> Tuple[Any, Dict[str, int], int]:
+    """获取 S7DataItem 类型、区域代码和字节字长 (兼容 snap7 1.x 和 2.x)"""
+    try:
+        # snap7 2.x
+        from snap7.type import S7DataItem, Area, WordLen
+        areas = {'DB': int(Area.DB), 'PA': int(Area.PA), 'PE': int(Area.PE)}
+        return S7DataItem, areas, int(WordLen.Byte)
+    except ImportError:
+        # snap7 1.x
+        from snap7.types import S7DataItem, S7AreaDB, S7AreaPA, S7AreaPE, S7WLByte
+        areas = {'DB': S7AreaDB, 'PA': S7AreaPA, 'PE': S7AreaPE}
+        return S7DataItem, areas, S7WLByte
+
+
 class PLCManager:
     """PLC 长连接管理器（单例模式）"""
     
@@ -67,6 +160,9 @@ class PLCManager:
         self._consecutive_error_count: int = 0
         self._last_error: str = ""
         
+        # 协商的 PDU 长度 (连接成功后从 PLC 获取)
+        self._pdu_length: int = DEFAULT_PDU_LENGTH
+        
         # 线程锁
         self._rw_lock = threading.Lock()
         
@@ -74,6 +170,8 @@ class PLCManager:
         self._reconnect_interval: float = 5.0
         self._max_reconnect_attempts: int = 3
         self._max_consecutive_errors: int = 10
+        self._reconnect_wait: float = settings.plc_reconnect_wait
+        self._reconnect_not_before: float = 0.0  # 强制断开后最早允许重连的时间 (monotonic)
         
         # 仅在 DEBUG 模式下打印初始化信息
         if settings.app_debug:
@@ -92,15 +190,26 @@ class PLCManager:
         if not SNAP7_AVAILABLE:
             return (False, "snap7 未安装")
         
+        # 强制断开后等待 PLC 释放旧连接槽 (不阻塞，直接返回失败)
+        remaining = self._reconnect_not_before - time.monotonic()
+        if remaining > 0:
+            return (False, f"等待 PLC 释放旧连接 ({remaining:.1f}s 后重连)")
+        
         try:
             self._client = snap7.client.Client()
-            # python-snap7 2.0+ 不再支持 tcpport 参数，使用标准端口 102
-            self._client.connect(self._ip, self._rack, self._slot)
+            # 使用配置的端口 (默认 102)
+            self._client.connect(self._ip, self._rack, self._slot, self._port)
             self._connected = True
             self._last_connect_time = datetime.now()
             self._connect_count += 1
             self._consecutive_error_count = 0
             
+            # 获取协商的 PDU 长度 (用于合并读取分组)
+            try:
+                self._pdu_length = int(self._client.get_pdu_length()) or DEFAULT_PDU_LENGTH
+            except Exception:
+                self._pdu_length = DEFAULT_PDU_LENGTH
+            
             # 连接成功，重置限流器
             log_throttler.reset("plc_connect_failed")
             print(f"✅ PLC 连接成功: {self._ip}:{self._port}")
@@ -130,14 +239,14 @@ class PLCManager:
         self._connected = False
         print("PLC 连接已断开")
     
-    def _reconnect_with_wait(self) -> Tuple[bool, str]:
-        """断开并等待后重连 (不加锁，供已持有锁的方法调用)
+    def _schedule_reconnect(self):
+        """断开连接，延迟到等待时间之后再重连 (不加锁，供已持有锁的方法调用)
         
-        PLC 需要时间释放旧连接槽，直接重连可能失败
+        PLC 需要时间释放旧连接槽，直接重连可能失败；
+        这里不在锁内 sleep，只记录最早重连时间，由之后的请求触发重连
         """
         self._disconnect_internal()
-        time.sleep(2.0)  # 等待 PLC 释放旧连接
-        return self._connect_internal()
+        self._reconnect_not_before = time.monotonic() + self._reconnect_wait
     
     def read_db(self, db_number: int, start: int, size: int) -> Tuple[Optional[bytes], str]:
         """读取 DB 块数据
@@ -170,20 +279,10 @@ class PLCManager:
                 # 使用限流器记录错误日志（60秒内只记录一次）
                 log_throttler.log_error("plc_read_failed", f"PLC 读取失败 DB{db_number}: {e}")
                 
-                # 连续错误过多，强制重连并重试一次
+                # 连续错误过多，断开并在等待后由下一次请求重连
                 if self._consecutive_error_count >= self._max_consecutive_errors:
                     log_throttler.log_error("plc_force_reconnect", f"连续 {self._consecutive_error_count} 次错误，强制重连")
-                    success, _ = self._reconnect_with_wait()
-                    if success:
-                        # 重连成功，重试本次读取
-                        try:
-                            data = self._client.db_read(db_number, start, size)
-                            self._last_read_time = datetime.now()
-                            self._consecutive_error_count = 0
-                            return (bytes(data), "")
-                        except Exception as e2:
-                            log_throttler.log_error("plc_read_retry_failed", f"PLC 重连后读取仍失败 DB{db_number}: {e2}")
-                            return (None, str(e2))
+                    self._schedule_reconnect()
                 
                 return (None, str(e))
     
@@ -311,6 +410,93 @@ class PLCManager:
                 log_throttler.log_error("plc_read_input_failed", f"PLC 读取输入区失败 I{start}: {e}")
                 return (None, str(e))
 
+    def read_multi(self, items: List[ReadItem]) -> Tuple[Dict[str, Optional[bytes]], str]:
+        """合并读取多个 DB 块 / Q区 / I区 (一次加锁，按 PDU 分组调用 read_multi_vars)
+        
+        Args:
+            items: 本周期的读取请求列表
+            
+        Returns:
+            ({key: 数据 或 None}, 错误信息)
+            
+        示例:
+            results, err = plc.read_multi([
+                ReadItem('db32', 'DB', 32, 0, 29),
+                ReadItem('q_area', 'PA', 0, 3, 2),
+            ])
+            db32_data = results['db32']
+        """
+        results: Dict[str, Optional[bytes]] = {item.key: None for item in items}
+        if not items:
+            return (results, "")
+        
+        with self._rw_lock:
+            if not self._connected or not self._client:
+                success, msg = self._connect_internal()
+                if not success:
+                    return (results, msg)
+            
+            try:
+                self._read_multi_internal(items, results)
+                self._last_read_time = datetime.now()
+                self._consecutive_error_count = 0
+                return (results, "")
+            except Exception as e:
+                self._error_count += 1
+                self._consecutive_error_count += 1
+                self._last_error = str(e)
+                
+                # 使用限流器记录错误日志（60秒内只记录一次）
+                log_throttler.log_error("plc_read_multi_failed", f"PLC 合并读取失败 ({len(items)} 项): {e}")
+                
+                # 连续错误过多，断开并在等待后由下一次请求重连
+                if self._consecutive_error_count >= self._max_consecutive_errors:
+                    log_throttler.log_error("plc_force_reconnect", f"连续 {self._consecutive_error_count} 次错误，强制重连")
+                    self._schedule_reconnect()
+                
+                return (results, str(e))
+    
+    def _read_multi_internal(self, items: List[ReadItem], results: Dict[str, Optional[bytes]]):
+        """内部合并读取方法 (不加锁，供已持有锁的方法调用)"""
+        S7DataItem, area_codes, wordlen_byte = _get_snap7_multi_types()
+        
+        for group in plan_multi_read(items, self._pdu_length):
+            # 单项分组: 直接普通读取 (大块由 snap7 内部分片)
+            if len(group) == 1:
+                item = group[0]
+                if item.area == 'DB':
+                    data = self._client.db_read(item.db_number, item.start, item.size)
+                else:
+                    data = self._client.read_area(area_codes[item.area], 0, item.start, item.size)
+                results[item.key] = bytes(data)
+                continue
+            
+            # 多项分组: 构建 S7DataItem 数组，一次往返读取
+            data_items = (S7DataItem * len(group))()
+            buffers = []
+            for data_item, item in zip(data_items, group):
+                buffer = ctypes.create_string_buffer(item.size)
+                buffers.append(buffer)
+                data_item.Area = ctypes.c_int32(area_codes[item.area])
+                data_item.WordLen = ctypes.c_int32(wordlen_byte)
+                data_item.Result = ctypes.c_int32(0)
+                data_item.DBNumber = ctypes.c_int32(item.db_number)
+                data_item.Start = ctypes.c_int32(item.start)
+                data_item.Amount = ctypes.c_int32(item.size)
+                data_item.pData = ctypes.cast(ctypes.pointer(buffer), ctypes.POINTER(ctypes.c_uint8))
+            
+            self._client.read_multi_vars(data_items)
+            
+            # 单项失败只影响该项 (如 DB 块不存在)，其余数据照常返回
+            for data_item, item, buffer in zip(data_items, group, buffers):
+                if data_item.Result == 0:
+                    results[item.key] = buffer.raw[:item.size]
+                else:
+                    log_throttler.log_error(
+                        f"plc_read_multi_item_{item.key}",
+                        f"PLC 合并读取单项失败 {item.key}: 错误码 0x{data_item.Result:X}"
+                    )
+
     def get_status(self) -> Dict[str, Any]:
         """获取连接状态信息"""
         return {
@@ -322,6 +508,7 @@ class PLCManager:
             'connect_count': self._connect_count,
             'error_count': self._error_count,
             'consecutive_errors': self._consecutive_error_count,
+            'pdu_length': self._pdu_length,
             'last_error': self._last_error,
             'last_connect_time': self._last_connect_time.isoformat() if self._last_connect_time else None,
             'last_read_time': self._last_read_time.isoformat() if self._last_read_time else None,
@@ -0,0 +1,340 @@
+# ============================================================
+# 文件说明: plc_scheduler.py - PLC 请求优先级调度器 (独立 I/O 线程)
+# ============================================================
+# 功能:
+#   1. 独立 I/O 线程独占 snap7 客户端 (PLCManager)，所有 S7 请求串行执行
+#   2. 优先级: 弧流/紧急 > 操作员写入 > 传感器 > 状态，同级按截止时间排序
+#   3. 合并重复读取: 队列中尚未执行的同一块读取只发送一次，结果分发给所有等待者
+#   4. 过期/已取消的请求不再发送到 PLC
+#   5. 弧流保护窗口: 高速弧流轮询时，低优先级请求若会与下一次弧流读取重叠则延后执行
+#      (延后次数有上限，再等待会错过截止时间时立即执行)
+#   6. 按优先级统计排队等待时间 / 执行时间
+# ============================================================
+# 调用方式:
+#   - asyncio 轮询循环: AsyncPLCClient (plc_async_client.py)
+#   - GUI 线程写入: scheduler.call(...) 阻塞等待结果 (bridge/plc_writer.py)
+# ============================================================
+
+import heapq
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import get_settings
+from backend.plc.plc_manager import ReadItem
+
+settings = get_settings()
+
+
+class PLCPriority(IntEnum):
+    """请求优先级 (数值越小越优先)"""
+    ARC = 0        # DB1 弧流弧压 / 紧急停电相关
+    WRITE = 1      # 操作员写入 (料仓上限、弧流上限、DB19 标志清零)
+    SENSOR = 2     # DB32 传感器 + 料仓 PLC 数据
+    STATUS = 3     # DB30/DB41 通信状态
+
+
+@dataclass
+class _PLCRequest:
+    """一次 PLC 请求 (合并后可能有多个等待者)"""
+    name: str                               # 请求名称 (日志/统计用)
+    func: Callable[..., Any]                # PLCManager 方法
+    args: Tuple[Any, ...]
+    priority: PLCPriority
+    deadline: float                         # 截止时间 (monotonic)，合并后取最晚的等待者
+    merge_key: Optional[Hashable] = None    # 读取请求的合并键 (写入为 None)
+    waiters: List[Future] = field(default_factory=list)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started: bool = False
+    deferrals: int = 0                      # 被弧流保护窗口延后的次数
+
+    def is_abandoned(self, now: float) -> bool:
+        """所有等待者都已取消/超时，或已过截止时间"""
+        return now >= self.deadline or all(f.done() for f in self.waiters)
+
+
+class _ClassStats:
+    """单个优先级的统计"""
+
+    def __init__(self, window: int = 500):
+        self.submitted = 0
+        self.executed = 0
+        self.merged = 0
+        self.expired = 0
+        self.deferred = 0        # 因弧流保护窗口被延后的次数
+        self.waits: Deque[float] = deque(maxlen=window)
+        self.services: Deque[float] = deque(maxlen=window)
+
+    def to_dict(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        services = self.services
+        return {
+            'submitted': self.submitted,
+            'executed': self.executed,
+            'merged': self.merged,
+            'expired': self.expired,
+            'deferred': self.deferred,
+            'wait_avg_ms': round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+            'wait_p95_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else 0.0,
+            'wait_max_ms': round(waits[-1] * 1000, 2) if waits else 0.0,
+            'service_avg_ms': round(sum(services) / len(services) * 1000, 2) if services else 0.0,
+        }
+
+
+class PLCScheduler:
+    """PLC 请求调度器 (单例通过 get_plc_scheduler() 获取)"""
+
+    ARC_GUARD_MAX_PERIOD = 1.0   # 弧流周期超过此值 (低速模式) 时不启用保护窗口
+    ARC_GUARD_SLACK = 0.05       # 预计弧流请求迟到的容忍时间 (秒)
+    ARC_GUARD_MAX_DEFERRALS = 3  # 单个请求最多被延后的次数，超过后直接执行
+
+    # 1. 初始化 (I/O 线程延迟到首次请求时启动)
+    def __init__(self, arc_guard: bool = settings.plc_arc_guard_enabled):
+        self._heap: List[Tuple[int, float, int, _PLCRequest]] = []
+        self._pending: Dict[Hashable, _PLCRequest] = {}   # merge_key -> 尚未执行的请求
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        # 弧流保护窗口
+        self._arc_guard = arc_guard
+        self._last_arc_arrival: Optional[float] = None
+        self._arc_period: Optional[float] = None        # 弧流请求到达间隔 (EWMA)
+        self._service_time: Dict[Hashable, float] = {}  # 请求名称 -> 执行耗时 (EWMA)
+
+        self._stats: Dict[PLCPriority, _ClassStats] = {p: _ClassStats() for p in PLCPriority}
+
+    # 2. 提交请求 (任意线程)，返回 concurrent.futures.Future
+    def submit(self, name: str, func: Callable[..., Any], args: Tuple[Any, ...],
+               priority: PLCPriority, timeout: float,
+               merge_key: Optional[Hashable] = None) -> Future:
+        future: Future = Future()
+        now = time.monotonic()
+        deadline = now + timeout
+
+        with self._cond:
+            self._ensure_worker()
+            stats = self._stats[priority]
+            stats.submitted += 1
+            if priority == PLCPriority.ARC:
+                self._observe_arc_arrival(now)
+
+            # 2.1 合并: 同一块的读取已在队列中且未开始执行
+            request = self._pending.get(merge_key) if merge_key is not None else None
+            if request is not None and not request.started:
+                request.waiters.append(future)
+                request.deadline = max(request.deadline, deadline)
+                stats.merged += 1
+                # 更高优先级的等待者: 以新优先级再入堆一次 (先被取出的那个执行，另一个跳过)
+                if priority < request.priority:
+                    request.priority = priority
+                    self._push(request, deadline)
+                return future
+
+            request = _PLCRequest(
+                name=name, func=func, args=args, priority=priority,
+                deadline=deadline, merge_key=merge_key, waiters=[future],
+            )
+            if merge_key is not None:
+                self._pending[merge_key] = request
+            self._push(request, deadline)
+        return future
+
+    # 3. 同步调用 (GUI 线程写入使用)，超时返回 None
+    def call(self, name: str, func: Callable[..., Any], args: Tuple[Any, ...],
+             priority: PLCPriority = PLCPriority.WRITE,
+             timeout: float = settings.plc_request_timeout) -> Optional[Any]:
+        future = self.submit(name, func, args, priority, timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return None
+
+    # 4. 读取请求的合并键
+    @staticmethod
+    def read_db_key(db_number: int, start: int, size: int) -> Hashable:
+        return ('read_db', db_number, start, size)
+
+    @staticmethod
+    def read_multi_key(items: List[ReadItem]) -> Hashable:
+        return ('read_multi',) + tuple((i.key, i.area, i.db_number, i.start, i.size) for i in items)
+
+    # 5. 统计
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'worker_alive': self._thread is not None and self._thread.is_alive(),
+                'queue_size': len({id(r) for *_, r in self._heap if not r.started}),
+                'arc_period_ms': round(self._arc_period * 1000, 1) if self._arc_period else None,
+                'classes': {p.name.lower(): s.to_dict() for p, s in self._stats.items()},
+            }
+
+    # 6. 停止 I/O 线程 (未执行的请求全部取消)
+    def close(self, join_timeout: float = 2.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=join_timeout)
+        with self._cond:
+            for *_, request in self._heap:
+                for f in request.waiters:
+                    f.cancel()
+            self._heap.clear()
+            self._pending.clear()
+            self._thread = None
+            self._stopping = False
+
+    # ------------------------------------------------------------
+    # 内部方法 (带 _locked 后缀的调用方已持有 self._cond)
+    # ------------------------------------------------------------
+    def _push(self, request: _PLCRequest, deadline: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (int(request.priority), deadline, self._seq, request))
+        self._cond.notify()
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="PLC-IO", daemon=True)
+            self._thread.start()
+            logger.info("PLC I/O 线程已启动")
+
+    def _observe_arc_arrival(self, now: float):
+        """记录弧流请求到达间隔 (用于预测下一次弧流读取)"""
+        if self._last_arc_arrival is not None:
+            interval = now - self._last_arc_arrival
+            self._arc_period = interval if self._arc_period is None else 0.8 * self._arc_period + 0.2 * interval
+        self._last_arc_arrival = now
+
+    def _arc_guard_wait_locked(self, request: _PLCRequest, now: float) -> float:
+        """低优先级请求是否会与下一次弧流读取重叠，返回需要等待的秒数 (0 = 立即执行)"""
+        if (not self._arc_guard or request.priority == PLCPriority.ARC
+                or self._arc_period is None or self._arc_period > self.ARC_GUARD_MAX_PERIOD):
+            return 0.0
+        if request.deferrals >= self.ARC_GUARD_MAX_DEFERRALS:
+            return 0.0   # 已多次延后，不再等待 (避免预计耗时偏大时永远让路)
+        next_arc = self._last_arc_arrival + self._arc_period
+        if now > next_arc + self.ARC_GUARD_SLACK:
+            return 0.0   # 弧流请求已迟到 (可能已停止)，不再等待
+        # 预计耗时不超过一个弧流周期 (重连等偶发慢读取不应让请求一直让路)
+        service = min(self._service_time.get(request.name, 0.0), self._arc_period)
+        if now + service <= next_arc:
+            return 0.0   # 在下一次弧流读取之前可以完成
+        wait = next_arc + self.ARC_GUARD_SLACK - now
+        if now + wait + service >= request.deadline:
+            return 0.0   # 再等待会错过截止时间
+        return wait
+
+    def _next_request_locked(self) -> Optional[_PLCRequest]:
+        """取出下一个可执行的请求 (无请求时等待)，停止时返回 None"""
+        while not self._stopping:
+            if not self._heap:
+                self._cond.wait()
+                continue
+
+            now = time.monotonic()
+            _, _, _, request = self._heap[0]
+
+            # 已执行 (合并后重复入堆) / 已放弃的请求直接丢弃
+            if request.started:
+                heapq.heappop(self._heap)
+                continue
+            if request.is_abandoned(now):
+                heapq.heappop(self._heap)
+                self._finish_locked(request)
+                request.started = True   # 标记离队，合并产生的重复堆项不再重复统计
+                self._stats[request.priority].expired += 1
+                for f in request.waiters:
+                    f.cancel()
+                continue
+
+            wait = self._arc_guard_wait_locked(request, now)
+            if wait > 0:
+                request.deferrals += 1
+                self._stats[request.priority].deferred += 1
+                # 等待期间弧流请求到达会 notify，重新从堆顶开始选择
+                self._cond.wait(timeout=min(wait, request.deadline - now))
+                continue
+
+            heapq.heappop(self._heap)
+            self._finish_locked(request)
+            request.started = True
+            self._stats[request.priority].waits.append(now - request.enqueued_at)
+            return request
+        return None
+
+    def _finish_locked(self, request: _PLCRequest):
+        """请求离开队列，不再接受合并"""
+        if request.merge_key is not None and self._pending.get(request.merge_key) is request:
+            del self._pending[request.merge_key]
+
+    def _worker(self):
+        """I/O 线程主循环"""
+        while True:
+            with self._cond:
+                request = self._next_request_locked()
+            if request is None:
+                break
+
+            t0 = time.monotonic()
+            try:
+                result = request.func(*request.args)
+                error = None
+            except Exception as e:
+                result = None
+                error = e
+            elapsed = time.monotonic() - t0
+
+            with self._cond:
+                stats = self._stats[request.priority]
+                stats.executed += 1
+                stats.services.append(elapsed)
+                # 样本上限为一个弧流周期，单次慢读取不会把预计耗时推高到无法执行
+                sample = min(elapsed, self._arc_period) if self._arc_period else elapsed
+                previous = self._service_time.get(request.name)
+                self._service_time[request.name] = sample if previous is None else 0.8 * previous + 0.2 * sample
+
+            for f in request.waiters:
+                try:
+                    if error is not None:
+                        f.set_exception(error)
+                    else:
+                        f.set_result(result)
+                except InvalidStateError:
+                    pass   # 等待者已取消/超时
+
+        logger.info("PLC I/O 线程已停止")
+
+
+# ============================================================
+# 单例
+# ============================================================
+_plc_scheduler: Optional[PLCScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_plc_scheduler() -> PLCScheduler:
+    global _plc_scheduler
+    if _plc_scheduler is None:
+        with _scheduler_lock:
+            if _plc_scheduler is None:
+                _plc_scheduler = PLCScheduler()
+    return _plc_scheduler
+
+
+def close_plc_scheduler() -> None:
+    """停止 I/O 线程 (轮询停止时调用)"""
+    global _plc_scheduler
+    if _plc_scheduler is not None:
+        _plc_scheduler.close()
+        _plc_scheduler = None
@@ -1,17 +1,17 @@
 """
 报警检查器 - 在轮询数据中检查是否超过报警阈值，超过则写入报警记录
+
+阈值判定由 AlarmEngine 完成 (回差 + 延时)，只有状态升级 (normal -> warning -> alarm) 时写入报警记录
 """
-from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List
 from loguru import logger
 
-from backend.alarm_thresholds import get_alarm_threshold_manager
 from backend.core.alarm_store import log_alarm
-
-
-# 设备ID常量
-DEVICE_FURNACE = "furnace_1"
-DEVICE_ELECTRODE = "electrode"
+from backend.services.alarm_engine import (
+    get_alarm_engine,
+    AlarmTransition,
+    DEVICE_ELECTRODE,
+)
 
 
 def check_arc_data_alarms(arc_cache: Dict[str, Any], batch_code: str = ""):
@@ -28,60 +28,17 @@ def check_arc_data_alarms(arc_cache: Dict[str, Any], batch_code: str = ""):
     if not arc_cache:
         return
     
-    manager = get_alarm_threshold_manager()
-    
-    # 相位映射: U->u, V->v, W->w
-    phase_map = {'U': 'u', 'V': 'v', 'W': 'w'}
-    phase_display = {'U': '1#', 'V': '2#', 'W': '3#'}
-    
-    # 1. 检查三相弧流
     arc_current = arc_cache.get('arc_current', {})
-    for phase_key, param_suffix in phase_map.items():
-        value = arc_current.get(phase_key)
-        if value is None:
-            continue
-        
-        param_name = f"arc_current_{param_suffix}"
-        level = manager.check_value(param_name, value)
-        
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            # 确定超过的是哪个阈值
-            threshold = _get_exceeded_threshold(config, value, level)
-            log_alarm(
-                device_id=DEVICE_ELECTRODE,
-                alarm_type="arc_current",
-                param_name=param_name,
-                value=value,
-                threshold=threshold,
-                level=level,
-                message=f"{phase_display[phase_key]}弧流 {value:.1f}A 超过{_level_text(level)} {threshold:.1f}A",
-                batch_code=batch_code
-            )
-    
-    # 2. 检查三相弧压
     arc_voltage = arc_cache.get('arc_voltage', {})
-    for phase_key, param_suffix in phase_map.items():
-        value = arc_voltage.get(phase_key)
-        if value is None:
-            continue
-        
-        param_name = f"arc_voltage_{param_suffix}"
-        level = manager.check_value(param_name, value)
-        
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, value, level)
-            log_alarm(
-                device_id=DEVICE_ELECTRODE,
-                alarm_type="arc_voltage",
-                param_name=param_name,
-                value=value,
-                threshold=threshold,
-                level=level,
-                message=f"{phase_display[phase_key]}弧压 {value:.1f}V 超过{_level_text(level)} {threshold:.1f}V",
-                batch_code=batch_code
-            )
+    values = {
+        'arc_current_u': arc_current.get('U'),
+        'arc_current_v': arc_current.get('V'),
+        'arc_current_w': arc_current.get('W'),
+        'arc_voltage_u': arc_voltage.get('U'),
+        'arc_voltage_v': arc_voltage.get('V'),
+        'arc_voltage_w': arc_voltage.get('W'),
+    }
+    _log_transitions(get_alarm_engine().evaluate(values), batch_code)
 
 
 def check_sensor_data_alarms(
@@ -106,133 +63,42 @@ def check_sensor_data_alarms(
         furnace_cover_pressure: 炉盖水压 (kPa)
         batch_code: 当前批次号
     """
-    manager = get_alarm_threshold_manager()
-    
-    # 1. 检查三相电极深度
     electrode_depths = parsed.get('electrode_depths', {})
-    depth_map = {
-        'LENTH1': ('electrode_depth_u', '1#'),
-        'LENTH2': ('electrode_depth_v', '2#'),
-        'LENTH3': ('electrode_depth_w', '3#'),
+    cooling_flows = parsed.get('cooling_flows', {})
+    values = {
+        'electrode_depth_u': _field(electrode_depths.get('LENTH1'), 'distance_mm'),
+        'electrode_depth_v': _field(electrode_depths.get('LENTH2'), 'distance_mm'),
+        'electrode_depth_w': _field(electrode_depths.get('LENTH3'), 'distance_mm'),
+        'cooling_pressure_shell': furnace_shell_pressure,
+        'cooling_pressure_cover': furnace_cover_pressure,
+        'cooling_flow_shell': _field(cooling_flows.get('WATER_FLOW_1'), 'flow'),
+        'cooling_flow_cover': _field(cooling_flows.get('WATER_FLOW_2'), 'flow'),
+        'filter_pressure_diff': _field(parsed.get('filter_pressure_diff'), 'value'),
     }
-    
-    for key, (param_name, phase_display) in depth_map.items():
-        depth_data = electrode_depths.get(key, {})
-        value = depth_data.get('distance_mm') if isinstance(depth_data, dict) else None
-        if value is None:
+    _log_transitions(get_alarm_engine().evaluate(values), batch_code)
+
+
+def _field(data: Any, key: str):
+    """取解析结果中的数值 (结构不符时返回 None)"""
+    return data.get(key) if isinstance(data, dict) else None
+
+
+def _log_transitions(transitions: List[AlarmTransition], batch_code: str):
+    """状态升级写入报警记录，解除/降级只记录日志"""
+    for t in transitions:
+        if not t.is_raise:
+            logger.info(f"[ALARM] 报警解除: {t.message}")
             continue
-        
-        level = manager.check_value(param_name, value)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, value, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="electrode_depth",
-                param_name=param_name,
-                value=value,
-                threshold=threshold,
-                level=level,
-                message=f"{phase_display}电极深度 {value:.1f}mm 超过{_level_text(level)} {threshold:.1f}mm",
-                batch_code=batch_code
-            )
-    
-    # 2. 检查炉皮冷却水压力
-    if furnace_shell_pressure is not None:
-        param_name = "cooling_pressure_shell"
-        level = manager.check_value(param_name, furnace_shell_pressure)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, furnace_shell_pressure, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="cooling_water",
-                param_name=param_name,
-                value=furnace_shell_pressure,
-                threshold=threshold,
-                level=level,
-                message=f"炉皮冷却水压力 {furnace_shell_pressure:.2f}kPa 超过{_level_text(level)} {threshold:.2f}kPa",
-                batch_code=batch_code
-            )
-    
-    # 3. 检查炉盖冷却水压力
-    if furnace_cover_pressure is not None:
-        param_name = "cooling_pressure_cover"
-        level = manager.check_value(param_name, furnace_cover_pressure)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, furnace_cover_pressure, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="cooling_water",
-                param_name=param_name,
-                value=furnace_cover_pressure,
-                threshold=threshold,
-                level=level,
-                message=f"炉盖冷却水压力 {furnace_cover_pressure:.2f}kPa 超过{_level_text(level)} {threshold:.2f}kPa",
-                batch_code=batch_code
-            )
-    
-    # 4. 检查炉皮冷却水流速
-    cooling_flows = parsed.get('cooling_flows', {})
-    flow_1_data = cooling_flows.get('WATER_FLOW_1', {})
-    furnace_shell_flow = flow_1_data.get('flow') if isinstance(flow_1_data, dict) else None
-    if furnace_shell_flow is not None:
-        param_name = "cooling_flow_shell"
-        level = manager.check_value(param_name, furnace_shell_flow)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, furnace_shell_flow, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="cooling_water_flow",
-                param_name=param_name,
-                value=furnace_shell_flow,
-                threshold=threshold,
-                level=level,
-                message=f"炉皮冷却水流速 {furnace_shell_flow:.2f}m\u00b3/h 超过{_level_text(level)} {threshold:.2f}m\u00b3/h",
-                batch_code=batch_code
-            )
-    
-    # 5. 检查炉盖冷却水流速
-    flow_2_data = cooling_flows.get('WATER_FLOW_2', {})
-    furnace_cover_flow = flow_2_data.get('flow') if isinstance(flow_2_data, dict) else None
-    if furnace_cover_flow is not None:
-        param_name = "cooling_flow_cover"
-        level = manager.check_value(param_name, furnace_cover_flow)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, furnace_cover_flow, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="cooling_water_flow",
-                param_name=param_name,
-                value=furnace_cover_flow,
-                threshold=threshold,
-                level=level,
-                message=f"炉盖冷却水流速 {furnace_cover_flow:.2f}m\u00b3/h 超过{_level_text(level)} {threshold:.2f}m\u00b3/h",
-                batch_code=batch_code
-            )
-    
-    # 6. 检查过滤器压差
-    filter_diff_data = parsed.get('filter_pressure_diff', {})
-    filter_diff_value = filter_diff_data.get('value') if isinstance(filter_diff_data, dict) else None
-    if filter_diff_value is not None:
-        param_name = "filter_pressure_diff"
-        level = manager.check_value(param_name, filter_diff_value)
-        if level in ('warning', 'alarm'):
-            config = manager.get_threshold(param_name)
-            threshold = _get_exceeded_threshold(config, filter_diff_value, level)
-            log_alarm(
-                device_id=DEVICE_FURNACE,
-                alarm_type="filter",
-                param_name=param_name,
-                value=filter_diff_value,
-                threshold=threshold,
-                level=level,
-                message=f"过滤器压差 {filter_diff_value:.2f}kPa 超过{_level_text(level)} {threshold:.2f}kPa",
-                batch_code=batch_code
-            )
+        log_alarm(
+            device_id=t.channel.device_id,
+            alarm_type=t.channel.alarm_type,
+            param_name=t.channel.param_name,
+            value=t.value,
+            threshold=t.threshold,
+            level=t.level,
+            message=t.message,
+            batch_code=batch_code
+        )
 
 
 def check_emergency_stop_alarm(parsed: Dict[str, Any], batch_code: str = ""):
@@ -267,27 +133,3 @@ def check_emergency_stop_alarm(parsed: Dict[str, Any], batch_code: str = ""):
         message=f"高压紧急停电触发, 弧流上限 {arc_limit}A, 消抖 {delay_ms}ms",
         batch_code=batch_code
     )
-
-
-def _get_exceeded_threshold(config, value: float, level: str) -> float:
-    """获取被超过的阈值数值"""
-    if not config:
-        return 0.0
-    
-    if level == 'alarm':
-        if config.alarm_max is not None and value > config.alarm_max:
-            return config.alarm_max
-        if config.alarm_min is not None and value < config.alarm_min:
-            return config.alarm_min
-    elif level == 'warning':
-        if config.warning_max is not None and value > config.warning_max:
-            return config.warning_max
-        if config.warning_min is not None and value < config.warning_min:
-            return config.warning_min
-    
-    return 0.0
-
-
-def _level_text(level: str) -> str:
-    """报警级别文本"""
-    return "报警阈值" if level == 'alarm' else "警告阈值"
@@ -0,0 +1,313 @@
+# ============================================================
+# 文件说明: alarm_engine.py - 报警判定引擎 (回差 + 延时)
+# ============================================================
+# 功能:
+#   1. 把 data/alarm_thresholds.json 编译成各通道的阈值数组 (警告/报警上下限、回差、延时)
+#   2. 一帧数据一次 NumPy 运算得出所有通道的超限级别
+#   3. 每个通道一个状态机 (normal / warning / alarm):
+#      - 升级: 超限持续 on_delay 秒才进入新级别
+#      - 解除/降级: 回到"阈值收紧回差"后的范围内，并持续 off_delay 秒才退出
+#   4. 只输出状态变化 (AlarmTransition)，在阈值附近抖动的数值不再反复产生报警
+#   5. 阈值配置保存后自动重新编译 (AlarmThresholdManager.version 变化)
+#   6. 标量快速路径: 全部通道正常且本帧数值都在回差收紧后的范围内时，不进入 NumPy 运算
+# ============================================================
+# 用法:
+#   engine = get_alarm_engine()
+#   for t in engine.evaluate({'arc_current_u': 8100.0, ...}):
+#       if t.is_raise: log_alarm(...)
+# ============================================================
+# 说明:
+#   - 本帧没有的通道 (值为 None/NaN) 保持原状态，不影响延时计时
+#   - 时间使用 frame_utcnow()，离线回放时延时按录制时间计算，结果与现场一致
+#   - evaluate 只在 asyncio 线程调用；reset 可在任意线程调用 (与判定共用一把锁)
+# ============================================================
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.alarm_thresholds import get_alarm_threshold_manager
+from backend.config import get_settings
+from backend.core.frame_recorder import frame_utcnow
+
+settings = get_settings()
+
+# 级别 (数值越大越严重)
+LEVEL_NORMAL = 0
+LEVEL_WARNING = 1
+LEVEL_ALARM = 2
+LEVEL_NAMES = ('normal', 'warning', 'alarm')
+
+# 设备ID常量
+DEVICE_FURNACE = "furnace_1"
+DEVICE_ELECTRODE = "electrode"
+
+
+@dataclass(frozen=True)
+class AlarmChannel:
+    """监测通道定义"""
+    param_name: str       # 阈值配置键 (data/alarm_thresholds.json)
+    device_id: str
+    alarm_type: str
+    label: str            # 报警消息中的名称
+    unit: str
+    decimals: int         # 报警消息中的小数位数
+    deadband: float       # 回差 (物理单位)
+
+
+CHANNELS: Tuple[AlarmChannel, ...] = (
+    # 弧流 / 弧压 (DB1)
+    AlarmChannel('arc_current_u', DEVICE_ELECTRODE, 'arc_current', '1#弧流', 'A', 1, 50.0),
+    AlarmChannel('arc_current_v', DEVICE_ELECTRODE, 'arc_current', '2#弧流', 'A', 1, 50.0),
+    AlarmChannel('arc_current_w', DEVICE_ELECTRODE, 'arc_current', '3#弧流', 'A', 1, 50.0),
+    AlarmChannel('arc_voltage_u', DEVICE_ELECTRODE, 'arc_voltage', '1#弧压', 'V', 1, 2.0),
+    AlarmChannel('arc_voltage_v', DEVICE_ELECTRODE, 'arc_voltage', '2#弧压', 'V', 1, 2.0),
+    AlarmChannel('arc_voltage_w', DEVICE_ELECTRODE, 'arc_voltage', '3#弧压', 'V', 1, 2.0),
+    # 电极深度 / 冷却水 / 过滤器 (DB32)
+    AlarmChannel('electrode_depth_u', DEVICE_FURNACE, 'electrode_depth', '1#电极深度', 'mm', 1, 5.0),
+    AlarmChannel('electrode_depth_v', DEVICE_FURNACE, 'electrode_depth', '2#电极深度', 'mm', 1, 5.0),
+    AlarmChannel('electrode_depth_w', DEVICE_FURNACE, 'electrode_depth', '3#电极深度', 'mm', 1, 5.0),
+    AlarmChannel('cooling_pressure_shell', DEVICE_FURNACE, 'cooling_water', '炉皮冷却水压力', 'kPa', 2, 0.5),
+    AlarmChannel('cooling_pressure_cover', DEVICE_FURNACE, 'cooling_water', '炉盖冷却水压力', 'kPa', 2, 0.5),
+    AlarmChannel('cooling_flow_shell', DEVICE_FURNACE, 'cooling_water_flow', '炉皮冷却水流速', 'm³/h', 2, 0.2),
+    AlarmChannel('cooling_flow_cover', DEVICE_FURNACE, 'cooling_water_flow', '炉盖冷却水流速', 'm³/h', 2, 0.2),
+    AlarmChannel('filter_pressure_diff', DEVICE_FURNACE, 'filter', '过滤器压差', 'kPa', 2, 0.5),
+)
+
+
+@dataclass(frozen=True)
+class AlarmTransition:
+    """通道状态变化"""
+    channel: AlarmChannel
+    old_level: int
+    new_level: int
+    value: float
+    threshold: float      # 升级时为被超过的阈值，解除时为 0
+
+    @property
+    def is_raise(self) -> bool:
+        return self.new_level > self.old_level
+
+    @property
+    def level(self) -> str:
+        return LEVEL_NAMES[self.new_level]
+
+    @property
+    def message(self) -> str:
+        ch = self.channel
+        d = ch.decimals
+        if self.is_raise:
+            level_text = "报警阈值" if self.new_level == LEVEL_ALARM else "警告阈值"
+            return f"{ch.label} {self.value:.{d}f}{ch.unit} 超过{level_text} {self.threshold:.{d}f}{ch.unit}"
+        return f"{ch.label} {self.value:.{d}f}{ch.unit} {LEVEL_NAMES[self.old_level]} -> {self.level}"
+
+
+class AlarmEngine:
+    """报警判定引擎 (单例通过 get_alarm_engine() 获取，判定在 asyncio 线程调用，reset 线程安全)"""
+
+    # 1. 初始化 (阈值在首次判定时编译)
+    def __init__(
+        self,
+        channels: Tuple[AlarmChannel, ...] = CHANNELS,
+        on_delay: float = settings.alarm_on_delay,
+        off_delay: float = settings.alarm_off_delay,
+    ):
+        self._channels = channels
+        self._index: Dict[str, int] = {ch.param_name: i for i, ch in enumerate(channels)}
+        self._on_delay = on_delay
+        self._off_delay = off_delay
+        self._lock = threading.Lock()
+
+        n = len(channels)
+        self._compiled_version = -1
+        self._enabled = np.zeros(n, dtype=bool)
+        # 行: 报警下限 / 警告下限 / 收紧回差后的报警下限 / 收紧回差后的警告下限 (未配置为 -inf)
+        self._lower = np.empty((4, n), dtype=np.float64)
+        # 行: 对应的上限 (未配置为 +inf)
+        self._upper = np.empty((4, n), dtype=np.float64)
+        # 标量快速路径: 参数名 -> (最严下限, 最严上限)，范围内即四行都不超限 (未启用为 ±inf)
+        self._bands: Dict[str, Tuple[float, float]] = {}
+
+        # 状态机: 当前级别；按级别 (行 0=warning, 1=alarm) 记录持续超限/持续回到回差内的起始时间 (NaN 表示未持续)
+        self._state = np.zeros(n, dtype=np.int8)
+        self._above_since = np.full((2, n), np.nan)
+        self._below_since = np.full((2, n), np.nan)
+        self._values = np.full(n, np.nan)
+        self._columns = np.arange(n)
+        # 全部通道正常且没有进行中的升级计时 (快速路径前提)
+        self._idle = True
+
+        self._evaluations = 0
+        self._transitions = 0
+
+    # 2. 判定一帧数据 (参数名 -> 数值)，返回状态变化
+    def evaluate(self, values: Dict[str, Optional[float]], now: Optional[float] = None) -> List[AlarmTransition]:
+        self._ensure_compiled()
+
+        # 快速路径: 空闲状态下本帧数值都在范围内 (NaN 比较为 False，交给数组路径处理)
+        if self._idle:
+            bands = self._bands
+            for name, value in values.items():
+                band = bands.get(name)
+                if band is not None and value is not None and not (band[0] <= value <= band[1]):
+                    break
+            else:
+                self._evaluations += 1
+                return []
+
+        frame = np.full(len(self._channels), np.nan)
+        for name, value in values.items():
+            index = self._index.get(name)
+            if index is not None and value is not None:
+                frame[index] = value
+        return self.evaluate_array(frame, now)
+
+    # 2.1 判定按通道顺序排列的数组 (NaN 表示本帧没有该通道)
+    def evaluate_array(self, frame: np.ndarray, now: Optional[float] = None) -> List[AlarmTransition]:
+        self._ensure_compiled()
+        with self._lock:
+            return self._evaluate_locked(frame, now)
+
+    def _evaluate_locked(self, frame: np.ndarray, now: Optional[float]) -> List[AlarmTransition]:
+        self._evaluations += 1
+
+        # 1. 一次比较得出 [报警, 警告, 回差内报警, 回差内警告] 四个超限矩阵 (NaN 比较结果为 False)
+        exceeded = (frame < self._lower) | (frame > self._upper)
+        exceeded &= self._enabled
+
+        # 快速路径: 全部正常且没有进行中的计时
+        if not exceeded.any() and self._idle:
+            return []
+
+        if now is None:
+            now = frame_utcnow().timestamp()
+        valid = ~np.isnan(frame)
+        self._values = np.where(valid, frame, self._values)
+
+        # 2. 持续计时: 超过级别 l (行 l-1) 的起始时间；回差内低于级别 l 的起始时间 (本帧没有的通道保持不变)
+        alarm, warning, hold_alarm, hold_warning = exceeded
+        above = np.vstack((warning | alarm, alarm))
+        below = np.vstack((~(hold_warning | hold_alarm), ~hold_alarm))
+        self._above_since = self._track(self._above_since, above, valid, now)
+        self._below_since = self._track(self._below_since, below, valid, now)
+
+        # 3. 升级: 持续超限满 on_delay 的最高级别
+        state = self._state
+        up_ready = (now - self._above_since) >= self._on_delay
+        up_level = np.where(up_ready[1], LEVEL_ALARM, np.where(up_ready[0], LEVEL_WARNING, LEVEL_NORMAL))
+
+        # 4. 解除/降级: 回差内低于当前级别持续满 off_delay，降到回差内的级别
+        hold_level = np.where(hold_alarm, LEVEL_ALARM, np.where(hold_warning, LEVEL_WARNING, LEVEL_NORMAL))
+        down_since = self._below_since[np.maximum(state, 1) - 1, self._columns]
+        down_ready = (state > LEVEL_NORMAL) & ((now - down_since) >= self._off_delay)
+
+        target = np.where(up_level > state, up_level, np.where(down_ready, np.minimum(hold_level, state - 1), state))
+        target = np.where(self._enabled, target, LEVEL_NORMAL).astype(np.int8)
+        fire = target != state
+        if not fire.any():
+            self._idle = not state.any() and bool(np.isnan(self._above_since).all())
+            return []
+
+        transitions = []
+        for i in np.flatnonzero(fire):
+            old_level, new_level = int(state[i]), int(target[i])
+            value = float(self._values[i])
+            transitions.append(AlarmTransition(
+                channel=self._channels[i],
+                old_level=old_level,
+                new_level=new_level,
+                value=value,
+                threshold=self._exceeded_threshold(i, new_level, value) if new_level > old_level else 0.0,
+            ))
+        self._state = target
+        self._transitions += len(transitions)
+        self._idle = not target.any() and bool(np.isnan(self._above_since).all())
+        return transitions
+
+    # 3. 各通道当前状态 {参数名: 'normal'/'warning'/'alarm'}
+    def get_states(self) -> Dict[str, str]:
+        return {ch.param_name: LEVEL_NAMES[int(self._state[i])] for i, ch in enumerate(self._channels)}
+
+    # 4. 统计
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'evaluations': self._evaluations,
+            'transitions': self._transitions,
+            'active': int(np.count_nonzero(self._state)),
+        }
+
+    # 5. 清除所有状态 (下次超限重新计时，可在任意线程调用)
+    def reset(self):
+        with self._lock:
+            self._state[:] = LEVEL_NORMAL
+            self._above_since[:] = np.nan
+            self._below_since[:] = np.nan
+            self._values[:] = np.nan
+            self._idle = True
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    @staticmethod
+    def _track(since: np.ndarray, active: np.ndarray, valid: np.ndarray, now: float) -> np.ndarray:
+        """条件成立: 保留已有起始时间 (没有则记为 now)；不成立: 清除；本帧无数据: 不变"""
+        started = np.where(np.isnan(since), now, since)
+        return np.where(valid, np.where(active, started, np.nan), since)
+
+    def _ensure_compiled(self):
+        manager = get_alarm_threshold_manager()
+        if manager.version == self._compiled_version:
+            return
+        self._compile(manager)
+        self._compiled_version = manager.version
+
+    def _compile(self, manager):
+        """阈值配置 -> 数组 (未配置的上下限为 ±inf，回差不超过上下限间距的 1/4，下限 <= 0 不加回差)"""
+        inf = np.inf
+        for i, ch in enumerate(self._channels):
+            config = manager.get_threshold(ch.param_name)
+            self._enabled[i] = bool(config and config.enabled)
+            pairs = (
+                (config.alarm_min, config.alarm_max),
+                (config.warning_min, config.warning_max),
+            ) if config else ((None, None), (None, None))
+
+            for row, (low, high) in enumerate(pairs):
+                low = -inf if low is None else float(low)
+                high = inf if high is None else float(high)
+                deadband = ch.deadband
+                if np.isfinite(low) and np.isfinite(high):
+                    deadband = min(deadband, max(high - low, 0.0) / 4)
+                self._lower[row, i], self._upper[row, i] = low, high
+                # 下限 <= 0 视为未启用下限 (如弧流 alarm_min=0): 不收紧，否则 0A 会落在回差带内一直保持报警
+                hold_low = low + deadband if low > 0 else low
+                self._lower[row + 2, i], self._upper[row + 2, i] = hold_low, high - deadband
+
+        band_low = np.where(self._enabled, self._lower.max(axis=0), -inf)
+        band_high = np.where(self._enabled, self._upper.min(axis=0), inf)
+        self._bands = {
+            ch.param_name: (float(band_low[i]), float(band_high[i])) for i, ch in enumerate(self._channels)
+        }
+        logger.info(f"报警阈值已编译: {int(self._enabled.sum())}/{len(self._channels)} 个通道启用")
+
+    def _exceeded_threshold(self, index: int, level: int, value: float) -> float:
+        row = 0 if level == LEVEL_ALARM else 1
+        low, high = self._lower[row, index], self._upper[row, index]
+        bound = high if value > high else low
+        return float(bound) if np.isfinite(bound) else 0.0
+
+
+# ============================================================
+# 单例
+# ============================================================
+_alarm_engine: Optional[AlarmEngine] = None
+
+
+def get_alarm_engine() -> AlarmEngine:
+    global _alarm_engine
+    if _alarm_engine is None:
+        _alarm_engine = AlarmEngine()
+    return _alarm_engine
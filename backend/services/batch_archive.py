@@ -0,0 +1,445 @@
+# ============================================================
+# 文件说明: batch_archive.py - 批次列存归档 (本地 .npy，按通道存储)
+# ============================================================
+# 功能:
+#   1. 批次停止/终止时由 BatchService 提交归档任务，后台线程延迟执行
+#      (等待写入队列落库；InfluxDB 不可用或离线缓冲未回放完时继续推迟)
+#   2. 按时间分段查询原始数据 (HistoryQueryService.query_raw_series)，逐段追加到临时文件，
+#      内存占用与批次时长无关
+#   3. 每条曲线两个文件: 时间戳 int64 (UTC 纳秒) + 数值 float32，np.load(mmap_mode='r') 直接映射
+#   4. 历史曲线: 二分定位时间范围，按聚合间隔求窗口均值 (与 aggregateWindow 相同的窗口对齐)
+#   5. 批次对比: 由归档计算统计汇总 (本地汇总索引缺失时使用)
+#   6. 续炼/恢复时删除旧归档 (批次数据会继续增加)，删除批次数据时同步删除
+# ============================================================
+# 目录结构 (data/batch_archive/<批次号>/):
+#   - meta.json                 批次号、起止时间、各曲线点数、生成时间
+#   - <曲线键名>.time.npy        int64 UTC 纳秒时间戳 (升序)
+#   - <曲线键名>.value.npy       float32 数值
+#   曲线键名见 HistoryQueryService.HISTORY_SERIES_KEYS，无数据的曲线不生成文件
+# ============================================================
+# 容量估算:
+#   - 每个点 12 字节，20 小时 0.2s 批次约 36 万点/曲线，全部曲线约 40 MB
+#   - 归档独立于 InfluxDB 保留策略，可作为冷备份
+# ============================================================
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+# 计算项目根目录的绝对路径 (避免工作目录变化导致路径问题)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ARCHIVE_DIR = os.path.join(_PROJECT_ROOT, "data", "batch_archive")
+
+# 归档格式版本 (格式变化时旧归档视为不存在，回退 InfluxDB)
+_ARCHIVE_VERSION = 1
+
+_META_FILE = "meta.json"
+_TIME_SUFFIX = ".time.npy"
+_VALUE_SUFFIX = ".value.npy"
+
+# 查询时间范围前后余量 (批次号过滤，余量只用于覆盖时钟误差)
+_RANGE_MARGIN = timedelta(seconds=60)
+
+# 生成失败后的最大尝试次数
+_MAX_ATTEMPTS = 3
+
+# 内存中保持映射的批次数
+_MAX_OPEN = 8
+
+# 阶梯数据不做窗口聚合 (与 query_history_series 一致)
+_RAW_KEYS = ("feeding_total",)
+
+# 曲线: (时间戳数组 int64 纳秒, 数值数组 float32)
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+class _Job:
+    __slots__ = ('batch_code', 'start_time', 'end_time', 'due', 'attempts')
+
+    def __init__(self, batch_code: str, start_time: datetime, end_time: datetime, due: float):
+        self.batch_code = batch_code
+        self.start_time = start_time
+        self.end_time = end_time
+        self.due = due                     # 最早执行时间 (单调时钟)
+        self.attempts = 0
+
+
+class BatchArchive:
+    """批次列存归档 (线程安全，单例通过 get_batch_archive() 获取)"""
+
+    # 1. 初始化 (后台线程在首次提交任务时启动)
+    def __init__(self, directory: Optional[str] = None, delay: float = settings.batch_archive_delay):
+        self._dir = directory or settings.batch_archive_dir or DEFAULT_ARCHIVE_DIR
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _Job] = {}
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._open: "OrderedDict[str, Tuple[Dict[str, Any], Dict[str, Series]]]" = OrderedDict()
+        self._stats = {'builds': 0, 'failures': 0, 'deferred': 0, 'hits': 0, 'last_build_s': 0.0}
+
+    # 2. 提交归档任务 (批次停止/终止时调用，立即返回)
+    def schedule(self, batch_code: str, start_time: datetime, end_time: datetime):
+        if not settings.batch_archive_enabled or not batch_code:
+            return
+        meta = self.get_meta(batch_code)
+        if meta and meta.get('end_time') == end_time.isoformat():
+            return
+
+        job = _Job(batch_code, start_time, end_time, time.monotonic() + self._delay)
+        with self._lock:
+            self._jobs[batch_code] = job
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="BatchArchive", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        logger.info(f"批次 {batch_code} 归档任务已提交 ({self._delay:.0f}s 后执行)")
+
+    # 3. 删除归档并取消未执行的任务 (续炼/恢复/删除批次数据时调用)
+    def discard(self, batch_code: str):
+        with self._lock:
+            self._jobs.pop(batch_code, None)
+            self._open.pop(batch_code, None)
+        path = self._batch_dir(batch_code)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            logger.info(f"批次 {batch_code} 归档已删除")
+
+    # 4. 归档信息 (不存在或版本不符时返回 None)
+    def get_meta(self, batch_code: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self._batch_dir(batch_code), _META_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == _ARCHIVE_VERSION else None
+
+    def has(self, batch_code: str) -> bool:
+        return self.get_meta(batch_code) is not None
+
+    # 5. 读取曲线 (时间范围内，按 every 秒窗口求均值)
+    def query_series(
+        self,
+        batch_code: str,
+        start_utc: Optional[datetime],
+        end_utc: Optional[datetime],
+        every: Optional[int],
+        keys,
+    ) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Args:
+            batch_code: 批次号
+            start_utc / end_utc: 时间范围 (UTC，[start, end))，None 表示不限
+            every: 聚合窗口 (秒)，None 表示返回原始数据点
+            keys: 曲线键名列表
+
+        Returns:
+            {曲线键名: (时间戳数组 (秒), 数值数组 float64)}，格式同 query_history_series；
+            没有归档时返回 None
+        """
+        opened = self._get_open(batch_code)
+        if opened is None:
+            return None
+        _, series = opened
+
+        start_ns = _to_ns(start_utc) if start_utc else None
+        stop_ns = _to_ns(end_utc) if end_utc else None
+        result = {}
+        for key in keys:
+            if key not in series:
+                result[key] = (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64))
+                continue
+            t, v = series[key]
+            i0 = int(np.searchsorted(t, start_ns, 'left')) if start_ns is not None else 0
+            i1 = int(np.searchsorted(t, stop_ns, 'left')) if stop_ns is not None else t.size
+            if every and key not in _RAW_KEYS:
+                result[key] = _window_mean(t[i0:i1], v[i0:i1], every * 1_000_000_000, stop_ns)
+            else:
+                result[key] = (t[i0:i1] / 1e9, v[i0:i1].astype(np.float64))
+
+        with self._lock:
+            self._stats['hits'] += 1
+        return result
+
+    # 6. 由归档计算批次统计汇总 (格式同 HistoryQueryService.query_batch_statistics)
+    def summarize(self, batch_code: str) -> Optional[Dict[str, Any]]:
+        opened = self._get_open(batch_code)
+        if opened is None:
+            return None
+        _, series = opened
+
+        def peak(key: str) -> float:
+            if key not in series:
+                return 0.0
+            return float(np.max(series[key][1]))
+
+        # 开炉时长: 弧流第一个到最后一个数据点 (无弧流数据时取全部曲线的首尾)
+        if "arc_current_U" in series:
+            first, last = int(series["arc_current_U"][0][0]), int(series["arc_current_U"][0][-1])
+        else:
+            first = min(int(t[0]) for t, _ in series.values())
+            last = max(int(t[-1]) for t, _ in series.values())
+
+        beijing = timezone(timedelta(hours=8))
+        return {
+            'batch_code': batch_code,
+            'energy_total': peak("energy_total"),
+            'feeding_total': peak("feeding_total"),
+            'shell_water_total': peak("furnace_shell_water_total"),
+            'cover_water_total': peak("furnace_cover_water_total"),
+            'duration_hours': (last - first) / 1e9 / 3600.0,
+            'start_time': datetime.fromtimestamp(first / 1e9, tz=beijing).isoformat(),
+            'end_time': datetime.fromtimestamp(last / 1e9, tz=beijing).isoformat(),
+        }
+
+    # 7. 同步生成归档 (后台线程调用；成功返回 True)
+    def build(self, batch_code: str, start_time: datetime, end_time: datetime, job: Optional[_Job] = None) -> bool:
+        """job 不为 None 时，生成期间任务被取消/替代 (续炼、恢复、删除批次) 则丢弃结果"""
+        from backend.bridge.history_query import get_history_query_service, HISTORY_SERIES_KEYS
+
+        started = time.perf_counter()
+        start_time = self._catalog_start(batch_code, start_time)
+        range_start = start_time - _RANGE_MARGIN
+        range_stop = end_time + _RANGE_MARGIN
+        step = timedelta(minutes=settings.export_chunk_minutes)
+
+        final_dir = self._batch_dir(batch_code)
+        work_dir = final_dir + ".building"
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.makedirs(work_dir, exist_ok=True)
+
+        parts = {}
+        counts = {key: 0 for key in HISTORY_SERIES_KEYS}
+        try:
+            parts = {
+                key: (open(os.path.join(work_dir, f"{key}.time.bin"), 'wb'),
+                      open(os.path.join(work_dir, f"{key}.value.bin"), 'wb'))
+                for key in HISTORY_SERIES_KEYS
+            }
+
+            # 1. 分段查询原始数据，逐段追加 (分段首尾相接，各段内已按时间排序)
+            history_service = get_history_query_service()
+            chunk_start = range_start.replace(microsecond=0)
+            while chunk_start < range_stop:
+                chunk_end = min(chunk_start + step, range_stop)
+                for key, (x, y) in history_service.query_raw_series(batch_code, chunk_start, chunk_end).items():
+                    if key not in parts or not len(x):
+                        continue
+                    # 秒 (float64) -> 纳秒，按微秒取整 (float64 秒级时间戳的精度约 0.2 微秒)
+                    t_ns = np.round(x * 1e6).astype('<i8') * 1000
+                    parts[key][0].write(t_ns.tobytes())
+                    parts[key][1].write(np.asarray(y, dtype='<f4').tobytes())
+                    counts[key] += t_ns.size
+                chunk_start = chunk_end
+
+            for time_part, value_part in parts.values():
+                time_part.close()
+                value_part.close()
+
+            if not any(counts.values()):
+                logger.warning(f"批次 {batch_code} 没有数据，不生成归档")
+                shutil.rmtree(work_dir, ignore_errors=True)
+                return False
+
+            # 2. 临时文件转为 .npy (无数据的曲线不生成文件)
+            for key, count in counts.items():
+                time_bin = os.path.join(work_dir, f"{key}.time.bin")
+                value_bin = os.path.join(work_dir, f"{key}.value.bin")
+                if count:
+                    _pack_npy(time_bin, os.path.join(work_dir, key + _TIME_SUFFIX), '<i8', count)
+                    _pack_npy(value_bin, os.path.join(work_dir, key + _VALUE_SUFFIX), '<f4', count)
+                os.remove(time_bin)
+                os.remove(value_bin)
+
+            meta = {
+                'version': _ARCHIVE_VERSION,
+                'batch_code': batch_code,
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+                'series': {key: count for key, count in counts.items() if count},
+                'created_at': datetime.now().isoformat(),
+            }
+            with open(os.path.join(work_dir, _META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+
+            # 3. 替换旧归档 (持有锁检查任务仍有效；先释放映射，Windows 下映射中的文件无法删除)
+            old_dir = final_dir + ".old"
+            with self._lock:
+                if job is not None and self._jobs.get(batch_code) is not job:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                    logger.info(f"批次 {batch_code} 归档期间任务已取消，丢弃生成结果")
+                    return False
+                self._open.pop(batch_code, None)
+                if os.path.isdir(final_dir):
+                    shutil.rmtree(old_dir, ignore_errors=True)
+                    os.replace(final_dir, old_dir)
+                os.replace(work_dir, final_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats['builds'] += 1
+                self._stats['last_build_s'] = round(elapsed, 2)
+            logger.info(f"批次 {batch_code} 归档完成: {sum(counts.values())} 点, 耗时 {elapsed:.1f}s")
+            return True
+
+        except Exception as e:
+            for time_part, value_part in parts.values():
+                time_part.close()
+                value_part.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+            with self._lock:
+                self._stats['failures'] += 1
+            logger.error(f"批次 {batch_code} 归档失败: {e}")
+            return False
+
+    # 8. 统计 {builds, failures, deferred, hits, last_build_s, pending, open, directory}
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'pending': len(self._jobs),
+                'open': len(self._open),
+                'directory': self._dir,
+            }
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _batch_dir(self, batch_code: str) -> str:
+        return os.path.join(self._dir, batch_code)
+
+    def _get_open(self, batch_code: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Series]]]:
+        if not settings.batch_archive_enabled or not batch_code:
+            return None
+        with self._lock:
+            opened = self._open.get(batch_code)
+            if opened is not None:
+                self._open.move_to_end(batch_code)
+                return opened
+
+        meta = self.get_meta(batch_code)
+        if meta is None:
+            return None
+        path = self._batch_dir(batch_code)
+        try:
+            series = {
+                key: (np.load(os.path.join(path, key + _TIME_SUFFIX), mmap_mode='r'),
+                      np.load(os.path.join(path, key + _VALUE_SUFFIX), mmap_mode='r'))
+                for key in meta['series']
+            }
+        except (OSError, ValueError) as e:
+            logger.error(f"读取批次 {batch_code} 归档失败: {e}")
+            return None
+
+        with self._lock:
+            self._open[batch_code] = (meta, series)
+            while len(self._open) > _MAX_OPEN:
+                self._open.popitem(last=False)
+        return meta, series
+
+    def _catalog_start(self, batch_code: str, start_time: datetime) -> datetime:
+        """续炼批次以批次目录中最早的开始时间为准"""
+        try:
+            from backend.services.batch_catalog import get_batch_catalog
+            entry = get_batch_catalog().get(batch_code)
+            if entry and entry.get('start_time'):
+                return min(start_time, datetime.fromisoformat(entry['start_time']))
+        except Exception as e:
+            logger.warning(f"读取批次目录失败: {e}")
+        return start_time
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            wait = job.due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            with self._lock:
+                if self._jobs.get(job.batch_code) is not job:
+                    continue        # 已被取消或被新任务替代
+
+            # InfluxDB 不可用或离线缓冲未回放完: 数据不完整，推迟
+            if not _writes_settled():
+                with self._lock:
+                    self._stats['deferred'] += 1
+                self._requeue(job)
+                continue
+
+            job.attempts += 1
+            if self.build(job.batch_code, job.start_time, job.end_time, job) or job.attempts >= _MAX_ATTEMPTS:
+                with self._lock:
+                    if self._jobs.get(job.batch_code) is job:
+                        del self._jobs[job.batch_code]
+            else:
+                self._requeue(job)
+
+    def _requeue(self, job: _Job):
+        job.due = time.monotonic() + self._delay
+        self._queue.put(job)
+
+
+def _writes_settled() -> bool:
+    try:
+        from backend.core.influx_writer import get_influx_writer
+        stats = get_influx_writer().get_metrics()
+    except Exception:
+        return True
+    spool = stats.get('spool') or {}
+    return not stats.get('influx_down') and not spool.get('pending_bytes')
+
+
+def _to_ns(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(round(value.timestamp() * 1e6)) * 1000
+
+
+def _window_mean(t: np.ndarray, v: np.ndarray, every_ns: int, stop_ns: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """按 every_ns 对齐的窗口求均值，时间戳取窗口结束时刻 (与 aggregateWindow 默认行为一致)"""
+    if not t.size:
+        return (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64))
+    window = np.asarray(t) // every_ns
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(window)) + 1))
+    sums = np.add.reduceat(np.asarray(v, dtype=np.float64), starts)
+    counts = np.diff(np.append(starts, t.size))
+    stops = (window[starts] + 1) * every_ns
+    if stop_ns is not None:
+        np.minimum(stops, stop_ns, out=stops)
+    return (stops / 1e9, sums / counts)
+
+
+def _pack_npy(source_path: str, target_path: str, dtype: str, count: int):
+    """原始字节文件 -> .npy (写入头部后整块复制，不载入内存)"""
+    header = {'descr': dtype, 'fortran_order': False, 'shape': (count,)}
+    with open(target_path, 'wb') as target, open(source_path, 'rb') as source:
+        np.lib.format.write_array_header_1_0(target, header)
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+
+
+# ============================================================
+# 单例
+# ============================================================
+_batch_archive: Optional[BatchArchive] = None
+
+
+def get_batch_archive() -> BatchArchive:
+    global _batch_archive
+    if _batch_archive is None:
+        _batch_archive = BatchArchive()
+    return _batch_archive
@@ -0,0 +1,205 @@
+# ============================================================
+# 文件说明: batch_catalog.py - 批次目录本地索引
+# ============================================================
+# 功能:
+#   1. 维护批次目录 (批次号、起止时间、炉号、状态)
+#   2. BatchService 开始/暂停/恢复/终止/停止时增量更新
+#   3. 与 InfluxDB 对账 (补录遗漏批次、修正起止时间)
+#   4. 批次下拉框/时间范围直接读取本地目录，不再扫描 90 天数据
+# ============================================================
+# 文件结构 (data/batch_catalog.json):
+#   {
+#     "reconciled_at": str | null,     # 上次对账时间 (UTC ISO)，下次对账从此处增量查询
+#     "batches": {
+#       "批次号": {
+#         "batch_code", "furnace_number",
+#         "start_time", "end_time",    # 北京时间 ISO (无时区)，运行中 end_time 为 null
+#         "status",                    # running/paused/terminated/stopped/imported
+#         "updated_at"
+#       }, ...
+#     }
+#   }
+# ============================================================
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 计算项目根目录的绝对路径 (避免工作目录变化导致路径问题)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DATA_DIR = os.path.join(_PROJECT_ROOT, "data")
+
+# 批次状态
+STATUS_RUNNING = "running"        # 冶炼中
+STATUS_PAUSED = "paused"          # 暂停
+STATUS_TERMINATED = "terminated"  # 已终止 (保留批次号)
+STATUS_STOPPED = "stopped"        # 已结束
+STATUS_IMPORTED = "imported"      # 对账时从 InfluxDB 补录
+
+
+class BatchCatalog:
+    """批次目录 (线程安全，单例通过 get_batch_catalog() 获取)"""
+
+    CATALOG_FILE = os.path.join(_DATA_DIR, "batch_catalog.json")
+
+    # 1. 初始化 (延迟到首次访问时加载文件)
+    def __init__(self, path: str = CATALOG_FILE):
+        self._path = path
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+
+    # 2. 批次开始 (续炼时保留最早的开始时间)
+    def mark_started(self, batch_code: str, start_time: datetime):
+        with self._lock:
+            entry = self._entry(batch_code)
+            start_iso = start_time.isoformat()
+            if not entry.get('start_time') or start_iso < entry['start_time']:
+                entry['start_time'] = start_iso
+            entry['end_time'] = None
+            entry['status'] = STATUS_RUNNING
+            self._save()
+
+    # 3. 批次状态变化 (暂停/恢复/终止/停止)
+    def mark_status(self, batch_code: str, status: str, end_time: Optional[datetime] = None):
+        with self._lock:
+            entry = self._entry(batch_code)
+            entry['status'] = status
+            if end_time is not None:
+                entry['end_time'] = end_time.isoformat()
+            elif status == STATUS_RUNNING:
+                entry['end_time'] = None
+            self._save()
+
+    # 4. 批次列表 (按开始时间倒序)
+    def list_batches(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            batches = [dict(entry) for entry in self._load()['batches'].values() if entry.get('start_time')]
+        batches.sort(key=lambda entry: entry['start_time'], reverse=True)
+        return batches[:limit]
+
+    # 5. 查询单个批次
+    def get(self, batch_code: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load()['batches'].get(batch_code)
+            return dict(entry) if entry else None
+
+    # 6. 是否从未对账 (首次使用时需要全量导入)
+    def is_empty(self) -> bool:
+        with self._lock:
+            data = self._load()
+            return not data['batches'] and not data.get('reconciled_at')
+
+    # 7. 上次对账时间 (UTC)
+    def get_reconciled_at(self) -> Optional[datetime]:
+        with self._lock:
+            value = self._load().get('reconciled_at')
+        return datetime.fromisoformat(value) if value else None
+
+    # 8. 合并 InfluxDB 对账结果
+    def merge_time_ranges(
+        self,
+        ranges: Dict[str, Tuple[datetime, datetime]],
+        reconciled_at: Optional[datetime] = None
+    ) -> int:
+        """
+        合并对账结果 (只扩展起止时间，不缩小)
+
+        Args:
+            ranges: {批次号: (首条数据时间, 末条数据时间)}，北京时间 (无时区)
+            reconciled_at: 本次对账时间 (UTC)，单个批次补录时为 None
+
+        Returns:
+            新增批次数量
+        """
+        added = 0
+        with self._lock:
+            batches = self._load()['batches']
+            for batch_code, (start_time, end_time) in ranges.items():
+                if batch_code not in batches:
+                    added += 1
+                entry = self._entry(batch_code)
+                if not entry.get('status'):
+                    entry['status'] = STATUS_IMPORTED
+
+                start_iso = start_time.isoformat()
+                if not entry.get('start_time') or start_iso < entry['start_time']:
+                    entry['start_time'] = start_iso
+
+                # 运行中的批次没有结束时间
+                if entry['status'] not in (STATUS_RUNNING, STATUS_PAUSED):
+                    end_iso = end_time.isoformat()
+                    if not entry.get('end_time') or end_iso > entry['end_time']:
+                        entry['end_time'] = end_iso
+
+            if reconciled_at is not None:
+                self._load()['reconciled_at'] = reconciled_at.isoformat()
+            self._save()
+        return added
+
+    # 9. 删除批次 (批次数据被删除时调用)
+    def remove(self, batch_code: str):
+        with self._lock:
+            if self._load()['batches'].pop(batch_code, None) is not None:
+                self._save()
+
+    # ------------------------------------------------------------
+    # 内部方法 (调用方已持有锁)
+    # ------------------------------------------------------------
+    def _entry(self, batch_code: str) -> Dict[str, Any]:
+        batches = self._load()['batches']
+        entry = batches.get(batch_code)
+        if entry is None:
+            entry = batches[batch_code] = {
+                'batch_code': batch_code,
+                'furnace_number': _parse_furnace_number(batch_code),
+                'start_time': None,
+                'end_time': None,
+                'status': None,
+            }
+        entry['updated_at'] = datetime.now().isoformat()
+        return entry
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = {'reconciled_at': None, 'batches': {}}
+            try:
+                if os.path.exists(self._path):
+                    with open(self._path, 'r', encoding='utf-8') as f:
+                        self._data.update(json.load(f))
+            except Exception as e:
+                logger.error(f"加载批次目录失败: {e}")
+        return self._data
+
+    def _save(self):
+        tmp_path = self._path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path)
+        except Exception as e:
+            logger.error(f"保存批次目录失败: {e}")
+
+
+def _parse_furnace_number(batch_code: str) -> Optional[int]:
+    """从批次号 (YYMMFFDD) 解析炉号"""
+    if len(batch_code) == 8 and batch_code.isdigit():
+        return int(batch_code[4:6])
+    return None
+
+
+# ============================================================
+# 单例
+# ============================================================
+_batch_catalog: Optional[BatchCatalog] = None
+
+
+def get_batch_catalog() -> BatchCatalog:
+    global _batch_catalog
+    if _batch_catalog is None:
+        _batch_catalog = BatchCatalog()
+    return _batch_catalog
@@ -6,6 +6,9 @@
 #   2. 维护当前批次编号 (batch_code)
 #   3. 支持暂停/恢复冶炼（保留批次号）
 #   4. 断电恢复保护（状态持久化到文件）
+#   5. 批次终止/停止时写入统计汇总（batch_summary_store）
+#   6. 状态变化时增量更新批次目录（batch_catalog）
+#   7. 批次终止/停止时提交列存归档任务（batch_archive），续炼/恢复时删除旧归档
 # ============================================================
 
 import json
@@ -147,9 +150,13 @@ class BatchService:
         # 只需要重置累计器（清空队列、设置批次号）
         print(f"[BatchService] 开始冶炼：批次号 {batch_code}")
         self._reset_accumulators(batch_code)
+        self._reset_alarm_engine()
+        self._flush_rollup()
         
         # 持久化状态
         self._save_state_to_file()
+        self._update_catalog("running")
+        self._discard_archive()
         
         return {
             "success": True,
@@ -202,6 +209,7 @@ class BatchService:
         
         # 持久化状态
         self._save_state_to_file()
+        self._update_catalog("paused")
         
         return {
             "success": True,
@@ -233,6 +241,8 @@ class BatchService:
         
         # 持久化状态
         self._save_state_to_file()
+        self._update_catalog("running")
+        self._discard_archive()
         
         return {
             "success": True,
@@ -270,6 +280,11 @@ class BatchService:
         
         # 持久化状态
         self._save_state_to_file()
+        self._update_catalog("terminated", self._pause_time)
+        
+        # 写入批次统计汇总（终止后不再写数据库，累计值已是最终值）
+        self._record_batch_summary(self._pause_time)
+        self._schedule_archive(self._pause_time)
         
         return {
             "success": True,
@@ -308,6 +323,16 @@ class BatchService:
             # 3. 能耗计算器（无缓存，跳过）
             # 能耗数据是实时计算并批量写入的，无需单独刷新
             
+            # 4. 输出未结束的汇总窗口 (10s/1m/10m)
+            #    批次仍可能在运行: 保留累计，同一窗口后续样本继续合并
+            try:
+                from backend.services.rollup_aggregator import get_rollup_aggregator
+                get_rollup_aggregator().flush_all(final=False)
+                flushed_services.append("汇总数据")
+            except Exception as e:
+                errors.append(f"汇总数据: {e}")
+                print(f"[ERROR] 汇总数据刷新失败: {e}")
+            
             if errors:
                 return {
                     "success": False,
@@ -342,6 +367,13 @@ class BatchService:
                 "message": "当前没有进行中的冶炼"
             }
         
+        # 写入批次统计汇总（已终止的批次以终止时间为结束时间）
+        end_time = self._pause_time if self._state == SmeltingState.PAUSED else datetime.now()
+        self._record_batch_summary(end_time)
+        self._update_catalog("stopped", end_time)
+        self._schedule_archive(end_time)
+        self._flush_rollup()
+        
         # 记录结束信息
         summary = {
             "batch_code": self._batch_code,
@@ -371,6 +403,111 @@ class BatchService:
             "summary": summary
         }
     
+    def build_live_summary(self, end_time: Optional[datetime] = None) -> Optional[dict]:
+        """
+        根据内存累计器生成当前批次统计汇总（格式同 HistoryQueryService.query_batch_statistics）
+        
+        Returns:
+            统计汇总字典，无进行中批次时返回 None
+        """
+        if not self._batch_code or not self._start_time:
+            return None
+        
+        end_time = end_time or datetime.now()
+        summary = {
+            'batch_code': self._batch_code,
+            'energy_total': 0.0,
+            'feeding_total': 0.0,
+            'shell_water_total': 0.0,
+            'cover_water_total': 0.0,
+            'duration_hours': max(0.0, (end_time - self._start_time).total_seconds() / 3600.0),
+            'start_time': self._start_time.isoformat(),
+            'end_time': end_time.isoformat()
+        }
+        
+        try:
+            from backend.services.db1.power_energy_calculator import get_power_energy_calculator
+            summary['energy_total'] = get_power_energy_calculator().get_realtime_data()['energy_total']
+        except Exception as e:
+            print(f"[BatchService] 读取累计能耗失败: {e}")
+        
+        try:
+            from backend.services.hopper.accumulator import get_feeding_plc_accumulator
+            summary['feeding_total'] = get_feeding_plc_accumulator().get_feeding_total()
+        except Exception as e:
+            print(f"[BatchService] 读取累计投料失败: {e}")
+        
+        try:
+            from backend.services.db32.cooling_water_calculator import get_cooling_water_calculator
+            volumes = get_cooling_water_calculator().get_total_volumes()
+            summary['shell_water_total'] = volumes['furnace_shell']
+            summary['cover_water_total'] = volumes['furnace_cover']
+        except Exception as e:
+            print(f"[BatchService] 读取冷却水累计流量失败: {e}")
+        
+        return summary
+    
+    def _record_batch_summary(self, end_time: Optional[datetime]):
+        """写入批次统计汇总到本地索引（批次对比直接读取）"""
+        try:
+            summary = self.build_live_summary(end_time)
+            if summary:
+                from backend.services.batch_summary_store import get_batch_summary_store
+                get_batch_summary_store().put(summary, source="live")
+                print(f"[BatchService] 批次统计汇总已保存: {summary['batch_code']}")
+        except Exception as e:
+            print(f"[BatchService] 保存批次统计汇总失败: {e}")
+    
+    def _update_catalog(self, status: str, end_time: Optional[datetime] = None):
+        """增量更新批次目录（批次下拉框直接读取）"""
+        if not self._batch_code:
+            return
+        try:
+            from backend.services.batch_catalog import get_batch_catalog
+            catalog = get_batch_catalog()
+            if status == "running" and self._start_time:
+                catalog.mark_started(self._batch_code, self._start_time)
+            else:
+                catalog.mark_status(self._batch_code, status, end_time)
+        except Exception as e:
+            print(f"[BatchService] 更新批次目录失败: {e}")
+    
+    def _reset_alarm_engine(self):
+        """清除报警状态机（新批次不继承上一批次的报警/计时）"""
+        try:
+            from backend.services.alarm_engine import get_alarm_engine
+            get_alarm_engine().reset()
+        except Exception as e:
+            print(f"[BatchService] 重置报警引擎失败: {e}")
+    
+    def _flush_rollup(self):
+        """输出并清空所有未结束的汇总窗口（批次停止/切换时调用）"""
+        try:
+            from backend.services.rollup_aggregator import get_rollup_aggregator
+            get_rollup_aggregator().flush_all(final=True)
+        except Exception as e:
+            print(f"[BatchService] 输出汇总窗口失败: {e}")
+    
+    def _schedule_archive(self, end_time: Optional[datetime]):
+        """提交批次列存归档任务（后台线程延迟生成）"""
+        if not self._batch_code or not self._start_time or not end_time:
+            return
+        try:
+            from backend.services.batch_archive import get_batch_archive
+            get_batch_archive().schedule(self._batch_code, self._start_time, end_time)
+        except Exception as e:
+            print(f"[BatchService] 提交批次归档任务失败: {e}")
+    
+    def _discard_archive(self):
+        """续炼/恢复时删除旧归档（批次数据会继续增加）"""
+        if not self._batch_code:
+            return
+        try:
+            from backend.services.batch_archive import get_batch_archive
+            get_batch_archive().discard(self._batch_code)
+        except Exception as e:
+            print(f"[BatchService] 删除批次归档失败: {e}")
+    
     def get_status(self) -> dict:
         """
         获取当前状态（用于前端轮询和断电恢复）
@@ -449,6 +586,9 @@ class BatchService:
                 # 断电恢复时也需要重置累计器，设置批次号
                 if self._batch_code:
                     self._reset_accumulators(self._batch_code)
+                
+                # 已终止的批次恢复为运行后会继续写入，删除终止时生成的归档
+                self._discard_archive()
             else:
                 # 空闲状态也恢复 last_batch_code（用于续炼判断）
                 self._last_batch_code = state_data.get("last_batch_code")
@@ -0,0 +1,125 @@
+# ============================================================
+# 文件说明: batch_summary_store.py - 批次统计汇总本地索引
+# ============================================================
+# 功能:
+#   1. 持久化每个批次的统计汇总 (能耗/投料/冷却水/开炉时长)
+#   2. 批次停止/终止时由 BatchService 写入 (取自内存累计器，无需查询数据库)
+#   3. 旧批次首次对比时从 InfluxDB 查询一次后回填
+#   4. 批次对比直接读取本地索引，不再逐批次查询 InfluxDB
+# ============================================================
+# 文件结构 (data/batch_summary.json):
+#   {
+#     "批次号": {
+#       "batch_code", "energy_total", "feeding_total",
+#       "shell_water_total", "cover_water_total", "duration_hours",
+#       "start_time", "end_time",
+#       "source": "live" | "influx",    # 数据来源
+#       "updated_at": str
+#     }, ...
+#   }
+# ============================================================
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from loguru import logger
+
+# 计算项目根目录的绝对路径 (避免工作目录变化导致路径问题)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DATA_DIR = os.path.join(_PROJECT_ROOT, "data")
+
+# 汇总数值字段 (与 HistoryQueryService.query_batch_statistics 返回格式一致)
+SUMMARY_VALUE_KEYS = (
+    'energy_total',
+    'feeding_total',
+    'shell_water_total',
+    'cover_water_total',
+    'duration_hours',
+)
+
+
+class BatchSummaryStore:
+    """批次统计汇总存储 (线程安全，单例通过 get_batch_summary_store() 获取)"""
+
+    SUMMARY_FILE = os.path.join(_DATA_DIR, "batch_summary.json")
+
+    # 1. 初始化 (延迟到首次访问时加载文件)
+    def __init__(self, path: str = SUMMARY_FILE):
+        self._path = path
+        self._lock = threading.Lock()
+        self._summaries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # 2. 查询单个批次汇总
+    def get(self, batch_code: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self._load().get(batch_code)
+            return dict(summary) if summary else None
+
+    # 3. 批量查询 (返回已有的批次，缺失的批次不在结果中)
+    def get_many(self, batch_codes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            summaries = self._load()
+            return {code: dict(summaries[code]) for code in batch_codes if code in summaries}
+
+    # 4. 写入/覆盖批次汇总
+    def put(self, summary: Dict[str, Any], source: str):
+        batch_code = summary.get('batch_code')
+        if not batch_code:
+            return
+        record = {
+            'batch_code': batch_code,
+            **{key: float(summary.get(key) or 0.0) for key in SUMMARY_VALUE_KEYS},
+            'start_time': summary.get('start_time'),
+            'end_time': summary.get('end_time'),
+            'source': source,
+            'updated_at': datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._load()[batch_code] = record
+            self._save()
+
+    # 5. 删除批次汇总 (批次数据被删除时调用)
+    def remove(self, batch_code: str):
+        with self._lock:
+            if self._load().pop(batch_code, None) is not None:
+                self._save()
+
+    # ------------------------------------------------------------
+    # 内部方法 (调用方已持有锁)
+    # ------------------------------------------------------------
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._summaries is None:
+            self._summaries = {}
+            try:
+                if os.path.exists(self._path):
+                    with open(self._path, 'r', encoding='utf-8') as f:
+                        self._summaries = json.load(f)
+            except Exception as e:
+                logger.error(f"加载批次汇总索引失败: {e}")
+        return self._summaries
+
+    def _save(self):
+        tmp_path = self._path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._summaries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path)
+        except Exception as e:
+            logger.error(f"保存批次汇总索引失败: {e}")
+
+
+# ============================================================
+# 单例
+# ============================================================
+_batch_summary_store: Optional[BatchSummaryStore] = None
+
+
+def get_batch_summary_store() -> BatchSummaryStore:
+    global _batch_summary_store
+    if _batch_summary_store is None:
+        _batch_summary_store = BatchSummaryStore()
+    return _batch_summary_store
@@ -1,122 +1,375 @@
 """
-数据导出服务 - 导出历史数据为 Excel
+数据导出服务 - 原始分辨率历史数据流式导出 (Excel / CSV / NumPy 列存)
+
+    1. 按时间分段 (export_chunk_minutes) 查询 InfluxDB 原始数据，每段解析为列数组后立即写入文件
+       内存占用只与单段数据量有关，与批次时长无关 (20 小时 0.2s 批次 ≈ 每条曲线 36 万点)
+    2. 每段的全部曲线按时间戳合并为一张宽表: 时间 + 14 条曲线，某条曲线在该时刻没有采样时为空
+    3. 写入器:
+        - xlsx: openpyxl write_only 模式 (逐行写入临时文件，不在内存中构建单元格)，
+                超过单表行数上限时续写到 "原始数据_2" ...
+        - csv:  UTF-8 BOM (Excel 直接打开不乱码)
+        - npz:  每列先顺序写入临时 .bin 文件，结束时按 .npy 格式打包 (np.load 直接读取)
+    4. 在调用线程执行 (界面通过 QThread 调用)，每段完成后回调进度，段与段之间检查取消标志
+    5. 先写临时文件，完成后 os.replace 到目标路径；失败或取消时删除临时文件，不留下半个文件
 """
-from datetime import datetime
-from pathlib import Path
+import csv
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
 from loguru import logger
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+# 导出格式 (按文件扩展名选择)
+FORMAT_XLSX = 'xlsx'
+FORMAT_CSV = 'csv'
+FORMAT_NPZ = 'npz'
+EXPORT_FORMATS = (FORMAT_XLSX, FORMAT_CSV, FORMAT_NPZ)
+
+# 导出列: (曲线键名, 表头)，键名与 HistoryQueryService.HISTORY_SERIES_KEYS 一致
+EXPORT_COLUMNS = (
+    ("arc_current_U", "1#弧流 (A)"),
+    ("arc_current_V", "2#弧流 (A)"),
+    ("arc_current_W", "3#弧流 (A)"),
+    ("arc_voltage_U", "1#弧压 (V)"),
+    ("arc_voltage_V", "2#弧压 (V)"),
+    ("arc_voltage_W", "3#弧压 (V)"),
+    ("electrode_depth_1", "1#电极 (mm)"),
+    ("electrode_depth_2", "2#电极 (mm)"),
+    ("electrode_depth_3", "3#电极 (mm)"),
+    ("power_total", "功率 (kW)"),
+    ("energy_total", "能耗 (kWh)"),
+    ("feeding_total", "投料累计 (kg)"),
+    ("furnace_shell_water_total", "炉皮冷却水 (m³)"),
+    ("furnace_cover_water_total", "炉盖冷却水 (m³)"),
+)
+
+# Excel 单个工作表最大行数 (含表头)
+_XLSX_MAX_ROWS = 1048576
+
+# 数值保留小数位
+_DECIMALS = 3
+
+# 北京时间偏移 (毫秒)
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
+# 进度回调: (已完成段数, 总段数, 已写入行数)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+
+
+def format_beijing_times(timestamps: np.ndarray) -> np.ndarray:
+    """UTC 时间戳 (秒) 数组 -> 北京时间字符串数组 "YYYY-MM-DD HH:MM:SS.mmm" (向量化)"""
+    ms = np.round(timestamps * 1000).astype(np.int64) + _BEIJING_OFFSET_MS
+    text = np.datetime_as_string(ms.astype("datetime64[ms]"), unit="ms")
+    return np.char.replace(text, "T", " ")
+
+
+def merge_series(series: Dict[str, Any], keys: Sequence[str]):
+    """按时间戳合并多条曲线
+
+    Args:
+        series: {曲线键名: (时间戳数组, 数值数组)}
+        keys: 输出列顺序
+
+    Returns:
+        (时间戳数组 (n,), 数值矩阵 (n, len(keys)))，没有采样的位置为 NaN
+    """
+    parts = [series[key][0] for key in keys if key in series and len(series[key][0])]
+    if not parts:
+        return np.empty(0, dtype=np.float64), np.empty((0, len(keys)), dtype=np.float64)
+
+    times = np.unique(np.concatenate(parts))
+    matrix = np.full((times.size, len(keys)), np.nan, dtype=np.float64)
+    for col, key in enumerate(keys):
+        x, y = series.get(key, (None, None))
+        if x is None or not len(x):
+            continue
+        matrix[np.searchsorted(times, x), col] = y
+    return times, matrix
+
+
+# ============================================================
+# 写入器
+# ============================================================
+class _CsvWriter:
+    def __init__(self, path: str, headers: List[str]):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write(self, times: np.ndarray, matrix: np.ndarray):
+        labels = format_beijing_times(times).tolist()
+        rows = np.round(matrix, _DECIMALS).tolist()
+        self._writer.writerows(
+            [label] + [v if v == v else '' for v in row]
+            for label, row in zip(labels, rows)
+        )
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str, headers: List[str], info: List[List[Any]]):
+        import openpyxl
+        from openpyxl.styles import Font, PatternFill
+
+        self._path = path
+        self._headers = headers
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._header_font = Font(name='Microsoft YaHei', size=11, bold=True, color='FFFFFF')
+        self._header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+
+        # 说明页: 批次、时间范围、列说明
+        sheet = self._workbook.create_sheet("说明")
+        sheet.column_dimensions['A'].width = 16
+        sheet.column_dimensions['B'].width = 40
+        for row in info:
+            sheet.append(row)
+
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheet_count = 0
+
+    def write(self, times: np.ndarray, matrix: np.ndarray):
+        labels = format_beijing_times(times).tolist()
+        rows = np.round(matrix, _DECIMALS).tolist()
+        for label, row in zip(labels, rows):
+            if self._sheet is None or self._sheet_rows >= _XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append([label] + [v if v == v else None for v in row])
+            self._sheet_rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._new_sheet()
+        self._workbook.save(self._path)
+
+    def abort(self):
+        self._workbook.close()
+
+    def _new_sheet(self):
+        from openpyxl.cell import WriteOnlyCell
+
+        self._sheet_count += 1
+        title = "原始数据" if self._sheet_count == 1 else f"原始数据_{self._sheet_count}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.column_dimensions['A'].width = 24
+        self._sheet.freeze_panes = 'B2'
+        header = []
+        for text in self._headers:
+            cell = WriteOnlyCell(self._sheet, value=text)
+            cell.font = self._header_font
+            cell.fill = self._header_fill
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet_rows = 1
+
+
+class _NpzWriter:
+    """列存: 每列一个 .npy (float64)，time 列为 UTC 时间戳 (秒)"""
+
+    def __init__(self, path: str, keys: List[str], batch_code: str):
+        self._path = path
+        self._keys = ['time'] + list(keys)
+        self._batch_code = batch_code
+        self._parts_dir = tempfile.mkdtemp(prefix='export_', dir=os.path.dirname(os.path.abspath(path)))
+        self._parts = {key: open(os.path.join(self._parts_dir, f'{key}.bin'), 'wb') for key in self._keys}
+        self._rows = 0
+
+    def write(self, times: np.ndarray, matrix: np.ndarray):
+        self._parts['time'].write(np.ascontiguousarray(times, dtype='<f8').tobytes())
+        for col, key in enumerate(self._keys[1:]):
+            self._parts[key].write(np.ascontiguousarray(matrix[:, col], dtype='<f8').tobytes())
+        self._rows += times.size
+
+    def close(self):
+        for part in self._parts.values():
+            part.close()
+        header = {'descr': '<f8', 'fortran_order': False, 'shape': (self._rows,)}
+        try:
+            with zipfile.ZipFile(self._path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for key in self._keys:
+                    with archive.open(f'{key}.npy', 'w', force_zip64=True) as member, \
+                            open(os.path.join(self._parts_dir, f'{key}.bin'), 'rb') as source:
+                        np.lib.format.write_array_header_1_0(member, header)
+                        shutil.copyfileobj(source, member, length=1024 * 1024)
+                with archive.open('batch_code.npy', 'w') as member:
+                    np.lib.format.write_array(member, np.array(self._batch_code))
+        finally:
+            shutil.rmtree(self._parts_dir, ignore_errors=True)
+
+    def abort(self):
+        for part in self._parts.values():
+            part.close()
+        shutil.rmtree(self._parts_dir, ignore_errors=True)
 
 
 class DataExporter:
-    """数据导出服务"""
-    
-    # 1. 导出历史数据为 Excel
-    @staticmethod
-    def export_to_excel(
+    """数据导出服务 (单例通过 get_data_exporter() 获取)"""
+
+    # 1. 原始分辨率流式导出
+    def export_raw(
+        self,
         file_path: str,
         batch_code: str,
         start_time: datetime,
         end_time: datetime,
-        data_type: str,
-        data_list: list
-    ) -> bool:
+        progress: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        chunk_minutes: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
-        导出数据为 Excel
-        
-        参数:
-            file_path: 保存路径
-            batch_code: 批次编号
-            start_time: 起始时间
-            end_time: 截止时间
-            data_type: 数据类型（如 "1#弧流"）
-            data_list: 数据列表，格式 [{"time": datetime, "value": float}, ...]
-        
-        返回:
-            bool: 是否成功
+        导出批次原始数据 (在调用线程执行，耗时与数据量成正比)
+
+        Args:
+            file_path: 保存路径，扩展名决定格式 (.xlsx / .csv / .npz)
+            batch_code: 批次号
+            start_time: 开始时间（北京时间）
+            end_time: 结束时间（北京时间）
+            progress: 进度回调 (已完成段数, 总段数, 已写入行数)
+            cancel_event: 设置后在当前段完成时停止并删除临时文件
+            chunk_minutes: 单次查询时间跨度，默认 settings.export_chunk_minutes
+
+        Returns:
+            {"success", "cancelled", "message", "rows", "file_path"}
         """
+        fmt = os.path.splitext(file_path)[1].lstrip('.').lower()
+        if fmt not in EXPORT_FORMATS:
+            return self._result(False, f"不支持的导出格式: .{fmt}", file_path)
+
+        from backend.bridge.history_query import get_history_query_service
+        history_service = get_history_query_service()
+
+        start_time = start_time.replace(microsecond=0)
+        step = timedelta(minutes=chunk_minutes or settings.export_chunk_minutes)
+        total_chunks = max(1, int(np.ceil((end_time - start_time) / step)))
+        keys = [key for key, _ in EXPORT_COLUMNS]
+        headers = ["时间"] + [label for _, label in EXPORT_COLUMNS]
+
+        tmp_path = f"{file_path}.tmp"
+        writer = None
+        rows = 0
+        started = time.perf_counter()
         try:
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "历史数据"
-            
-            # 设置列宽
-            ws.column_dimensions['A'].width = 20
-            ws.column_dimensions['B'].width = 22
-            ws.column_dimensions['C'].width = 22
-            ws.column_dimensions['D'].width = 20
-            ws.column_dimensions['E'].width = 15
-            
-            # 表头样式
-            header_font = Font(name='Microsoft YaHei', size=12, bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-            header_alignment = Alignment(horizontal='center', vertical='center')
-            border = Border(
-                left=Side(style='thin', color='000000'),
-                right=Side(style='thin', color='000000'),
-                top=Side(style='thin', color='000000'),
-                bottom=Side(style='thin', color='000000')
-            )
-            
-            # 写入表头
-            headers = ['批次编号', '起始时间', '截止时间', '数据类型', '数据值']
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # 数据样式
-            data_font = Font(name='Microsoft YaHei', size=11)
-            data_alignment = Alignment(horizontal='center', vertical='center')
-            
-            # 格式化时间
-            start_time_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
-            end_time_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 写入数据
-            for row_idx, data_point in enumerate(data_list, start=2):
-                # 批次编号
-                cell = ws.cell(row=row_idx, column=1, value=batch_code)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = border
-                
-                # 起始时间
-                cell = ws.cell(row=row_idx, column=2, value=start_time_str)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = border
-                
-                # 截止时间
-                cell = ws.cell(row=row_idx, column=3, value=end_time_str)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = border
-                
-                # 数据类型
-                cell = ws.cell(row=row_idx, column=4, value=data_type)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = border
-                
-                # 数据值
-                value = data_point.get('value', 0)
-                cell = ws.cell(row=row_idx, column=5, value=round(value, 2))
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
-            logger.info(f"数据导出成功: {file_path}, 共 {len(data_list)} 条数据")
-            return True
-            
+            if fmt == FORMAT_XLSX:
+                writer = _XlsxWriter(tmp_path, headers, [
+                    ["批次编号", batch_code],
+                    ["起始时间", start_time.strftime('%Y-%m-%d %H:%M:%S')],
+                    ["截止时间", end_time.strftime('%Y-%m-%d %H:%M:%S')],
+                    ["导出时间", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+                    ["数据分辨率", "原始采样 (未聚合)"],
+                ])
+            elif fmt == FORMAT_CSV:
+                writer = _CsvWriter(tmp_path, headers)
+            else:
+                writer = _NpzWriter(tmp_path, keys, batch_code)
+
+            for index in range(total_chunks):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled()
+
+                chunk_start = start_time + step * index
+                chunk_end = min(chunk_start + step, end_time)
+                series = history_service.query_raw_series(batch_code, chunk_start, chunk_end)
+                times, matrix = merge_series(series, keys)
+                if times.size:
+                    writer.write(times, matrix)
+                    rows += times.size
+
+                if progress is not None:
+                    progress(index + 1, total_chunks, rows)
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+
+            writer.close()
+            writer = None
+            os.replace(tmp_path, file_path)
+
+            elapsed = time.perf_counter() - started
+            logger.info(f"原始数据导出完成: {file_path}, {rows} 行, {total_chunks} 段, 耗时 {elapsed:.1f}s")
+            return self._result(True, f"共导出 {rows} 行数据", file_path, rows)
+
+        except ExportCancelled:
+            logger.info(f"原始数据导出已取消: {file_path} (已处理 {rows} 行)")
+            return self._result(False, "导出已取消", file_path, rows, cancelled=True)
+
         except Exception as e:
-            logger.error(f"导出数据失败: {e}", exc_info=True)
-            return False
+            logger.error(f"原始数据导出失败: {e}", exc_info=True)
+            return self._result(False, f"导出失败: {str(e)}", file_path, rows)
+
+        finally:
+            if writer is not None:
+                writer.abort()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # 2. 导出少量汇总行为 Excel (write_only 模式，批次对比等小表格使用)
+    @staticmethod
+    def export_rows_to_excel(
+        file_path: str,
+        sheet_title: str,
+        headers: List[str],
+        rows: List[List[Any]],
+        column_widths: Optional[List[float]] = None,
+    ):
+        """写入单个工作表 (表头加粗填充，数据行无逐单元格样式)，失败时抛出异常"""
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_title)
+        for index, width in enumerate(column_widths or [], start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+
+        header_font = Font(name='Microsoft YaHei', size=12, bold=True, color='FFFFFF')
+        header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+        header = []
+        for text in headers:
+            cell = WriteOnlyCell(sheet, value=text)
+            cell.font = header_font
+            cell.fill = header_fill
+            header.append(cell)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+
+        tmp_path = f"{file_path}.tmp"
+        try:
+            workbook.save(tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _result(success: bool, message: str, file_path: str, rows: int = 0, cancelled: bool = False) -> Dict[str, Any]:
+        return {
+            "success": success,
+            "cancelled": cancelled,
+            "message": message,
+            "rows": rows,
+            "file_path": file_path,
+        }
 
 
 # 单例
@@ -129,4 +382,3 @@ def get_data_exporter() -> DataExporter:
     if _data_exporter is None:
         _data_exporter = DataExporter()
     return _data_exporter
-
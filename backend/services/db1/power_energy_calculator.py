@@ -30,6 +30,8 @@ from typing import Optional, Dict, Any, List
 from collections import deque
 from dataclasses import dataclass
 
+from backend.core.frame_recorder import frame_utcnow
+
 
 @dataclass
 class PowerDataPoint:
@@ -200,7 +202,7 @@ class PowerEnergyCalculator:
             power_total = power_U + power_V + power_W
             
             # 2. 创建数据点（只存储总功率）
-            now = datetime.now(timezone.utc)
+            now = frame_utcnow()  # 回放时为录制时间，保证能耗积分与现场一致
             point = PowerDataPoint(
                 power_U=power_U,  # 内部保留用于计算
                 power_V=power_V,  # 内部保留用于计算
@@ -251,7 +253,7 @@ class PowerEnergyCalculator:
             }
         """
         with self._data_lock:
-            now = datetime.now(timezone.utc)
+            now = frame_utcnow()  # 回放时为录制时间，保证能耗积分与现场一致
             
             # 检查数据点数量
             if len(self._power_queue) < 2:
@@ -54,6 +54,7 @@ from collections import deque
 from dataclasses import dataclass, field
 
 from backend.services.db32.valve_config import get_valve_config_service
+from backend.core.line_protocol import LineProtocolEncoder
 
 
 # ============================================================
@@ -68,6 +69,7 @@ _valve_openness_buffers: Dict[int, deque] = {
 }
 _valve_buffer_counts: Dict[int, int] = {1: 0, 2: 0, 3: 0, 4: 0}
 _valve_batch_size = 30  # 30次轮询后批量写入 (0.5s×30=15s)
+_valve_encoder = LineProtocolEncoder()  # line protocol 编码器 (缓冲区复用)
 
 
 # ============================================================
@@ -518,26 +520,18 @@ async def flush_valve_openness_buffers():
     if not all_points:
         return
     
-    # 转换为 InfluxDB Point 对象
-    from backend.core.influxdb import write_points_batch, build_point
+    # 直接编码为 line protocol (跳过 Point 对象构建)
+    from backend.core.influx_writer import get_influx_writer
+    from backend.core.line_protocol import encode_points
     
-    influx_points = []
-    for dp in all_points:
-        p = build_point(dp['measurement'], dp['tags'], dp['fields'], dp['time'])
-        if p:
-            influx_points.append(p)
-    
-    if not influx_points:
+    payload, point_count = encode_points(_valve_encoder, all_points)
+    if not point_count:
         return
     
-    try:
-        success, err = write_points_batch(influx_points)
-        if success:
-            print(f" [Valve] 批量写入成功: {len(influx_points)} 个蝶阀开度数据点")
-        else:
-            print(f" [Valve] 批量写入失败: {err}")
-    except Exception as e:
-        print(f" [Valve] 批量写入异常: {e}")
+    # 提交到异步写入队列 (不等待数据库)
+    result = get_influx_writer().submit([payload])
+    if result.dropped:
+        print(f" [Valve] 写入队列已满，丢弃 {result.dropped} 个数据点")
 
 
 def should_flush_valve_buffers() -> bool:
@@ -0,0 +1,271 @@
+# ============================================================
+# 文件说明: frame_replay.py - PLC 原始帧离线回放
+# ============================================================
+# 功能:
+#   1. 读取 FrameRecorder 录制的会话，按录制顺序送入处理函数
+#      (process_arc_data / process_modbus_data / process_hopper_plc_data / process_status_data / process_db41_data)
+#   2. 回放速度: 1x (按录制间隔) / Nx / max (不等待)
+#   3. 回放期间 frame_utcnow() 返回录制时间，能耗积分、投料记录、报警时间与现场一致
+#   4. 批量写入节奏与轮询循环一致 (DB1 每 20 帧、DB32/蝶阀每 30 帧)
+#   5. 回放结束输出能耗/投料/冷却水累计和分阶段耗时，可多次回放核对结果是否一致
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m backend.services.frame_replay data/frame_records/20260310_080000 --speed max
+#   python -m backend.services.frame_replay <会话目录> --speed 10 --batch-code 26039910
+#   python -m backend.services.frame_replay <会话目录> --speed max --repeat 2 --output replay.json
+# ============================================================
+# 说明:
+#   - 默认 InfluxDB 只读模式 (不写入)，--write-influx 时按 --batch-code 写入
+#   - 批次状态/批次目录/批次汇总写入临时目录，不影响 data/ 下的正式文件
+#   - 回放不写 PLC (DB19 排料标志清零因 PLC 未连接而跳过)
+# ============================================================
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from backend.core.frame_recorder import FrameReader, set_replay_wall_time
+
+# 批量写入节奏 (与 polling_loops_v2 一致)
+ARC_FLUSH_FRAMES = 20
+NORMAL_FLUSH_FRAMES = 30
+
+# max 速度时每隔多少帧让出事件循环 (执行投料记录等后台任务)
+_YIELD_EVERY = 200
+
+
+async def replay_session(
+    directory: str,
+    speed: float = 1.0,
+    batch_code: str = "",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """回放一个录制会话
+
+    Args:
+        directory: 会话目录 (data/frame_records/<会话>)
+        speed: 回放倍速，<= 0 表示不等待 (max)
+        batch_code: 传给处理函数的批次号 (为空时只更新缓存，不计算能耗/投料)
+        on_progress: 进度回调 (已回放帧数, 总帧数)
+
+    Returns:
+        dict: 回放统计 (帧数、录制时长、实际耗时、倍速、各块帧数)
+    """
+    from backend.services.polling_data_processor import (
+        init_parsers,
+        process_arc_data,
+        process_modbus_data,
+        process_hopper_plc_data,
+        process_status_data,
+        process_db41_data,
+        flush_arc_buffer,
+        flush_normal_buffer,
+    )
+    from backend.services.db32.valve_calculator import flush_valve_openness_buffers
+
+    init_parsers()
+    reader = FrameReader(directory)
+    counts = reader.count()
+    total = max(counts.values(), default=0)
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    first_mono: Optional[float] = None
+    first_wall = last_wall = 0.0
+    anchor = loop.time()
+
+    frames = 0
+    arc_frames = 0
+    normal_frames = 0
+
+    try:
+        for mono, wall, blocks in reader.iter_frames():
+            # 1. 按录制间隔等待 (倍速)
+            if first_mono is None:
+                first_mono, first_wall = mono, wall
+            if speed > 0:
+                delay = anchor + (mono - first_mono) / speed - loop.time()
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+            elif frames % _YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+
+            set_replay_wall_time(wall)
+            last_wall = wall
+            frames += 1
+
+            # 2. DB1 弧流弧压
+            db1_data = blocks.get('db1')
+            if db1_data:
+                process_arc_data(db1_data, batch_code)
+                arc_frames += 1
+                if arc_frames % ARC_FLUSH_FRAMES == 0:
+                    await flush_arc_buffer()
+
+            # 3. DB32 传感器 + 料仓 (DB18 + DB19 + Q区 + I区)
+            db32_data = blocks.get('db32')
+            if db32_data:
+                process_modbus_data(db32_data)
+                if blocks.get('db18') and blocks.get('db19'):
+                    process_hopper_plc_data(
+                        db18_data=blocks['db18'],
+                        db19_data=blocks['db19'],
+                        q_data=blocks.get('q_area'),
+                        i_data=blocks.get('i_area'),
+                        batch_code=batch_code,
+                    )
+                normal_frames += 1
+                if normal_frames % NORMAL_FLUSH_FRAMES == 0:
+                    await flush_normal_buffer()
+                    await flush_valve_openness_buffers()
+
+            # 4. DB30/DB41 状态
+            if blocks.get('db30'):
+                process_status_data(blocks['db30'])
+            if blocks.get('db41'):
+                process_db41_data(blocks['db41'])
+
+            if on_progress and frames % 1000 == 0:
+                on_progress(frames, total)
+
+        # 5. 写出剩余缓存，等待投料记录等后台任务完成
+        await flush_arc_buffer()
+        await flush_normal_buffer()
+        await flush_valve_openness_buffers()
+        await asyncio.sleep(0)
+    finally:
+        set_replay_wall_time(None)
+
+    elapsed = time.perf_counter() - started
+    recorded = last_wall - first_wall
+    return {
+        'directory': directory,
+        'frames': frames,
+        'blocks': counts,
+        'recorded_seconds': round(recorded, 3),
+        'elapsed_seconds': round(elapsed, 3),
+        'speedup': round(recorded / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def get_replay_totals() -> Dict[str, Any]:
+    """回放后的累计值 (用于核对回放结果是否一致)"""
+    from backend.services.db1.power_energy_calculator import get_power_energy_calculator
+    from backend.services.hopper.accumulator import get_feeding_plc_accumulator
+    from backend.services.db32.cooling_water_calculator import get_cooling_water_calculator
+
+    feeding = get_feeding_plc_accumulator().get_realtime_data()
+    volumes = get_cooling_water_calculator().get_total_volumes()
+    return {
+        'energy_total_kwh': round(get_power_energy_calculator().get_realtime_data().get('energy_total', 0.0), 6),
+        'feeding_total_kg': round(feeding.get('feeding_total', 0.0), 3),
+        'feeding_count': feeding.get('feeding_count', 0),
+        'cooling_cover_total_m3': round(volumes.get('furnace_cover', 0.0), 6),
+        'cooling_shell_total_m3': round(volumes.get('furnace_shell', 0.0), 6),
+    }
+
+
+# ============================================================
+# 命令行入口
+# ============================================================
+def _prepare_environment(data_dir: str, write_influx: bool):
+    """批次相关文件写入临时目录，默认 InfluxDB 只读"""
+    import os
+    from backend.core.influxdb import set_writes_suppressed
+    from backend.services import batch_catalog, batch_summary_store
+    from backend.services.batch_service import BatchService
+
+    set_writes_suppressed(not write_influx)
+    BatchService.STATE_FILE = os.path.join(data_dir, "batch_state.json")
+    batch_catalog._batch_catalog = batch_catalog.BatchCatalog(os.path.join(data_dir, "batch_catalog.json"))
+    batch_summary_store._batch_summary_store = batch_summary_store.BatchSummaryStore(
+        os.path.join(data_dir, "batch_summary.json")
+    )
+
+
+async def _run(args) -> Dict[str, Any]:
+    from datetime import datetime
+    from backend.core.influx_writer import get_influx_writer
+    from backend.core.pipeline_metrics import get_pipeline_metrics
+    from backend.services.batch_service import get_batch_service
+
+    batch_code = args.batch_code
+    if not batch_code:
+        # 默认批次号: 炉号位 99 表示回放数据
+        first = next(FrameReader(args.directory).iter_frames(), None)
+        when = datetime.fromtimestamp(first[1]) if first else datetime.now()
+        batch_code = f"{when:%y%m}99{when:%d}"
+
+    speed = 0.0 if args.speed == 'max' else float(args.speed)
+    batch_service = get_batch_service()
+    runs = []
+
+    for index in range(args.repeat):
+        get_pipeline_metrics().reset()
+        batch_service.start(batch_code)
+
+        def progress(done: int, total: int):
+            logger.info(f"回放进度 ({index + 1}/{args.repeat}): {done}/{total}")
+
+        stats = await replay_session(args.directory, speed=speed, batch_code=batch_code, on_progress=progress)
+        stats['totals'] = get_replay_totals()
+        stats['stages'] = get_pipeline_metrics().snapshot()
+        batch_service.stop()
+        runs.append(stats)
+
+    writer_metrics = get_influx_writer().get_metrics()
+    totals = [run['totals'] for run in runs]
+    return {
+        'batch_code': batch_code,
+        'speed': args.speed,
+        'write_influx': args.write_influx,
+        'deterministic': all(t == totals[0] for t in totals),
+        'influx_points': {
+            'submitted': writer_metrics.get('submitted_points', 0),
+            'suppressed': writer_metrics.get('suppressed_points', 0),
+        },
+        'runs': runs,
+    }
+
+
+def main():
+    import argparse
+    import json
+    import tempfile
+
+    arg_parser = argparse.ArgumentParser(description="PLC 原始帧离线回放")
+    arg_parser.add_argument("directory", help="录制会话目录 (data/frame_records/<会话>)")
+    arg_parser.add_argument("--speed", default="max", help="回放倍速: 1 / 10 / max (默认 max)")
+    arg_parser.add_argument("--batch-code", default="", help="回放批次号 (默认按录制日期生成，炉号位 99)")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="回放次数 (>1 时核对各次累计值是否一致)")
+    arg_parser.add_argument("--write-influx", action="store_true", help="写入 InfluxDB (默认只读)")
+    arg_parser.add_argument("--output", default=None, help="结果 JSON 文件 (默认只打印)")
+    args = arg_parser.parse_args()
+
+    _prepare_environment(tempfile.mkdtemp(prefix="furnace_replay_"), args.write_influx)
+    try:
+        result = asyncio.run(_run(args))
+    finally:
+        from backend.core.influx_writer import close_influx_writer
+        close_influx_writer()
+
+    for index, run in enumerate(result['runs'], start=1):
+        totals = run['totals']
+        print(f"\n== 第 {index} 次回放: {run['frames']} 帧, 录制 {run['recorded_seconds']}s, "
+              f"耗时 {run['elapsed_seconds']}s ({run['speedup']}x) ==")
+        print(f"  能耗累计: {totals['energy_total_kwh']} kWh")
+        print(f"  投料累计: {totals['feeding_total_kg']} kg ({totals['feeding_count']} 次)")
+        print(f"  冷却水累计: 炉盖 {totals['cooling_cover_total_m3']} m³, 炉皮 {totals['cooling_shell_total_m3']} m³")
+    if args.repeat > 1:
+        print(f"\n多次回放结果{'一致' if result['deterministic'] else '不一致'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
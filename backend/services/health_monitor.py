@@ -0,0 +1,257 @@
+# ============================================================
+# 文件说明: health_monitor.py - 后台健康检查
+# ============================================================
+# 功能:
+#   1. 在后台线程定期探测 PLC 连接 / InfluxDB / 轮询循环，GUI 线程不再执行任何网络请求
+#   2. 每个探测项在独立的工作线程执行，InfluxDB 超时不会拖慢 PLC/轮询状态的刷新
+#   3. 缓存每项结果 (是否正常、说明、检查时间、状态变化时间、探测耗时)
+#   4. 状态变化时 (或探测项首次完成时) 通知监听者，由 DataBridge 送达界面
+#   5. 探测耗时计入 PipelineMetrics ('health' 循环，状态页采集链路耗时卡片显示)
+# ============================================================
+# 用法:
+#   monitor = get_health_monitor()
+#   monitor.add_listener(bridge.emit_health_status)   # 回调在健康检查线程执行
+#   monitor.start()
+#   monitor.get_status()   # {'plc': {...}, 'influxdb': {...}, 'polling': {...}}
+#   monitor.stop()
+# ============================================================
+# 注意:
+#   - 上一次探测尚未返回时不重复提交 (不会堆积阻塞的 HTTP 请求)
+#   - 探测超过 health_probe_timeout 仍未返回时该项标记为异常 ("探测超时")
+# ============================================================
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import get_settings
+from backend.core.pipeline_metrics import get_pipeline_metrics
+
+settings = get_settings()
+
+# 探测项名称
+PROBE_PLC = 'plc'
+PROBE_INFLUXDB = 'influxdb'
+PROBE_POLLING = 'polling'
+
+# PipelineMetrics 中的循环名 (阶段名为 <探测项>_probe)
+METRICS_LOOP = 'health'
+
+# 探测函数: 返回 (是否正常, 说明)
+Probe = Callable[[], Tuple[bool, str]]
+
+
+# ============================================================
+# 探测函数
+# ============================================================
+def probe_plc() -> Tuple[bool, str]:
+    """PLC 连接状态 (只读连接标志，不访问 PLC)"""
+    from backend.plc.plc_manager import get_plc_manager
+
+    if get_plc_manager().is_connected():
+        return (True, "PLC 已连接")
+    return (False, "PLC 未连接")
+
+
+def probe_influxdb() -> Tuple[bool, str]:
+    """InfluxDB /health 接口 (同步 HTTP，只在探测线程调用)"""
+    from backend.core.influxdb import check_influx_health
+
+    return check_influx_health()
+
+
+def probe_polling() -> Tuple[bool, str]:
+    """轮询循环是否都在运行"""
+    from backend.services.polling_loops_v2 import get_polling_loops_status
+
+    status = get_polling_loops_status()
+    stopped = [name for name in ('db1', 'db32', 'status') if not status.get(f'{name}_running', False)]
+    if stopped:
+        return (False, f"轮询未运行: {', '.join(stopped)}")
+    return (True, "轮询运行中")
+
+
+DEFAULT_PROBES: Dict[str, Probe] = {
+    PROBE_PLC: probe_plc,
+    PROBE_INFLUXDB: probe_influxdb,
+    PROBE_POLLING: probe_polling,
+}
+
+
+class _ProbeState:
+    __slots__ = ('ok', 'message', 'checked_at', 'changed_at', 'latency_ms', 'checks', 'failures',
+                 'future', 'submitted')
+
+    def __init__(self):
+        self.ok: Optional[bool] = None           # None 表示尚未完成首次探测
+        self.message = "检查中"
+        self.checked_at: Optional[datetime] = None
+        self.changed_at: Optional[datetime] = None
+        self.latency_ms = 0.0
+        self.checks = 0
+        self.failures = 0
+        self.future: Optional[Future] = None     # 执行中的探测
+        self.submitted = 0.0                     # 提交时间 (单调时钟)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ok': self.ok,
+            'message': self.message,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None,
+            'changed_at': self.changed_at.isoformat() if self.changed_at else None,
+            'latency_ms': self.latency_ms,
+            'checks': self.checks,
+            'failures': self.failures,
+            'in_flight': self.future is not None,
+        }
+
+
+class HealthMonitor:
+    """后台健康检查 (单例通过 get_health_monitor() 获取)"""
+
+    # 1. 初始化
+    def __init__(
+        self,
+        probes: Optional[Dict[str, Probe]] = None,
+        interval: float = settings.health_check_interval,
+        probe_timeout: float = settings.health_probe_timeout,
+    ):
+        self._probes = dict(probes or DEFAULT_PROBES)
+        self._interval = interval
+        self._probe_timeout = probe_timeout
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _ProbeState] = {name: _ProbeState() for name in self._probes}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # 2. 注册状态变化监听者 (回调参数为 get_status() 的返回值，在后台线程执行)
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # 3. 启动后台线程
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=len(self._probes), thread_name_prefix="HealthProbe")
+        self._thread = threading.Thread(target=self._run, name="HealthMonitor", daemon=True)
+        self._thread.start()
+        logger.info(f"健康检查已启动 (间隔 {self._interval}s, 探测超时 {self._probe_timeout}s)")
+
+    # 4. 停止 (不等待阻塞中的探测返回)
+    def stop(self, join_timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=join_timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("健康检查已停止")
+
+    # 5. 立即执行一轮探测 (不等待结果)
+    def check_now(self):
+        self._tick()
+
+    # 6. 缓存的检查结果 {探测项: {ok, message, checked_at, changed_at, latency_ms, checks, failures, in_flight}}
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: state.to_dict() for name, state in self._states.items()}
+
+    # 6.1 单项是否正常 (尚未完成首次探测时返回 None)
+    def is_ok(self, name: str) -> Optional[bool]:
+        state = self._states.get(name)
+        return state.ok if state else None
+
+    # ------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"健康检查异常: {e}")
+            self._stop_event.wait(self._interval)
+
+    def _tick(self):
+        executor = self._executor
+        if executor is None:
+            return
+        now = time.monotonic()
+        timed_out = []
+        with self._lock:
+            for name, state in self._states.items():
+                if state.future is None:
+                    state.submitted = now
+                    state.future = executor.submit(self._probe_once, name)
+                elif now - state.submitted > self._probe_timeout:
+                    # 上一次探测仍未返回: 不重复提交，超时后标记为异常
+                    timed_out.append(name)
+
+        for name in timed_out:
+            elapsed = time.monotonic() - self._states[name].submitted
+            self._apply(name, False, f"探测超时 ({elapsed:.0f}s 未返回)", elapsed, finished=False)
+
+    def _probe_once(self, name: str):
+        started = time.perf_counter()
+        try:
+            ok, message = self._probes[name]()
+        except Exception as e:
+            ok, message = False, str(e)
+        elapsed = time.perf_counter() - started
+        get_pipeline_metrics().record(METRICS_LOOP, f'{name}_probe', elapsed)
+        self._apply(name, ok, message, elapsed, finished=True)
+
+    def _apply(self, name: str, ok: bool, message: str, elapsed: float, finished: bool):
+        now = datetime.now()
+        with self._lock:
+            state = self._states[name]
+            if finished:
+                state.future = None
+                state.checks += 1
+                if not ok:
+                    state.failures += 1
+            changed = state.ok != ok
+            state.ok = ok
+            state.message = message
+            state.checked_at = now
+            state.latency_ms = round(elapsed * 1000, 1)
+            if changed:
+                state.changed_at = now
+        if not changed:
+            return
+
+        logger.info(f"健康状态变化: {name} -> {'正常' if ok else '异常'} ({message})")
+        status = self.get_status()
+        for callback in list(self._listeners):
+            try:
+                callback(status)
+            except Exception as e:
+                logger.error(f"健康状态回调失败: {e}")
+
+
+# ============================================================
+# 单例
+# ============================================================
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor()
+    return _health_monitor
@@ -36,6 +36,8 @@ from dataclasses import dataclass
 
 from loguru import logger
 
+from backend.core.frame_recorder import frame_utcnow
+
 
 @dataclass
 class FeedingRecord:
@@ -185,7 +187,7 @@ class FeedingPLCAccumulator:
             
             # 创建投料记录
             record = FeedingRecord(
-                timestamp=datetime.now(timezone.utc),
+                timestamp=frame_utcnow(),
                 discharge_weight=discharge_weight,
                 batch_code=batch_code
             )
@@ -215,10 +217,12 @@ class FeedingPLCAccumulator:
             是否写入成功
         """
         try:
-            from backend.core.influxdb import write_points_batch, build_point
+            from backend.core.influx_writer import get_influx_writer
+            from backend.core.line_protocol import LineProtocolEncoder
             
-            # 构建数据点
-            point = build_point(
+            # 构建数据点 (直接编码为 line protocol)
+            encoder = LineProtocolEncoder()
+            encoded = encoder.append(
                 measurement='sensor_data',
                 tags={
                     'device_type': 'hopper',
@@ -233,17 +237,16 @@ class FeedingPLCAccumulator:
                 timestamp=record.timestamp
             )
             
-            if not point:
+            if not encoded:
                 logger.error("构建投料记录数据点失败")
                 return False
             
-            # 写入数据库
-            success, err = write_points_batch([point])
-            if success:
-                logger.info(f"投料记录已写入数据库: {record.discharge_weight:.1f}kg, 累计: {feeding_total:.1f}kg")
+            # 提交到异步写入队列 (不阻塞轮询循环)
+            if get_influx_writer().submit([encoder.take()]).accepted:
+                logger.info(f"投料记录已提交写入: {record.discharge_weight:.1f}kg, 累计: {feeding_total:.1f}kg")
                 return True
             else:
-                logger.error(f"写入投料记录失败: {err}")
+                logger.error("写入投料记录失败: 写入队列已满")
                 return False
         
         except Exception as e:
@@ -0,0 +1,145 @@
+# ============================================================
+# 文件说明: polling_clock.py - 按绝对截止时间调度的轮询时钟
+# ============================================================
+# 功能:
+#   1. 按固定网格 (anchor + n × interval) 唤醒，处理耗时不再累加到周期上 (不漂移)
+#   2. 本周期处理超时但未超过一个周期: 立即开始下一周期 (补偿)
+#   3. 落后超过一个周期: 跳过错过的节拍，回到网格上的下一个时刻 (记录 missed_ticks)
+#   4. 统计每个循环的实际周期 / 唤醒抖动 / 处理耗时 (直方图 + 分位数 + 有效采样率)
+# ============================================================
+# 用法:
+#   clock = PollingClock("db1", 0.2)
+#   while running:
+#       ... 读取/处理 ...
+#       await clock.tick()      # 代替 await asyncio.sleep(interval)
+#   异常退避后调用 clock.reset()，重新以当前时刻为锚点
+# ============================================================
+
+import asyncio
+import bisect
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class _Histogram:
+    """固定桶直方图 (毫秒) + 最近样本分位数"""
+
+    BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, window: int = 600):
+        self._counts: List[int] = [0] * (len(self.BUCKETS_MS) + 1)
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._max = 0.0
+
+    def add(self, seconds: float):
+        ms = seconds * 1000
+        self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self._recent.append(ms)
+        if ms > self._max:
+            self._max = ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        n = len(recent)
+
+        def pct(q: float) -> float:
+            return round(recent[min(n - 1, int(n * q))], 2) if n else 0.0
+
+        labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'p99_ms': pct(0.99),
+            'max_ms': round(self._max, 2),
+            'buckets': {label: count for label, count in zip(labels, self._counts) if count},
+        }
+
+
+class PollingClock:
+    """单个轮询循环的节拍时钟 (只在 asyncio 线程使用)"""
+
+    # 1. 初始化
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self._interval = interval
+        self._next: Optional[float] = None        # 下一个截止时间 (loop.time())
+        self._last_wake: Optional[float] = None   # 上一次唤醒时间
+
+        self._ticks = 0
+        self._overruns = 0        # 处理耗时超过一个周期的次数
+        self._missed_ticks = 0    # 跳过的节拍数
+        self._wakes: Deque[float] = deque(maxlen=200)
+        self._period = _Histogram()
+        self._jitter = _Histogram()
+        self._work = _Histogram()
+
+    # 2. 等待下一个节拍
+    async def tick(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if self._next is None:
+            # 首个节拍 / reset 后: 以当前时刻为锚点
+            self._next = now + self._interval
+        else:
+            if self._last_wake is not None:
+                self._work.add(now - self._last_wake)
+            late = now - self._next
+            if late > 0:
+                self._overruns += 1
+                # 2.1 落后超过一个周期: 跳过错过的节拍 (不补跑)
+                missed = int(late // self._interval)
+                if missed:
+                    self._missed_ticks += missed
+                    self._next += missed * self._interval
+
+        delay = self._next - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # 已到期/超时: 仍让出一次事件循环，避免持续超时时饿死其他协程
+            await asyncio.sleep(0)
+
+        wake = loop.time()
+        self._jitter.add(max(0.0, wake - self._next))
+        if self._last_wake is not None:
+            self._period.add(wake - self._last_wake)
+        self._last_wake = wake
+        self._wakes.append(wake)
+        self._ticks += 1
+        self._next += self._interval
+
+    # 3. 重新锚定 (异常退避 / 长时间暂停之后调用，不计入周期统计)
+    def reset(self):
+        self._next = None
+        self._last_wake = None
+
+    # 4. 修改周期 (下一个截止时间按新周期从上一次唤醒起算)
+    def set_interval(self, interval: float):
+        if interval == self._interval:
+            return
+        self._interval = interval
+        if self._last_wake is not None:
+            self._next = self._last_wake + interval
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    # 5. 统计
+    def get_stats(self) -> Dict[str, Any]:
+        wakes = self._wakes
+        effective_hz = None
+        if len(wakes) >= 2 and wakes[-1] > wakes[0]:
+            effective_hz = round((len(wakes) - 1) / (wakes[-1] - wakes[0]), 3)
+        return {
+            'interval': self._interval,
+            'target_hz': round(1.0 / self._interval, 3) if self._interval > 0 else None,
+            'effective_hz': effective_hz,
+            'ticks': self._ticks,
+            'overruns': self._overruns,
+            'missed_ticks': self._missed_ticks,
+            'period': self._period.to_dict(),
+            'jitter': self._jitter.to_dict(),
+            'work': self._work.to_dict(),
+        }
@@ -7,7 +7,8 @@
 #   3. 批量写入缓存 (双速轮询架构)
 #   4. 数据处理函数 (_process_*)
 #   5. 蝶阀状态队列管理
-#   6. 批量写入 InfluxDB
+#   6. 批量写入 InfluxDB (提交到异步写入队列)
+#   7. 写入同时累计 10s/1m/10m 汇总数据 (rollup_aggregator)
 # ============================================================
 # 【数据库写入说明】
 # ============================================================
@@ -55,13 +56,27 @@
 #    - 蝶阀状态队列 (ValveStatusMonitor) - 仅用于历史记录API
 # ============================================================
 
+import asyncio
 import threading
 import traceback
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from collections import deque
 
-from backend.core.influxdb import write_points_batch, build_point
+from backend.core.influx_writer import get_influx_writer
+from backend.core.frame_recorder import frame_utcnow
+from backend.core.frame_change import get_frame_change_detector
+from backend.core.line_protocol import LineProtocolEncoder, encode_points
+from backend.services.rollup_aggregator import get_rollup_aggregator
+from backend.core.pipeline_metrics import (
+    get_pipeline_metrics,
+    STAGE_PARSE,
+    STAGE_CONVERT,
+    STAGE_POWER_CALC,
+    STAGE_ALARM_CHECK,
+    STAGE_CACHE_PUBLISH,
+    STAGE_SIGNAL_EMIT,
+)
 from backend.plc.parser_config_db32 import ConfigDrivenDB32Parser
 from backend.plc.parser_config_db1 import ConfigDrivenDB1Parser
 from backend.plc.parser_status import ModbusStatusParser
@@ -120,6 +135,12 @@ _latest_hopper_upper_limit_timestamp: Optional[datetime] = None
 _latest_hopper_plc_data: Dict[str, Any] = {}
 _latest_hopper_plc_timestamp: Optional[datetime] = None
 
+# 最近一次发布的料仓数据 (DB18/DB19/Q/I 未变化时不重新发布，随 DB32 传感器数据带出)
+_latest_hopper_publish: Dict[str, Any] = {}
+
+# 后台写入任务引用 (事件循环只持有弱引用，未保存的任务可能在完成前被回收)
+_background_tasks: set = set()
+
 # ============================================================
 # 设定值变化检测缓存 (用于智能写入数据库)
 # ============================================================
@@ -163,24 +184,34 @@ _valve_status_timestamps: Dict[int, deque] = {
 #  弧流弧压缓存 (高频写入)
 # - 轮询间隔: 0.2s
 # - 批量大小: 20次 (0.2s×20=4s写入一次)
-_arc_buffer: deque = deque(maxlen=500)
+# - 不设 maxlen: 每次 flush 整体取出交给写入队列，避免静默丢弃数据
+_arc_buffer: deque = deque()
 _arc_buffer_count = 0
 _arc_batch_size = 20  # 20次弧流轮询后批量写入 (0.2s×20=4s)
 
 # 📊 普通数据缓存 (常规写入)
 # - 轮询间隔: 5s
 # - 批量大小: 20次 (5s×20=100s写入一次)
-_normal_buffer: deque = deque(maxlen=1000)
+_normal_buffer: deque = deque()
 _normal_buffer_count = 0
 _normal_batch_size = 20  # 20次常规轮询后批量写入 (5s×20=100s)
 
+# line protocol 编码器 (预编译行前缀，缓冲区复用)
+_arc_encoder = LineProtocolEncoder()
+_normal_encoder = LineProtocolEncoder()
+
+# 写入队列背压时原始点降采样: 每个 (measurement, module_type) 每 N 个保留 1 个
+# (汇总层级在降采样之前按全量数据累计，不受影响)
+_BACKPRESSURE_KEEP_EVERY = 4
+
 # ============================================================
 # 统计信息
 # ============================================================
 _stats = {
     "total_polls": 0,
-    "successful_writes": 0,
+    "queued_writes": 0,
     "failed_writes": 0,
+    "thinned_points": 0,      # 写入队列背压时降采样跳过的原始点
     "last_poll_time": None,
     "db32_errors": 0,
     "db1_errors": 0,
@@ -289,8 +320,11 @@ def process_modbus_data(raw_data: bytes):
         return
 
     try:
+        cycle = get_pipeline_metrics().begin('db32')
+        
         # 1. 解析原始数据
         parsed = _modbus_parser.parse_all(raw_data)
+        cycle.mark(STAGE_PARSE)
         
         # ========================================
         # 2. 冷却水流量计算 (新增逻辑)
@@ -359,6 +393,7 @@ def process_modbus_data(raw_data: bytes):
             volumes = cooling_calc.get_total_volumes()
             parsed['furnace_cover_total_volume'] = volumes['furnace_cover']
             parsed['furnace_shell_total_volume'] = volumes['furnace_shell']
+        cycle.mark(STAGE_POWER_CALC)
         
         # 3. 更新内存缓存 (供实时API使用)
         with _data_lock:
@@ -370,7 +405,7 @@ def process_modbus_data(raw_data: bytes):
             # ========================================
             valve_status_data = parsed.get('valve_status', {})
             valve_status_byte = valve_status_data.get('raw_byte', 0)
-            timestamp = datetime.now(timezone.utc)
+            timestamp = frame_utcnow()
             
             # 解析每个蝶阀的2-bit状态
             for valve_id in range(1, 5):  # 蝶阀1-4
@@ -411,7 +446,7 @@ def process_modbus_data(raw_data: bytes):
                     'cover_total': parsed.get('furnace_cover_total_volume', 0.0),  # 炉盖累计流量
                     'shell_total': parsed.get('furnace_shell_total_volume', 0.0),  # 炉皮累计流量
                 },
-                'hopper': _latest_weight_data.copy() if _latest_weight_data else {},
+                'hopper': _get_hopper_publish_data(),
                 'valve_status': parsed.get('valve_status', {}),
                 'valve_openness': valve_openness_dict,
                 'energy_total': 0.0,  # 占位，后续从功率计算器获取
@@ -429,12 +464,15 @@ def process_modbus_data(raw_data: bytes):
             
             # 写入缓存
             data_cache.set_sensor_data(sensor_data)
+            cycle.mark(STAGE_CACHE_PUBLISH)
             
             # 发送信号到前端
             data_bridge.emit_sensor_data(sensor_data)
+            cycle.mark(STAGE_SIGNAL_EMIT)
             
         except Exception as bridge_err:
             print(f" 写入 DataCache/DataBridge 失败: {bridge_err}")
+            cycle.skip()
         
         # 3.2 报警检查: 检查电极深度/冷却水压力/过滤器压差是否超过报警阈值
         try:
@@ -443,6 +481,7 @@ def process_modbus_data(raw_data: bytes):
             check_sensor_data_alarms(parsed, furnace_shell_pressure, furnace_cover_pressure, batch_code=_get_batch() or "")
         except Exception as alarm_err:
             print(f" 报警检查失败(DB32): {alarm_err}")
+        cycle.mark(STAGE_ALARM_CHECK)
         
         # ========================================
         # 4. 蝶阀开度计算服务 (新增 - 滑动窗口 + 自动校准)
@@ -451,13 +490,14 @@ def process_modbus_data(raw_data: bytes):
             from backend.services.db32.valve_calculator import batch_add_valve_statuses
             valve_status_data = parsed.get('valve_status', {})
             valve_status_byte = valve_status_data.get('raw_byte', 0)
-            batch_add_valve_statuses(valve_status_byte, datetime.now(timezone.utc))
+            batch_add_valve_statuses(valve_status_byte, frame_utcnow())
         except Exception as valve_err:
             print(f" 蝶阀开度计算失败: {valve_err}")
+        cycle.mark(STAGE_POWER_CALC)
         
         # 5. 转换为 InfluxDB Points (供历史存储)
         # 重要: 只有在有批次号时才写入数据库，避免产生无批次的杂乱数据
-        now = datetime.now(timezone.utc)
+        now = frame_utcnow()
         
         # 获取当前批次号 (仅由前端提供，后端不自动生成)
         from backend.services.polling_service import ensure_batch_code
@@ -519,6 +559,9 @@ def process_modbus_data(raw_data: bytes):
                 'time': now
             }
             _normal_buffer.append(pressure_diff_point)
+        
+        cycle.mark(STAGE_CONVERT)
+        cycle.commit()
             
     except Exception as e:
         print(f" 处理 DB32 数据失败: {e}")
@@ -547,11 +590,15 @@ def process_arc_data(raw_data: bytes, batch_code: str):
         return
 
     try:
+        cycle = get_pipeline_metrics().begin('db1')
+        
         # 1. 解析原始数据
         parsed = _db1_parser.parse_all(raw_data)
+        cycle.mark(STAGE_PARSE)
         
         # 2. 使用简化转换器 (直接使用原始值)
         arc_data_obj: ArcDataSimple = convert_db1_arc_data_simple(parsed)
+        cycle.mark(STAGE_CONVERT)
         
         # ========================================
         # 3. 计算三相功率 (新增)
@@ -566,6 +613,7 @@ def process_arc_data(raw_data: bytes, batch_code: str):
             arc_voltage_W=arc_data_obj.phase_W.voltage_V,
             power_factor=0.98,
         )
+        cycle.mark(STAGE_POWER_CALC)
         
         # 4. 构建缓存数据 (UVW三相 + 三个设定值 + 手动死区 + 功率)
         setpoints = arc_data_obj.get_setpoints_A()
@@ -625,12 +673,15 @@ def process_arc_data(raw_data: bytes, batch_code: str):
             
             # 写入缓存
             data_cache.set_arc_data(arc_data)
+            cycle.mark(STAGE_CACHE_PUBLISH)
             
             # 发送信号到前端
             data_bridge.emit_arc_data(arc_data)
+            cycle.mark(STAGE_SIGNAL_EMIT)
             
         except Exception as bridge_err:
             print(f" 写入 DataCache/DataBridge 失败: {bridge_err}")
+            cycle.skip()
         
         # 5.2 报警检查: 检查弧流弧压是否超过报警阈值
         try:
@@ -639,9 +690,10 @@ def process_arc_data(raw_data: bytes, batch_code: str):
             check_emergency_stop_alarm(parsed, batch_code=batch_code or "")
         except Exception as alarm_err:
             print(f" 报警检查失败(DB1): {alarm_err}")
+        cycle.mark(STAGE_ALARM_CHECK)
         
         # 6. 使用变化检测转换为 InfluxDB 字段
-        now = datetime.now(timezone.utc)
+        now = frame_utcnow()
         change_result = convert_to_influx_fields_with_change_detection(
             arc_data_obj, _prev_setpoints, _prev_deadzone
         )
@@ -681,6 +733,8 @@ def process_arc_data(raw_data: bytes, batch_code: str):
             # print(f" [DB1] 弧流弧压+功率数据已缓存: U相弧流={arc_data_obj.phase_U.current_A}A, "
             #       f"功率={power_result['power_total']:.2f}kW{setpoint_info}")
         
+        cycle.mark(STAGE_CONVERT)
+        
         # ========================================
         # 10. 检查是否需要计算能耗 (每15秒)
         # 【优化】只在能耗累计值变化时写入
@@ -715,6 +769,9 @@ def process_arc_data(raw_data: bytes, batch_code: str):
                 
                 # 更新上次写入的值
                 _prev_energy_total = current_energy_total
+        
+        cycle.mark(STAGE_POWER_CALC)
+        cycle.commit()
             
     except Exception as e:
         print(f" 处理 DB1 弧流弧压数据失败: {e}")
@@ -728,6 +785,13 @@ def process_status_data(raw_data: bytes):
     if not _status_parser:
         return
 
+    # 与上次读取相同: 只刷新读取时间，跳过解析和发布
+    detector = get_frame_change_detector()
+    if not detector.changed('db30', raw_data):
+        with _data_lock:
+            _latest_status_timestamp = datetime.now()
+        return
+
     try:
         parsed = _status_parser.parse_all(raw_data)
         
@@ -750,6 +814,7 @@ def process_status_data(raw_data: bytes):
             pass  # 状态数据不是关键数据，失败不影响主流程
             
     except Exception as e:
+        detector.invalidate('db30')
         print(f" 处理 DB30 状态数据失败: {e}")
 
 
@@ -760,6 +825,13 @@ def process_db41_data(raw_data: bytes):
     if not _db41_parser:
         return
 
+    # 与上次读取相同: 只刷新读取时间，跳过解析
+    detector = get_frame_change_detector()
+    if not detector.changed('db41', raw_data):
+        with _data_lock:
+            _latest_db41_timestamp = datetime.now()
+        return
+
     try:
         parsed = _db41_parser.parse_all(raw_data)
         
@@ -768,6 +840,7 @@ def process_db41_data(raw_data: bytes):
             _latest_db41_timestamp = datetime.now()
             
     except Exception as e:
+        detector.invalidate('db41')
         print(f" 处理 DB41 数据状态失败: {e}")
 
 
@@ -787,7 +860,7 @@ async def flush_arc_buffer():
         return
     
     # 检查批次状态 - 只有运行中（RUNNING）才写数据库
-    from backend.services.batch_service import get_batch_service
+    from backend.services.batch_service import get_batch_service, SmeltingState
     batch_service = get_batch_service()
     
     if not batch_service.is_running:
@@ -796,32 +869,23 @@ async def flush_arc_buffer():
         _arc_buffer.clear()
         if skipped_count > 0:
             print(f"⏸️ [DB1] 跳过写入 {skipped_count} 个数据点 (状态: {batch_service.state.value})")
+        # 输出未结束的汇总窗口 (暂停时保留累计，恢复后同一窗口继续合并)
+        get_rollup_aggregator().flush_all(final=batch_service.state != SmeltingState.PAUSED)
         return
     
-    dict_points_list = list(_arc_buffer)
+    # 累计汇总数据 (10s/1m/10m)
+    get_rollup_aggregator().add_points(_arc_buffer)
+    
+    # 直接编码为 line protocol (跳过 Point 对象构建)，写入队列背压时先降采样
+    writer = get_influx_writer()
+    payload, point_count = encode_points(_arc_encoder, _thin_if_backpressured(writer, _arc_buffer))
     _arc_buffer.clear()
     
-    influx_points = []
-    for dp in dict_points_list:
-        p = build_point(dp['measurement'], dp['tags'], dp['fields'], dp['time'])
-        if p:
-            influx_points.append(p)
-            
-    if not influx_points:
+    if not point_count:
         return
 
-    try:
-        success, err = write_points_batch(influx_points)
-        if success:
-            _stats["successful_writes"] += len(influx_points)
-            print(f" [DB1] 批量写入成功: {len(influx_points)} 个数据点")
-        else:
-            _stats["failed_writes"] += len(influx_points)
-            print(f" [DB1] 批量写入失败: {err}")
-        
-    except Exception as e:
-        _stats["failed_writes"] += len(influx_points)
-        print(f" [DB1] 批量写入异常: {e}")
+    # 提交到异步写入队列 (不等待数据库，写入由后台线程完成)
+    _record_submit(writer.submit([payload]), "DB1")
 
 
 async def flush_normal_buffer():
@@ -837,7 +901,7 @@ async def flush_normal_buffer():
         return
     
     # 检查批次状态 - 只有运行中（RUNNING）才写数据库
-    from backend.services.batch_service import get_batch_service
+    from backend.services.batch_service import get_batch_service, SmeltingState
     batch_service = get_batch_service()
     
     if not batch_service.is_running:
@@ -846,32 +910,47 @@ async def flush_normal_buffer():
         _normal_buffer.clear()
         if skipped_count > 0:
             print(f"⏸️ [DB32] 跳过写入 {skipped_count} 个数据点 (状态: {batch_service.state.value})")
+        # 输出未结束的汇总窗口 (暂停时保留累计，恢复后同一窗口继续合并)
+        get_rollup_aggregator().flush_all(final=batch_service.state != SmeltingState.PAUSED)
         return
     
-    dict_points_list = list(_normal_buffer)
+    # 累计汇总数据 (10s/1m/10m)
+    get_rollup_aggregator().add_points(_normal_buffer)
+    
+    # 直接编码为 line protocol (跳过 Point 对象构建)，写入队列背压时先降采样
+    writer = get_influx_writer()
+    payload, point_count = encode_points(_normal_encoder, _thin_if_backpressured(writer, _normal_buffer))
     _normal_buffer.clear()
     
-    influx_points = []
-    for dp in dict_points_list:
-        p = build_point(dp['measurement'], dp['tags'], dp['fields'], dp['time'])
-        if p:
-            influx_points.append(p)
-            
-    if not influx_points:
+    if not point_count:
         return
 
-    try:
-        success, err = write_points_batch(influx_points)
-        if success:
-            _stats["successful_writes"] += len(influx_points)
-            print(f" [DB32] 批量写入成功: {len(influx_points)} 个数据点")
-        else:
-            _stats["failed_writes"] += len(influx_points)
-            print(f" [DB32] 批量写入失败: {err}")
-        
-    except Exception as e:
-        _stats["failed_writes"] += len(influx_points)
-        print(f" [DB32] 批量写入异常: {e}")
+    # 提交到异步写入队列 (不等待数据库，写入由后台线程完成)
+    _record_submit(writer.submit([payload]), "DB32")
+
+
+def _thin_if_backpressured(writer, buffer: deque):
+    """写入队列背压时按 (measurement, module_type) 每 N 个保留 1 个 (每组首个点始终保留)"""
+    if not writer.is_backpressured():
+        return buffer
+    kept = []
+    counts: Dict[tuple, int] = {}
+    for point in buffer:
+        key = (point['measurement'], point['tags'].get('module_type'))
+        n = counts.get(key, 0)
+        counts[key] = n + 1
+        if n % _BACKPRESSURE_KEEP_EVERY == 0:
+            kept.append(point)
+    _stats["thinned_points"] += len(buffer) - len(kept)
+    return kept
+
+
+def _record_submit(result, source: str):
+    """按 SubmitResult 统计写入/丢弃点数"""
+    _stats["queued_writes"] += result.accepted
+    if result.dropped:
+        _stats["failed_writes"] += result.dropped
+        print(f" [{source}] 写入队列已满，丢弃 {result.dropped} 个数据点")
 
 
 # ============================================================
@@ -900,7 +979,8 @@ def get_latest_status_data() -> Dict[str, Any]:
     with _data_lock:
         return {
             'data': _latest_status_data.copy() if _latest_status_data else {},
-            'timestamp': _latest_status_timestamp.isoformat() if _latest_status_timestamp else None
+            'timestamp': _latest_status_timestamp.isoformat() if _latest_status_timestamp else None,
+            'changed_at': _isoformat(get_frame_change_detector().changed_at('db30')),
         }
 
 
@@ -909,7 +989,8 @@ def get_latest_db41_data() -> Dict[str, Any]:
     with _data_lock:
         return {
             'data': _latest_db41_data.copy() if _latest_db41_data else {},
-            'timestamp': _latest_db41_timestamp.isoformat() if _latest_db41_timestamp else None
+            'timestamp': _latest_db41_timestamp.isoformat() if _latest_db41_timestamp else None,
+            'changed_at': _isoformat(get_frame_change_detector().changed_at('db41')),
         }
 
 
@@ -983,7 +1064,9 @@ def get_buffer_status() -> Dict[str, Any]:
         'normal_buffer_size': len(_normal_buffer),
         'arc_batch_size': _arc_batch_size,
         'normal_batch_size': _normal_batch_size,
-        'stats': _stats.copy()
+        'stats': _stats.copy(),
+        'writer': get_influx_writer().get_metrics(),
+        'rollup': get_rollup_aggregator().get_stats(),
     }
 
 
@@ -1040,6 +1123,21 @@ def get_hopper_upper_limit() -> float:
 # ============================================================
 # 料仓 PLC 数据处理模块 (DB18 + DB19)
 # ============================================================
+# 参与变化检测的料仓数据块
+_HOPPER_BLOCKS = ('db18', 'db19', 'q_area', 'i_area')
+
+
+def _get_hopper_publish_data() -> Dict[str, Any]:
+    """随 DB32 传感器数据发布的料仓数据 (带最新投料累计)"""
+    if not _latest_hopper_publish:
+        return _latest_weight_data.copy() if _latest_weight_data else {}
+    
+    from backend.services.hopper.accumulator import get_feeding_plc_accumulator
+    hopper = dict(_latest_hopper_publish)
+    hopper['feeding_total'] = get_feeding_plc_accumulator().get_feeding_total()
+    return hopper
+
+
 def process_hopper_plc_data(
     db18_data: bytes,
     db19_data: bytes,
@@ -1067,10 +1165,20 @@ def process_hopper_plc_data(
     """
     global _latest_hopper_plc_data, _latest_hopper_plc_timestamp
     global _latest_hopper_upper_limit, _latest_hopper_upper_limit_timestamp
+    global _latest_hopper_publish
     
     if not _db18_parser or not _db19_parser:
         return
     
+    # 0. DB18/DB19/Q区/I区都与上次相同且批次未变: 状态不变，跳过解析和发布
+    #    (排料标志未清零期间也不会重复生成投料记录)
+    detector = get_frame_change_detector()
+    blocks = dict(zip(_HOPPER_BLOCKS, (db18_data, db19_data, q_data, i_data)))
+    if not detector.changed_any(blocks) and _latest_hopper_plc_data.get('batch_code') == batch_code:
+        with _data_lock:
+            _latest_hopper_plc_timestamp = datetime.now()
+        return
+    
     try:
         # 1. 解析 DB18 数据
         db18_parsed = _db18_parser.parse(db18_data)
@@ -1148,8 +1256,7 @@ def process_hopper_plc_data(
             accumulator = get_feeding_plc_accumulator()
             
             # 立即写入数据库
-            import asyncio
-            asyncio.create_task(accumulator.add_feeding_record_and_write(
+            _spawn_background_task(accumulator.add_feeding_record_and_write(
                 discharge_weight=discharge_weight,
                 batch_code=batch_code,
                 current_weight=current_weight,
@@ -1157,6 +1264,7 @@ def process_hopper_plc_data(
             ))
             
             # 8. 写入 DB19.2.3 = False，告诉 PLC "我已经读取了"
+            #    (提交到 PLC I/O 线程，不阻塞轮询循环)
             try:
                 from backend.plc.plc_manager import get_plc_manager
                 plc = get_plc_manager()
@@ -1169,15 +1277,14 @@ def process_hopper_plc_data(
                     new_db19_data[2] &= ~(1 << 3)  # 清零 Bit 3
                     
                     # 写入 DB19
-                    write_result = plc.write_db(19, 0, bytes(new_db19_data))
-                    if write_result[0]:
-                        logger.info(f"已清零 DB19.2.3 标志位 (本次排料: {discharge_weight:.1f}kg)")
-                    else:
-                        logger.error(f"清零 DB19.2.3 失败: {write_result[1]}")
+                    _spawn_background_task(_clear_db19_discharge_flag(bytes(new_db19_data), discharge_weight))
                 else:
+                    # 标志未清零: 作废 DB19 缓存，下次轮询即使字节未变也重新处理并重试清零
+                    detector.invalidate('db19')
                     logger.warning("PLC 未连接，无法清零 DB19.2.3")
             
             except Exception as write_err:
+                detector.invalidate('db19')
                 logger.error(f"写入 DB19.2.3 失败: {write_err}")
                 import traceback
                 logger.error(traceback.format_exc())
@@ -1211,8 +1318,10 @@ def process_hopper_plc_data(
                     'timestamp': time.time()
                 }
                 
-                # 更新传感器数据中的料仓部分
-                sensor_data = data_cache.get_sensor_data()
+                _latest_hopper_publish = hopper_data
+                
+                # 更新传感器数据中的料仓部分（快照只读，复制后发布新快照）
+                sensor_data = dict(data_cache.get_sensor_data())
                 if sensor_data:
                     sensor_data['hopper'] = hopper_data
                     sensor_data['timestamp'] = time.time()
@@ -1227,11 +1336,41 @@ def process_hopper_plc_data(
             logger.error(f"写入 DataCache/DataBridge 失败: {bridge_err}")
         
     except Exception as e:
+        for key in _HOPPER_BLOCKS:
+            detector.invalidate(key)
         logger.error(f"处理料仓 PLC 数据失败: {e}")
         import traceback
         traceback.print_exc()
 
 
+def _spawn_background_task(coro) -> asyncio.Task:
+    """创建后台任务并保存引用，任务完成后自动移除"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _clear_db19_discharge_flag(new_db19_data: bytes, discharge_weight: float):
+    """通过 PLC I/O 线程写入 DB19 (清零排料重量待读取标志)
+    
+    写入失败/超时时作废 DB19 的变化检测缓存，否则 PLC 侧字节不变会被
+    "未变化"快速路径跳过，标志位永远不会再次尝试清零。
+    """
+    from backend.plc.plc_async_client import get_async_plc_client
+    
+    try:
+        success, err = await get_async_plc_client().write_db(19, 0, new_db19_data)
+    except Exception as e:
+        success, err = False, str(e)
+    
+    if success:
+        logger.info(f"已清零 DB19.2.3 标志位 (本次排料: {discharge_weight:.1f}kg)")
+    else:
+        get_frame_change_detector().invalidate('db19')
+        logger.error(f"清零 DB19.2.3 失败: {err}")
+
+
 def _determine_hopper_state(
     is_discharging: bool,
     is_requesting: bool,
@@ -1277,11 +1416,19 @@ def get_latest_hopper_plc_data() -> Dict[str, Any]:
     Returns:
         {
             'data': dict,
-            'timestamp': str
+            'timestamp': str,     # 最后读取时间
+            'changed_at': str     # DB18/DB19/Q/I 最后变化时间
         }
     """
+    detector = get_frame_change_detector()
+    changed = [t for t in (detector.changed_at(k) for k in _HOPPER_BLOCKS) if t is not None]
     with _data_lock:
         return {
             'data': _latest_hopper_plc_data.copy() if _latest_hopper_plc_data else {},
-            'timestamp': _latest_hopper_plc_timestamp.isoformat() if _latest_hopper_plc_timestamp else None
+            'timestamp': _latest_hopper_plc_timestamp.isoformat() if _latest_hopper_plc_timestamp else None,
+            'changed_at': _isoformat(max(changed)) if changed else None,
         }
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
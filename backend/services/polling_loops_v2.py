@@ -10,6 +10,12 @@
 #   - 三个独立的 asyncio.Task
 #   - 自动启动 (无需前端触发)
 #   - 开始冶炼时切换 DB1 速度
+#   - PLC 读取通过 AsyncPLCClient 在独立 I/O 线程执行，事件循环不被 snap7 阻塞
+#   - 每次读取带截止时间 (DB1 使用更短的截止时间)，超时按读取失败处理
+#   - 请求优先级: DB1 弧流 > 写入 > DB32 传感器 > DB30/DB41 状态 (PLCScheduler)
+#   - 周期由 PollingClock 按绝对截止时间调度，处理耗时不累加到周期上
+#   - 各阶段耗时记录到 PipelineMetrics (PLC 读取 / 批量写入 / 整个周期)
+#   - 启用录制时，读取到的原始字节写入 FrameRecorder (离线回放见 frame_replay.py)
 # ============================================================
 # 【数据库写入说明 - 轮询架构】
 # ============================================================
@@ -40,10 +46,22 @@
 import asyncio
 import traceback
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Optional
 
 from backend.config import get_settings
-from backend.plc.plc_manager import get_plc_manager
+from backend.plc.plc_manager import ReadItem
+from backend.plc.plc_async_client import get_async_plc_client, close_async_plc_client
+from backend.plc.plc_scheduler import PLCPriority
+from backend.services.polling_clock import PollingClock
+from backend.core.frame_recorder import get_frame_recorder, close_frame_recorder
+from backend.core.frame_change import get_frame_change_detector
+from backend.core.pipeline_metrics import (
+    get_pipeline_metrics,
+    STAGE_PLC_READ,
+    STAGE_PARSE,
+    STAGE_BUFFER_FLUSH,
+    STAGE_CYCLE,
+)
 from loguru import logger
 
 settings = get_settings()
@@ -55,6 +73,9 @@ _db1_task: Optional[asyncio.Task] = None
 _db32_task: Optional[asyncio.Task] = None
 _status_task: Optional[asyncio.Task] = None
 
+# 轮询时钟 (周期/抖动/超时统计)
+_clocks: Dict[str, PollingClock] = {}
+
 # 运行标志
 _db1_running = False
 _db32_running = False
@@ -96,29 +117,7 @@ async def _flush_valve_buffer():
 
 
 # ============================================================
-# 2: 状态查询函数模块
-# ============================================================
-def get_polling_loops_status() -> dict:
-    """获取所有轮询循环的状态
-    
-    Returns:
-        dict: {
-            'db1_running': bool,
-            'db32_running': bool,
-            'status_running': bool,
-            'db1_interval': float
-        }
-    """
-    return {
-        'db1_running': _db1_running,
-        'db32_running': _db32_running,
-        'status_running': _status_running,
-        'db1_interval': _db1_interval
-    }
-
-
-# ============================================================
-# 3: DB1 弧流弧压轮询模块 (可变速)
+# 2: DB1 弧流弧压轮询模块 (可变速)
 # ============================================================
 async def _db1_arc_polling_loop(
     parser,
@@ -139,26 +138,30 @@ async def _db1_arc_polling_loop(
     FIXED_WAIT_TIME = 30  # 固定等待时间（秒）
     
     logger.info(f"DB1 弧流弧压轮询已启动 (初始间隔: {_db1_interval}s)")
+    clock = _clocks['db1'] = PollingClock('db1', _db1_interval)
+    metrics = get_pipeline_metrics()
+    recorder = get_frame_recorder()
     
     if not is_mock:
-        plc = get_plc_manager()
+        plc = get_async_plc_client()
+        read_timeout = settings.plc_arc_request_timeout
         db_number = parser.get_db_number() if parser else 1
         db_size = parser.get_total_size() if parser else 182
     
     while _db1_running:
         try:
             poll_count += 1
+            t_cycle = metrics.start()
             
             if is_mock:
                 # Mock 模式: 生成随机数据
                 from backend.services.polling_data_generator import generate_mock_db1_data
                 db1_data = generate_mock_db1_data()
             else:
-                # PLC 模式: 读取真实数据
-                if not plc.is_connected():
-                    plc.connect()
-                
-                result = plc.read_db(db_number, 0, db_size)
+                # PLC 模式: 读取真实数据 (未连接时 I/O 线程自动重连)
+                t = metrics.start()
+                result = await plc.read_db(db_number, 0, db_size, priority=PLCPriority.ARC, timeout=read_timeout)
+                metrics.lap('db1', STAGE_PLC_READ, t)
                 if isinstance(result, (tuple, list)) and len(result) == 2:
                     db1_data, err = result
                 else:
@@ -166,8 +169,12 @@ async def _db1_arc_polling_loop(
                 
                 if not db1_data:
                     await asyncio.sleep(1)
+                    clock.reset()
                     continue
             
+            if recorder:
+                recorder.record('db1', db1_data)
+            
             # 处理数据 (获取当前批次号)
             from backend.services.polling_service import get_batch_info
             batch_info = get_batch_info()
@@ -180,14 +187,19 @@ async def _db1_arc_polling_loop(
             # 批量写入逻辑
             _arc_buffer_count += 1
             if _arc_buffer_count >= _arc_batch_size:
+                t = metrics.start()
                 await _flush_arc_buffer()
+                metrics.lap('db1', STAGE_BUFFER_FLUSH, t)
                 _arc_buffer_count = 0
             
+            metrics.lap('db1', STAGE_CYCLE, t_cycle)
+            
             # 成功后重置错误计数器
             error_count = 0
             
-            # 动态间隔 (可被外部修改)
-            await asyncio.sleep(_db1_interval)
+            # 动态间隔 (可被外部修改)，按绝对截止时间等待下一周期
+            clock.set_interval(_db1_interval)
+            await clock.tick()
             
         except asyncio.CancelledError:
             break
@@ -207,12 +219,15 @@ async def _db1_arc_polling_loop(
                 if error_count <= 3:
                     logger.error(traceback.format_exc())
                 await asyncio.sleep(wait_time)
+            
+            # 退避结束后重新锚定周期 (不计入周期统计)
+            clock.reset()
     
     logger.info("DB1 弧流弧压轮询已停止")
 
 
 # ============================================================
-# 4: DB32 传感器轮询模块 (固定 0.5s)
+# 3: DB32 传感器轮询模块 (固定 0.5s)
 # ============================================================
 async def _db32_sensor_polling_loop(
     parser,
@@ -240,92 +255,68 @@ async def _db32_sensor_polling_loop(
     interval = settings.db32_polling_interval  # 从 .env 配置读取
     
     logger.info(f"DB32 传感器轮询已启动 (间隔: {interval}s)")
+    clock = _clocks['db32'] = PollingClock('db32', interval)
+    metrics = get_pipeline_metrics()
+    recorder = get_frame_recorder()
     
     if not is_mock:
-        plc = get_plc_manager()
+        plc = get_async_plc_client()
         db_number = parser.get_db_number() if parser else 32
         db_size = parser.get_total_size() if parser else 29
+        
+        # 本周期的合并读取请求 (DB32 + DB18 + DB19 + Q区 + I区 -> 按 PDU 分组 1~2 次往返)
+        read_items = [ReadItem('db32', 'DB', db_number, 0, db_size)]
+        if db18_parser:
+            read_items.append(ReadItem('db18', 'DB', db18_parser.get_db_number(), 0, db18_parser.get_total_size()))
+        if db19_parser:
+            read_items.append(ReadItem('db19', 'DB', db19_parser.get_db_number(), 0, db19_parser.get_total_size()))
+        read_items.append(ReadItem('q_area', 'PA', 0, 3, 2))  # Q3, Q4 (Q3.7 排料, Q4.0 要料)
+        read_items.append(ReadItem('i_area', 'PE', 0, 4, 1))  # I4 (I4.6 供料反馈)
     
     while _db32_running:
         try:
             poll_count += 1
+            t_cycle = metrics.start()
             
-            # 1. 读取 DB32 传感器数据
+            # 1. 读取 DB32 传感器数据 + 料仓 PLC 数据 (DB18 + DB19 + Q区 + I区)
             if is_mock:
-                from backend.services.polling_data_generator import generate_mock_db32_data
+                from backend.services.polling_data_generator import (
+                    generate_mock_db32_data,
+                    generate_mock_db18_data,
+                    generate_mock_db19_data,
+                    generate_mock_q_data,
+                    generate_mock_i_data,
+                )
                 db32_data = generate_mock_db32_data()
+                db18_data = generate_mock_db18_data()
+                db19_data = generate_mock_db19_data()
+                q_data = generate_mock_q_data()
+                i_data = generate_mock_i_data()
             else:
-                if not plc.is_connected():
-                    plc.connect()
-                
-                result = plc.read_db(db_number, 0, db_size)
-                if isinstance(result, (tuple, list)) and len(result) == 2:
-                    db32_data, err = result
-                else:
-                    db32_data = None
+                t = metrics.start()
+                blocks, err = await plc.read_multi(read_items, priority=PLCPriority.SENSOR)
+                metrics.lap('db32', STAGE_PLC_READ, t)
+                db32_data = blocks.get('db32')
                 
                 if not db32_data:
                     await asyncio.sleep(1)
+                    clock.reset()
                     continue
+                
+                db18_data = blocks.get('db18')  # 料仓重量、本次排料重量、上限值
+                db19_data = blocks.get('db19')  # 排料重量待读取标志
+                q_data = blocks.get('q_area')
+                i_data = blocks.get('i_area')
             
-            process_func(db32_data)
+            if recorder:
+                recorder.record_group({
+                    'db32': db32_data, 'db18': db18_data, 'db19': db19_data,
+                    'q_area': q_data, 'i_area': i_data,
+                })
             
-            # 2. 读取料仓 PLC 数据 (DB18 + DB19 + Q区 + I区)
-            # 2.1 读取 DB18 (料仓重量、本次排料重量、上限值)
-            db18_data = None
-            if is_mock:
-                from backend.services.polling_data_generator import generate_mock_db18_data
-                db18_data = generate_mock_db18_data()
-            else:
-                try:
-                    if db18_parser:
-                        db18_number = db18_parser.get_db_number()
-                        db18_size = db18_parser.get_total_size()
-                        result = plc.read_db(db18_number, 0, db18_size)
-                        if isinstance(result, (tuple, list)) and len(result) == 2:
-                            db18_data, err = result
-                except Exception as db18_err:
-                    logger.debug(f"读取 DB18 失败: {db18_err}")
-                
-            # 2.2 读取 DB19 (排料重量待读取标志)
-            db19_data = None
-            if is_mock:
-                from backend.services.polling_data_generator import generate_mock_db19_data
-                db19_data = generate_mock_db19_data()
-            else:
-                try:
-                    if db19_parser:
-                        db19_number = db19_parser.get_db_number()
-                        db19_size = db19_parser.get_total_size()
-                        result = plc.read_db(db19_number, 0, db19_size)
-                        if isinstance(result, (tuple, list)) and len(result) == 2:
-                            db19_data, err = result
-                except Exception as db19_err:
-                    logger.debug(f"读取 DB19 失败: {db19_err}")
-            
-            # 2.3 读取 Q区信号 (Q3.7 排料, Q4.0 要料)
-            q_data = None
-            if is_mock:
-                from backend.services.polling_data_generator import generate_mock_q_data
-                q_data = generate_mock_q_data()
-            else:
-                try:
-                    q_data, q_err = plc.read_output_area(3, 2)  # 读取 Q3, Q4
-                except Exception as q_err:
-                    logger.debug(f"读取 Q区失败: {q_err}")
+            process_func(db32_data)
             
-            # 2.4 读取 I区信号 (I4.6 供料反馈)
-            i_data = None
-            if is_mock:
-                from backend.services.polling_data_generator import generate_mock_i_data
-                i_data = generate_mock_i_data()
-            else:
-                try:
-                    i_data, i_err = plc.read_input_area(4, 1)  # 读取 I4
-                except Exception as i_err:
-                    logger.debug(f"读取 I区失败: {i_err}")
-                
-            # 2.5 处理料仓 PLC 数据
+            # 2. 处理料仓 PLC 数据
             from backend.services.polling_service import get_batch_info
             batch_info = get_batch_info()
             current_batch = batch_info.get('batch_code', '')
@@ -345,7 +336,9 @@ async def _db32_sensor_polling_loop(
             # 批量写入逻辑 (每15秒写一次: 0.5s×30=15s)
             _normal_buffer_count += 1
             if _normal_buffer_count >= _normal_batch_size:
+                t = metrics.start()
                 await _flush_normal_buffer()
+                metrics.lap('db32', STAGE_BUFFER_FLUSH, t)
                 _normal_buffer_count = 0
             
             # 蝶阀开度批量写入逻辑 (每15秒写一次: 0.5s×30=15s)
@@ -354,10 +347,12 @@ async def _db32_sensor_polling_loop(
                 await _flush_valve_buffer()
                 _valve_buffer_count = 0
             
+            metrics.lap('db32', STAGE_CYCLE, t_cycle)
+            
             # 成功后重置错误计数器
             error_count = 0
             
-            await asyncio.sleep(interval)
+            await clock.tick()
             
         except asyncio.CancelledError:
             break
@@ -377,12 +372,15 @@ async def _db32_sensor_polling_loop(
                 if error_count <= 3:
                     logger.error(traceback.format_exc())
                 await asyncio.sleep(wait_time)
+            
+            # 退避结束后重新锚定周期 (不计入周期统计)
+            clock.reset()
     
     logger.info("DB32 传感器轮询已停止")
 
 
 # ============================================================
-# 5: DB30/DB41 状态轮询模块 (固定 5s, 仅缓存)
+# 4: DB30/DB41 状态轮询模块 (固定 5s, 仅缓存)
 # ============================================================
 async def _status_polling_loop(
     db30_parser,
@@ -407,53 +405,57 @@ async def _status_polling_loop(
     interval = settings.status_polling_interval  # 从 .env 配置读取
     
     logger.info(f"状态轮询已启动 (DB30+DB41, 间隔: {interval}s)")
+    clock = _clocks['status'] = PollingClock('status', interval)
+    metrics = get_pipeline_metrics()
+    recorder = get_frame_recorder()
     
     if not is_mock:
-        plc = get_plc_manager()
+        plc = get_async_plc_client()
         db30_number = db30_parser.get_db_number() if db30_parser else 30
         db30_size = db30_parser.get_total_size() if db30_parser else 40
         db41_number = db41_parser.get_db_number() if db41_parser else 41
         db41_size = db41_parser.get_total_size() if db41_parser else 28  # 7设备×4字节=28
+        
+        # DB30 + DB41 合并为一次读取
+        read_items = [
+            ReadItem('db30', 'DB', db30_number, 0, db30_size),
+            ReadItem('db41', 'DB', db41_number, 0, db41_size),
+        ]
     
     while _status_running:
         try:
             poll_count += 1
+            t_cycle = metrics.start()
             
-            # 1. 读取 DB30 通信状态
+            # 1. 读取 DB30 通信状态 + DB41 数据状态
             if is_mock:
-                from backend.services.polling_data_generator import generate_mock_db30_data
+                from backend.services.polling_data_generator import generate_mock_db30_data, generate_mock_db41_data
                 db30_data = generate_mock_db30_data()
+                db41_data = generate_mock_db41_data()
             else:
-                if not plc.is_connected():
-                    plc.connect()
-                
-                result = plc.read_db(db30_number, 0, db30_size)
-                if isinstance(result, (tuple, list)) and len(result) == 2:
-                    db30_data, err = result
-                else:
-                    db30_data = None
+                t = metrics.start()
+                blocks, err = await plc.read_multi(read_items, priority=PLCPriority.STATUS)
+                metrics.lap('status', STAGE_PLC_READ, t)
+                db30_data = blocks.get('db30')
+                db41_data = blocks.get('db41')
+            
+            if recorder:
+                recorder.record_group({'db30': db30_data, 'db41': db41_data})
             
+            t = metrics.start()
             if db30_data:
                 process_db30_func(db30_data)
             
-            # 2. 读取 DB41 数据状态
-            if is_mock:
-                from backend.services.polling_data_generator import generate_mock_db41_data
-                db41_data = generate_mock_db41_data()
-            else:
-                result = plc.read_db(db41_number, 0, db41_size)
-                if isinstance(result, (tuple, list)) and len(result) == 2:
-                    db41_data, err = result
-                else:
-                    db41_data = None
-            
+            # 2. 处理 DB41 数据状态
             if db41_data:
                 process_db41_func(db41_data)
+            metrics.lap('status', STAGE_PARSE, t)
+            metrics.lap('status', STAGE_CYCLE, t_cycle)
             
             # 成功后重置错误计数器
             error_count = 0
             
-            await asyncio.sleep(interval)
+            await clock.tick()
             
         except asyncio.CancelledError:
             break
@@ -473,6 +475,9 @@ async def _status_polling_loop(
                 if error_count <= 3:
                     logger.error(traceback.format_exc())
                 await asyncio.sleep(wait_time)
+            
+            # 退避结束后重新锚定周期 (不计入周期统计)
+            clock.reset()
     
     logger.info("状态轮询已停止")
 
@@ -574,6 +579,19 @@ async def stop_all_polling_loops():
             except asyncio.CancelledError:
                 pass
     
+    # 输出并清空未结束的汇总窗口
+    try:
+        from backend.services.rollup_aggregator import get_rollup_aggregator
+        get_rollup_aggregator().flush_all(final=True)
+    except Exception as e:
+        logger.error(f"输出汇总窗口失败: {e}")
+    
+    # 停止 PLC I/O 线程
+    await asyncio.to_thread(close_async_plc_client)
+    
+    # 关闭原始帧录制 (写出缓冲区)
+    close_frame_recorder()
+    
     logger.info("所有轮询任务已停止")
 
 
@@ -593,11 +611,42 @@ def switch_db1_speed(high_speed: bool):
         logger.info(f"DB1 轮询切换到低速模式 ({_db1_interval}s)")
 
 
+def get_pipeline_stage_metrics() -> dict:
+    """获取采集链路分阶段耗时 (供状态页/服务状态 API 调用)
+    
+    Returns:
+        dict: {
+            'enabled': bool,
+            'loops': {循环名: {阶段: {count, avg_ms, p50_ms, p95_ms, p99_ms, max_ms}}},
+            'intervals': {循环名: 目标周期 (秒)}
+        }
+    """
+    metrics = get_pipeline_metrics()
+    return {
+        'enabled': metrics.enabled,
+        'loops': metrics.snapshot(),
+        'intervals': {name: clock.interval for name, clock in _clocks.items()},
+    }
+
+
 def get_polling_loops_status():
-    """获取轮询任务状态"""
+    """获取轮询任务状态
+    
+    Returns:
+        dict: {
+            'db1_running': bool,
+            'db1_interval': float,
+            'db32_running': bool,
+            'status_running': bool,
+            'clocks': {循环名: 周期/抖动/处理耗时统计 (见 PollingClock.get_stats)},
+            'frame_changes': {块名: 读取/变化次数、跳过比例、最后变化时间}
+        }
+    """
     return {
         "db1_running": _db1_running,
         "db1_interval": _db1_interval,
         "db32_running": _db32_running,
         "status_running": _status_running,
+        "clocks": {name: clock.get_stats() for name, clock in _clocks.items()},
+        "frame_changes": get_frame_change_detector().get_stats(),
     }
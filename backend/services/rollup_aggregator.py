@@ -0,0 +1,179 @@
+# ============================================================
+# 文件说明: rollup_aggregator.py - 历史数据预聚合 (降采样) 服务
+# ============================================================
+# 功能:
+#   1. 从批量写入管线接收原始数据点 (flush_arc_buffer / flush_normal_buffer)
+#   2. 按 10s / 1m / 10m 三个时间层级累计 mean / min / max
+#   3. 窗口结束后生成汇总点，写入 sensor_rollup measurement
+#   4. 暂停/强制刷新时输出未结束窗口的当前统计 (保留累计，之后同一窗口再输出时覆盖为整窗统计)
+#   5. 批次停止/切换/服务退出时输出并清空所有未结束窗口
+# ============================================================
+# 数据格式 (sensor_rollup):
+#   - tags: 与原始点相同 (batch_code/module_type/sensor...) + tier
+#   - fields: {字段}_mean, {字段}_min, {字段}_max
+#   - time: 窗口起始时间 (UTC)
+#   - 同一窗口可能输出多次 (暂停/强制刷新后继续累计)，InfluxDB 保留最后一次写入，
+#     累计值 (sum/count/min/max) 始终覆盖整个窗口，mean 按样本数加权
+# ============================================================
+# 查询路由见 HistoryQueryService.select_rollup_tier():
+#   长时间跨度查询直接读取汇总层级，不再扫描 0.2s/0.5s 原始数据
+# ============================================================
+
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from backend.core.influx_writer import get_influx_writer
+from backend.core.line_protocol import LineProtocolEncoder
+
+ROLLUP_MEASUREMENT = "sensor_rollup"
+
+# 汇总层级 (名称, 窗口秒数)，从细到粗
+ROLLUP_TIERS: Tuple[Tuple[str, int], ...] = (
+    ("10s", 10),
+    ("1m", 60),
+    ("10m", 600),
+)
+
+# 只汇总原始 sensor_data 数据
+_SOURCE_MEASUREMENT = "sensor_data"
+
+
+class RollupAggregator:
+    """多层级滑动窗口汇总器 (线程安全)"""
+
+    # 1. 初始化各层级的窗口状态
+    def __init__(self, tiers: Tuple[Tuple[str, int], ...] = ROLLUP_TIERS):
+        self._tiers = tiers
+        self._lock = threading.Lock()
+        self._encoder = LineProtocolEncoder()
+
+        # tier -> {tags 元组: [窗口起始秒, {字段: [sum, count, min, max]}, 是否有未输出的新样本]}
+        # 每个序列独立推进窗口 (弧流 4s 一批、传感器 100s 一批，互不影响)
+        self._windows: Dict[str, Dict[Tuple, list]] = {name: {} for name, _ in tiers}
+
+        # 统计
+        self._stats = {
+            'source_points': 0,
+            'rollup_points': 0,
+            'submit_failed': 0,
+        }
+
+    # 2. 累加一批原始数据点 (字典格式: measurement/tags/fields/time)
+    def add_points(self, points: Iterable[Dict[str, Any]]):
+        with self._lock:
+            for point in points:
+                if point.get('measurement') != _SOURCE_MEASUREMENT:
+                    continue
+                timestamp = point.get('time')
+                if timestamp is None:
+                    continue
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.astimezone(timezone.utc)
+                epoch = int(timestamp.timestamp())
+
+                # 只保留数值字段 (bool 是 int 子类，需要排除)
+                values = [
+                    (k, float(v)) for k, v in point['fields'].items()
+                    if isinstance(v, (int, float)) and not isinstance(v, bool) and v == v
+                ]
+                if not values:
+                    continue
+
+                tags_key = tuple(sorted(point['tags'].items()))
+                for name, seconds in self._tiers:
+                    start = epoch - epoch % seconds
+                    window = self._windows[name].get(tags_key)
+                    if window is None:
+                        window = self._windows[name][tags_key] = [start, {}, False]
+                    elif start > window[0]:
+                        # 进入新窗口: 输出上一个窗口
+                        self._emit_window(name, tags_key, window)
+                        window[0] = start
+                        window[1] = {}
+                    elif start < window[0]:
+                        # 迟到数据 (所在窗口已输出) 直接忽略
+                        continue
+
+                    window[2] = True
+                    series = window[1]
+                    for field, value in values:
+                        acc = series.get(field)
+                        if acc is None:
+                            series[field] = [value, 1, value, value]
+                        else:
+                            acc[0] += value
+                            acc[1] += 1
+                            if value < acc[2]:
+                                acc[2] = value
+                            if value > acc[3]:
+                                acc[3] = value
+
+                self._stats['source_points'] += 1
+
+            self._submit()
+
+    # 3. 输出所有未结束的窗口
+    #    final=False (暂停/强制刷新): 输出当前统计但保留累计，恢复后同一窗口的新样本继续合并
+    #    final=True  (批次停止/切换/服务退出): 输出后清空
+    def flush_all(self, final: bool = False):
+        with self._lock:
+            for name, _ in self._tiers:
+                windows = self._windows[name]
+                for tags_key, window in windows.items():
+                    self._emit_window(name, tags_key, window)
+                if final:
+                    windows.clear()
+            self._submit()
+
+    # 4. 获取统计信息
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'open_series': {name: len(self._windows[name]) for name, _ in self._tiers},
+            }
+
+    # ------------------------------------------------------------
+    # 内部方法 (调用方已持有锁)
+    # ------------------------------------------------------------
+    def _emit_window(self, name: str, tags_key: Tuple, window: list):
+        window_start, series, dirty = window
+        if not series or not dirty:
+            return
+        window[2] = False
+        fields = {}
+        for field, (total, count, minimum, maximum) in series.items():
+            fields[f"{field}_mean"] = total / count
+            fields[f"{field}_min"] = minimum
+            fields[f"{field}_max"] = maximum
+        tags = dict(tags_key)
+        tags['tier'] = name
+        timestamp = datetime.fromtimestamp(window_start, tz=timezone.utc)
+        if self._encoder.append(ROLLUP_MEASUREMENT, tags, fields, timestamp):
+            self._stats['rollup_points'] += 1
+
+    def _submit(self):
+        count = self._encoder.line_count
+        if not count:
+            return
+        payload = self._encoder.take()
+        result = get_influx_writer().submit([payload])
+        if result.dropped:
+            self._stats['submit_failed'] += result.dropped
+            logger.warning(f"汇总数据提交失败 (写入队列已满)，丢弃 {result.dropped} 个点")
+
+
+# ============================================================
+# 单例
+# ============================================================
+_rollup_aggregator: Optional[RollupAggregator] = None
+
+
+def get_rollup_aggregator() -> RollupAggregator:
+    global _rollup_aggregator
+    if _rollup_aggregator is None:
+        _rollup_aggregator = RollupAggregator()
+    return _rollup_aggregator
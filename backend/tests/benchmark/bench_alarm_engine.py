@@ -0,0 +1,127 @@
+# ============================================================
+# 文件说明: bench_alarm_engine.py - 报警判定每帧耗时对比
+# ============================================================
+# 功能:
+#   1. 旧路径: 逐字段 AlarmThresholdManager.check_value (无回差/延时)
+#   2. 新路径: AlarmEngine.evaluate (空闲时标量快速路径)
+#   3. 数组路径: AlarmEngine.evaluate_array (始终 NumPy 运算，作为参照)
+#   4. 校验: 持续超限的帧序列，新旧路径得出的最终级别一致
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m backend.tests.benchmark.bench_alarm_engine
+#   python -m backend.tests.benchmark.bench_alarm_engine --frames 200000
+# ============================================================
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backend.alarm_thresholds import get_alarm_threshold_manager
+from backend.services.alarm_engine import AlarmEngine, CHANNELS
+
+
+# 1. 生成正常范围内的弧流帧 (DB1，6 个通道) 与传感器帧 (DB32，8 个通道)
+def make_frames(count: int):
+    arc, sensor = [], []
+    for _ in range(count):
+        arc.append({
+            'arc_current_u': random.uniform(4000, 5000),
+            'arc_current_v': random.uniform(4000, 5000),
+            'arc_current_w': random.uniform(4000, 5000),
+            'arc_voltage_u': random.uniform(63, 67),
+            'arc_voltage_v': random.uniform(63, 67),
+            'arc_voltage_w': random.uniform(63, 67),
+        })
+        sensor.append({
+            'electrode_depth_u': random.uniform(500, 1500),
+            'electrode_depth_v': random.uniform(500, 1500),
+            'electrode_depth_w': random.uniform(500, 1500),
+            'cooling_pressure_shell': random.uniform(20, 40),
+            'cooling_pressure_cover': random.uniform(20, 40),
+            'cooling_flow_shell': None,
+            'cooling_flow_cover': None,
+            'filter_pressure_diff': None,
+        })
+    return arc, sensor
+
+
+# 2. 旧路径: 逐字段判定
+def run_scalar(frames):
+    manager = get_alarm_threshold_manager()
+    raised = 0
+    for values in frames:
+        for name, value in values.items():
+            if value is None:
+                continue
+            if manager.check_value(name, value) in ('warning', 'alarm'):
+                raised += 1
+    return raised
+
+
+# 3. 新路径: 引擎 (快速路径)
+def run_engine(frames):
+    engine = AlarmEngine()
+    raised = 0
+    for i, values in enumerate(frames):
+        raised += len(engine.evaluate(values, now=i * 0.2))
+    return raised
+
+
+# 4. 参照: 每帧都走 NumPy 数组运算
+def run_array(frames):
+    engine = AlarmEngine()
+    index = {ch.param_name: i for i, ch in enumerate(CHANNELS)}
+    arrays = []
+    for values in frames:
+        frame = np.full(len(CHANNELS), np.nan)
+        for name, value in values.items():
+            if value is not None:
+                frame[index[name]] = value
+        arrays.append(frame)
+    raised = 0
+    for i, frame in enumerate(arrays):
+        raised += len(engine.evaluate_array(frame, now=i * 0.2))
+    return raised
+
+
+# 5. 校验: 持续过流后新旧路径的最终级别一致
+def verify():
+    manager = get_alarm_threshold_manager()
+    engine = AlarmEngine(on_delay=1.0, off_delay=1.0)
+    frame = {'arc_current_u': 8500.0, 'arc_current_v': 6500.0, 'arc_current_w': 4500.0}
+    for i in range(20):
+        engine.evaluate(frame, now=i * 0.2)
+    states = engine.get_states()
+    return all(states[name] == manager.check_value(name, value) for name, value in frame.items())
+
+
+def _timed(func, frames):
+    t0 = time.perf_counter()
+    raised = func(frames)
+    return raised, (time.perf_counter() - t0) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="报警判定每帧耗时对比")
+    parser.add_argument("--frames", type=int, default=50000, help="每种帧的数量 (全部在正常范围内)")
+    args = parser.parse_args()
+
+    arc, sensor = make_frames(args.frames)
+
+    print("=" * 60)
+    print(f"报警判定对比 ({args.frames} 帧弧流 + {args.frames} 帧传感器, 全部正常)")
+    print("=" * 60)
+    print(f"持续超限级别校验: {'通过' if verify() else '不一致'}")
+
+    for label, frames in (("弧流帧 (6 通道)", arc), ("传感器帧 (5 通道有值)", sensor)):
+        print(f"\n{label}:")
+        for name, func in (("check_value 逐字段", run_scalar), ("AlarmEngine.evaluate", run_engine),
+                           ("evaluate_array 参照", run_array)):
+            raised, per_frame = _timed(func, frames)
+            print(f"  {name:<22} {per_frame:6.2f} us/帧  (报警 {raised})")
+
+
+if __name__ == "__main__":
+    main()
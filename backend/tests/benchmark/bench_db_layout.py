@@ -0,0 +1,120 @@
+# ============================================================
+# 文件说明: bench_db_layout.py - DB1 帧解码性能对比
+# ============================================================
+# 功能:
+#   1. 旧路径: 逐字段 if/elif 类型分支 + 切片 struct.unpack + all_fields 元数据字典
+#   2. 新路径: CompiledLayout 预编译 Struct，一次 unpack_from 解码整帧
+#   3. 完整 parse(): 新解析器含分组/组合值计算的端到端耗时
+#   4. 校验新旧路径解码出的字段值一致
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m backend.tests.benchmark.bench_db_layout
+#   python -m backend.tests.benchmark.bench_db_layout --frames 50000
+# ============================================================
+
+import argparse
+import os
+import struct
+import time
+
+from backend.plc.parser_config_db1 import ConfigDrivenDB1Parser
+
+
+# 1. 旧路径: 逐字段解析 (与改造前 ConfigDrivenDB1Parser._parse_field 一致)
+def legacy_parse_field(data: bytes, field_def: dict):
+    offset = field_def.get('offset', 0)
+    field_type = field_def.get('type', 'INT').upper()
+    if field_type == 'INT':
+        if offset + 2 > len(data):
+            return 0
+        return struct.unpack('>h', data[offset:offset + 2])[0]
+    elif field_type == 'REAL':
+        if offset + 4 > len(data):
+            return 0.0
+        return round(struct.unpack('>f', data[offset:offset + 4])[0], 4)
+    elif field_type == 'WORD':
+        if offset + 2 > len(data):
+            return 0
+        return struct.unpack('>H', data[offset:offset + 2])[0]
+    elif field_type == 'DWORD' or field_type == 'UDINT':
+        if offset + 4 > len(data):
+            return 0
+        return struct.unpack('>I', data[offset:offset + 4])[0]
+    elif field_type == 'DINT':
+        if offset + 4 > len(data):
+            return 0
+        return struct.unpack('>i', data[offset:offset + 4])[0]
+    elif field_type == 'BYTE':
+        if offset + 1 > len(data):
+            return 0
+        return data[offset]
+    elif field_type == 'BOOL':
+        if offset + 1 > len(data):
+            return False
+        return bool(data[offset] & (1 << field_def.get('bit', 0)))
+    elif field_type == 'TIME':
+        if offset + 4 > len(data):
+            return 0
+        return struct.unpack('>i', data[offset:offset + 4])[0]
+    return 0
+
+
+def legacy_decode(fields, data: bytes) -> dict:
+    all_fields = {}
+    for field_def in fields:
+        all_fields[field_def.get('name', '')] = {
+            'value': legacy_parse_field(data, field_def),
+            'type': field_def.get('type', 'INT'),
+            'offset': field_def.get('offset', 0),
+            'unit': field_def.get('unit', ''),
+            'description': field_def.get('description', '')
+        }
+    return all_fields
+
+
+# 2. 计时工具: 返回 (帧/秒, 总耗时秒)
+def run(func, frames):
+    t0 = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    elapsed = time.perf_counter() - t0
+    return len(frames) / elapsed, elapsed
+
+
+# 3. 校验新旧路径字段值一致 (NaN 按字符串比较)
+def verify(parser, frames) -> bool:
+    for frame in frames:
+        old = {name: str(item['value']) for name, item in legacy_decode(parser.fields, frame).items()}
+        new = {name: str(value) for name, value in parser.layout.decode_dict(frame).items()}
+        if old != new:
+            return False
+    return True
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="DB1 帧解码性能对比")
+    arg_parser.add_argument("--frames", type=int, default=20000, help="解码帧数")
+    args = arg_parser.parse_args()
+
+    parser = ConfigDrivenDB1Parser()
+    size = parser.get_total_size()
+    frames = [os.urandom(size) for _ in range(args.frames)]
+
+    print("=" * 60)
+    print(f"DB1 帧解码对比 ({args.frames} 帧, 每帧 {size} bytes, {len(parser.fields)} 个字段)")
+    print("=" * 60)
+    print(f"预编译格式: {parser.layout.size} bytes, {len(parser.layout.names)} 个字段")
+    print(f"解码一致性校验: {'通过' if verify(parser, frames[:200]) else '不一致'}")
+
+    old_rate, old_elapsed = run(lambda frame: legacy_decode(parser.fields, frame), frames)
+    new_rate, new_elapsed = run(parser.layout.decode, frames)
+    parse_rate, parse_elapsed = run(parser.parse, frames)
+
+    print(f"逐字段解析:       {old_elapsed * 1000:8.1f} ms, {old_rate:12,.0f} 帧/秒")
+    print(f"预编译解码:       {new_elapsed * 1000:8.1f} ms, {new_rate:12,.0f} 帧/秒")
+    print(f"完整 parse():     {parse_elapsed * 1000:8.1f} ms, {parse_rate:12,.0f} 帧/秒")
+    print(f"解码加速比: {old_elapsed / new_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# ============================================================
+# 文件说明: bench_line_protocol.py - line protocol 序列化性能对比
+# ============================================================
+# 功能:
+#   1. 旧路径: build_point() 构建 Point + to_line_protocol()
+#   2. 新路径: LineProtocolEncoder 预编译前缀直接写入缓冲区
+#   3. 校验两条路径输出的数据行一致 (字段顺序无关)
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m backend.tests.benchmark.bench_line_protocol
+#   python -m backend.tests.benchmark.bench_line_protocol --flushes 2000
+# ============================================================
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone, timedelta
+
+from backend.core.influxdb import build_point
+from backend.core.line_protocol import LineProtocolEncoder, encode_points
+
+
+# 1. 生成一次 DB1 flush 的数据点 (20次弧流 + 1个能耗点，与 process_arc_data 一致)
+def make_arc_flush(batch_code: str, start: datetime):
+    points = []
+    for i in range(20):
+        points.append({
+            'measurement': 'sensor_data',
+            'tags': {
+                'device_type': 'electric_furnace',
+                'module_type': 'arc_data',
+                'device_id': 'electrode',
+                'batch_code': batch_code
+            },
+            'fields': {
+                'arc_current_U': random.uniform(4000, 6000),
+                'arc_current_V': random.uniform(4000, 6000),
+                'arc_current_W': random.uniform(4000, 6000),
+                'arc_voltage_U': random.uniform(80, 120),
+                'arc_voltage_V': random.uniform(80, 120),
+                'arc_voltage_W': random.uniform(80, 120),
+                'power_total': random.uniform(1000, 2000),
+            },
+            'time': start + timedelta(milliseconds=200 * i)
+        })
+    points.append({
+        'measurement': 'sensor_data',
+        'tags': {
+            'device_type': 'electric_furnace',
+            'module_type': 'energy_consumption',
+            'device_id': 'electrode',
+            'batch_code': batch_code
+        },
+        'fields': {'energy_total': random.uniform(0, 50000)},
+        'time': start
+    })
+    return points
+
+
+# 2. 旧路径: Point 对象 + to_line_protocol
+def run_point_path(flushes):
+    lines = 0
+    for points in flushes:
+        for dp in points:
+            p = build_point(dp['measurement'], dp['tags'], dp['fields'], dp['time'])
+            if p:
+                p.to_line_protocol()
+                lines += 1
+    return lines
+
+
+# 3. 新路径: 预编译编码器
+def run_encoder_path(flushes):
+    encoder = LineProtocolEncoder()
+    lines = 0
+    for points in flushes:
+        _, count = encode_points(encoder, points)
+        lines += count
+    return lines
+
+
+# 4. 校验输出一致 (按字段集合比较)
+def verify(points):
+    def normalize(line: str):
+        head, fields, ts = line.rsplit(' ', 2)
+        return head, frozenset(fields.split(',')), ts
+
+    encoder = LineProtocolEncoder()
+    payload, _ = encode_points(encoder, points)
+    new_lines = [normalize(l) for l in payload.decode('utf-8').splitlines()]
+    old_lines = [
+        normalize(build_point(dp['measurement'], dp['tags'], dp['fields'], dp['time']).to_line_protocol())
+        for dp in points
+    ]
+    return new_lines == old_lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="line protocol 序列化性能对比")
+    parser.add_argument("--flushes", type=int, default=1000, help="模拟 DB1 flush 次数 (每次 21 个点)")
+    args = parser.parse_args()
+
+    start = datetime.now(timezone.utc)
+    flushes = [make_arc_flush("26010315", start + timedelta(seconds=4 * i)) for i in range(args.flushes)]
+
+    print("=" * 60)
+    print(f"line protocol 序列化对比 ({args.flushes} 次 flush, 每次 21 个点)")
+    print("=" * 60)
+    print(f"输出一致性校验: {'通过' if verify(flushes[0]) else '不一致'}")
+
+    t0 = time.perf_counter()
+    old_lines = run_point_path(flushes)
+    old_elapsed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new_lines = run_encoder_path(flushes)
+    new_elapsed = time.perf_counter() - t0
+
+    print(f"build_point 路径: {old_lines} 行, {old_elapsed * 1000:.1f} ms, {old_lines / old_elapsed:,.0f} 行/秒")
+    print(f"预编译编码器:     {new_lines} 行, {new_elapsed * 1000:.1f} ms, {new_lines / new_elapsed:,.0f} 行/秒")
+    print(f"加速比: {old_elapsed / new_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
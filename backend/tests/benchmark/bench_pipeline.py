@@ -0,0 +1,503 @@
+# ============================================================
+# 文件说明: bench_pipeline.py - 采集链路端到端压测
+# ============================================================
+# 功能:
+#   1. 进程内 snap7 模拟 PLC (DB1/DB32/DB18/DB19/DB30/DB41 + Q/I 区)，数据来自 polling_data_generator
+#      (--source mock 时改用后端 Mock 模式，不经过 PLC 读取)
+#   2. 本地 line protocol 接收端代替 InfluxDB (/api/v2/write 计数，/health 返回 pass)
+#   3. 直接驱动 start_all_polling_loops，按指定轮询间隔运行 N 分钟 (可一次测多档速率)
+#   4. 统计: 各循环实际采样率/抖动、事件循环延迟、写入点数/秒、内存增长、各线程 CPU、分阶段耗时
+#   5. 结果输出为 JSON，可用 --baseline 与上一版本结果对比
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m backend.tests.benchmark.bench_pipeline --minutes 5
+#   python -m backend.tests.benchmark.bench_pipeline --rates 0.2,0.1,0.05,0.02 --minutes 2 --output bench.json
+#   python -m backend.tests.benchmark.bench_pipeline --source mock --minutes 1 --baseline bench_prev.json
+# ============================================================
+# 说明:
+#   - 批次状态/批次目录/批次汇总写入临时目录，不影响 data/ 下的正式文件
+#   - 每档速率先预热 --warmup 秒，预热期间的统计不计入结果
+# ============================================================
+
+import argparse
+import asyncio
+import ctypes
+import gzip
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+# 对比时关注的指标 (路径, 越大越好)
+BASELINE_KEYS = (
+    (('loops', 'db1', 'effective_hz'), True),
+    (('loops', 'db32', 'effective_hz'), True),
+    (('loops', 'db1', 'jitter_p95_ms'), False),
+    (('event_loop_lag_ms', 'p99'), False),
+    (('points', 'points_per_second'), True),
+    (('memory', 'growth_mb_per_min'), False),
+    (('cpu', 'process_pct'), False),
+)
+
+
+# ============================================================
+# 1: line protocol 接收端 (InfluxDB 替身)
+# ============================================================
+class LineProtocolSink:
+    """统计写入的数据行数/字节数 (线程安全)"""
+
+    def __init__(self, port: int):
+        self._lock = threading.Lock()
+        self.reset()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                if self.path.startswith('/api/v2/write'):
+                    sink.record(body)
+                    self.send_response(204)
+                    self.end_headers()
+                elif self.path.startswith('/api/v2/query'):
+                    # 查询返回空结果 (累计器初始化等)
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/csv')
+                    self.end_headers()
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+
+            def do_GET(self):
+                if self.path.startswith('/health'):
+                    payload = json.dumps({'name': 'influxdb', 'message': 'ready for queries and writes',
+                                          'status': 'pass', 'checks': [], 'version': 'bench', 'commit': ''})
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.end_headers()
+                    self.wfile.write(payload.encode())
+                else:
+                    self.send_response(204)
+                    self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="LineProtocolSink", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self, body: bytes):
+        lines = body.count(b'\n') + (1 if body and not body.endswith(b'\n') else 0)
+        with self._lock:
+            self.points += lines
+            self.bytes += len(body)
+            self.requests += 1
+
+    def reset(self):
+        with self._lock:
+            self.points = 0
+            self.bytes = 0
+            self.requests = 0
+
+
+# ============================================================
+# 2: 进程内模拟 PLC (snap7 Server)
+# ============================================================
+class InProcessPLC:
+    """注册轮询用到的 DB 块和 Q/I 区，后台线程按 update_interval 刷新数据"""
+
+    def __init__(self, port: int, update_interval: float):
+        import snap7
+        from snap7.server import Server
+        try:
+            from snap7.type import SrvArea
+            self._area_db, self._area_pa, self._area_pe = SrvArea.DB, SrvArea.PA, SrvArea.PE
+        except ImportError:
+            from snap7.types import srvAreaDB, srvAreaPA, srvAreaPE
+            self._area_db, self._area_pa, self._area_pe = srvAreaDB, srvAreaPA, srvAreaPE
+
+        self._snap7 = snap7
+        self._port = port
+        self._update_interval = update_interval
+        self._server = Server()
+        self._buffers: Dict[Any, Any] = {}
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _register(self, area, index: int, size: int):
+        buffer = (ctypes.c_ubyte * size)()
+        self._server.register_area(area, index, buffer)
+        self._buffers[(area, index)] = buffer
+
+    def _write(self, area, index: int, offset: int, data: bytes):
+        buffer = self._buffers[(area, index)]
+        size = min(len(data), len(buffer) - offset)
+        ctypes.memmove(ctypes.addressof(buffer) + offset, data, size)
+
+    def start(self, db_sizes: Dict[int, int]):
+        for db_number, size in db_sizes.items():
+            self._register(self._area_db, db_number, size)
+        self._register(self._area_pa, 0, 8)
+        self._register(self._area_pe, 0, 8)
+        self._refresh()
+        self._server.start(tcpport=self._port)
+        self._running = True
+        self._thread = threading.Thread(target=self._update_loop, name="MockPLC-Update", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self._server.stop()
+        self._server.destroy()
+
+    def _refresh(self):
+        from backend.services import polling_data_generator as gen
+        for db_number, func in ((1, gen.generate_mock_db1_data), (32, gen.generate_mock_db32_data),
+                                (18, gen.generate_mock_db18_data), (19, gen.generate_mock_db19_data),
+                                (30, gen.generate_mock_db30_data), (41, gen.generate_mock_db41_data)):
+            if (self._area_db, db_number) in self._buffers:
+                self._write(self._area_db, db_number, 0, func())
+        self._write(self._area_pa, 0, 3, gen.generate_mock_q_data())
+        self._write(self._area_pe, 0, 4, gen.generate_mock_i_data())
+
+    def _update_loop(self):
+        while self._running:
+            self._refresh()
+            time.sleep(self._update_interval)
+
+
+# ============================================================
+# 3: 资源采样 (RSS / 各线程 CPU)
+# ============================================================
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def read_rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_thread_cpu() -> Dict[str, float]:
+    """各线程累计 CPU 秒数 (按线程名合并，仅 Linux)"""
+    names = {t.native_id: t.name for t in threading.enumerate() if t.native_id is not None}
+    result: Dict[str, float] = {}
+    task_dir = '/proc/self/task'
+    if not os.path.isdir(task_dir):
+        return result
+    for tid in os.listdir(task_dir):
+        try:
+            with open(f'{task_dir}/{tid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+            name = names.get(int(tid))
+            if name is None:
+                with open(f'{task_dir}/{tid}/comm') as f:
+                    name = f"native:{f.read().strip()}"
+        except (OSError, IndexError, ValueError):
+            continue
+        result[name] = result.get(name, 0.0) + cpu
+    return result
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    n = len(ordered)
+    if not n:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    pick = lambda q: round(ordered[min(n - 1, int(n * q))], 3)
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': round(ordered[-1], 3)}
+
+
+# ============================================================
+# 4: 单档速率运行
+# ============================================================
+async def run_once(args, db1_interval: float, sink: LineProtocolSink) -> Dict[str, Any]:
+    from backend.config import get_settings
+    from backend.core.influx_writer import get_influx_writer
+    from backend.core.pipeline_metrics import get_pipeline_metrics
+    from backend.services import polling_loops_v2
+    from backend.services.batch_service import get_batch_service
+    from backend.plc.plc_async_client import get_async_plc_client
+
+    settings = get_settings()
+    settings.db1_polling_interval = db1_interval
+    settings.db32_polling_interval = args.db32_interval or max(db1_interval, 0.02)
+    settings.status_polling_interval = args.status_interval
+
+    batch_service = get_batch_service()
+    now = datetime.now()
+    batch_service.start(f"{now:%y%m}99{now:%d}")
+    get_influx_writer().start()
+
+    await polling_loops_v2.start_all_polling_loops()
+    polling_loops_v2._db1_interval = db1_interval   # 不受 0.2s/0.5s 档位限制
+
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    rss: List[float] = []
+    measuring = False
+
+    # 4.1 事件循环延迟探针 (10ms 定时器的唤醒偏差)
+    async def lag_probe():
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(0.01)
+            if measuring:
+                lags.append((loop.time() - t0 - 0.01) * 1000)
+
+    # 4.2 内存采样 (每秒)
+    async def rss_sampler():
+        while True:
+            if measuring:
+                rss.append(read_rss_mb())
+            await asyncio.sleep(1.0)
+
+    probes = [asyncio.create_task(lag_probe()), asyncio.create_task(rss_sampler())]
+
+    # 4.3 预热结束后清零统计
+    await asyncio.sleep(args.warmup)
+    get_pipeline_metrics().reset()
+    sink.reset()
+    writer_before = get_influx_writer().get_metrics()
+    clocks_before = {name: c['ticks'] for name, c in polling_loops_v2.get_polling_loops_status()['clocks'].items()}
+    cpu_before = read_thread_cpu()
+    process_before = time.process_time()
+    t_start = time.monotonic()
+    measuring = True
+
+    await asyncio.sleep(args.minutes * 60)
+
+    measuring = False
+    elapsed = time.monotonic() - t_start
+    process_cpu = time.process_time() - process_before
+    cpu_after = read_thread_cpu()
+    sink_points, sink_bytes, sink_requests = sink.points, sink.bytes, sink.requests
+    status = polling_loops_v2.get_polling_loops_status()
+    writer_after = get_influx_writer().get_metrics()
+    stages = get_pipeline_metrics().snapshot()
+    scheduler = get_async_plc_client().get_status() if not settings.mock_mode else None
+
+    for task in probes:
+        task.cancel()
+    await polling_loops_v2.stop_all_polling_loops()
+    batch_service.stop()
+
+    # 4.4 汇总
+    loops = {}
+    for name, clock in status['clocks'].items():
+        ticks = clock['ticks'] - clocks_before.get(name, 0)
+        loops[name] = {
+            'target_hz': clock['target_hz'],
+            'effective_hz': round(ticks / elapsed, 3),
+            'ticks': ticks,
+            'overruns': clock['overruns'],
+            'missed_ticks': clock['missed_ticks'],
+            'period_p95_ms': clock['period']['p95_ms'],
+            'jitter_p95_ms': clock['jitter']['p95_ms'],
+            'work_p95_ms': clock['work']['p95_ms'],
+        }
+
+    threads = {}
+    for name, cpu in cpu_after.items():
+        used = cpu - cpu_before.get(name, 0.0)
+        if used > 0:
+            threads[name] = {'cpu_s': round(used, 3), 'pct': round(used / elapsed * 100, 2)}
+
+    return {
+        'db1_interval': db1_interval,
+        'db32_interval': settings.db32_polling_interval,
+        'status_interval': settings.status_polling_interval,
+        'duration_s': round(elapsed, 2),
+        'loops': loops,
+        'event_loop_lag_ms': percentiles(lags),
+        'points': {
+            'points': sink_points,
+            'points_per_second': round(sink_points / elapsed, 2),
+            'bytes_per_second': round(sink_bytes / elapsed, 2),
+            'write_requests': sink_requests,
+            'writer_dropped': writer_after.get('dropped_points', 0) - writer_before.get('dropped_points', 0),
+            'writer_queue_depth': writer_after.get('queue_depth', 0),
+        },
+        'memory': {
+            'rss_start_mb': round(rss[0], 2) if rss else None,
+            'rss_end_mb': round(rss[-1], 2) if rss else None,
+            'rss_peak_mb': round(max(rss), 2) if rss else None,
+            'growth_mb': round(rss[-1] - rss[0], 2) if rss else None,
+            'growth_mb_per_min': round((rss[-1] - rss[0]) / (elapsed / 60), 3) if len(rss) > 1 else None,
+        },
+        'cpu': {
+            'process_s': round(process_cpu, 3),
+            'process_pct': round(process_cpu / elapsed * 100, 2),
+            'threads': dict(sorted(threads.items(), key=lambda item: -item[1]['cpu_s'])),
+        },
+        'stages': stages,
+        'plc_scheduler': scheduler,
+    }
+
+
+# ============================================================
+# 5: 环境准备 / 对比 / 入口
+# ============================================================
+def prepare_environment(args, data_dir: str):
+    """指向模拟 PLC 与接收端，批次相关文件写入临时目录"""
+    from backend.config import get_settings
+    from backend.services import batch_catalog, batch_summary_store
+    from backend.services.batch_service import BatchService
+
+    settings = get_settings()
+    settings.mock_mode = args.source == 'mock'
+    settings.plc_ip = '127.0.0.1'
+    settings.plc_port = args.plc_port
+    settings.influx_url = f"http://127.0.0.1:{args.sink_port}"
+    settings.influx_spool_enabled = False
+    settings.pipeline_metrics_enabled = True
+
+    BatchService.STATE_FILE = os.path.join(data_dir, "batch_state.json")
+    batch_catalog._batch_catalog = batch_catalog.BatchCatalog(os.path.join(data_dir, "batch_catalog.json"))
+    batch_summary_store._batch_summary_store = batch_summary_store.BatchSummaryStore(
+        os.path.join(data_dir, "batch_summary.json")
+    )
+
+
+def db_sizes_from_parsers() -> Dict[int, int]:
+    from backend.services.polling_data_processor import init_parsers, get_parsers
+    init_parsers()
+    db1, db32, db30, db41, db18, db19 = get_parsers()
+    sizes = {1: 182, 32: 29, 30: 40, 41: 28, 18: 44, 19: 4}
+    for parser in (db1, db32, db30, db41, db18, db19):
+        if parser is not None and hasattr(parser, 'get_db_number'):
+            sizes[parser.get_db_number()] = max(parser.get_total_size(), sizes.get(parser.get_db_number(), 0))
+    return sizes
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any]):
+    """按 db1_interval 配对，输出关键指标变化"""
+    previous = {run['db1_interval']: run for run in baseline.get('runs', [])}
+    for run in result['runs']:
+        base = previous.get(run['db1_interval'])
+        if base is None:
+            continue
+        print(f"\n对比基线 (db1_interval={run['db1_interval']}s, 基线版本 {baseline.get('git_commit')}):")
+        for path, higher_is_better in BASELINE_KEYS:
+            new, old = run, base
+            for key in path:
+                new = new.get(key) if isinstance(new, dict) else None
+                old = old.get(key) if isinstance(old, dict) else None
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            change = (new - old) / abs(old) * 100 if old else 0.0
+            worse = change < 0 if higher_is_better else change > 0
+            flag = " <-- 退化" if worse and abs(change) > 10 else ""
+            print(f"  {'.'.join(path):32s} {old:>12} -> {new:<12} ({change:+.1f}%){flag}")
+
+
+def print_summary(run: Dict[str, Any]):
+    print(f"\n== db1 {run['db1_interval']}s / db32 {run['db32_interval']}s, {run['duration_s']}s ==")
+    for name, loop in run['loops'].items():
+        print(f"  {name:7s} 目标 {loop['target_hz']} Hz, 实际 {loop['effective_hz']} Hz, "
+              f"抖动 p95 {loop['jitter_p95_ms']} ms, 超时 {loop['overruns']}, 跳拍 {loop['missed_ticks']}")
+    lag = run['event_loop_lag_ms']
+    print(f"  事件循环延迟: p50 {lag['p50']} ms, p99 {lag['p99']} ms, max {lag['max']} ms")
+    print(f"  写入: {run['points']['points_per_second']} 点/秒 (丢弃 {run['points']['writer_dropped']})")
+    mem = run['memory']
+    print(f"  内存: {mem['rss_start_mb']} -> {mem['rss_end_mb']} MB ({mem['growth_mb_per_min']} MB/min)")
+    print(f"  CPU: {run['cpu']['process_pct']}%  " +
+          ", ".join(f"{name} {info['pct']}%" for name, info in list(run['cpu']['threads'].items())[:5]))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="采集链路端到端压测")
+    arg_parser.add_argument("--source", choices=("snap7", "mock"), default="snap7",
+                            help="snap7: 进程内模拟 PLC; mock: 后端 Mock 模式 (不经过 PLC 读取)")
+    arg_parser.add_argument("--rates", default="0.2", help="DB1 轮询间隔 (秒)，逗号分隔可测多档，如 0.2,0.05,0.02")
+    arg_parser.add_argument("--db32-interval", type=float, default=None, help="DB32 轮询间隔 (默认与 DB1 相同)")
+    arg_parser.add_argument("--status-interval", type=float, default=5.0, help="DB30/DB41 轮询间隔")
+    arg_parser.add_argument("--minutes", type=float, default=1.0, help="每档测量时长 (分钟)")
+    arg_parser.add_argument("--warmup", type=float, default=5.0, help="每档预热时长 (秒)")
+    arg_parser.add_argument("--plc-port", type=int, default=11102, help="模拟 PLC 端口")
+    arg_parser.add_argument("--sink-port", type=int, default=18086, help="line protocol 接收端端口")
+    arg_parser.add_argument("--output", default=None, help="结果 JSON 文件 (默认只打印)")
+    arg_parser.add_argument("--baseline", default=None, help="上一版本的结果 JSON，用于对比")
+    args = arg_parser.parse_args()
+
+    rates = [float(r) for r in args.rates.split(',') if r.strip()]
+    data_dir = tempfile.mkdtemp(prefix="furnace_bench_")
+    prepare_environment(args, data_dir)
+
+    sink = LineProtocolSink(args.sink_port)
+    sink.start()
+
+    plc = None
+    if args.source == 'snap7':
+        plc = InProcessPLC(args.plc_port, update_interval=min(rates))
+        plc.start(db_sizes_from_parsers())
+
+    result = {
+        'benchmark': 'pipeline',
+        'schema_version': SCHEMA_VERSION,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        'runs': [],
+    }
+
+    try:
+        for rate in rates:
+            run = asyncio.run(run_once(args, rate, sink))
+            result['runs'].append(run)
+            print_summary(run)
+    finally:
+        from backend.core.influx_writer import close_influx_writer
+        close_influx_writer()
+        if plc:
+            plc.stop()
+        sink.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare_with_baseline(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
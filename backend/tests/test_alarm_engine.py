@@ -0,0 +1,121 @@
+# ============================================================
+# 文件说明: test_alarm_engine.py - 报警引擎回差/延时状态机测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_alarm_engine.py
+# ============================================================
+
+import threading
+
+import numpy as np
+import pytest
+
+from backend.alarm_thresholds import ThresholdConfig
+from backend.services import alarm_engine
+from backend.services.alarm_engine import AlarmEngine, CHANNELS, LEVEL_ALARM, LEVEL_NORMAL, LEVEL_WARNING
+
+# arc_current_* 回差 50A
+_ARC = ThresholdConfig(warning_min=2000.0, warning_max=6000.0, alarm_min=0.0, alarm_max=8000.0)
+
+
+class _Thresholds:
+    def __init__(self, configs):
+        self.configs = configs
+        self.version = 1
+
+    def get_threshold(self, name):
+        return self.configs.get(name)
+
+
+@pytest.fixture
+def thresholds(monkeypatch):
+    t = _Thresholds({'arc_current_u': _ARC, 'arc_current_v': _ARC})
+    monkeypatch.setattr(alarm_engine, 'get_alarm_threshold_manager', lambda: t)
+    return t
+
+
+def _levels(transitions):
+    return [(t.channel.param_name, t.old_level, t.new_level) for t in transitions]
+
+
+def test_on_delay_requires_sustained_excursion(thresholds):
+    engine = AlarmEngine(on_delay=1.0, off_delay=1.0)
+    assert engine.evaluate({'arc_current_u': 8500.0}, now=0.0) == []
+    assert engine.evaluate({'arc_current_u': 4000.0}, now=0.5) == []
+    # 中途回到正常，计时重新开始
+    assert engine.evaluate({'arc_current_u': 8500.0}, now=1.0) == []
+    assert engine.evaluate({'arc_current_u': 8500.0}, now=1.5) == []
+
+    transitions = engine.evaluate({'arc_current_u': 8500.0}, now=2.0)
+    assert _levels(transitions) == [('arc_current_u', LEVEL_NORMAL, LEVEL_ALARM)]
+    assert transitions[0].threshold == 8000.0
+    # 已是报警级别，不重复输出
+    assert engine.evaluate({'arc_current_u': 8600.0}, now=3.0) == []
+
+
+def test_deadband_holds_level_near_threshold(thresholds):
+    engine = AlarmEngine(on_delay=0.0, off_delay=0.0)
+    assert _levels(engine.evaluate({'arc_current_u': 6010.0}, now=0.0)) == [
+        ('arc_current_u', LEVEL_NORMAL, LEVEL_WARNING)]
+
+    # 在阈值与回差之间抖动: 保持警告，不反复解除/触发
+    for i, value in enumerate((5990.0, 6010.0, 5960.0, 6005.0)):
+        assert engine.evaluate({'arc_current_u': value}, now=1.0 + i) == []
+
+    assert _levels(engine.evaluate({'arc_current_u': 5940.0}, now=10.0)) == [
+        ('arc_current_u', LEVEL_WARNING, LEVEL_NORMAL)]
+
+
+def test_off_delay_and_step_down(thresholds):
+    engine = AlarmEngine(on_delay=0.0, off_delay=2.0)
+    engine.evaluate({'arc_current_u': 8500.0}, now=0.0)
+    assert engine.get_states()['arc_current_u'] == 'alarm'
+
+    # 回到警告区间: 持续满 off_delay 才降级
+    assert engine.evaluate({'arc_current_u': 7000.0}, now=1.0) == []
+    assert engine.evaluate({'arc_current_u': 7000.0}, now=2.0) == []
+    assert _levels(engine.evaluate({'arc_current_u': 7000.0}, now=3.0)) == [
+        ('arc_current_u', LEVEL_ALARM, LEVEL_WARNING)]
+
+
+def test_zero_lower_limit_does_not_hold_alarm(thresholds):
+    """alarm_min=0: 断弧后 0A 不落在回差带内，报警可以解除"""
+    engine = AlarmEngine(on_delay=0.0, off_delay=0.0)
+    engine.evaluate({'arc_current_u': 8500.0}, now=0.0)
+    transitions = engine.evaluate({'arc_current_u': 0.0}, now=1.0)
+    assert _levels(transitions) == [('arc_current_u', LEVEL_ALARM, LEVEL_WARNING)]
+
+
+def test_missing_values_keep_state(thresholds):
+    engine = AlarmEngine(on_delay=1.0, off_delay=0.0)
+    engine.evaluate({'arc_current_u': 8500.0}, now=0.0)
+    # 本帧没有该通道: 不影响计时
+    assert engine.evaluate({'arc_current_u': None, 'arc_current_v': 4000.0}, now=0.5) == []
+    assert _levels(engine.evaluate({'arc_current_u': 8500.0}, now=1.0)) == [
+        ('arc_current_u', LEVEL_NORMAL, LEVEL_ALARM)]
+
+
+def test_fast_path_matches_array_path(thresholds):
+    index = {ch.param_name: i for i, ch in enumerate(CHANNELS)}
+    fast = AlarmEngine(on_delay=0.4, off_delay=0.4)
+    vector = AlarmEngine(on_delay=0.4, off_delay=0.4)
+    rng = np.random.default_rng(3)
+    for step, value in enumerate(rng.choice([0.0, 1900.0, 4000.0, 5990.0, 6100.0, 8100.0], size=400)):
+        frame = np.full(len(CHANNELS), np.nan)
+        frame[index['arc_current_u']] = value
+        now = step * 0.2
+        assert _levels(fast.evaluate({'arc_current_u': float(value)}, now=now)) == \
+            _levels(vector.evaluate_array(frame, now=now))
+    assert fast.get_states() == vector.get_states()
+
+
+def test_reset_from_other_thread(thresholds):
+    engine = AlarmEngine(on_delay=0.0, off_delay=0.0)
+    engine.evaluate({'arc_current_u': 8500.0}, now=0.0)
+    worker = threading.Thread(target=engine.reset)
+    worker.start()
+    worker.join()
+    assert engine.get_stats()['active'] == 0
+    # 复位后再次超限重新输出
+    assert _levels(engine.evaluate({'arc_current_u': 8500.0}, now=1.0)) == [
+        ('arc_current_u', LEVEL_NORMAL, LEVEL_ALARM)]
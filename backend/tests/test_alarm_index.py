@@ -0,0 +1,102 @@
+# ============================================================
+# 文件说明: test_alarm_index.py - 报警记录索引增量刷新/范围缩小测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_alarm_index.py
+# ============================================================
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.bridge import alarm_index
+from backend.bridge.alarm_index import AlarmRecordIndex, _RECORDS_PER_PARAM
+
+# 北京时间 (naive)
+_T0 = datetime(2026, 1, 3, 8, 0, 0)
+_TABLES = {'arc_u': ('arc_current', 'arc_current_u')}
+
+
+def _utc(value: datetime) -> datetime:
+    return alarm_index._to_utc(value)
+
+
+class _History:
+    """按 query_alarm_records_grouped 的语义返回记录: 时间范围过滤，每组取最新 N 条"""
+
+    def __init__(self):
+        self.records = []
+        self.calls = []
+
+    def add(self, minutes: float, param_name: str = 'arc_current_u'):
+        self.records.append({
+            'time_utc': _utc(_T0 + timedelta(minutes=minutes)),
+            'alarm_type': 'arc_current',
+            'param_name': param_name,
+            'level': 'alarm',
+        })
+
+    def query_alarm_records_grouped(self, batch_code, start_time, end_time, limit_per_param):
+        self.calls.append((start_time, end_time))
+        groups = {}
+        for r in sorted(self.records, key=lambda r: r['time_utc'], reverse=True):
+            if start_time <= r['time_utc'] < end_time:
+                group = groups.setdefault((r['alarm_type'], r['param_name']), [])
+                if len(group) < limit_per_param:
+                    group.append(dict(r))
+        return [r for group in groups.values() for r in group]
+
+
+@pytest.fixture
+def history(monkeypatch):
+    h = _History()
+    monkeypatch.setattr(alarm_index, 'get_history_query_service', lambda: h)
+    return h
+
+
+def _minutes(records):
+    return [round((r['time_utc'] - _utc(_T0)).total_seconds() / 60) for r in records]
+
+
+def test_incremental_refresh_queries_only_new_range(history):
+    index = AlarmRecordIndex()
+    history.add(1)
+    history.add(2)
+    first = index.get_tables('B1', _T0, _T0 + timedelta(minutes=10), _TABLES)
+    assert _minutes(first['arc_u']) == [2, 1]
+
+    history.add(15)
+    second = index.get_tables('B1', _T0, _T0 + timedelta(minutes=20), _TABLES)
+    assert _minutes(second['arc_u']) == [15, 2, 1]
+    assert len(history.calls) == 2
+    assert history.calls[1][0] == _utc(_T0 + timedelta(minutes=10)) - alarm_index._INCREMENTAL_OVERLAP
+
+
+def test_narrowed_end_within_cached_range_uses_cache(history):
+    index = AlarmRecordIndex()
+    for minute in range(5):
+        history.add(minute)
+    index.get_tables('B1', _T0, _T0 + timedelta(minutes=30), _TABLES)
+
+    result = index.get_tables('B1', _T0, _T0 + timedelta(minutes=2, seconds=30), _TABLES)
+    assert _minutes(result['arc_u']) == [2, 1, 0]
+    assert len(history.calls) == 1
+
+
+def test_narrowed_end_beyond_truncated_cache_requeries(history):
+    """缓存只有最新 N 条: 截止时间提前到缓存最早记录之前时需重新查询，不能返回空表"""
+    index = AlarmRecordIndex()
+    for minute in range(_RECORDS_PER_PARAM + 20):
+        history.add(minute)
+    index.get_tables('B1', _T0, _T0 + timedelta(hours=2), _TABLES)
+
+    result = index.get_tables('B1', _T0, _T0 + timedelta(minutes=10, seconds=30), _TABLES, limit=5)
+    assert _minutes(result['arc_u']) == [10, 9, 8, 7, 6]
+    assert len(history.calls) == 2
+
+
+def test_failed_query_is_not_cached(history, monkeypatch):
+    index = AlarmRecordIndex()
+    monkeypatch.setattr(history, 'query_alarm_records_grouped', lambda **kw: None)
+    assert index.get_tables('B1', _T0, _T0 + timedelta(minutes=5), _TABLES) == {'arc_u': []}
+    assert index.get_stats()['batches'] == 0
@@ -0,0 +1,86 @@
+# ============================================================
+# 文件说明: test_influx_spool.py - InfluxDB 离线缓冲读写/容量/重启续读测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_influx_spool.py
+# ============================================================
+
+import os
+
+from backend.core.influx_spool import InfluxSpool
+
+
+def _lines(start: int, count: int):
+    return [f"m,sensor=a v={i} {i}" for i in range(start, start + count)]
+
+
+def _drain(spool: InfluxSpool, max_lines: int = 3):
+    replayed = []
+    while True:
+        seq, lines, offset = spool.read_chunk(max_lines)
+        if seq is None:
+            return replayed
+        replayed.extend(lines)
+        spool.commit(seq, offset, len(lines))
+
+
+def test_append_and_replay_in_order(tmp_path):
+    spool = InfluxSpool(str(tmp_path), segment_max_bytes=64)
+    assert spool.append(_lines(0, 5)) == 5
+    assert spool.append(_lines(5, 5)) == 5
+    assert spool.get_status()['segments'] > 1
+
+    assert _drain(spool) == _lines(0, 10)
+    status = spool.get_status()
+    assert not spool.has_pending()
+    assert status['pending_bytes'] == 0
+    assert status['replayed_lines'] == 10
+
+
+def test_read_without_commit_rereads_same_chunk(tmp_path):
+    spool = InfluxSpool(str(tmp_path))
+    spool.append(_lines(0, 4))
+    seq, first, _ = spool.read_chunk(2)
+    seq_again, again, _ = spool.read_chunk(2)
+    assert (seq_again, again) == (seq, first)
+    assert first == _lines(0, 2)
+
+
+def test_resume_from_committed_offset_after_restart(tmp_path):
+    spool = InfluxSpool(str(tmp_path))
+    spool.append(_lines(0, 6))
+    seq, lines, offset = spool.read_chunk(4)
+    spool.commit(seq, offset, len(lines))
+    # 读取但未确认的数据重启后仍会回放
+    spool.read_chunk(2)
+    spool.close()
+
+    restarted = InfluxSpool(str(tmp_path))
+    assert restarted.has_pending()
+    assert _drain(restarted) == _lines(4, 2)
+
+
+def test_capacity_limit_drops_oldest_segment(tmp_path):
+    line_bytes = len(_lines(0, 1)[0]) + 1
+    spool = InfluxSpool(str(tmp_path), segment_max_bytes=line_bytes * 2, max_total_bytes=line_bytes * 5)
+    for i in range(0, 10, 2):
+        spool.append(_lines(i, 2))
+
+    status = spool.get_status()
+    assert status['pending_bytes'] <= line_bytes * 5
+    assert status['discarded_bytes'] > 0
+    replayed = _drain(spool)
+    # 保留的是最新数据
+    assert replayed == _lines(10 - len(replayed), len(replayed))
+
+
+def test_quarantine_is_never_replayed(tmp_path):
+    spool = InfluxSpool(str(tmp_path))
+    assert spool.quarantine(_lines(0, 2))
+    assert not spool.has_pending()
+    assert _drain(spool) == []
+
+    restarted = InfluxSpool(str(tmp_path))
+    assert not restarted.has_pending()
+    assert os.path.exists(os.path.join(str(tmp_path), 'rejected.lp'))
+    assert spool.get_status()['rejected_lines'] == 2
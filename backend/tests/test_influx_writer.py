@@ -0,0 +1,109 @@
+# ============================================================
+# 文件说明: test_influx_writer.py - 写入队列提交结果/丢弃策略/背压测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_influx_writer.py
+# ============================================================
+
+from collections import deque
+
+import pytest
+
+from backend.core import influx_writer
+from backend.core.influx_spool import InfluxSpool
+from backend.core.influx_writer import DROP_NEWEST, DROP_OLDEST, InfluxWriter, SubmitResult
+
+
+class _WriteApi:
+    def __init__(self):
+        self.records = []
+
+    def write(self, bucket, org, record):
+        self.records.extend(record)
+
+
+@pytest.fixture
+def write_api(monkeypatch):
+    api = _WriteApi()
+    monkeypatch.setattr(influx_writer, 'get_write_api', lambda: api)
+    return api
+
+
+def _writer(drop_policy: str, spool=None, size: int = 2) -> InfluxWriter:
+    # 批量/间隔足够大: 测试期间后台线程不会取走队列中的数据
+    return InfluxWriter(max_queue_size=size, batch_size=1000, flush_interval=60.0,
+                        drop_policy=drop_policy, spool=spool)
+
+
+def test_drop_newest_reports_rejected_points(write_api):
+    writer = _writer(DROP_NEWEST)
+    try:
+        assert writer.submit(['m f=1 1', 'm f=2 2', 'm f=3 3']) == SubmitResult(accepted=2, dropped=1)
+        assert writer.submit(['m f=4 4']) == SubmitResult(accepted=0, dropped=1)
+        assert writer.get_metrics()['dropped_points'] == 2
+    finally:
+        writer.stop()
+    assert write_api.records == ['m f=1 1', 'm f=2 2']
+
+
+def test_drop_oldest_reports_evicted_points(write_api):
+    writer = _writer(DROP_OLDEST)
+    try:
+        assert writer.submit(['m f=1 1', 'm f=2 2']) == SubmitResult(accepted=2, dropped=0)
+        assert writer.submit(['m f=3 3']) == SubmitResult(accepted=1, dropped=1)
+        metrics = writer.get_metrics()
+        assert metrics['evicted_points'] == 1
+        assert metrics['dropped_points'] == 1
+    finally:
+        writer.stop()
+    assert write_api.records == ['m f=2 2', 'm f=3 3']
+
+
+def test_counts_are_in_lines_for_bytes_payloads(write_api):
+    writer = _writer(DROP_NEWEST)
+    try:
+        assert writer.submit([b'm f=1 1\nm f=2 2\nm f=3 3\n']) == SubmitResult(accepted=3, dropped=0)
+        assert writer.submit([b'm f=4 4\n', b'm f=5 5\nm f=6 6\n']) == SubmitResult(accepted=1, dropped=2)
+    finally:
+        writer.stop()
+
+
+def test_overflow_is_spooled_not_dropped(write_api, tmp_path):
+    writer = _writer(DROP_NEWEST, spool=InfluxSpool(str(tmp_path)))
+    try:
+        assert writer.submit(['m f=1 1', 'm f=2 2', 'm f=3 3']) == SubmitResult(accepted=3, dropped=0)
+        metrics = writer.get_metrics()
+        assert metrics['dropped_points'] == 0
+        assert metrics['spool']['spooled_lines'] == 1
+    finally:
+        writer.stop()
+
+
+def test_backpressure_at_high_watermark(write_api):
+    writer = _writer(DROP_NEWEST, size=10)
+    try:
+        writer.submit([f'm f={i} {i}' for i in range(7)])
+        assert not writer.is_backpressured()
+        writer.submit(['m f=8 8'])
+        assert writer.is_backpressured()
+        assert writer.get_metrics()['backpressured']
+    finally:
+        writer.stop()
+
+
+def test_producers_thin_raw_points_under_backpressure():
+    from backend.services import polling_data_processor as processor
+
+    class _Busy:
+        def is_backpressured(self):
+            return True
+
+    def point(module_type, i):
+        return {'measurement': 'sensor_data', 'tags': {'module_type': module_type}, 'fields': {'v': i}}
+
+    buffer = deque([point('arc_data', i) for i in range(20)] + [point('energy_consumption', 0)])
+    kept = processor._thin_if_backpressured(_Busy(), buffer)
+    step = processor._BACKPRESSURE_KEEP_EVERY
+    assert [p['fields']['v'] for p in kept if p['tags']['module_type'] == 'arc_data'] == list(range(0, 20, step))
+    # 每组首个点始终保留 (每次 flush 只有一个能耗点)
+    assert any(p['tags']['module_type'] == 'energy_consumption' for p in kept)
@@ -0,0 +1,97 @@
+# ============================================================
+# 文件说明: test_layout_compiler.py - 预编译 DB 结构与逐字段解析的等价性测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_layout_compiler.py
+# ============================================================
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+from backend.plc.layout_compiler import CompiledLayout, field_meta_from_config, parse_offset
+from backend.plc.parser_config_db1 import ConfigDrivenDB1Parser
+from backend.tests.benchmark.bench_db_layout import legacy_decode
+
+# 覆盖: 空隙填充、WORD 内重叠的 BYTE、位字段、未知类型、超出帧长度的字段
+_FIELDS = [
+    {'name': 'a', 'type': 'INT', 'offset': 0},
+    {'name': 'b', 'type': 'REAL', 'offset': 4},
+    {'name': 'c', 'type': 'WORD', 'offset': 8},
+    {'name': 'c_low', 'type': 'BYTE', 'offset': 9},
+    {'name': 'd', 'type': 'DINT', 'offset': 12},
+    {'name': 'e', 'type': 'UDINT', 'offset': 16},
+    {'name': 'f', 'type': 'TIME', 'offset': 20},
+    {'name': 'flag0', 'type': 'BOOL', 'offset': 24, 'bit': 0},
+    {'name': 'flag7', 'type': 'BOOL', 'offset': 24, 'bit': 7},
+    {'name': 'g', 'type': 'DWORD', 'offset': 26},
+    {'name': 'unknown', 'type': 'STRING', 'offset': 2},
+    {'name': 'beyond', 'type': 'REAL', 'offset': 40},
+    {'name': 'beyond_bit', 'type': 'BOOL', 'offset': 40, 'bit': 1},
+]
+_FRAME_SIZE = 32
+
+
+def _as_text(values: dict) -> dict:
+    # NaN 按字符串比较
+    return {name: str(value) for name, value in values.items()}
+
+
+def _legacy(fields, frame) -> dict:
+    return _as_text({name: item['value'] for name, item in legacy_decode(fields, frame).items()})
+
+
+@pytest.fixture
+def layout():
+    return CompiledLayout([field_meta_from_config(f) for f in _FIELDS], frame_size=_FRAME_SIZE, real_digits=4)
+
+
+def test_full_frames_match_field_by_field_parse(layout):
+    for _ in range(200):
+        frame = os.urandom(_FRAME_SIZE)
+        assert _as_text(layout.decode_dict(frame)) == _legacy(_FIELDS, frame)
+
+
+def test_short_frames_use_defaults_like_field_by_field_parse(layout):
+    rng = random.Random(7)
+    for length in range(0, _FRAME_SIZE):
+        frame = bytes(rng.randrange(256) for _ in range(length))
+        assert _as_text(layout.decode_dict(frame)) == _legacy(_FIELDS, frame), length
+
+
+def test_out_of_frame_fields_are_constants(layout):
+    assert set(layout.out_of_frame) == {'unknown', 'beyond', 'beyond_bit'}
+    record = layout.decode(bytes(_FRAME_SIZE))
+    assert (record.beyond, record.beyond_bit, record.unknown) == (0.0, False, 0)
+
+
+def test_numpy_dtype_matches_struct_decode(layout):
+    frames = [os.urandom(_FRAME_SIZE) for _ in range(50)]
+    array = np.frombuffer(b''.join(frames), dtype=layout.numpy_dtype())
+    for row, frame in zip(array, frames):
+        record = layout.decode_dict(frame)
+        for name in array.dtype.names:
+            if name == 'b':
+                # REAL 在 decode 中保留 4 位小数，dtype 为原始 float32
+                assert str(row[name]) == str(np.frombuffer(frame[4:8], '>f4')[0])
+            else:
+                assert row[name] == record[name]
+
+
+def test_parse_offset_bit_notation():
+    assert parse_offset(0.3) == (0, 3)
+    assert parse_offset(12.7) == (12, 7)
+    assert parse_offset(6) == (6, 0)
+
+
+def test_db1_layout_matches_baseline_parser():
+    parser = ConfigDrivenDB1Parser()
+    size = parser.get_total_size()
+    for _ in range(100):
+        frame = os.urandom(size)
+        assert _as_text(parser.layout.decode_dict(frame)) == _legacy(parser.fields, frame)
+    # 截断帧: 越界字段取默认值
+    frame = os.urandom(size // 2)
+    assert _as_text(parser.layout.decode_dict(frame)) == _legacy(parser.fields, frame)
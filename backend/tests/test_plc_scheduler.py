@@ -0,0 +1,62 @@
+# ============================================================
+# 文件说明: test_plc_scheduler.py - PLC 调度器弧流保护窗口测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_plc_scheduler.py
+# ============================================================
+
+import threading
+import time
+
+from backend.plc.plc_scheduler import PLCPriority, PLCScheduler
+
+
+def _run_arc_and_sensor(scheduler: PLCScheduler, sensor_func, seconds: float,
+                        arc_period: float = 0.2, sensor_period: float = 0.5):
+    """弧流每 arc_period 秒读取一次 (约 20ms)，传感器每 sensor_period 秒读取一次 (截止 3s)"""
+    stop = threading.Event()
+
+    def arc_loop():
+        while not stop.is_set():
+            scheduler.submit('db1', time.sleep, (0.02,), PLCPriority.ARC, timeout=arc_period)
+            stop.wait(arc_period)
+
+    arc_thread = threading.Thread(target=arc_loop, daemon=True)
+    arc_thread.start()
+
+    futures = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        futures.append(scheduler.submit('db32', sensor_func, (), PLCPriority.SENSOR, timeout=3.0))
+        time.sleep(sensor_period)
+
+    for future in futures:
+        try:
+            future.result(timeout=5.0)
+        except Exception:
+            pass
+    stop.set()
+    arc_thread.join()
+    return futures
+
+
+def test_single_slow_read_does_not_starve_sensor_reads():
+    """一次 1s 的慢读取 (如重连) 之后，传感器读取仍能正常执行，不会因预计耗时偏大一直让路"""
+    scheduler = PLCScheduler(arc_guard=True)
+    calls = {'count': 0}
+
+    def sensor_read():
+        calls['count'] += 1
+        time.sleep(1.0 if calls['count'] == 1 else 0.02)
+        return calls['count']
+
+    try:
+        futures = _run_arc_and_sensor(scheduler, sensor_read, seconds=6.0)
+        stats = scheduler.get_stats()['classes']['sensor']
+    finally:
+        scheduler.close()
+
+    completed = [f for f in futures if f.done() and not f.cancelled()]
+    assert stats['expired'] == 0
+    assert len(completed) == len(futures)
+    assert stats['deferred'] <= PLCScheduler.ARC_GUARD_MAX_DEFERRALS * stats['submitted']
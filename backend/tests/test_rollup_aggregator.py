@@ -0,0 +1,113 @@
+# ============================================================
+# 文件说明: test_rollup_aggregator.py - 汇总窗口边界与刷新语义测试
+# ============================================================
+# 运行方式 (项目根目录):
+#   python -m pytest -q backend/tests/test_rollup_aggregator.py
+# ============================================================
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.core.influx_writer import SubmitResult
+from backend.services import rollup_aggregator
+from backend.services.rollup_aggregator import RollupAggregator
+
+_T0 = datetime(2026, 1, 3, 8, 0, 0, tzinfo=timezone.utc)
+
+
+class _Writer:
+    """收集提交的 line protocol，按 InfluxDB 规则保留同一序列同一时间戳的最后一次写入"""
+
+    def __init__(self):
+        self.lines = []
+
+    def submit(self, payloads):
+        lines = [line for payload in payloads for line in payload.decode().splitlines()]
+        self.lines.extend(lines)
+        return SubmitResult(len(lines), 0)
+
+    def points(self):
+        result = {}
+        for line in self.lines:
+            series, fields, timestamp = line.split(' ')
+            tags = dict(item.split('=') for item in series.split(',')[1:])
+            values = {k: float(v) for k, v in (item.split('=') for item in fields.split(','))}
+            result[(tags['tier'], int(timestamp))] = values
+        return result
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    w = _Writer()
+    monkeypatch.setattr(rollup_aggregator, 'get_influx_writer', lambda: w)
+    return w
+
+
+def _point(seconds: float, value: float):
+    return {
+        'measurement': 'sensor_data',
+        'tags': {'batch_code': 'B1', 'sensor': 'arc'},
+        'fields': {'arc_current_U': value},
+        'time': _T0 + timedelta(seconds=seconds),
+    }
+
+
+def _ns(seconds: int) -> int:
+    return int((_T0 + timedelta(seconds=seconds)).timestamp()) * 1_000_000_000
+
+
+def test_window_emitted_when_next_window_starts(writer):
+    agg = RollupAggregator(tiers=(("10s", 10),))
+    agg.add_points([_point(0, 1.0), _point(4, 3.0), _point(9.9, 5.0)])
+    assert writer.lines == []
+
+    agg.add_points([_point(10, 100.0)])
+    assert writer.points() == {
+        ('10s', _ns(0)): {'arc_current_U_mean': 3.0, 'arc_current_U_min': 1.0, 'arc_current_U_max': 5.0},
+    }
+
+
+def test_late_points_for_emitted_window_are_ignored(writer):
+    agg = RollupAggregator(tiers=(("10s", 10),))
+    agg.add_points([_point(12, 1.0)])
+    agg.add_points([_point(3, 50.0)])
+    agg.flush_all(final=True)
+    assert writer.points() == {
+        ('10s', _ns(10)): {'arc_current_U_mean': 1.0, 'arc_current_U_min': 1.0, 'arc_current_U_max': 1.0},
+    }
+
+
+def test_pause_resume_inside_window_keeps_whole_window_stats(writer):
+    """暂停时输出部分窗口，恢复后同一窗口再次输出时覆盖为整窗统计 (按样本数加权)"""
+    agg = RollupAggregator(tiers=(("10s", 10),))
+    agg.add_points([_point(0, 1.0), _point(1, 1.0), _point(2, 1.0)])
+    agg.flush_all(final=False)
+    assert writer.points()[('10s', _ns(0))]['arc_current_U_mean'] == 1.0
+
+    agg.add_points([_point(5, 9.0)])
+    agg.flush_all(final=True)
+    assert writer.points() == {
+        ('10s', _ns(0)): {'arc_current_U_mean': 3.0, 'arc_current_U_min': 1.0, 'arc_current_U_max': 9.0},
+    }
+
+
+def test_repeated_flush_without_new_samples_does_not_rewrite(writer):
+    agg = RollupAggregator(tiers=(("10s", 10),))
+    agg.add_points([_point(0, 2.0)])
+    agg.flush_all(final=False)
+    agg.flush_all(final=False)
+    agg.add_points([_point(10, 4.0)])
+    assert len(writer.lines) == 1
+    assert agg.get_stats()['open_series'] == {'10s': 1}
+
+
+def test_final_flush_clears_open_windows(writer):
+    agg = RollupAggregator(tiers=(("10s", 10), ("1m", 60)))
+    agg.add_points([_point(0, 2.0)])
+    agg.flush_all(final=True)
+    assert agg.get_stats()['open_series'] == {'10s': 0, '1m': 0}
+    assert set(writer.points()) == {('10s', _ns(0)), ('1m', _ns(0))}
+
+    agg.flush_all(final=True)
+    assert len(writer.lines) == 2
@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QStackedWidget, QPushButton, QLabel, QFrame, QMessageBox, QApplication, QDialog
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QKeySequence, QShortcut, QFont, QIcon
 from loguru import logger
 
@@ -26,6 +26,9 @@ from backend.bridge.service_manager import ServiceManager
 from backend.bridge.data_bridge import get_data_bridge
 from backend.bridge.data_cache import get_data_cache
 
+# 报警事件 (alarm 级别) 触发的报警声音持续时间 (毫秒)
+ALARM_EVENT_SOUND_MS = 10000
+
 
 class MainWindow(QMainWindow):
     """主窗口类"""
@@ -97,6 +100,12 @@ class MainWindow(QMainWindow):
         # 连接错误信号
         self.data_bridge.error_occurred.connect(self.on_backend_error)
         
+        # 连接报警事件信号（去重后立即送达，不等待数据库写入）
+        self.alarm_sound_timer = QTimer(self)
+        self.alarm_sound_timer.setSingleShot(True)
+        self.alarm_sound_timer.timeout.connect(self.on_alarm_sound_timeout)
+        self.data_bridge.alarm_raised.connect(self.on_alarm_raised)
+        
         # 连接高压紧急停电报警信号
         try:
             from backend.services.db1.emergency_stop_service import get_emergency_stop_service
@@ -139,6 +148,20 @@ class MainWindow(QMainWindow):
         """高压紧急停电报警解除"""
         logger.info("[报警] 高压紧急停电报警已解除")
         # 可以在这里添加报警解除的提示（可选）
+    
+    # 4.2 处理报警事件（alarm 级别播放报警声音，持续一段时间后自动停止）
+    def on_alarm_raised(self, event: dict):
+        logger.warning(f"[报警] {event.get('message', '')}")
+        if event.get('level') != 'alarm':
+            return
+        from ui.utils.alarm_sound_manager import get_alarm_sound_manager
+        get_alarm_sound_manager().play_alarm("alarm_event")
+        self.alarm_sound_timer.start(ALARM_EVENT_SOUND_MS)
+    
+    # 4.3 报警事件声音到时停止
+    def on_alarm_sound_timeout(self):
+        from ui.utils.alarm_sound_manager import get_alarm_sound_manager
+        get_alarm_sound_manager().stop_alarm("alarm_event")
         
     # 2. 初始化UI
     def init_ui(self):
@@ -405,6 +428,8 @@ class MainWindow(QMainWindow):
             logger.info("正在断开信号连接...")
             self.theme_manager.theme_changed.disconnect(self.on_theme_changed)
             self.data_bridge.error_occurred.disconnect(self.on_backend_error)
+            self.data_bridge.alarm_raised.disconnect(self.on_alarm_raised)
+            self.alarm_sound_timer.stop()
             
             # 断开高压紧急停电报警信号
             try:
@@ -15,6 +15,7 @@ from ui.styles.themes import ThemeManager
 from ui.widgets.history_curve.dropdown_tech import DropdownTech
 from ui.widgets.history_curve.widget_time_selector import WidgetTimeSelector
 from backend.bridge.history_query import get_history_query_service
+from backend.bridge.alarm_index import get_alarm_record_index
 
 
 class PageAlarmRecords(QWidget):
@@ -33,8 +34,9 @@ class PageAlarmRecords(QWidget):
         self.batch_start_time = None
         self.batch_end_time = None
         
-        # 历史查询服务
+        # 历史查询服务 / 报警记录索引 (一次查询所有表格，同一批次再次刷新只查询新增记录)
         self.history_service = get_history_query_service()
+        self.alarm_index = get_alarm_record_index()
         
         # 是否已查询过（点查询按钮后才显示数据）
         self.has_queried = False
@@ -251,6 +253,9 @@ class PageAlarmRecords(QWidget):
         
         # 查询该批次的时间范围，更新时间选择器
         self.query_batch_time_range(batch_code)
+        
+        # 已查询过时直接刷新 (已缓存的批次只查询新增记录)
+        self.refresh_all_alarms()
     
     # 查询按钮点击
     def on_query_clicked(self):
@@ -265,7 +270,7 @@ class PageAlarmRecords(QWidget):
         end_dt = end_qdt.toPyDateTime()
         return start_dt, end_dt
     
-    # 刷新所有报警记录
+    # 刷新所有报警记录 (所有表格共用一次查询)
     def refresh_all_alarms(self):
         if not self.has_queried:
             return
@@ -275,21 +280,18 @@ class PageAlarmRecords(QWidget):
         start_dt, end_dt = self.get_query_time_range()
         batch_code = self.selected_batch_code or None
         
+        tables = {}
+        for table in self.tables:
+            alarm_config = table.property("alarm_config")
+            if alarm_config and alarm_config["alarm_type"]:
+                tables[alarm_config["param"]] = (alarm_config["alarm_type"], alarm_config["param"])
+        
         try:
+            grouped = self.alarm_index.get_tables(batch_code, start_dt, end_dt, tables, limit=10)
             for table in self.tables:
                 alarm_config = table.property("alarm_config")
-                if not alarm_config or not alarm_config["alarm_type"]:
-                    continue
-                
-                filtered_alarms = self.history_service.query_alarm_records(
-                    alarm_type=alarm_config["alarm_type"],
-                    param_name=alarm_config["param"],
-                    batch_code=batch_code,
-                    start_time=start_dt,
-                    end_time=end_dt,
-                    limit=50
-                )
-                self.update_table(table, filtered_alarms)
+                if alarm_config and alarm_config["param"] in grouped:
+                    self.update_table(table, grouped[alarm_config["param"]])
         except Exception as e:
             logger.error(f"查询报警记录失败: {e}")
     
@@ -2,17 +2,31 @@
 历史曲线页面 - 九宫格测试版本
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QLabel, QHBoxLayout,
-                              QScrollArea, QFileDialog, QMessageBox, QPushButton)
+                              QScrollArea, QFileDialog, QMessageBox, QPushButton, QProgressDialog)
 from PyQt6.QtCore import Qt, QTimer, QDateTime, QThread, pyqtSignal
 from ui.styles.themes import ThemeManager
 from ui.widgets.history_curve.chart_line import ChartLine
 from ui.widgets.history_curve.bar_history import BarHistory
 from ui.pages.page_batch_compare import PageBatchCompare
 from backend.bridge.history_query import get_history_query_service
+from backend.services.data_exporter import get_data_exporter
 from datetime import datetime
 from loguru import logger
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+import numpy as np
+import os
+import threading
+
+# 导出格式 -> 文件对话框过滤器
+_EXPORT_FILTERS = {
+    "xlsx": "Excel 文件 (*.xlsx)",
+    "csv": "CSV 文件 (*.csv)",
+    "npz": "NumPy 列存文件 (*.npz)",
+}
+
+
+def _empty_series():
+    """空曲线 (时间戳数组, 数值数组)"""
+    return (np.empty(0), np.empty(0))
 
 
 class HistoryQueryThread(QThread):
@@ -34,33 +48,12 @@ class HistoryQueryThread(QThread):
         try:
             logger.info(f"后台线程开始查询批次 {self.batch_code} 的历史数据")
             
-            arc_data = self.history_service.query_arc_data(
-                self.batch_code, self.start_time, self.end_time, self.interval
-            )
-            
-            electrode_data = self.history_service.query_electrode_depth(
+            # 单次查询返回全部曲线 {键名: (时间戳数组, 数值数组)}
+            series = self.history_service.query_history_series(
                 self.batch_code, self.start_time, self.end_time, self.interval
             )
             
-            power_data = self.history_service.query_power_energy(
-                self.batch_code, self.start_time, self.end_time, self.interval
-            )
-            
-            hopper_data = self.history_service.query_hopper_data(
-                self.batch_code, self.start_time, self.end_time, self.interval
-            )
-            
-            cooling_data = self.history_service.query_cooling_water(
-                self.batch_code, self.start_time, self.end_time, self.interval
-            )
-            
-            result = {
-                "arc_data": arc_data,
-                "electrode_data": electrode_data,
-                "power_data": power_data,
-                "hopper_data": hopper_data,
-                "cooling_data": cooling_data
-            }
+            result = {"series": series}
             
             logger.info("后台线程查询完成，发送结果到主线程")
             self.query_finished.emit(result)
@@ -70,6 +63,37 @@ class HistoryQueryThread(QThread):
             self.query_failed.emit(str(e))
 
 
+class ExportThread(QThread):
+    """原始数据导出线程 (分段查询 InfluxDB 并流式写入文件)"""
+    
+    export_progress = pyqtSignal(int, int, int)   # 已完成段数, 总段数, 已写入行数
+    export_finished = pyqtSignal(dict)
+    
+    def __init__(self, file_path: str, batch_code: str, start_time: datetime, end_time: datetime):
+        super().__init__()
+        self.file_path = file_path
+        self.batch_code = batch_code
+        self.start_time = start_time
+        self.end_time = end_time
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """请求取消 (当前段写完后停止，删除未完成的文件)"""
+        self.cancel_event.set()
+    
+    def run(self):
+        """在后台线程中执行导出"""
+        result = get_data_exporter().export_raw(
+            self.file_path,
+            self.batch_code,
+            self.start_time,
+            self.end_time,
+            progress=self.export_progress.emit,
+            cancel_event=self.cancel_event,
+        )
+        self.export_finished.emit(result)
+
+
 class PageHistoryCurve(QWidget):
     """历史曲线页面 - 九宫格测试版本"""
     
@@ -86,16 +110,7 @@ class PageHistoryCurve(QWidget):
         self.current_start_time = None
         self.current_end_time = None
         
-        self.cached_data = {
-            "arc_current": {"1": [], "2": [], "3": []},
-            "arc_voltage": {"1": [], "2": [], "3": []},
-            "electrode_depth": {"1": [], "2": [], "3": []},
-            "power": [],
-            "energy": [],
-            "feeding_total": [],
-            "shell_water": [],
-            "cover_water": []
-        }
+        self.cached_data = self._new_cache()
         
         self.init_ui()
         self.apply_styles()
@@ -104,6 +119,8 @@ class PageHistoryCurve(QWidget):
         
         self.is_initialized = False
         self.query_thread = None
+        self.export_thread = None
+        self.export_progress = None
         self.load_retry_count = 0
         self.max_retry_count = 10
     
@@ -418,31 +435,25 @@ class PageHistoryCurve(QWidget):
         try:
             logger.info("收到后台查询结果，开始更新缓存")
             
-            arc_data = result.get("arc_data", {})
-            self.cached_data["arc_current"] = arc_data.get("arc_current", {"U": [], "V": [], "W": []})
-            self.cached_data["arc_voltage"] = arc_data.get("arc_voltage", {"U": [], "V": [], "W": []})
-            
-            self.cached_data["arc_current"]["1"] = self.cached_data["arc_current"].pop("U", [])
-            self.cached_data["arc_current"]["2"] = self.cached_data["arc_current"].pop("V", [])
-            self.cached_data["arc_current"]["3"] = self.cached_data["arc_current"].pop("W", [])
-            
-            self.cached_data["arc_voltage"]["1"] = self.cached_data["arc_voltage"].pop("U", [])
-            self.cached_data["arc_voltage"]["2"] = self.cached_data["arc_voltage"].pop("V", [])
-            self.cached_data["arc_voltage"]["3"] = self.cached_data["arc_voltage"].pop("W", [])
-            
-            electrode_data = result.get("electrode_data", {})
-            self.cached_data["electrode_depth"] = electrode_data
+            series = result.get("series", {})
             
-            power_data = result.get("power_data", {})
-            self.cached_data["power"] = power_data.get("power", [])
-            self.cached_data["energy"] = power_data.get("energy", [])
+            def get(key):
+                return series.get(key, _empty_series())
             
-            hopper_data = result.get("hopper_data", {})
-            self.cached_data["feeding_total"] = hopper_data.get("feeding_total", [])
-            
-            cooling_data = result.get("cooling_data", {})
-            self.cached_data["shell_water"] = cooling_data.get("shell_water", [])
-            self.cached_data["cover_water"] = cooling_data.get("cover_water", [])
+            self.cached_data["arc_current"] = {
+                "1": get("arc_current_U"), "2": get("arc_current_V"), "3": get("arc_current_W")
+            }
+            self.cached_data["arc_voltage"] = {
+                "1": get("arc_voltage_U"), "2": get("arc_voltage_V"), "3": get("arc_voltage_W")
+            }
+            self.cached_data["electrode_depth"] = {
+                "1": get("electrode_depth_1"), "2": get("electrode_depth_2"), "3": get("electrode_depth_3")
+            }
+            self.cached_data["power"] = get("power_total")
+            self.cached_data["energy"] = get("energy_total")
+            self.cached_data["feeding_total"] = get("feeding_total")
+            self.cached_data["shell_water"] = get("furnace_shell_water_total")
+            self.cached_data["cover_water"] = get("furnace_cover_water_total")
             
             logger.info("缓存更新完成，开始更新图表")
             
@@ -471,114 +482,70 @@ class PageHistoryCurve(QWidget):
         chart_cover_water = self.chart_cover_water.findChild(ChartLine)
         
         # 1. 更新弧流图表
-        data_1 = self.cached_data["arc_current"]["1"]
-        data_2 = self.cached_data["arc_current"]["2"]
-        data_3 = self.cached_data["arc_current"]["3"]
-        
-        if data_1 and data_2 and data_3:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in data_1]
-            y_data_1 = [d["value"] for d in data_1]
-            y_data_2 = [d["value"] for d in data_2]
-            y_data_3 = [d["value"] for d in data_3]
-            
-            data_list = [
-                ("1# (A)", x_data, y_data_1, colors.CHART_LINE_1),
-                ("2# (A)", x_data, y_data_2, colors.CHART_LINE_2),
-                ("3# (A)", x_data, y_data_3, colors.CHART_LINE_3),
-            ]
-            chart_arc_current.update_multi_data_with_time(data_list)
+        self._update_phase_chart(chart_arc_current, self.cached_data["arc_current"], "A", colors)
         
         # 2. 更新弧压图表
-        data_1 = self.cached_data["arc_voltage"]["1"]
-        data_2 = self.cached_data["arc_voltage"]["2"]
-        data_3 = self.cached_data["arc_voltage"]["3"]
-        
-        if data_1 and data_2 and data_3:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in data_1]
-            y_data_1 = [d["value"] for d in data_1]
-            y_data_2 = [d["value"] for d in data_2]
-            y_data_3 = [d["value"] for d in data_3]
-            
-            data_list = [
-                ("1# (V)", x_data, y_data_1, colors.CHART_LINE_1),
-                ("2# (V)", x_data, y_data_2, colors.CHART_LINE_2),
-                ("3# (V)", x_data, y_data_3, colors.CHART_LINE_3),
-            ]
-            chart_arc_voltage.update_multi_data_with_time(data_list)
+        self._update_phase_chart(chart_arc_voltage, self.cached_data["arc_voltage"], "V", colors)
         
         # 3. 更新电极高度图表
-        data_1 = self.cached_data["electrode_depth"]["1"]
-        data_2 = self.cached_data["electrode_depth"]["2"]
-        data_3 = self.cached_data["electrode_depth"]["3"]
-        
-        if data_1 and data_2 and data_3:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in data_1]
-            y_data_1 = [d["value"] for d in data_1]
-            y_data_2 = [d["value"] for d in data_2]
-            y_data_3 = [d["value"] for d in data_3]
-            
-            data_list = [
-                ("1# (mm)", x_data, y_data_1, colors.CHART_LINE_1),
-                ("2# (mm)", x_data, y_data_2, colors.CHART_LINE_2),
-                ("3# (mm)", x_data, y_data_3, colors.CHART_LINE_3),
-            ]
-            chart_electrode_depth.update_multi_data_with_time(data_list)
+        self._update_phase_chart(chart_electrode_depth, self.cached_data["electrode_depth"], "mm", colors)
         
         # 4. 更新功率图表
-        power_data = self.cached_data["power"]
-        if power_data:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in power_data]
-            y_data = [d["value"] for d in power_data]
+        x_data, y_data = self.cached_data["power"]
+        if len(x_data) > 0:
             chart_power.update_data_with_time(x_data, y_data, "功率 (kW)")
         
         # 5. 更新能耗图表
-        energy_data = self.cached_data["energy"]
-        if energy_data:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in energy_data]
-            y_data = [d["value"] for d in energy_data]
+        x_data, y_data = self.cached_data["energy"]
+        if len(x_data) > 0:
             chart_energy.update_data_with_time(x_data, y_data, "能耗 (kWh)")
         
         # 6. 更新累计投料量图表
-        feeding_data = self.cached_data["feeding_total"]
-        if feeding_data:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in feeding_data]
-            y_data = [d["value"] for d in feeding_data]
+        x_data, y_data = self.cached_data["feeding_total"]
+        if len(x_data) > 0:
             chart_feeding.update_data_with_time(x_data, y_data, "投料 (kg)")
         
         # 7. 更新炉皮冷却水图表
-        shell_data = self.cached_data["shell_water"]
-        if shell_data:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in shell_data]
-            y_data = [d["value"] for d in shell_data]
+        x_data, y_data = self.cached_data["shell_water"]
+        if len(x_data) > 0:
             chart_shell_water.update_data_with_time(x_data, y_data, "炉皮 (m³)")
         
         # 8. 更新炉盖冷却水图表
-        cover_data = self.cached_data["cover_water"]
-        if cover_data:
-            x_data = [self._parse_time_to_timestamp(d["time"]) for d in cover_data]
-            y_data = [d["value"] for d in cover_data]
+        x_data, y_data = self.cached_data["cover_water"]
+        if len(x_data) > 0:
             chart_cover_water.update_data_with_time(x_data, y_data, "炉盖 (m³)")
     
-    def _parse_time_to_timestamp(self, time_str: str) -> float:
-        """将ISO格式时间字符串转换为时间戳"""
-        from dateutil import parser
-        dt = parser.isoparse(time_str)
-        return dt.timestamp()
+    def _update_phase_chart(self, chart: ChartLine, phase_data: dict, unit: str, colors):
+        """更新三相曲线图表 (每相使用各自的时间轴)"""
+        line_colors = [colors.CHART_LINE_1, colors.CHART_LINE_2, colors.CHART_LINE_3]
+        data_list = []
+        for phase_id, color in zip(["1", "2", "3"], line_colors):
+            x_data, y_data = phase_data[phase_id]
+            if len(x_data) > 0:
+                data_list.append((f"{phase_id}# ({unit})", x_data, y_data, color))
+        
+        if data_list:
+            chart.update_multi_data_with_time(data_list)
     
     def clear_cache(self):
         """清空数据缓存"""
-        self.cached_data = {
-            "arc_current": {"1": [], "2": [], "3": []},
-            "arc_voltage": {"1": [], "2": [], "3": []},
-            "electrode_depth": {"1": [], "2": [], "3": []},
-            "power": [],
-            "energy": [],
-            "feeding_total": [],
-            "shell_water": [],
-            "cover_water": []
-        }
+        self.cached_data = self._new_cache()
         logger.info("数据缓存已清空")
     
+    @staticmethod
+    def _new_cache() -> dict:
+        """创建空数据缓存，每条曲线为 (时间戳数组, 数值数组)"""
+        return {
+            "arc_current": {"1": _empty_series(), "2": _empty_series(), "3": _empty_series()},
+            "arc_voltage": {"1": _empty_series(), "2": _empty_series(), "3": _empty_series()},
+            "electrode_depth": {"1": _empty_series(), "2": _empty_series(), "3": _empty_series()},
+            "power": _empty_series(),
+            "energy": _empty_series(),
+            "feeding_total": _empty_series(),
+            "shell_water": _empty_series(),
+            "cover_water": _empty_series()
+        }
+    
     def update_batch_compare(self, use_mock: bool = False):
         """更新批次对比"""
         if not self.selected_batches:
@@ -607,19 +574,24 @@ class PageHistoryCurve(QWidget):
                 batch_data['cover_water_total'][batch_code] = random.uniform(80, 180)
                 batch_data['duration_hours'][batch_code] = random.uniform(12, 22)
         else:
+            # 本地汇总索引一次读取（旧批次首次对比时自动回填）
+            try:
+                summaries = self.history_service.get_batch_summaries(self.selected_batches)
+            except Exception as e:
+                logger.error(f"查询批次统计数据失败: {e}")
+                summaries = {}
+            
             for batch_code in self.selected_batches:
-                try:
-                    stats = self.history_service.query_batch_statistics(batch_code)
-                    
-                    batch_data['batches'].append(batch_code)
-                    batch_data['energy_total'][batch_code] = stats['energy_total']
-                    batch_data['feeding_total'][batch_code] = stats['feeding_total']
-                    batch_data['shell_water_total'][batch_code] = stats['shell_water_total']
-                    batch_data['cover_water_total'][batch_code] = stats['cover_water_total']
-                    batch_data['duration_hours'][batch_code] = stats['duration_hours']
-                    
-                except Exception as e:
-                    logger.error(f"查询批次 {batch_code} 统计数据失败: {e}")
+                stats = summaries.get(batch_code)
+                if not stats:
+                    continue
+                
+                batch_data['batches'].append(batch_code)
+                batch_data['energy_total'][batch_code] = stats['energy_total']
+                batch_data['feeding_total'][batch_code] = stats['feeding_total']
+                batch_data['shell_water_total'][batch_code] = stats['shell_water_total']
+                batch_data['cover_water_total'][batch_code] = stats['cover_water_total']
+                batch_data['duration_hours'][batch_code] = stats['duration_hours']
         
         self.batch_compare_page.update_batch_data(batch_data)
     
@@ -633,193 +605,75 @@ class PageHistoryCurve(QWidget):
             self.export_history_curve_data()
     
     def export_history_curve_data(self):
-        """导出历史曲线数据到Excel文件，每个图表一个Sheet"""
-        if not self.selected_batch:
-            QMessageBox.warning(self, "导出失败", "请先选择批次并查询数据")
+        """导出所选批次时间范围内的原始分辨率数据 (后台线程分段流式写入，可取消)"""
+        batch_code = self.bar_history.get_selected_batch() or self.selected_batch
+        if not batch_code or batch_code in ["无数据", "加载失败"]:
+            QMessageBox.warning(self, "导出失败", "请先选择批次")
             return
         
-        if not self.current_start_time or not self.current_end_time:
-            QMessageBox.warning(self, "导出失败", "请先查询数据")
+        if self.export_thread and self.export_thread.isRunning():
+            QMessageBox.warning(self, "导出中", "上一次导出尚未完成")
             return
         
-        # 弹出文件保存对话框
-        # 文件名格式：批次号_历史数据_起始时间_截止时间.xlsx
-        start_str = self.current_start_time.strftime('%Y%m%d_%H%M%S')
-        end_str = self.current_end_time.strftime('%Y%m%d_%H%M%S')
-        default_filename = f"{self.selected_batch}_历史数据_{start_str}_{end_str}.xlsx"
-        file_path, _ = QFileDialog.getSaveFileName(
+        start_qdt, end_qdt = self.bar_history.get_time_range()
+        start_time = start_qdt.toPyDateTime()
+        end_time = end_qdt.toPyDateTime()
+        if end_time <= start_time:
+            QMessageBox.warning(self, "导出失败", "截止时间必须晚于起始时间")
+            return
+        
+        # 文件名格式：批次号_原始数据_起始时间_截止时间.xlsx
+        start_str = start_time.strftime('%Y%m%d_%H%M%S')
+        end_str = end_time.strftime('%Y%m%d_%H%M%S')
+        default_filename = f"{batch_code}_原始数据_{start_str}_{end_str}.xlsx"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
-            "导出所有数据",
+            "导出原始数据",
             default_filename,
-            "Excel 文件 (*.xlsx)"
+            ";;".join(_EXPORT_FILTERS.values())
         )
         
         if not file_path:
             return
         
-        try:
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            wb.remove(wb.active)  # 删除默认的空白sheet
-            
-            # 表头样式
-            header_font = Font(name='Microsoft YaHei', size=12, bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-            header_alignment = Alignment(horizontal='center', vertical='center')
-            border = Border(
-                left=Side(style='thin', color='000000'),
-                right=Side(style='thin', color='000000'),
-                top=Side(style='thin', color='000000'),
-                bottom=Side(style='thin', color='000000')
-            )
-            
-            # 数据样式
-            data_font = Font(name='Microsoft YaHei', size=11)
-            data_alignment = Alignment(horizontal='center', vertical='center')
-            
-            # 格式化时间
-            start_time_str = self.current_start_time.strftime('%Y-%m-%d %H:%M:%S')
-            end_time_str = self.current_end_time.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 定义要导出的数据集
-            export_datasets = [
-                ("弧流", self.cached_data["arc_current"], ["1#弧流 (A)", "2#弧流 (A)", "3#弧流 (A)"]),
-                ("弧压", self.cached_data["arc_voltage"], ["1#弧压 (V)", "2#弧压 (V)", "3#弧压 (V)"]),
-                ("电极高度", self.cached_data["electrode_depth"], ["1#电极 (mm)", "2#电极 (mm)", "3#电极 (mm)"]),
-                ("功率", {"data": self.cached_data["power"]}, ["功率 (kW)"]),
-                ("能耗", {"data": self.cached_data["energy"]}, ["能耗 (kWh)"]),
-                ("累计投料量", {"data": self.cached_data["feeding_total"]}, ["投料 (kg)"]),
-                ("炉皮冷却水", {"data": self.cached_data["shell_water"]}, ["炉皮 (m³)"]),
-                ("炉盖冷却水", {"data": self.cached_data["cover_water"]}, ["炉盖 (m³)"]),
-            ]
-            
-            # 为每个数据集创建一个Sheet
-            for sheet_name, data_dict, labels in export_datasets:
-                # 检查数据是否为空
-                if isinstance(data_dict, dict):
-                    if "data" in data_dict:
-                        # 单曲线数据
-                        data_list = data_dict["data"]
-                        if not data_list:
-                            logger.warning(f"{sheet_name} 数据为空，跳过")
-                            continue
-                        
-                        # 创建工作表
-                        ws = wb.create_sheet(title=sheet_name)
-                        
-                        # 设置列宽
-                        ws.column_dimensions['A'].width = 20
-                        ws.column_dimensions['B'].width = 22
-                        ws.column_dimensions['C'].width = 22
-                        ws.column_dimensions['D'].width = 20
-                        ws.column_dimensions['E'].width = 15
-                        
-                        # 写入表头
-                        headers = ['批次编号', '起始时间', '截止时间', '数据类型', '数据值']
-                        for col_idx, header in enumerate(headers, start=1):
-                            cell = ws.cell(row=1, column=col_idx, value=header)
-                            cell.font = header_font
-                            cell.fill = header_fill
-                            cell.alignment = header_alignment
-                            cell.border = border
-                        
-                        # 写入数据
-                        for row_idx, data_point in enumerate(data_list, start=2):
-                            ws.cell(row=row_idx, column=1, value=self.selected_batch).font = data_font
-                            ws.cell(row=row_idx, column=1).alignment = data_alignment
-                            ws.cell(row=row_idx, column=1).border = border
-                            
-                            ws.cell(row=row_idx, column=2, value=start_time_str).font = data_font
-                            ws.cell(row=row_idx, column=2).alignment = data_alignment
-                            ws.cell(row=row_idx, column=2).border = border
-                            
-                            ws.cell(row=row_idx, column=3, value=end_time_str).font = data_font
-                            ws.cell(row=row_idx, column=3).alignment = data_alignment
-                            ws.cell(row=row_idx, column=3).border = border
-                            
-                            ws.cell(row=row_idx, column=4, value=labels[0]).font = data_font
-                            ws.cell(row=row_idx, column=4).alignment = data_alignment
-                            ws.cell(row=row_idx, column=4).border = border
-                            
-                            value = data_point.get('value', 0)
-                            ws.cell(row=row_idx, column=5, value=round(value, 2)).font = data_font
-                            ws.cell(row=row_idx, column=5).alignment = data_alignment
-                            ws.cell(row=row_idx, column=5).border = border
-                    else:
-                        # 三相数据
-                        has_data = False
-                        for phase_id in ["1", "2", "3"]:
-                            if data_dict.get(phase_id):
-                                has_data = True
-                                break
-                        
-                        if not has_data:
-                            logger.warning(f"{sheet_name} 数据为空，跳过")
-                            continue
-                        
-                        # 创建工作表
-                        ws = wb.create_sheet(title=sheet_name)
-                        
-                        # 设置列宽
-                        ws.column_dimensions['A'].width = 20
-                        ws.column_dimensions['B'].width = 22
-                        ws.column_dimensions['C'].width = 22
-                        ws.column_dimensions['D'].width = 20
-                        ws.column_dimensions['E'].width = 15
-                        
-                        # 写入表头
-                        headers = ['批次编号', '起始时间', '截止时间', '数据类型', '数据值']
-                        for col_idx, header in enumerate(headers, start=1):
-                            cell = ws.cell(row=1, column=col_idx, value=header)
-                            cell.font = header_font
-                            cell.fill = header_fill
-                            cell.alignment = header_alignment
-                            cell.border = border
-                        
-                        # 写入三相数据
-                        row_idx = 2
-                        for phase_idx, phase_id in enumerate(["1", "2", "3"]):
-                            data_list = data_dict.get(phase_id, [])
-                            if not data_list:
-                                continue
-                            
-                            for data_point in data_list:
-                                ws.cell(row=row_idx, column=1, value=self.selected_batch).font = data_font
-                                ws.cell(row=row_idx, column=1).alignment = data_alignment
-                                ws.cell(row=row_idx, column=1).border = border
-                                
-                                ws.cell(row=row_idx, column=2, value=start_time_str).font = data_font
-                                ws.cell(row=row_idx, column=2).alignment = data_alignment
-                                ws.cell(row=row_idx, column=2).border = border
-                                
-                                ws.cell(row=row_idx, column=3, value=end_time_str).font = data_font
-                                ws.cell(row=row_idx, column=3).alignment = data_alignment
-                                ws.cell(row=row_idx, column=3).border = border
-                                
-                                ws.cell(row=row_idx, column=4, value=labels[phase_idx]).font = data_font
-                                ws.cell(row=row_idx, column=4).alignment = data_alignment
-                                ws.cell(row=row_idx, column=4).border = border
-                                
-                                value = data_point.get('value', 0)
-                                ws.cell(row=row_idx, column=5, value=round(value, 2)).font = data_font
-                                ws.cell(row=row_idx, column=5).alignment = data_alignment
-                                ws.cell(row=row_idx, column=5).border = border
-                                
-                                row_idx += 1
-            
-            # 检查是否创建了任何工作表
-            if len(wb.sheetnames) == 0:
-                QMessageBox.warning(self, "导出失败", "没有可导出的数据")
-                return
-            
-            # 保存文件
-            wb.save(file_path)
-            logger.info(f"所有数据导出成功: {file_path}")
-            QMessageBox.information(self, "导出成功", f"所有数据已导出到:\n{file_path}\n\n共 {len(wb.sheetnames)} 个数据表")
-            
-        except Exception as e:
-            logger.error(f"导出数据失败: {e}", exc_info=True)
-            QMessageBox.critical(self, "导出失败", f"导出数据时发生错误:\n{str(e)}")
+        # 未输入扩展名时按所选过滤器补全
+        if os.path.splitext(file_path)[1].lstrip('.').lower() not in _EXPORT_FILTERS:
+            fmt = next((key for key, text in _EXPORT_FILTERS.items() if text == selected_filter), "xlsx")
+            file_path = f"{file_path}.{fmt}"
+        
+        self.export_progress = QProgressDialog("正在导出原始数据...", "取消", 0, 100, self)
+        self.export_progress.setWindowTitle("导出数据")
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setAutoClose(False)
+        self.export_progress.setAutoReset(False)
+        self.export_progress.setValue(0)
+        
+        self.export_thread = ExportThread(file_path, batch_code, start_time, end_time)
+        self.export_thread.export_progress.connect(self.on_export_progress)
+        self.export_thread.export_finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_thread.cancel)
+        self.export_thread.start()
+        logger.info(f"后台导出线程已启动: {file_path}")
+    
+    def on_export_progress(self, done: int, total: int, rows: int):
+        """导出进度回调"""
+        if self.export_progress is None:
+            return
+        self.export_progress.setMaximum(total)
+        self.export_progress.setValue(done)
+        self.export_progress.setLabelText(f"正在导出原始数据... {done}/{total} 段，已写入 {rows} 行")
+    
+    def on_export_finished(self, result: dict):
+        """导出完成回调 (成功/失败/取消)"""
+        if self.export_progress is not None:
+            self.export_progress.close()
+            self.export_progress = None
+        
+        if result.get("success"):
+            QMessageBox.information(self, "导出成功", f"原始数据已导出到:\n{result['file_path']}\n\n{result['message']}")
+        elif not result.get("cancelled"):
+            QMessageBox.critical(self, "导出失败", f"导出数据时发生错误:\n{result.get('message', '')}")
     
     def export_batch_compare_data(self):
         """导出批次对比数据到Excel文件（单个Sheet）"""
@@ -848,41 +702,6 @@ class PageHistoryCurve(QWidget):
             return
         
         try:
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "批次对比数据"
-            
-            # 设置列宽
-            ws.column_dimensions['A'].width = 20
-            ws.column_dimensions['B'].width = 22
-            ws.column_dimensions['C'].width = 20
-            ws.column_dimensions['D'].width = 15
-            
-            # 表头样式
-            header_font = Font(name='Microsoft YaHei', size=12, bold=True, color='FFFFFF')
-            header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-            header_alignment = Alignment(horizontal='center', vertical='center')
-            border = Border(
-                left=Side(style='thin', color='000000'),
-                right=Side(style='thin', color='000000'),
-                top=Side(style='thin', color='000000'),
-                bottom=Side(style='thin', color='000000')
-            )
-            
-            # 数据样式
-            data_font = Font(name='Microsoft YaHei', size=11)
-            data_alignment = Alignment(horizontal='center', vertical='center')
-            
-            # 写入表头
-            headers = ['批次号', '时间', '数据类型', '数据值']
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-            
             # 获取当前时间作为导出时间
             export_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
@@ -895,46 +714,22 @@ class PageHistoryCurve(QWidget):
                 ('开炉时长', 'duration_hours', '小时')
             ]
             
-            # 写入数据
-            row_idx = 2
-            batches = batch_data.get('batches', [])
-            
             # 按数据类型分组，每个数据类型显示所有批次的数据
+            batches = batch_data.get('batches', [])
+            rows = []
             for data_type_name, data_key, unit in data_types:
                 data_dict = batch_data.get(data_key, {})
-                
-                # 为每个批次写入该数据类型的值
                 for batch_code in batches:
                     value = data_dict.get(batch_code, 0)
-                    
-                    # 批次号
-                    cell = ws.cell(row=row_idx, column=1, value=batch_code)
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = border
-                    
-                    # 时间
-                    cell = ws.cell(row=row_idx, column=2, value=export_time)
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = border
-                    
-                    # 数据类型
-                    cell = ws.cell(row=row_idx, column=3, value=f"{data_type_name} ({unit})")
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = border
-                    
-                    # 数据值
-                    cell = ws.cell(row=row_idx, column=4, value=round(value, 2))
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = border
-                    
-                    row_idx += 1
-            
-            # 保存文件
-            wb.save(file_path)
+                    rows.append([batch_code, export_time, f"{data_type_name} ({unit})", round(value, 2)])
+            
+            get_data_exporter().export_rows_to_excel(
+                file_path,
+                "批次对比数据",
+                ['批次号', '时间', '数据类型', '数据值'],
+                rows,
+                column_widths=[20, 22, 20, 15],
+            )
             logger.info(f"批次对比数据导出成功: {file_path}")
             QMessageBox.information(
                 self, 
@@ -74,6 +74,11 @@ class PageRealtime(QWidget):
         # 高弧流报警弹窗标志（防止重复弹窗）
         self.high_current_alarm_shown = False
         
+        # 已处理的缓存快照版本（版本号未变化时跳过对应区域的重绘）
+        self._card_arc_version = -1
+        self._card_sensor_version = -1
+        self._chart_arc_version = -1
+        
         # 监听主题变化
         self.theme_manager.theme_changed.connect(self.on_theme_changed)
         
@@ -302,9 +307,12 @@ class PageRealtime(QWidget):
         7. 功率、能耗
         """
         try:
-            # 从 DataCache 读取实时数据
-            sensor_data = self.data_cache.get_sensor_data()
-            arc_data = self.data_cache.get_arc_data()
+            # 从 DataCache 读取实时数据（只读快照，数据未更新时置空跳过重绘）
+            snapshot = self.data_cache.get_snapshot()
+            sensor_data = snapshot.sensor if snapshot.sensor_version != self._card_sensor_version else None
+            arc_data = snapshot.arc if snapshot.arc_version != self._card_arc_version else None
+            self._card_sensor_version = snapshot.sensor_version
+            self._card_arc_version = snapshot.arc_version
             
             # ========================================
             # 1. 更新蝶阀开度和状态（每 0.5s）
@@ -536,8 +544,12 @@ class PageRealtime(QWidget):
         - 0.5s 轮询时，图表每 0.5s 刷新
         """
         try:
-            # 从 DataCache 读取弧流数据
-            arc_data = self.data_cache.get_arc_data()
+            # 从 DataCache 读取弧流数据（版本号未变化时跳过重绘）
+            snapshot = self.data_cache.get_snapshot()
+            if snapshot.arc_version == self._chart_arc_version:
+                return
+            self._chart_arc_version = snapshot.arc_version
+            arc_data = snapshot.arc
             
             if arc_data:
                 arc_current = arc_data.get('arc_current', {})
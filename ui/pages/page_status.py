@@ -1,15 +1,17 @@
 """
-状态监控页面 - DB30/DB41 设备状态监控
+状态监控页面 - DB30/DB41 设备状态监控 + 采集链路耗时
 """
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QScrollArea
 from PyQt6.QtCore import Qt, QTimer
 from ui.styles.themes import ThemeManager
 from ui.widgets.status.card_status_db30 import CardStatusDb30
 from ui.widgets.status.card_status_db41 import CardStatusDb41
+from ui.widgets.status.card_pipeline_metrics import CardPipelineMetrics
 from backend.services.polling_data_processor import (
     get_latest_status_data,
     get_latest_db41_data
 )
+from backend.services.polling_loops_v2 import get_pipeline_stage_metrics
 
 
 class PageStatus(QWidget):
@@ -24,6 +26,10 @@ class PageStatus(QWidget):
         self.init_ui()
         self.apply_styles()
         
+        # 上次渲染时的最后变化时间 (未变化时不重建设备列表)
+        self._db30_changed_at = None
+        self._db41_changed_at = None
+        
         # 定时器定期刷新数据 (5秒)，页面显示时才启动
         self.refresh_timer = QTimer(self)
         self.refresh_timer.timeout.connect(self.refresh_data)
@@ -65,6 +71,10 @@ class PageStatus(QWidget):
         self.card_db41 = CardStatusDb41()
         content_layout.addWidget(self.card_db41)
         
+        # 采集链路耗时卡片
+        self.card_pipeline = CardPipelineMetrics()
+        content_layout.addWidget(self.card_pipeline)
+        
         content_layout.addStretch()
         
         scroll.setWidget(content)
@@ -75,8 +85,11 @@ class PageStatus(QWidget):
         # 获取 DB30 通信状态数据
         db30_result = get_latest_status_data()
         db30_data = db30_result.get('data', {})
+        db30_changed_at = db30_result.get('changed_at')
+        self.card_db30.update_changed_at(db30_changed_at)
         
-        if db30_data:
+        if db30_data and db30_changed_at != self._db30_changed_at:
+            self._db30_changed_at = db30_changed_at
             devices_dict = db30_data.get('devices', {})
             db30_devices = []
             for device_id, device_info in devices_dict.items():
@@ -94,8 +107,11 @@ class PageStatus(QWidget):
         # 获取 DB41 数据状态
         db41_result = get_latest_db41_data()
         db41_data = db41_result.get('data', {})
+        db41_changed_at = db41_result.get('changed_at')
+        self.card_db41.update_changed_at(db41_changed_at)
         
-        if db41_data:
+        if db41_data and db41_changed_at != self._db41_changed_at:
+            self._db41_changed_at = db41_changed_at
             devices_dict = db41_data.get('devices', {})
             db41_devices = []
             for device_id, device_info in devices_dict.items():
@@ -107,6 +123,9 @@ class PageStatus(QWidget):
             
             if db41_devices:
                 self.card_db41.update_devices(db41_devices)
+        
+        # 采集链路分阶段耗时
+        self.card_pipeline.update_metrics(get_pipeline_stage_metrics())
     
     # 4. 应用样式
     def apply_styles(self):
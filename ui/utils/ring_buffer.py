@@ -0,0 +1,86 @@
+"""
+实时曲线环形缓冲区 - NumPy 镜像存储，O(1) 追加，零拷贝连续视图
+
+用法:
+    buf = RingBuffer(30)
+    buf.append(5.98)
+    curve.setData(x, buf.view())  # view() 始终返回 capacity 长度，旧 -> 新，未填充部分为 NaN
+"""
+import numpy as np
+
+
+class RingBuffer:
+    """定长数值环形缓冲区（非线程安全，仅在 GUI 线程使用）
+
+    内部数组长度为 2 * capacity，每个值同时写入 i 和 i + capacity 两个位置，
+    因此任意时刻最近 capacity 个值在内存中都是连续的，view() 只做切片不复制。
+    """
+
+    # 1. 初始化缓冲区
+    def __init__(self, capacity: int, fill_value: float = np.nan, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于 0")
+        self._capacity = capacity
+        self._fill_value = fill_value
+        self._data = np.full(capacity * 2, fill_value, dtype=dtype)
+        self._pos = 0      # 下一个写入位置 (0 ~ capacity-1)
+        self._count = 0    # 有效数据个数
+        self._version = 0  # 每次写入递增，用于判断是否需要重绘
+
+    # 2. 追加一个值 (O(1))
+    def append(self, value: float):
+        pos = self._pos
+        self._data[pos] = value
+        self._data[pos + self._capacity] = value
+        self._pos = pos + 1 if pos + 1 < self._capacity else 0
+        if self._count < self._capacity:
+            self._count += 1
+        self._version += 1
+
+    # 3. 追加多个值
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    # 4. 获取全部窗口视图 (旧 -> 新，长度固定为 capacity，右对齐)
+    def view(self) -> np.ndarray:
+        """返回只读视图（不复制）；数据未填满时左侧为 fill_value"""
+        window = self._data[self._pos:self._pos + self._capacity]
+        window.flags.writeable = False
+        return window
+
+    # 5. 获取最近 n 个值的视图 (旧 -> 新)
+    def tail(self, n: int) -> np.ndarray:
+        n = min(n, self._count)
+        end = self._pos + self._capacity
+        window = self._data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    # 6. 最新值 (无数据时返回 fill_value)
+    def latest(self) -> float:
+        if not self._count:
+            return self._fill_value
+        return self._data[self._pos + self._capacity - 1]
+
+    # 7. 清空缓冲区
+    def clear(self):
+        self._data[:] = self._fill_value
+        self._pos = 0
+        self._count = 0
+        self._version += 1
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def is_full(self) -> bool:
+        return self._count == self._capacity
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return self._count
@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
     QFrame, QHBoxLayout, QVBoxLayout, QPushButton, 
     QLabel, QWidget
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QSize
 from PyQt6.QtGui import QFont, QIcon, QPixmap
 from PyQt6.QtSvgWidgets import QSvgWidget
 from datetime import datetime
@@ -15,8 +15,8 @@ from ui.widgets.common.switch_theme import SwitchTheme
 from ui.widgets.common.label_clock import LabelClock
 from backend.bridge.data_cache import get_data_cache
 from backend.bridge.service_manager import ServiceManager
-from backend.plc.plc_manager import get_plc_manager
-from backend.core.influxdb import check_influx_health
+from backend.bridge.data_bridge import get_data_bridge, TOPIC_HEALTH
+from backend.services.health_monitor import get_health_monitor, PROBE_PLC, PROBE_INFLUXDB, PROBE_POLLING
 from loguru import logger
 
 
@@ -40,11 +40,6 @@ class TopNavBar(QFrame):
         # 设置按钮
         self.settings_button = None
         
-        # 状态查询定时器 (5秒一次)
-        self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self.update_status)
-        self.status_timer.start(5000)  # 5秒更新
-        
         # 数据缓存
         self.data_cache = get_data_cache()
         
@@ -62,8 +57,9 @@ class TopNavBar(QFrame):
         self.init_ui()
         self.apply_styles()
         
-        # 立即更新一次状态
-        self.update_status()
+        # 状态由后台健康检查推送 (GUI 线程不执行任何网络请求)，先显示当前缓存结果
+        self.health_subscription = get_data_bridge().subscribe(TOPIC_HEALTH, self.update_status)
+        self.update_status(get_health_monitor().get_status())
     
     # 2. 初始化 UI
     def init_ui(self):
@@ -250,27 +246,17 @@ class TopNavBar(QFrame):
         self.apply_styles()
         self.nav_changed.emit(5)
     
-    # 10. 更新状态显示
-    def update_status(self):
+    # 10. 更新状态显示 (HealthMonitor.get_status() 的返回值)
+    def update_status(self, health: dict):
         try:
-            # 1. 检查 PLC 连接状态
-            plc_manager = get_plc_manager()
-            plc_connected = plc_manager.is_connected()
-            self.update_status_indicator(self.status_plc, plc_connected)
+            # 1. PLC 连接状态
+            self.update_status_indicator(self.status_plc, bool(health.get(PROBE_PLC, {}).get('ok')))
             
-            # 2. 检查服务状态 (轮询服务是否运行)
-            from backend.services.polling_loops_v2 import get_polling_loops_status
-            polling_status = get_polling_loops_status()
-            service_running = (
-                polling_status.get('db1_running', False) and 
-                polling_status.get('db32_running', False) and 
-                polling_status.get('status_running', False)
-            )
-            self.update_status_indicator(self.status_service, service_running)
+            # 2. 服务状态 (轮询循环是否都在运行)
+            self.update_status_indicator(self.status_service, bool(health.get(PROBE_POLLING, {}).get('ok')))
             
-            # 3. 检查数据库连接状态
-            db_ok, _ = check_influx_health()
-            self.update_status_indicator(self.status_database, db_ok)
+            # 3. 数据库连接状态
+            self.update_status_indicator(self.status_database, bool(health.get(PROBE_INFLUXDB, {}).get('ok')))
                 
         except Exception as e:
             logger.error(f"更新状态失败: {e}")
@@ -479,8 +465,9 @@ class TopNavBar(QFrame):
     def cleanup(self):
         if self.clock_widget:
             self.clock_widget.cleanup()
-        if self.status_timer:
-            self.status_timer.stop()
+        if self.health_subscription:
+            get_data_bridge().unsubscribe(self.health_subscription)
+            self.health_subscription = None
     
     # 18. 鼠标按下事件（开始拖动）
     def mousePressEvent(self, event):
@@ -175,10 +175,10 @@ class ChartLine(QWidget):
     
     # 3.1. 更新单条曲线数据（带时间轴）
     def update_data_with_time(self, x_data: list, y_data: list, label: str = "数据"):
-        """更新单条曲线（X轴为时间戳）"""
+        """更新单条曲线（X轴为时间戳，支持 list 或 NumPy 数组）"""
         self.plot_widget.clear()
         
-        if not x_data or not y_data:
+        if len(x_data) == 0 or len(y_data) == 0:
             return
         
         # 绘制曲线
@@ -256,7 +256,7 @@ class ChartLine(QWidget):
             else:
                 label, x_data, y_data, color = data
             
-            if not x_data or not y_data:
+            if len(x_data) == 0 or len(y_data) == 0:
                 continue
             
             # 绘制曲线
@@ -7,7 +7,7 @@ from PyQt6.QtGui import QPainter, QColor, QLinearGradient, QPen, QFont
 from ui.styles.themes import ThemeManager
 import pyqtgraph as pg
 import numpy as np
-from collections import deque
+from ui.utils.ring_buffer import RingBuffer
 
 
 class ElectrodeData:
@@ -52,21 +52,16 @@ class ChartElectrode(QWidget):
         self._throttle_timer.setSingleShot(True)
         self._throttle_timer.timeout.connect(self._do_pending_update)
 
-        # 三相弧流数据缓存（队列，最多30条）
+        # 三相弧流数据缓存（环形缓冲区，最多30条，追加 O(1)，绘图时零拷贝视图）
         self._maxlen = 30
         self.arc_current_data = {
-            'U': deque(maxlen=self._maxlen),
-            'V': deque(maxlen=self._maxlen),
-            'W': deque(maxlen=self._maxlen),
+            'U': RingBuffer(self._maxlen),
+            'V': RingBuffer(self._maxlen),
+            'W': RingBuffer(self._maxlen),
         }
         
-        # 预分配 numpy 数组（性能优化：避免每次绘图都创建新数组）
+        # 预分配 X 轴数组（右对齐时取尾部切片，不重新创建）
         self._x_full = np.arange(self._maxlen, dtype=np.float64)
-        self._y_buffers = {
-            'U': np.full(self._maxlen, np.nan, dtype=np.float64),
-            'V': np.full(self._maxlen, np.nan, dtype=np.float64),
-            'W': np.full(self._maxlen, np.nan, dtype=np.float64),
-        }
 
         self.init_ui()
 
@@ -391,29 +386,23 @@ class ChartElectrode(QWidget):
         self._pending_electrodes = None
         self._pending_deadzone = None
     
-    # 4.2 更新折线图（性能优化：预分配 + 右对齐）
+    # 4.2 更新折线图（性能优化：环形缓冲区视图 + 右对齐）
     def update_line_chart(self):
         """更新三相弧流折线图
         
-        数据右对齐：新数据始终出现在图表右侧，
-        空位用 NaN 填充，connect='finite' 自动跳过。
+        数据右对齐：新数据始终出现在图表右侧。
+        只传入已有数据的尾部视图（X 轴取对应尾部切片），
+        数组全部有限值，跳过 pyqtgraph 的 NaN 检查。
         """
         phases = ['U', 'V', 'W']
         for i, phase in enumerate(phases):
-            buf = self._y_buffers[phase]
-            buf[:] = np.nan  # 重置
-            
             data = self.arc_current_data[phase]
             n = len(data)
-            if n >= 2:
-                # 右对齐：数据填充到数组末尾
-                buf[self._maxlen - n:] = list(data)
-            elif n == 1:
-                # 只有1个点，放最右边但不画线（connect='finite' 需要2个点才连线）
-                buf[self._maxlen - 1] = data[0]
-            # n == 0 时保持全 NaN，曲线不显示
-            
-            self.line_curves[i].setData(self._x_full, buf)
+            # n == 0 时传入空数组，曲线不显示；n == 1 时只有一个点，不连线
+            self.line_curves[i].setData(
+                self._x_full[self._maxlen - n:], data.tail(n),
+                skipFiniteCheck=True,
+            )
     
     # 6. 从字典更新数据（便捷方法）
     def update_from_dict(self, data: dict):
@@ -3,6 +3,7 @@
 """
 from .card_status_db30 import CardStatusDb30
 from .card_status_db41 import CardStatusDb41
+from .card_pipeline_metrics import CardPipelineMetrics
 
-__all__ = ['CardStatusDb30', 'CardStatusDb41']
+__all__ = ['CardStatusDb30', 'CardStatusDb41', 'CardPipelineMetrics']
 
@@ -0,0 +1,231 @@
+"""
+采集链路耗时卡片 - 各轮询循环分阶段 p50/p95/p99/max
+"""
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout, QFrame
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFont
+from ui.styles.themes import ThemeManager
+
+
+# 循环 / 阶段显示名称
+LOOP_NAMES = {
+    'db1': 'DB1 弧流',
+    'db32': 'DB32 传感器',
+    'status': 'DB30/DB41 状态',
+    'health': '健康检查',
+}
+
+STAGE_NAMES = {
+    'plc_read': 'PLC 读取',
+    'parse': '解析',
+    'convert': '转换',
+    'power_calc': '功率/能耗计算',
+    'alarm_check': '报警检查',
+    'cache_publish': '缓存发布',
+    'signal_emit': '信号发送',
+    'buffer_flush': '批量写入',
+    'cycle': '整个周期',
+    'plc_probe': 'PLC 探测',
+    'influxdb_probe': 'InfluxDB 探测',
+    'polling_probe': '轮询探测',
+}
+
+COLUMNS = ("循环", "阶段", "p50 (ms)", "p95 (ms)", "p99 (ms)", "max (ms)", "次数")
+
+
+class CardPipelineMetrics(QFrame):
+    """采集链路耗时卡片"""
+
+    # 1. 初始化卡片
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.theme_manager = ThemeManager.instance()
+        self.theme_manager.theme_changed.connect(self.apply_styles)
+
+        self.rows = {}  # (loop, stage) -> [QLabel, ...]
+
+        self.init_ui()
+        self.apply_styles()
+
+    # 2. 初始化 UI
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # 头部
+        header = self.create_header()
+        layout.addWidget(header)
+
+        # 表格
+        self.grid_widget = QWidget()
+        self.grid_layout = QGridLayout(self.grid_widget)
+        self.grid_layout.setContentsMargins(16, 8, 16, 8)
+        self.grid_layout.setHorizontalSpacing(16)
+        self.grid_layout.setVerticalSpacing(2)
+
+        for col, text in enumerate(COLUMNS):
+            label = QLabel(text)
+            label.setObjectName("column_header")
+            label.setFont(QFont("Microsoft YaHei", 10, QFont.Weight.DemiBold))
+            if col >= 2:
+                label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.grid_layout.addWidget(label, 0, col)
+
+        layout.addWidget(self.grid_widget)
+
+    # 3. 创建头部
+    def create_header(self):
+        header = QWidget()
+        header.setObjectName("status_header")
+        header.setFixedHeight(40)
+
+        layout = QHBoxLayout(header)
+        layout.setContentsMargins(16, 0, 16, 0)
+        layout.setSpacing(8)
+
+        title = QLabel("采集链路耗时")
+        title.setObjectName("header_title")
+        title.setFont(QFont("Microsoft YaHei", 14, QFont.Weight.DemiBold))
+        layout.addWidget(title)
+
+        layout.addStretch()
+
+        # 超时提示 (整个周期 p95 超过轮询间隔)
+        self.overrun_label = QLabel("")
+        self.overrun_label.setObjectName("overrun_label")
+        self.overrun_label.setFont(QFont("Microsoft YaHei", 11))
+        layout.addWidget(self.overrun_label)
+
+        return header
+
+    # 4. 更新数据 (get_pipeline_stage_metrics 的返回值)
+    def update_metrics(self, metrics: dict):
+        if not metrics.get('enabled', False):
+            self.overrun_label.setText("统计未启用")
+            return
+
+        loops = metrics.get('loops', {})
+        keys = [(loop, stage) for loop, stages in loops.items() for stage in stages]
+        if keys != list(self.rows):
+            self.rebuild_rows(keys)
+
+        intervals = metrics.get('intervals', {})
+        overruns = []
+        for (loop, stage), labels in self.rows.items():
+            stats = loops[loop][stage]
+            labels[2].setText(f"{stats.get('p50_ms', 0.0):.2f}")
+            labels[3].setText(f"{stats.get('p95_ms', 0.0):.2f}")
+            labels[4].setText(f"{stats.get('p99_ms', 0.0):.2f}")
+            labels[5].setText(f"{stats.get('max_ms', 0.0):.2f}")
+            labels[6].setText(str(stats.get('count', 0)))
+
+            # 整个周期 p95 超过轮询间隔时标红
+            if stage == 'cycle':
+                interval_ms = intervals.get(loop, 0) * 1000
+                is_overrun = interval_ms > 0 and stats.get('p95_ms', 0.0) > interval_ms
+                labels[3].setObjectName("value_overrun" if is_overrun else "value_cell")
+                labels[3].style().unpolish(labels[3])
+                labels[3].style().polish(labels[3])
+                if is_overrun:
+                    overruns.append(LOOP_NAMES.get(loop, loop))
+
+        self.overrun_label.setText(f"周期超时: {', '.join(overruns)}" if overruns else "")
+
+    # 5. 重建表格行 (出现新的循环/阶段时，按循环分组)
+    def rebuild_rows(self, keys: list):
+        for labels in self.rows.values():
+            for label in labels:
+                label.deleteLater()
+        self.rows.clear()
+
+        previous_loop = None
+        for row, (loop, stage) in enumerate(keys, start=1):
+            labels = []
+
+            loop_label = QLabel(LOOP_NAMES.get(loop, loop) if loop != previous_loop else "")
+            loop_label.setObjectName("loop_cell")
+            loop_label.setFont(QFont("Microsoft YaHei", 10))
+            labels.append(loop_label)
+            previous_loop = loop
+
+            stage_label = QLabel(STAGE_NAMES.get(stage, stage))
+            stage_label.setObjectName("stage_cell")
+            stage_label.setFont(QFont("Microsoft YaHei", 10))
+            labels.append(stage_label)
+
+            for _ in range(5):
+                value_label = QLabel("-")
+                value_label.setObjectName("value_cell")
+                value_label.setFont(QFont("Consolas", 10))
+                value_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                labels.append(value_label)
+
+            for col, label in enumerate(labels):
+                self.grid_layout.addWidget(label, row, col)
+
+            self.rows[(loop, stage)] = labels
+
+    # 6. 应用样式
+    def apply_styles(self):
+        tm = self.theme_manager
+
+        self.setStyleSheet(f"""
+            CardPipelineMetrics {{
+                background: {tm.card_bg()};
+                border: 1px solid {tm.border_dark()};
+                border-radius: 4px;
+            }}
+
+            /* 头部 */
+            QWidget#status_header {{
+                background: {tm.bg_medium()};
+                border: none;
+                border-bottom: 1px solid {tm.border_medium()};
+                border-top-left-radius: 4px;
+                border-top-right-radius: 4px;
+            }}
+
+            QLabel#header_title {{
+                color: {tm.text_primary()};
+                border: none;
+                background: transparent;
+            }}
+
+            QLabel#overrun_label {{
+                color: {tm.status_alarm()};
+                border: none;
+                background: transparent;
+            }}
+
+            /* 表格 */
+            QLabel#column_header {{
+                color: {tm.text_secondary()};
+                border: none;
+                background: transparent;
+            }}
+
+            QLabel#loop_cell {{
+                color: {tm.glow_orange()};
+                border: none;
+                background: transparent;
+            }}
+
+            QLabel#stage_cell {{
+                color: {tm.text_primary()};
+                border: none;
+                background: transparent;
+            }}
+
+            QLabel#value_cell {{
+                color: {tm.text_primary()};
+                border: none;
+                background: transparent;
+            }}
+
+            QLabel#value_overrun {{
+                color: {tm.status_alarm()};
+                border: none;
+                background: transparent;
+            }}
+        """)
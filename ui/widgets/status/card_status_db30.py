@@ -63,6 +63,13 @@ class CardStatusDb30(QFrame):
         
         layout.addStretch()
         
+        # 最后变化时间 (数据块内容不变时不刷新设备列表)
+        self.changed_label = QLabel("")
+        self.changed_label.setObjectName("changed_label")
+        self.changed_label.setFont(QFont("Microsoft YaHei", 10))
+        layout.addWidget(self.changed_label)
+        layout.addSpacing(8)
+        
         # 统计标签
         self.stat_normal = self.create_stat_chip("正常", 0, "normal")
         self.stat_error = self.create_stat_chip("异常", 0, "error")
@@ -117,6 +124,10 @@ class CardStatusDb30(QFrame):
         # 更新统计
         self.update_statistics()
     
+    # 5.1 更新最后变化时间 (ISO 格式字符串)
+    def update_changed_at(self, changed_at):
+        self.changed_label.setText(f"最后变化 {changed_at[11:19]}" if changed_at else "")
+    
     # 6. 创建设备卡片
     def create_device_card(self, device: dict, index: int):
         card = QWidget()
@@ -251,6 +262,12 @@ class CardStatusDb30(QFrame):
                 background: transparent;
             }}
             
+            QLabel#changed_label {{
+                color: {tm.text_secondary()};
+                border: none;
+                background: transparent;
+            }}
+            
             /* 统计芯片 */
             QWidget#stat_chip_normal {{
                 background: rgba(0, 255, 136, 0.1);